@@ -0,0 +1,104 @@
+"""Compares the generated code bindings with the slotted code bindings.
+
+- construct: creating a validation result event
+- unmarshall: unmarshalling a validation result event received from EventBridge
+- memory: the memory allocated for each event held, in bytes
+
+Run from the repository root:
+    python -m lambdas.benchmarks.bindings_benchmark [--number 2000]
+"""
+
+import argparse
+import json
+import os
+import timeit
+import tracemalloc
+from datetime import datetime
+from types import ModuleType
+from typing import Callable
+
+from lambdas.utils.code_bindings import validation_result, validation_result_slotted
+from lambdas.utils.event_utilities.event_consumer import unmarshall
+
+SAMPLE_EVENT = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    "../utils/event_utilities/test/validation-failed-event.json",
+)
+
+
+def create_event(bindings: ModuleType) -> object:
+    """Creates a validation result event with the classes of a bindings package"""
+    return bindings.Event(
+        bindings.Detail(
+            bindings.Detail_metadata(
+                client_key="8b2b4dfa-4cbb-4a39-8d4b-2e8d3c0b7a59",
+                correlation_id="c0e2b0c4-1a7c-4d0f-9a56-0bb2c1b7f1de",
+                created=datetime.now(),
+                request_id="4a7e8f4e-3f0e-4c55-8d29-7b6a0f6f9b11",
+            ),
+            bindings.Detail_sensitive(
+                patient_identifier="9435797881", proxy_identifier="9435775039"
+            ),
+            bindings.Detail_standard(
+                proxy_identifier_type="NHS Number",
+                relationship_type="MTH",
+                validation_result_info={"VALIDATED_PROXY": "Validated Proxy"},
+            ),
+        ),
+        DetailType="Validation Successful",
+        EventBusName="event-bus",
+        Source="Validation Service",
+    )
+
+
+def measure(function: Callable[[], object], number: int) -> float:
+    """Returns the mean time of a call in microseconds"""
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1_000_000
+
+
+def measure_memory(function: Callable[[], object], number: int) -> float:
+    """Returns the memory allocated for each result held, in bytes"""
+    tracemalloc.start()
+    results = [function() for _ in range(number)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return allocated / number
+
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="calls per repeat")
+    args = parser.parse_args()
+
+    with open(SAMPLE_EVENT, "r", encoding="UTF-8") as file:
+        sample = json.load(file)
+
+    def unmarshall_event(bindings: ModuleType) -> object:
+        return unmarshall(sample, bindings.Marshaller.unmarshall, bindings.Event)
+
+    assert (
+        unmarshall_event(validation_result).to_dict()
+        == unmarshall_event(validation_result_slotted).to_dict()
+    )
+
+    cases = {
+        "construct": lambda bindings: lambda: create_event(bindings),
+        "unmarshall": lambda bindings: lambda: unmarshall_event(bindings),
+    }
+
+    print(f"{'case':<16}{'generated':>14}{'slotted':>14}{'speedup':>10}")
+    for name, case in cases.items():
+        before = measure(case(validation_result), args.number)
+        after = measure(case(validation_result_slotted), args.number)
+        print(
+            f"{name + ' (us)':<16}{before:>14.1f}{after:>14.1f}{before / after:>9.1f}x"
+        )
+    before = measure_memory(lambda: create_event(validation_result), args.number)
+    after = measure_memory(lambda: create_event(validation_result_slotted), args.number)
+    print(f"{'memory (bytes)':<16}{before:>14.0f}{after:>14.0f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
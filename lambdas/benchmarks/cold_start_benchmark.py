@@ -0,0 +1,123 @@
+"""Measures the cold start cost of each lambda handler.
+
+Each measurement runs in a new python process, as a cold start would:
+- import: the cumulative `python -X importtime` cost of importing the handler module
+- first invocation: the time taken by the first call of the handler, for the handlers
+  that have an event below. The events take a validation error path, so that no AWS
+  or PDS requests are made.
+
+The median of the repeats is reported. With --max-import-ms the benchmark exits with
+an error if any handler takes longer to import, to catch cold start regressions.
+
+Run from the repository root:
+    python -m lambdas.benchmarks.cold_start_benchmark [--repeat 5] [--max-import-ms 500]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Optional
+
+LAMBDAS_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+REPOSITORY_ROOT = os.path.join(LAMBDAS_DIR, "..")
+
+# Events for the first invocation of each handler, taking a validation error path
+FIRST_INVOCATION_EVENTS = {
+    "get_candidate_relationships": {},
+    "pds_get_patient_details": {},
+    "process_validation_result": {},
+    "relationship_lookup": {},
+    "validate_eligibility": {},
+    "validate_relationship": {},
+    "verify_parameters": {},
+}
+
+FIRST_INVOCATION_SCRIPT = """
+import sys, time
+from lambdas.{handler}.main import lambda_handler
+start = time.perf_counter()
+lambda_handler({event}, None)
+print(time.perf_counter() - start, file=sys.stderr)
+"""
+
+
+def get_handlers() -> list[str]:
+    """Returns the name of each lambda that has a main module"""
+    return sorted(
+        name
+        for name in os.listdir(LAMBDAS_DIR)
+        if os.path.isfile(os.path.join(LAMBDAS_DIR, name, "main.py"))
+    )
+
+
+def run(args: list[str]) -> str:
+    """Runs python from the repository root and returns its standard error"""
+    env = {"AWS_DEFAULT_REGION": "eu-west-2", **os.environ}
+    completed = subprocess.run(
+        [sys.executable, *args],
+        cwd=REPOSITORY_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=True,
+    )
+    return completed.stderr
+
+
+def measure_import(handler: str) -> float:
+    """Returns the cumulative import time of the handler module in milliseconds"""
+    module = f"lambdas.{handler}.main"
+    for line in run(["-X", "importtime", "-c", f"import {module}"]).splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    raise ValueError(f"No import time found for {module}")
+
+
+def measure_first_invocation(handler: str) -> Optional[float]:
+    """Returns the time taken by the first invocation in milliseconds"""
+    if handler not in FIRST_INVOCATION_EVENTS:
+        return None
+    script = FIRST_INVOCATION_SCRIPT.format(
+        handler=handler, event=repr(FIRST_INVOCATION_EVENTS[handler])
+    )
+    return float(run(["-c", script]).splitlines()[-1]) * 1000
+
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="processes per handler")
+    parser.add_argument("--handler", action="append", help="only measure a handler")
+    parser.add_argument("--max-import-ms", type=float, help="fail above this time")
+    args = parser.parse_args()
+
+    regressions = []
+    print(f"{'handler':<50}{'import (ms)':>12}{'first call (ms)':>17}")
+    for handler in args.handler or get_handlers():
+        import_ms = statistics.median(
+            measure_import(handler) for _ in range(args.repeat)
+        )
+        first_calls = [measure_first_invocation(handler) for _ in range(args.repeat)]
+        first_call = (
+            f"{statistics.median(first_calls):.1f}"
+            if first_calls[0] is not None
+            else "-"
+        )
+        print(f"{handler:<50}{import_ms:>12.1f}{first_call:>17}")
+
+        if args.max_import_ms is not None and import_ms > args.max_import_ms:
+            regressions.append(handler)
+
+    if regressions:
+        sys.exit(
+            f"Import time above {args.max_import_ms}ms for: {', '.join(regressions)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compares rendering the GP email template from strings with the template registry.
+
+- before: `Environment.from_string` for the subject and the body of every email, as
+  create_merged_email did before
+- hot: the registry of a warm container, where both templates are compiled
+- cold: a new registry and an empty bytecode cache, as on a cold start
+- cold, bytecode: a new registry reading the bytecode cache written by an earlier
+  process, as after Lambda restarts the process in the same execution environment
+
+Each case renders the adult_to_child email template deployed by terraform. Time is
+the fastest render of the subject and body in microseconds.
+
+Run from the repository root:
+    python -m lambdas.benchmarks.email_template_benchmark [--number 2000]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import timeit
+from typing import Callable
+
+from jinja2 import Environment, FileSystemBytecodeCache, select_autoescape
+
+from lambdas.create_merged_email.template_registry import TemplateRegistry
+
+TEMPLATE = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    "../../terraform/stacks/email/email_templates/adult_to_child_template.json",
+)
+VALUES = {"reference_code": "18704o5en9", "ods_code": "A20047"}
+
+
+def render_before(environment: Environment, subject: str, body: str) -> tuple:
+    """Renders the email as create_merged_email did before"""
+    return (
+        environment.from_string(subject).render(**VALUES),
+        environment.from_string(body).render(**VALUES),
+    )
+
+
+def render_registry(registry: TemplateRegistry, subject: str, body: str) -> tuple:
+    """Renders the email with the templates of a registry"""
+    return (
+        registry.get_template(subject, "email_subject").render(**VALUES),
+        registry.get_template(body, "email_body").render(**VALUES),
+    )
+
+
+def measure(function: Callable[[], object], number: int) -> float:
+    """Returns the shortest time of a render in microseconds"""
+    return min(timeit.repeat(function, number=1, repeat=number)) * 1_000_000
+
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="renders")
+    args = parser.parse_args()
+
+    with open(TEMPLATE) as file:
+        template = json.load(file)
+    subject, body = template["email_subject"], template["email_body"]
+    environment = Environment(autoescape=select_autoescape())
+    hot = TemplateRegistry()
+    expected = render_before(environment, subject, body)
+    assert render_registry(hot, subject, body) == expected
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Written by an earlier process in the same execution environment
+        render_registry(
+            TemplateRegistry(bytecode_cache=FileSystemBytecodeCache(directory)),
+            subject,
+            body,
+        )
+        cases = {
+            "before": lambda: render_before(environment, subject, body),
+            "hot": lambda: render_registry(hot, subject, body),
+            "cold": lambda: render_registry(TemplateRegistry(), subject, body),
+            "cold, bytecode": lambda: render_registry(
+                TemplateRegistry(bytecode_cache=FileSystemBytecodeCache(directory)),
+                subject,
+                body,
+            ),
+        }
+        print(f"{'case':<16}{'us per email':>14}")
+        for name, function in cases.items():
+            print(f"{name:<16}{measure(function, args.number):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Compares the generated reflective marshaller with the compiled marshaller.
+
+- marshall: marshalling a validation result event
+- publish entry: creating the PutEvents entry for an event, which previously
+  marshalled the event to validate it and then marshalled its detail again
+- unmarshall: unmarshalling a validation result event received from EventBridge
+
+Run from the repository root:
+    python -m lambdas.benchmarks.marshaller_benchmark [--number 2000]
+"""
+
+import argparse
+import json
+import os
+import timeit
+from datetime import datetime
+from typing import Callable
+
+from lambdas.utils.code_bindings.validation_result import (
+    Detail,
+    Detail_metadata,
+    Detail_sensitive,
+    Detail_standard,
+)
+from lambdas.utils.code_bindings.validation_result import Event as ValidationResult
+from lambdas.utils.code_bindings.validation_result import Marshaller
+from lambdas.utils.event_utilities.event_publisher import (
+    VALIDATION_RESULT_MARSHALLER,
+    ValidationResultEventPublisher,
+)
+
+SAMPLE_EVENT = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    "../utils/event_utilities/test/validation-failed-event.json",
+)
+
+
+def create_event() -> ValidationResult:
+    """Creates a validation result event"""
+    return ValidationResult(
+        Detail(
+            Detail_metadata(
+                client_key="8b2b4dfa-4cbb-4a39-8d4b-2e8d3c0b7a59",
+                correlation_id="c0e2b0c4-1a7c-4d0f-9a56-0bb2c1b7f1de",
+                created=datetime.now(),
+                request_id="4a7e8f4e-3f0e-4c55-8d29-7b6a0f6f9b11",
+            ),
+            Detail_sensitive(
+                patient_identifier="9435797881", proxy_identifier="9435775039"
+            ),
+            Detail_standard(
+                proxy_identifier_type="NHS Number",
+                relationship_type="MTH",
+                validation_result_info={"VALIDATED_PROXY": "Validated Proxy"},
+            ),
+        ),
+        DetailType="Validation Successful",
+        EventBusName="event-bus",
+        Source="Validation Service",
+    )
+
+
+def reflective_entry(event: ValidationResult) -> dict:
+    """Creates the PutEvents entry as ValidationResultEventPublisher did before"""
+    Marshaller.marshall(event)
+    return {
+        "DetailType": event.DetailType,
+        "Detail": json.dumps(Marshaller.marshall(event.Detail)),
+        "EventBusName": event.EventBusName,
+        "Source": event.Source,
+    }
+
+
+def measure(function: Callable[[], object], number: int) -> float:
+    """Returns the mean time of a call in microseconds"""
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1_000_000
+
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="calls per repeat")
+    args = parser.parse_args()
+
+    event = create_event()
+    with open(SAMPLE_EVENT, "r", encoding="UTF-8") as file:
+        sample = json.load(file)
+    data = {
+        "Detail": sample["detail"],
+        "DetailType": sample["detail-type"],
+        "Source": sample["source"],
+    }
+
+    assert VALIDATION_RESULT_MARSHALLER.marshall(event) == Marshaller.marshall(event)
+    assert ValidationResultEventPublisher.create_entry(event) == reflective_entry(event)
+    assert VALIDATION_RESULT_MARSHALLER.unmarshall(
+        data, ValidationResult
+    ) == Marshaller.unmarshall(data, ValidationResult)
+
+    cases = {
+        "marshall": (
+            lambda: Marshaller.marshall(event),
+            lambda: VALIDATION_RESULT_MARSHALLER.marshall(event),
+        ),
+        "publish entry": (
+            lambda: reflective_entry(event),
+            lambda: ValidationResultEventPublisher.create_entry(event),
+        ),
+        "unmarshall": (
+            lambda: Marshaller.unmarshall(data, ValidationResult),
+            lambda: VALIDATION_RESULT_MARSHALLER.unmarshall(data, ValidationResult),
+        ),
+    }
+
+    print(f"{'case':<16}{'reflective (us)':>18}{'compiled (us)':>16}{'speedup':>10}")
+    for name, (reflective, compiled) in cases.items():
+        before = measure(reflective, args.number)
+        after = measure(compiled, args.number)
+        print(f"{name:<16}{before:>18.1f}{after:>16.1f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Compares transforming CloudWatch metric stream records for Splunk as before vs now.
+
+- before: slicing the tail of the record for each size delimited OpenTelemetry
+  message and converting it with MessageToDict, and parsing JSON metrics with
+  ast.literal_eval and copying them with copy.deepcopy
+- now: reading the messages from a memoryview of the record and building the Splunk
+  events from the protobuf messages, and parsing JSON metrics with json.loads
+
+The formatter used to return only the first message of an OpenTelemetry record, here
+before converts every message so that both cases return every data point. Parsing
+the protobuf messages, which is the same in both cases, dominates the OpenTelemetry
+cases.
+
+The OpenTelemetry record holds size delimited requests of summary data points, as
+metric streams send them, and the JSON record holds a metric per line. The default
+sizes make records of about 1 MB, the largest record Firehose accepts. Time is the
+fastest transformation of the record.
+
+Run from the repository root:
+    python -m lambdas.benchmarks.metric_stream_benchmark [--requests 100]
+        [--data-points 40] [--lines 3000] [--number 10]
+"""
+
+import argparse
+import ast
+import copy
+import json
+import os
+from time import perf_counter
+from typing import Callable
+
+from google.protobuf.internal.decoder import _DecodeVarint
+from google.protobuf.internal.encoder import _VarintBytes
+from google.protobuf.json_format import MessageToDict
+from opentelemetry.proto.collector.metrics.v1.metrics_service_pb2 import (
+    ExportMetricsServiceRequest,
+)
+
+from lambdas.splunk_log_and_metric_formatter.main import (
+    transform_json_record,
+    transform_otel_record,
+)
+
+
+def create_otel_record(requests: int, data_points: int) -> bytes:
+    """Creates a record of size delimited OpenTelemetry requests"""
+    record = b""
+    for index in range(requests):
+        request = ExportMetricsServiceRequest()
+        resource_metrics = request.resource_metrics.add()
+        for key, value in (
+            ("cloud.provider", "aws"),
+            ("cloud.account.id", "123456789012"),
+            ("cloud.region", "eu-west-2"),
+            ("aws.exporter.arn", "arn:aws:cloudwatch:eu-west-2:1:metric-stream/s"),
+        ):
+            attribute = resource_metrics.resource.attributes.add(key=key)
+            attribute.value.string_value = value
+        scope_metrics = resource_metrics.scope_metrics.add()
+        for point in range(data_points):
+            metric = scope_metrics.metrics.add(
+                name="amazonaws.com/AWS/Lambda/Duration", unit="Milliseconds"
+            )
+            data_point = metric.summary.data_points.add(
+                time_unix_nano=1_700_000_000_000_000_000 + point,
+                start_time_unix_nano=1_699_999_940_000_000_000,
+                count=index + 1,
+                sum=point * 10.0,
+            )
+            for key, value in (
+                ("Namespace", "AWS/Lambda"),
+                ("MetricName", "Duration"),
+                ("FunctionName", f"function-{point}"),
+            ):
+                data_point.attributes.add(key=key).value.string_value = value
+            data_point.quantile_values.add(quantile=0.0, value=point)
+            data_point.quantile_values.add(quantile=1.0, value=point * 2.0)
+        message = request.SerializeToString()
+        record += _VarintBytes(len(message)) + message
+    return record
+
+
+def create_json_record(lines: int) -> bytes:
+    """Creates a record of JSON metrics, one per line"""
+    return "\n".join(
+        json.dumps(
+            {
+                "metric_stream_name": "stream",
+                "account_id": "123456789012",
+                "region": "eu-west-2",
+                "namespace": "AWS/Lambda",
+                "metric_name": "Duration",
+                "dimensions": {"FunctionName": f"function-{line}", "Resource": "r"},
+                "timestamp": 1700000000000,
+                "value": {"count": 2.0, "sum": line * 10.0, "max": 1.0, "min": 0.0},
+                "unit": "Milliseconds",
+            }
+        )
+        for line in range(lines)
+    ).encode("utf-8")
+
+
+def transform_otel_before(data: bytes) -> bytes:
+    """Transforms an OpenTelemetry record as the formatter did before"""
+    result = []
+    start = 0
+    while len(data) > 0 and start < len(data):
+        (msg_length, hdr_length) = _DecodeVarint(data[start:], 0)
+        proto_str = data[start + hdr_length : start + msg_length + hdr_length]
+        start = start + msg_length + hdr_length
+        msg = ExportMetricsServiceRequest()
+        msg.ParseFromString(proto_str)
+        result.append(MessageToDict(msg))
+    return json.dumps(result).encode("utf-8")
+
+
+def transform_json_before(data: bytes) -> bytes:
+    """Transforms a JSON record as the formatter did before"""
+    events = []
+    for metric_string in data.decode("utf-8").splitlines():
+        metric_event = copy.deepcopy(ast.literal_eval(metric_string))
+        metric_event["metric_dimensions"] = ",".join(
+            [f"{key}=[{value}]" for key, value in metric_event["dimensions"].items()]
+        )
+        metric_event.pop("dimensions")
+        for key, name in (
+            ("count", "SampleCount"),
+            ("sum", "Sum"),
+            ("max", "Maximum"),
+            ("min", "Minimum"),
+        ):
+            metric_event[name] = metric_event["value"][key]
+        metric_event["Average"] = metric_event["Sum"] / metric_event["SampleCount"]
+        metric_event.pop("value")
+        events.append(
+            {
+                "event": metric_event,
+                "source": f"{metric_event['region']}:{metric_event['namespace']}",
+                "sourcetype": os.environ["SPLUNK_CLOUDWATCH_SOURCETYPE"],
+                "time": metric_event["timestamp"],
+            }
+        )
+    return json.dumps(events).encode("utf-8")
+
+
+def measure(function: Callable[[bytes], object], data: bytes, number: int) -> float:
+    """Returns the shortest time of transforming the record in milliseconds"""
+    durations = []
+    for _ in range(number):
+        start = perf_counter()
+        function(data)
+        durations.append(perf_counter() - start)
+    return min(durations) * 1000
+
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100, help="OTEL requests")
+    parser.add_argument("--data-points", type=int, default=40, help="per request")
+    parser.add_argument("--lines", type=int, default=3000, help="JSON metrics")
+    parser.add_argument("--number", type=int, default=10, help="transformations")
+    args = parser.parse_args()
+    os.environ["SPLUNK_CLOUDWATCH_SOURCETYPE"] = "aws:cloudwatch:metric"
+
+    otel = create_otel_record(args.requests, args.data_points)
+    lines = create_json_record(args.lines)
+    assert json.loads(transform_json_before(lines)) == json.loads(
+        transform_json_record(lines)[1]
+    )
+    points = len(json.loads(transform_otel_record(otel)[1]))
+    assert points == args.requests * args.data_points
+
+    print(f"{'case':<14}{'record KB':>10}{'data points':>13}{'ms':>10}{'points/s':>12}")
+    cases = [
+        ("otel before", transform_otel_before, otel),
+        ("otel now", lambda data: transform_otel_record(data)[1], otel),
+        ("json before", transform_json_before, lines),
+        ("json now", lambda data: transform_json_record(data)[1], lines),
+    ]
+    for name, function, data in cases:
+        duration = measure(function, data, args.number)
+        count = points if name.startswith("otel") else args.lines
+        print(
+            f"{name:<14}{len(data) / 1024:>10.0f}{count:>13}{duration:>10.2f}"
+            f"{count / duration * 1000:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
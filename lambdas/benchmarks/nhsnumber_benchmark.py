@@ -0,0 +1,74 @@
+"""Measures the throughput of NHS number validation over a large batch.
+
+Compares validating each number with is_valid_nhs_number against validate_many,
+with and without NumPy for the checksum.
+
+Run from the repository root:
+    python -m lambdas.benchmarks.nhsnumber_benchmark [--count 1000000]
+"""
+
+import argparse
+import random
+import time
+from typing import Callable
+
+from lambdas.utils.pds import nhsnumber
+from lambdas.utils.pds.nhsnumber import NHSNumber
+
+
+def create_numbers(count: int) -> list[str]:
+    """Creates random ten digit numbers, some formatted with separators"""
+    generator = random.Random(11)
+    numbers = []
+    for _ in range(count):
+        number = f"{generator.randrange(10**10):010d}"
+        if generator.random() < 0.1:
+            number = f"{number[:3]}-{number[3:6]}-{number[6:]}"
+        numbers.append(number)
+    return numbers
+
+
+def measure(function: Callable[[list[str]], list[bool]], numbers: list[str]):
+    """Returns the results and the number of NHS numbers validated per second"""
+    start = time.perf_counter()
+    results = function(numbers)
+    return results, len(numbers) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1_000_000, help="batch size")
+    args = parser.parse_args()
+
+    numbers = create_numbers(args.count)
+    validator = NHSNumber()
+    installed_numpy = nhsnumber.numpy
+
+    def validate_each(batch: list[str]) -> list[bool]:
+        return [validator.is_valid_nhs_number(number) for number in batch]
+
+    def validate_many_without_numpy(batch: list[str]) -> list[bool]:
+        nhsnumber.numpy = None
+        try:
+            return validator.validate_many(batch)
+        finally:
+            nhsnumber.numpy = installed_numpy
+
+    scenarios = {"is_valid_nhs_number": validate_each}
+    scenarios["validate_many (python)"] = validate_many_without_numpy
+    if installed_numpy is not None:
+        scenarios["validate_many (numpy)"] = validator.validate_many
+
+    expected = None
+    print(f"{'method':<26}{'numbers/s':>14}")
+    for name, function in scenarios.items():
+        results, throughput = measure(function, numbers)
+        expected = results if expected is None else expected
+        assert results == expected
+        print(f"{name:<26}{throughput:>14,.0f}")
+    print(f"{sum(expected):,} of {len(numbers):,} numbers are valid")
+
+
+if __name__ == "__main__":
+    main()
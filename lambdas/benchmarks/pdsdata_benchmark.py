@@ -0,0 +1,91 @@
+"""Compares reading PDS records through the fhirclient models and the raw JSON.
+
+The eligibility checks made by validate_eligibility and validate_relationship are
+run against the sample PDS payloads, once building the Patient and RelatedPerson
+models for every record and once reading the raw JSON.
+
+Run from the repository root:
+    python -m lambdas.benchmarks.pdsdata_benchmark [--number 2000]
+"""
+
+import argparse
+import json
+import os
+import timeit
+from typing import Callable
+
+from fhirclient.models.patient import Patient
+from fhirclient.models.relatedperson import RelatedPerson
+
+from lambdas.utils.pds import pdsdata
+
+SAMPLE_DATA = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "../utils/pds/sample_data"
+)
+
+
+def load_sample(*path: str):
+    """Loads a sample PDS payload"""
+    with open(os.path.join(SAMPLE_DATA, *path), "r", encoding="UTF-8") as file:
+        return json.load(file)
+
+
+def check_eligibility(patient, related: list) -> tuple:
+    """Reads every property used by the eligibility checks"""
+    return (
+        pdsdata.get_identifier_value(patient),
+        pdsdata.get_is_person_deceased(patient),
+        pdsdata.get_security_code(patient),
+        pdsdata.get_patient_age(patient),
+        [
+            (pdsdata.get_related_nhs_number(rel), pdsdata.get_relationship(rel))
+            for rel in related
+        ],
+    )
+
+
+def model_path(patient: dict, related: list[dict]) -> tuple:
+    """Builds the full models before reading them"""
+    return check_eligibility(Patient(patient), [RelatedPerson(rel) for rel in related])
+
+
+def json_path(patient: dict, related: list[dict]) -> tuple:
+    """Reads the raw JSON"""
+    return check_eligibility(patient, related)
+
+
+def measure(function: Callable, patient: dict, related: list[dict], number: int):
+    """Returns the mean time of a call in microseconds"""
+    best = min(
+        timeit.repeat(lambda: function(patient, related), number=number, repeat=5)
+    )
+    return best / number * 1_000_000
+
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="calls per repeat")
+    args = parser.parse_args()
+
+    scenarios = {
+        "patient, 2 related people": (
+            load_sample("patient_details", "sample_sandpit_patient.json"),
+            load_sample("related_person", "sample_sandpit_two_related_person.json"),
+        ),
+        "proxy, 3 related people": (
+            load_sample("patient_details", "proxy_valid.json"),
+            load_sample("related_person", "proxy_valid_three_children.json"),
+        ),
+    }
+
+    print(f"{'scenario':<28}{'model (us)':>12}{'json (us)':>12}{'speedup':>10}")
+    for name, (patient, related) in scenarios.items():
+        assert model_path(patient, related) == json_path(patient, related)
+        model = measure(model_path, patient, related, args.number)
+        raw = measure(json_path, patient, related, args.number)
+        print(f"{name:<28}{model:>12.1f}{raw:>12.1f}{model / raw:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
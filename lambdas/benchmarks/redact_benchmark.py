@@ -0,0 +1,167 @@
+"""Compares redacting Firehose batches record by record with the streaming redaction.
+
+- before: decoding, parsing, redacting and re-serialising every record into a list,
+  as RedactData did before
+- streaming: `transform_records` with `redact`, which replaces the sensitive block in
+  the event text, with the json module and with orjson when it is installed
+- parallel: `transform_batch` in parallel mode, with a worker process per vCPU
+
+Each batch holds 500 synthetic validation result events. Time is the fastest of the
+batches and memory is the peak allocated for a batch, from parsing the Firehose event
+to returning the redacted records.
+
+Run from the repository root:
+    python -m lambdas.benchmarks.redact_benchmark [--records 500] [--number 50]
+"""
+
+import argparse
+import json
+import tracemalloc
+import uuid
+from base64 import b64decode, b64encode
+from time import perf_counter
+from typing import Callable
+from unittest.mock import patch
+
+from lambdas.redact_sensitive_data import main as redact_sensitive_data
+from lambdas.utils.firehose import records
+from lambdas.utils.firehose.records import (
+    BatchMetrics,
+    get_worker_count,
+    transform_batch,
+    transform_records,
+)
+
+
+def create_batch(size: int) -> list[dict]:
+    """Creates a Firehose batch of validation result events"""
+    batch = []
+    for index in range(size):
+        event = {
+            "version": "0",
+            "id": str(uuid.uuid4()),
+            "detail-type": "Validation Successful",
+            "source": "Validation Service",
+            "account": "111111111111",
+            "time": "2024-03-18T13:36:32Z",
+            "region": "eu-west-2",
+            "resources": [],
+            "detail": {
+                "metadata": {
+                    "client-key": str(uuid.uuid4()),
+                    "correlation-id": str(uuid.uuid4()),
+                    "created": "2024-03-18T13:36:32.123456",
+                    "request-id": str(uuid.uuid4()),
+                },
+                "sensitive": {
+                    "patient-identifier": f"{9000000000 + index}",
+                    "proxy-identifier": f"{9100000000 + index}",
+                },
+                "standard": {
+                    "proxy-identifier-type": "NHS Number",
+                    "relationship-type": "MTH",
+                    "validation-result-info": {
+                        "VALIDATED_PROXY": "Validated Proxy",
+                        "VALIDATED_RELATIONSHIP": "Validated Relationship",
+                    },
+                },
+            },
+        }
+        batch.append(
+            {
+                "recordId": str(index),
+                "approximateArrivalTimestamp": 1710845104989,
+                "data": b64encode(json.dumps(event).encode("utf-8")).decode("utf-8"),
+            }
+        )
+    return batch
+
+
+def redact_before(batch: list[dict]) -> list[dict]:
+    """Redacts a batch as RedactData did before"""
+    outputs = []
+    for record in batch:
+        business_event = json.loads(b64decode(record["data"]).decode("utf-8"))
+        business_event["detail"]["sensitive"] = "[REDACTED]"
+        outputs.append(
+            {
+                "recordId": record["recordId"],
+                "result": "Ok",
+                "data": b64encode(json.dumps(business_event).encode("utf-8")).decode(
+                    "utf-8"
+                ),
+            }
+        )
+    return outputs
+
+
+def redact_streaming(batch: list[dict]) -> list[dict]:
+    """Redacts a batch with the streaming redaction"""
+    return list(transform_records(batch, redact_sensitive_data.redact, BatchMetrics()))
+
+
+def redact_parallel(batch: list[dict]) -> list[dict]:
+    """Redacts a batch with a worker process per vCPU"""
+    return transform_batch(
+        batch, redact_sensitive_data.redact, BatchMetrics(), mode="parallel"
+    )
+
+
+def measure(function: Callable[[list[dict]], object], event: str, number: int):
+    """Returns the shortest time of redacting the batch in milliseconds"""
+    durations = []
+    for _ in range(number):
+        batch = json.loads(event)["records"]
+        start = perf_counter()
+        function(batch)
+        durations.append(perf_counter() - start)
+    return min(durations) * 1000
+
+
+def measure_memory(function: Callable[[list[dict]], object], event: str) -> float:
+    """Returns the peak memory allocated for the batch and its redaction in KB"""
+    tracemalloc.start()
+    function(json.loads(event)["records"])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=500, help="records per batch")
+    parser.add_argument("--number", type=int, default=50, help="batches to redact")
+    args = parser.parse_args()
+
+    batch = create_batch(args.records)
+    event = json.dumps({"records": batch})
+    expected = [json.loads(b64decode(r["data"])) for r in redact_before(batch)]
+    with patch.object(redact_sensitive_data, "write_log"):
+        actual = redact_streaming([dict(record) for record in batch])
+    assert [json.loads(b64decode(r["data"])) for r in actual] == expected
+
+    codecs = {"json": None}
+    if records.orjson is not None:
+        codecs["orjson"] = records.orjson
+
+    print(f"{'case':<22}{'ms per batch':>14}{'records/s':>12}{'peak KB':>10}")
+    cases = [("before", redact_before, None)] + [
+        (f"streaming ({name})", redact_streaming, codec)
+        for name, codec in codecs.items()
+    ]
+    cases.append((f"parallel ({get_worker_count()} vCPU)", redact_parallel, None))
+    for name, function, codec in cases:
+        with patch.object(records, "orjson", codec), patch.object(
+            redact_sensitive_data, "write_log"
+        ):
+            duration = measure(function, event, args.number)
+            peak = measure_memory(function, event)
+        print(
+            f"{name:<22}{duration:>14.2f}{args.records / duration * 1000:>12.0f}"
+            f"{peak:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compares matching a proxy to a relationship by scanning the bundle and by index.
+
+The scan reads the NHS number and relationship codes of each related person in turn,
+as ValidateRelationship.is_eligible did before the index. The proxy is the last
+related person in the bundle, which is the worst case for the scan.
+
+Run from the repository root:
+    python -m lambdas.benchmarks.relationship_index_benchmark [--number 200]
+"""
+
+import argparse
+import copy
+import json
+import os
+import timeit
+from typing import Callable, Optional
+
+from lambdas.utils.pds import pdsdata
+from lambdas.utils.pds.relationshipindex import RelationshipIndex
+
+SAMPLE_RELATED_PERSON = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)),
+    "../utils/pds/sample_data/related_person/sample_sandpit_two_related_person.json",
+)
+MOTHER_RELATION_CODE = "MTH"
+BUNDLE_SIZES = [1, 10, 100, 1000]
+
+
+def create_bundle(size: int) -> tuple[list[dict], str]:
+    """Creates a bundle of related people from the sample, the mother is last"""
+    with open(SAMPLE_RELATED_PERSON, "r", encoding="UTF-8") as file:
+        mother = json.load(file)[0]
+
+    bundle = []
+    for number in range(size):
+        related = copy.deepcopy(mother)
+        related["id"] = f"{number:08X}"
+        related["patient"]["identifier"]["value"] = str(9000000000 + number)
+        bundle.append(related)
+
+    return bundle, bundle[-1]["patient"]["identifier"]["value"]
+
+
+def scan(related: list[dict], nhs_number: str) -> Optional[dict]:
+    """Finds the mother by reading every related person in turn"""
+    for rel in related:
+        if MOTHER_RELATION_CODE in pdsdata.get_relationship(
+            rel
+        ) and nhs_number == pdsdata.get_related_nhs_number(rel):
+            return rel
+    return None
+
+
+def index(related: list[dict], nhs_number: str) -> Optional[dict]:
+    """Finds the mother using an index built for the request"""
+    return RelationshipIndex(related).find(nhs_number, MOTHER_RELATION_CODE)
+
+
+def measure(function: Callable, related: list[dict], nhs_number: str, number: int):
+    """Returns the mean time of a call in microseconds"""
+    best = min(
+        timeit.repeat(lambda: function(related, nhs_number), number=number, repeat=5)
+    )
+    return best / number * 1_000_000
+
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="calls per repeat")
+    args = parser.parse_args()
+
+    print(f"{'entries':>8}{'scan (us)':>14}{'index (us)':>14}{'speedup':>10}")
+    for size in BUNDLE_SIZES:
+        related, nhs_number = create_bundle(size)
+        assert scan(related, nhs_number) is index(related, nhs_number)
+        scanned = measure(scan, related, nhs_number, args.number)
+        indexed = measure(index, related, nhs_number, args.number)
+        print(f"{size:>8}{scanned:>14.1f}{indexed:>14.1f}{scanned / indexed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
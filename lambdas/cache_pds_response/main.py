@@ -6,10 +6,12 @@ from hashlib import sha256
 from json import dumps, loads
 from os import getenv
 
-import boto3
 from aws_lambda_powertools import Logger
 from botocore.exceptions import ClientError
-from requests import Request, Response, Session
+from requests import Request, Response
+
+from lambdas.utils.aws.clients import get_client
+from lambdas.utils.connection_pool import connection_metrics, get_session
 
 logger = Logger(service="cache_pds_response")
 TIMEOUT = 200
@@ -59,7 +61,7 @@ class CachePDSResponse:
         """
         Cache the response from PDS
         """
-        dynamodb = boto3.client("dynamodb")
+        dynamodb = get_client("dynamodb")
 
         try:
             dynamodb.put_item(
@@ -82,7 +84,7 @@ class CachePDSResponse:
         """
         Get cached response for previously called requests
         """
-        dynamodb = boto3.client("dynamodb")
+        dynamodb = get_client("dynamodb")
 
         try:
             key = {"CacheKey": {"S": key}}
@@ -117,13 +119,14 @@ class CachePDSResponse:
             headers=headers,
         )
         logger.info("pds request", url=api_request.url)
-        session = Session()
+        session = get_session(self.target)
         prepped = session.prepare_request(api_request)
         try:
             response = session.send(prepped, timeout=TIMEOUT)
             logger.info(
                 "pds response", status=response.status_code, json=response.json()
             )
+            logger.debug("connection pool", metrics=connection_metrics())
             return response
 
         except Exception as e:
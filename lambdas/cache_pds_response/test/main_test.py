@@ -39,7 +39,7 @@ logger = getLogger(__name__)
 
 def _mock_dynamodb(mocker, raise_error=False):
     # Create a mock for the boto3 client
-    mock_dynamodb = mocker.patch("boto3.client")
+    mock_dynamodb = mocker.patch("lambdas.cache_pds_response.main.get_client")
 
     # Mock response for a successful get_item call
     mock_item = {
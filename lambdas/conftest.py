@@ -9,7 +9,25 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 from spine_aws_common.log.log_helper import LogHelper
 from spine_aws_common.logger import Logger
 
+from lambdas.ods_lookup.odscache import ods_cache
 from lambdas.utils.logging.logger import initialise_logger
+from lambdas.utils.pds.pdscache import pds_cache
+
+
+class FakeClock:
+    """Controllable clock for the caches"""
+
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(name="clock")
+def clock_fixture() -> FakeClock:
+    """Create and return a fake clock starting at 1000 seconds."""
+    return FakeClock()
 
 
 @pytest.fixture(name="log_helper")
@@ -38,6 +56,22 @@ def initialise_logging(logger):
     initialise_logger(logger)
 
 
+@pytest.fixture(autouse=True)
+def clear_pds_cache():
+    """Clear the PDS cache so that responses are not shared between tests."""
+    pds_cache.clear()
+    yield
+    pds_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_ods_cache():
+    """Clear the ODS cache so that practices are not shared between tests."""
+    ods_cache.clear()
+    yield
+    ods_cache.clear()
+
+
 @pytest.fixture()
 def lambda_context() -> LambdaContext:
     @dataclass
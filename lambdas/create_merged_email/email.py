@@ -1,9 +1,7 @@
 from dataclasses import dataclass
 from json import dumps
 
-from jinja2 import Environment, select_autoescape
-
-env = Environment(autoescape=select_autoescape())
+from lambdas.create_merged_email.template_registry import registry
 
 
 @dataclass
@@ -20,9 +18,9 @@ class Email:
         )
 
     def replace_with_variables(self, values_to_replace: dict) -> None:
-        def replace_with_jinja(attribute: str) -> str:
-            template = env.from_string(attribute)
-            return template.render(**values_to_replace)
-
-        self.email_subject = replace_with_jinja(self.email_subject)
-        self.email_body = replace_with_jinja(self.email_body)
+        self.email_subject = registry.get_template(
+            self.email_subject, "email_subject"
+        ).render(**values_to_replace)
+        self.email_body = registry.get_template(self.email_body, "email_body").render(
+            **values_to_replace
+        )
@@ -0,0 +1,81 @@
+"""Compiles email templates once per container.
+
+`Environment.from_string` parses and compiles a template every time it is called.
+The registry loads each template source under a name made from its SHA-256 digest,
+so a template is compiled the first time it is rendered and then taken from the
+environment's cache of compiled templates on every later invocation of the warm
+container. A changed template has a new digest, so it is compiled again, which makes
+the digest a version of the template that needs no call to S3. The compiled code is
+also written to a bytecode cache in /tmp, which outlives the lambda process when
+Lambda restarts it in the same execution environment.
+"""
+
+from hashlib import sha256
+from os import getenv
+from typing import Optional
+
+from jinja2 import (
+    BaseLoader,
+    BytecodeCache,
+    Environment,
+    FileSystemBytecodeCache,
+    Template,
+    TemplateNotFound,
+)
+
+TEMPLATE_CACHE_SIZE = int(getenv("TEMPLATE_CACHE_SIZE", "50"))
+TEMPLATE_BYTECODE_CACHE = getenv("TEMPLATE_BYTECODE_CACHE", "true").lower() == "true"
+
+
+def get_bytecode_cache() -> Optional[BytecodeCache]:
+    """Returns a bytecode cache in the temporary directory, unless it is disabled"""
+    return FileSystemBytecodeCache() if TEMPLATE_BYTECODE_CACHE else None
+
+
+class TemplateRegistry(BaseLoader):
+    """Loads template sources by their digest into an environment that caches them"""
+
+    def __init__(
+        self,
+        cache_size: int = TEMPLATE_CACHE_SIZE,
+        bytecode_cache: Optional[BytecodeCache] = None,
+    ) -> None:
+        self.cache_size = cache_size
+        self.loaded = 0
+        self._sources: dict[str, str] = {}
+        # Templates were compiled from strings, which select_autoescape() escapes
+        self.environment = Environment(
+            loader=self,
+            autoescape=True,
+            cache_size=cache_size,
+            bytecode_cache=bytecode_cache,
+        )
+
+    def get_template(self, source: str, identifier: str = "template") -> Template:
+        """Returns the compiled template of a source
+
+        Args:
+            source (str): The Jinja template
+            identifier (str): Names the template in errors, e.g. 'email_subject'
+
+        Returns:
+            Template: The compiled template
+        """
+        name = f"{identifier}-{sha256(source.encode('utf-8')).hexdigest()}"
+        if name not in self._sources:
+            if len(self._sources) >= self.cache_size:
+                # Forget the oldest source, it is compiled again if it is used again
+                del self._sources[next(iter(self._sources))]
+            self._sources[name] = source
+        return self.environment.get_template(name)
+
+    def get_source(self, environment: Environment, template: str):
+        """Returns the source of a template that is not compiled yet"""
+        if template not in self._sources:
+            raise TemplateNotFound(template)
+        self.loaded += 1
+        # The name changes with the source, so a compiled template is never stale
+        return self._sources[template], None, None
+
+
+registry = TemplateRegistry(bytecode_cache=get_bytecode_cache())
@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from jinja2 import FileSystemBytecodeCache
+from pytest_mock import MockerFixture
+
+from ..template_registry import TemplateRegistry
+
+
+def test_template_is_compiled_once() -> None:
+    """Test that a template is compiled the first time it is used only."""
+    # Arrange
+    registry = TemplateRegistry()
+    # Act
+    first = registry.get_template("Reference {{ reference_code }}")
+    second = registry.get_template("Reference {{ reference_code }}")
+    # Assert
+    assert first is second
+    assert registry.loaded == 1
+    assert second.render(reference_code="ABC") == "Reference ABC"
+
+
+def test_changed_template_is_compiled_again() -> None:
+    """Test that a changed template source is compiled as a new template."""
+    # Arrange
+    registry = TemplateRegistry()
+    registry.get_template("Version {{ 1 }}")
+    # Act
+    template = registry.get_template("Version {{ 2 }}")
+    # Assert
+    assert registry.loaded == 2
+    assert template.render() == "Version 2"
+
+
+def test_templates_are_autoescaped() -> None:
+    """Test that variables are HTML escaped, as they were in string templates."""
+    # Arrange
+    registry = TemplateRegistry()
+    # Act
+    result = registry.get_template("<p>{{ ods_code }}</p>").render(ods_code="<b>")
+    # Assert
+    assert result == "<p>&lt;b&gt;</p>"
+
+
+def test_oldest_templates_are_evicted() -> None:
+    """Test that only the most recent templates are kept."""
+    # Arrange
+    registry = TemplateRegistry(cache_size=1)
+    registry.get_template("first")
+    registry.get_template("second")
+    # Act
+    template = registry.get_template("first")
+    # Assert
+    assert registry.loaded == 3
+    assert template.render() == "first"
+
+
+def test_compiled_templates_are_read_from_the_bytecode_cache(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """Test that a new process reads compiled templates from the bytecode cache."""
+    # Arrange
+    source = "Reference {{ reference_code }}"
+    TemplateRegistry(
+        bytecode_cache=FileSystemBytecodeCache(str(tmp_path))
+    ).get_template(source)
+    registry = TemplateRegistry(bytecode_cache=FileSystemBytecodeCache(str(tmp_path)))
+    compile_template = mocker.spy(registry.environment, "compile")
+    # Act
+    template = registry.get_template(source)
+    # Assert
+    compile_template.assert_not_called()
+    assert len(list(tmp_path.iterdir())) == 1
+    assert template.render(reference_code="ABC") == "Reference ABC"
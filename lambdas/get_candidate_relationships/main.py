@@ -5,14 +5,18 @@ import uuid
 from json import dumps, loads
 from os import getenv
 
-from boto3 import client
 from spine_aws_common import LambdaApplication
 
+from lambdas.utils.aws.clients import get_client
+from lambdas.utils.lazy_import import lazy_import
 from lambdas.utils.logging.logger import LOG_BASE, initialise_logger, write_log
 from lambdas.utils.pds import errors
 from lambdas.utils.pds.errors import OperationalOutcomeResult
 from lambdas.utils.pds.fhirobjectmapper import FHIRObjectMapper
-from lambdas.utils.pds.nhsnumber import NHSNumber
+from lambdas.utils.pds.nhsnumber import parse_nhs_identifier
+
+# Only imported when relationships are validated in process
+validate_relationships = lazy_import("lambdas.utils.pipeline.validate_relationships")
 
 
 class GetCandidateRelationships(LambdaApplication):
@@ -42,8 +46,12 @@ class GetCandidateRelationships(LambdaApplication):
         self.correlation_id = ""
         try:
             if self.__check_headers():
-                response = self.__trigger_validate_relationship()
-                self.__handle_step_function_response(response)
+                if self.__is_in_process_validation_enabled():
+                    output = self.__run_validate_relationship()
+                    self.__handle_validation_output(output)
+                else:
+                    response = self.__trigger_validate_relationship()
+                    self.__handle_step_function_response(response)
 
         except Exception as error:  # pylint: disable=broad-exception-caught
             write_log(
@@ -108,8 +116,7 @@ class GetCandidateRelationships(LambdaApplication):
         result = False
         requester_nhs_no = self.event.get(self.PARAM_HEADER_NHS_NO, 0)
         proxy_nhs_no = self.event.get(self.PARAM_PROXY_NHS_NO, 0)
-        nhs_number = NHSNumber()
-        extracted_number = nhs_number.extract_nhs_number(proxy_nhs_no).split("|")[-1]
+        extracted_number = parse_nhs_identifier(proxy_nhs_no).digits.split("|")[-1]
         if requester_nhs_no == extracted_number:
             result = True
         else:
@@ -152,7 +159,7 @@ class GetCandidateRelationships(LambdaApplication):
 
     def __trigger_validate_relationship(self) -> dict:
         """Triggers the validation of relationship using step function workflow"""
-        sfn_client = client("stepfunctions")
+        sfn_client = get_client("stepfunctions")
         input_data = self.__get_step_function_inputs()
         write_log("DEBUG", {"info": f"Triggering step function with {input_data}"})
         return sfn_client.start_sync_execution(
@@ -160,18 +167,44 @@ class GetCandidateRelationships(LambdaApplication):
             input=input_data,
         )
 
+    def __is_in_process_validation_enabled(self) -> bool:
+        """Determines if the relationships should be validated without the step function
+
+        Returns:
+            bool: True if VALIDATE_RELATIONSHIPS_IN_PROCESS is set to 'true'
+        """
+        return getenv("VALIDATE_RELATIONSHIPS_IN_PROCESS", "false").lower() == "true"
+
+    def __run_validate_relationship(self) -> dict:
+        """Validates the relationships in this process, running the same stages as the step function
+
+        Returns:
+            dict: Output of the validation containing 'statusCode' and 'body'
+        """
+        input_data = self.__get_validation_inputs()
+        write_log("DEBUG", {"info": f"Running in-process validation with {input_data}"})
+        try:
+            return validate_relationships.validate_relationships_pipeline.run(
+                input_data, self.context
+            )
+        finally:
+            # Each stage initialises the logger with its own log object
+            initialise_logger(self.log_object)
+
+    def __get_validation_inputs(self) -> dict:
+        """Get the inputs for the relationship validation"""
+        return {
+            "proxyNhsNumber": self.event.get(self.PARAM_PROXY_NHS_NO),
+            "patientNhsNumber": self.event.get(self.PARAM_PATIENT_NHS_NO),
+            "_include": self.event.get(self.PARAM_INCLUDE),
+            "correlationId": self.correlation_id,
+            "requestId": self.event.get(self.PARAM_HEADER_REQUEST_ID),
+            "originalRequestUrl": self.event.get(self.PARAM_HEADER_ORIGINAL_URL),
+        }
+
     def __get_step_function_inputs(self) -> str:
         """Get the inputs for the step function"""
-        return dumps(
-            {
-                "proxyNhsNumber": self.event.get(self.PARAM_PROXY_NHS_NO),
-                "patientNhsNumber": self.event.get(self.PARAM_PATIENT_NHS_NO),
-                "_include": self.event.get(self.PARAM_INCLUDE),
-                "correlationId": self.correlation_id,
-                "requestId": self.event.get(self.PARAM_HEADER_REQUEST_ID),
-                "originalRequestUrl": self.event.get(self.PARAM_HEADER_ORIGINAL_URL),
-            }
-        )
+        return dumps(self.__get_validation_inputs())
 
     def __handle_step_function_response(self, response: dict) -> None:
         """Handles the response from the step function
@@ -184,24 +217,34 @@ class GetCandidateRelationships(LambdaApplication):
             self.__output_error(errors.INTERNAL_SERVER_ERROR)
             return
         # If the response is not failed or timed out, the response is successful and can be converted to a FHIR object (if necessary)
-        state_machine_output = loads(response.get("output"))
-        response_body = state_machine_output.get("body")
-        status_code = state_machine_output.get("statusCode")
+        self.__handle_validation_output(loads(response.get("output")))
+
+    def __handle_validation_output(self, output: dict) -> None:
+        """Handles the output of the relationship validation
+
+        Args:
+            output (dict): Output from the step function or in-process validation
+        """
+        response_body = output.get("body")
+        status_code = output.get("statusCode")
         write_log(
             "DEBUG",
             {
-                "info": f"Evaluating response from step function - {status_code=}- {response_body=}"
+                "info": f"Evaluating relationship validation output - {status_code=}- {response_body=}"
             },
         )
         if response_body:
             self.response = {
-                "status_code": status_code,
+                "status_code": int(status_code),
                 "body": response_body,
             }
         else:
             write_log(
                 "ERROR",
-                {"info": "Failed to parse response from step function.", "error": ""},
+                {
+                    "info": "Failed to parse relationship validation output.",
+                    "error": "",
+                },
             )
             self.__output_error(errors.INTERNAL_SERVER_ERROR)
 
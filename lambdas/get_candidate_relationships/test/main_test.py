@@ -1,3 +1,4 @@
+from http import HTTPStatus
 from json import dumps
 from os import environ
 from unittest.mock import MagicMock, patch
@@ -180,7 +181,7 @@ def test_start_when_header_nhs_number_mismatch_then_returns_error(
 @patch.object(
     GetCandidateRelationships, "_GetCandidateRelationships__get_step_function_inputs"
 )
-@patch(f"{FILE_PATH}.client")
+@patch(f"{FILE_PATH}.get_client")
 def test__trigger_validate_relationship(
     mock_client: MagicMock,
     mock__get_step_function_inputs: MagicMock,
@@ -316,3 +317,67 @@ def test___handle_step_function_response_when_not_successful(
     sut._GetCandidateRelationships__handle_step_function_response(response)
     # Assert
     assert sut.response == {"status_code": 400, "body": operational_outcome}
+
+
+@patch(f"{FILE_PATH}.validate_relationships.validate_relationships_pipeline")
+@patch.dict(environ, {"VALIDATE_RELATIONSHIPS_IN_PROCESS": "true"})
+@patch(f"{FILE_PATH}.get_client")
+def test_start_when_in_process_validation_enabled_then_runs_pipeline(
+    mock_client: MagicMock,
+    mock_pipeline: MagicMock,
+    sut: GetCandidateRelationships,
+    event: dict,
+) -> None:
+    """
+    Test Function: GetCandidateRelationships.start
+    When VALIDATE_RELATIONSHIPS_IN_PROCESS is true
+    Expected Result: the pipeline is run instead of the step function
+    """
+    # Arrange
+    mock_pipeline.run.return_value = {
+        "statusCode": HTTPStatus.OK,
+        "body": {"test": "data"},
+    }
+    event[GetCandidateRelationships.PARAM_HEADER_NHS_NO] = NHS_NUMBER_17
+    sut.event = event
+    sut.context = context = {}
+    # Act
+    sut.start()
+    # Assert
+    mock_client.assert_not_called()
+    mock_pipeline.run.assert_called_once_with(
+        {
+            "proxyNhsNumber": event[GetCandidateRelationships.PARAM_PROXY_NHS_NO],
+            "patientNhsNumber": event[GetCandidateRelationships.PARAM_PATIENT_NHS_NO],
+            "_include": event[GetCandidateRelationships.PARAM_INCLUDE],
+            "correlationId": event[
+                GetCandidateRelationships.PARAM_HEADER_CORRELATION_ID
+            ],
+            "requestId": event[GetCandidateRelationships.PARAM_HEADER_REQUEST_ID],
+            "originalRequestUrl": event[
+                GetCandidateRelationships.PARAM_HEADER_ORIGINAL_URL
+            ],
+        },
+        context,
+    )
+    assert sut.response == {"status_code": 200, "body": {"test": "data"}}
+    assert type(sut.response["status_code"]) is int
+
+
+@patch(f"{FILE_PATH}.validate_relationships.validate_relationships_pipeline")
+@patch.dict(environ, {"VALIDATE_RELATIONSHIPS_IN_PROCESS": "true"})
+def test_start_when_pipeline_fails_then_returns_error(
+    mock_pipeline: MagicMock, sut: GetCandidateRelationships, event: dict
+) -> None:
+    """
+    Test Function: GetCandidateRelationships.start
+    When the in-process pipeline raises an exception
+    Expected Result: internal server error is returned
+    """
+    # Arrange
+    mock_pipeline.run.side_effect = Exception("test")
+    sut.event = event
+    # Act
+    sut.start()
+    # Assert
+    assert sut.response == {"status_code": 500, "body": INTERNAL_SERVER_ERROR}
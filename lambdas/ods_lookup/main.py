@@ -3,16 +3,47 @@ from http import HTTPStatus
 from os import getenv
 
 from boto3.dynamodb.types import TypeSerializer
-from requests import get
 from requests.exceptions import HTTPError
 from spine_aws_common import LambdaApplication
 
+from lambdas.ods_lookup.odscache import ods_cache
 from lambdas.utils.aws.secret_manager import SecretManager
+from lambdas.utils.connection_pool import get_session
 from lambdas.utils.logging.logger import LOG_BASE, initialise_logger, write_log
 
 type_serializer = TypeSerializer()
 
 
+def fetch_email_addresses(
+    ods_code: str, api_url: str, subscription_key: str
+) -> list[str]:
+    """Requests the GP email addresses associated with an ODS code from the ODS API
+
+    Args:
+        ods_code (str): The ODS code of the practice
+        api_url (str): ODS lookup API URL
+        subscription_key (str): ODS lookup API key
+
+    Returns:
+        list[str]: The email addresses of the practice
+    """
+    response = get_session(api_url).get(
+        f"{api_url}/{ods_code}",
+        timeout=60,
+        headers={"Subscription-key": subscription_key},
+    )
+    if response.status_code != HTTPStatus.OK:
+        write_log(
+            "ERROR",
+            {
+                "info": f"Response from API: status_code={response.status_code} content={response.content}",
+                "error": "",
+            },
+        )
+        raise HTTPError("Failed to get 200 response from remote.", response=response)
+    return response.json()["email"].split(":")
+
+
 class ODSLookup(LambdaApplication):
 
     settings = {"api_url": "", "api_subscription_key": ""}
@@ -30,6 +61,13 @@ class ODSLookup(LambdaApplication):
             "ODS-lookup-subscription-key"
         )
 
+    def __fetch_email_addresses(self, ods_code: str) -> list[str]:
+        """Requests the email addresses of a practice that is not cached"""
+        self.__load_secrets()
+        return fetch_email_addresses(
+            ods_code, self.settings["api_url"], self.settings["api_subscription_key"]
+        )
+
     def start(self) -> None:
         """Retrieves the GP information associated with the ODS code"""
 
@@ -45,24 +83,9 @@ class ODSLookup(LambdaApplication):
             )
             raise ValueError("ods_code is required")
         try:
-            self.__load_secrets()
-            response = get(
-                f'{self.settings["api_url"]}/{ods_code}',
-                timeout=60,
-                headers={"Subscription-key": self.settings["api_subscription_key"]},
-            )
-            if response.status_code != HTTPStatus.OK:
-                write_log(
-                    "ERROR",
-                    {
-                        "info": f"Response from API: status_code={response.status_code} content={response.content}",
-                        "error": "",
-                    },
-                )
-                raise HTTPError("Failed to get 200 response from remote.")
-            self.response = type_serializer.serialize(
-                response.json()["email"].split(":")
-            )
+            email_addresses = ods_cache.get(ods_code, self.__fetch_email_addresses)
+            write_log("INFO", {"info": f"ODSLookup : ODS cache {ods_cache.stats()}"})
+            self.response = type_serializer.serialize(email_addresses)
 
         except Exception as ex:
             write_log(
@@ -0,0 +1,156 @@
+"""Read-through cache for the GP email addresses returned by the ODS API.
+
+The email addresses of a practice are held in an in-memory LRU for the lifetime of a
+warm Lambda container, keyed on the ODS code. An optional DynamoDB table can be
+configured so that they are shared between containers and outlive them.
+
+Practice details rarely change, so an entry is fresh for ODS_CACHE_TTL seconds and is
+then served stale for up to ODS_CACHE_STALE_TTL seconds more while it is revalidated
+in the background. A practice that ODS no longer knows, a 404 response, is removed from
+both tiers so that it stops being served.
+"""
+
+import json
+from http import HTTPStatus
+from os import getenv
+from time import time
+from typing import Callable, Optional
+
+from requests.exceptions import HTTPError
+
+from lambdas.utils.tiered_cache import CacheEntry, TieredCache
+
+# Seconds that an entry is fresh for, and then served stale for while it is refreshed
+ODS_CACHE_TTL = int(getenv("ODS_CACHE_TTL", str(24 * 60 * 60)))
+ODS_CACHE_STALE_TTL = int(getenv("ODS_CACHE_STALE_TTL", str(4 * 60 * 60)))
+# Maximum number of practices held in memory
+MAX_ENTRIES = int(getenv("ODS_CACHE_MAX_ENTRIES", "1024"))
+# Optional DynamoDB table used to share entries between containers
+ODS_CACHE_TABLE_NAME = getenv("ODS_CACHE_TABLE_NAME")
+
+KEY_PREFIX = "ODS|"
+
+
+class ODSCache:
+    """Caches the GP email addresses of practices keyed on ODS code."""
+
+    def __init__(
+        self,
+        ttl: int = ODS_CACHE_TTL,
+        stale_ttl: int = ODS_CACHE_STALE_TTL,
+        max_entries: int = MAX_ENTRIES,
+        table_name: Optional[str] = ODS_CACHE_TABLE_NAME,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        """Initialise the cache
+
+        Args:
+            ttl (int): Seconds that an entry is fresh for
+            stale_ttl (int): Seconds that a stale entry is served for while refreshing
+            max_entries (int): Maximum number of practices held in memory
+            table_name (str, optional): DynamoDB table name for the shared tier
+            clock (Callable): Returns the current epoch time in seconds
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._cache = TieredCache(
+            "ODS",
+            max_entries=max_entries,
+            table_name=table_name,
+            clock=clock,
+        )
+        self.stale_hits = 0
+
+    @staticmethod
+    def create_key(ods_code: str) -> str:
+        """Creates the cache key for an ODS code
+
+        Args:
+            ods_code (str): The ODS code of the practice
+
+        Returns:
+            str: The cache key
+        """
+        return f"{KEY_PREFIX}{ods_code.strip().upper()}"
+
+    def get(self, ods_code: str, fetch: Callable[[str], list[str]]) -> list[str]:
+        """Returns the email addresses of a practice, fetching them when required.
+
+        A stale entry is still returned, but is refreshed in the background.
+
+        Args:
+            ods_code (str): The ODS code of the practice
+            fetch (Callable): Requests the email addresses of an ODS code from ODS
+
+        Returns:
+            list[str]: The email addresses of the practice
+        """
+        key = self.create_key(ods_code)
+        cached = self._cache.get(key)
+
+        if cached is None:
+            return self.__fetch_and_store(key, ods_code, fetch)
+
+        if cached.fresh_until <= self._clock():
+            self.stale_hits += 1
+            self._cache.refresh_in_background(
+                key,
+                lambda: self.__fetch_and_store(key, ods_code, fetch),
+                f"ODS code {ods_code}",
+            )
+        return json.loads(cached.value)
+
+    def clear(self) -> None:
+        """Removes every practice from the in-memory tier and resets the counters"""
+        self._cache.clear()
+        self.stale_hits = 0
+
+    def stats(self) -> dict:
+        """Returns the cache counters
+
+        Returns:
+            dict: hit, shared hit, stale hit, miss and refresh counts, the hit rate
+                and the number of practices held
+        """
+        stats = self._cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "hits": stats["hits"],
+            "shared_hits": stats["shared_hits"],
+            "stale_hits": self.stale_hits,
+            "misses": stats["misses"],
+            "refreshes": stats["refreshes"],
+            "hit_rate": round(stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": stats["entries"],
+        }
+
+    def __fetch_and_store(
+        self, key: str, ods_code: str, fetch: Callable[[str], list[str]]
+    ) -> list[str]:
+        """Fetches the email addresses and caches them in both tiers.
+
+        The practice is removed from both tiers if ODS responds that it is not found.
+        """
+        try:
+            email_addresses = fetch(ods_code)
+        except HTTPError as error:
+            if (
+                error.response is not None
+                and error.response.status_code == HTTPStatus.NOT_FOUND
+            ):
+                self._cache.delete(key)
+            raise
+        now = self._clock()
+        self._cache.put(
+            key,
+            CacheEntry(
+                value=json.dumps(list(email_addresses)),
+                fresh_until=now + self.ttl,
+                expires_at=now + self.ttl + self.stale_ttl,
+            ),
+        )
+        return email_addresses
+
+
+ods_cache = ODSCache()
@@ -24,8 +24,8 @@ def setup_fake_secret(mocker: MockerFixture):
 
 @pytest.fixture(name="fake_get")
 def setup_fake_get(mocker: MockerFixture):
-    """Create and return an fake requests.get"""
-    return mocker.patch(f"{FILE_PATH}.get", return_value="")
+    """Create and return an fake pooled session get"""
+    return mocker.patch(f"{FILE_PATH}.get_session").return_value.get
 
 
 def test_odslookup_when_parameter_missing_returns_error() -> None:
@@ -161,6 +161,30 @@ def test_odslookup_when_not_successful_response(
     fake_secret.assert_called_once()
 
 
+def test_odslookup_uses_cached_practice(
+    fake_secret: MagicMock, fake_get: MagicMock
+) -> None:
+    """
+    Test Function : main.start
+    Scenario: When the same ODS code is looked up twice
+    Expected Result: Then the ODS API is only called once
+    """
+    # Arrange
+    response = Response()
+    response.status_code = 200
+    response._content = b'{"email": "test@test.com"}'
+    fake_get.return_value = response
+    ods = ODSLookup()
+    ods.event = {"ods_code": "Test"}
+    # Act
+    ods.start()
+    ods.start()
+    # Assert
+    assert ods.response == {"L": [{"S": "test@test.com"}]}
+    fake_get.assert_called_once()
+    fake_secret.assert_called_once()
+
+
 def test_lambda_handler_calls_odslookup(mocker: MockerFixture) -> None:
     """
     Test Function : lambda_handler
@@ -0,0 +1,243 @@
+""" Unit tests for the ODS cache """
+
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+from requests import Response
+from requests.exceptions import HTTPError
+
+from lambdas.conftest import FakeClock
+from lambdas.ods_lookup.odscache import ODSCache
+
+FILE_PATH = "lambdas.utils.tiered_cache"
+ODS_CODE = "A20047"
+EMAIL_ADDRESSES = ["test@test.com", "test2@test.com"]
+
+
+class ImmediateThread:
+    """Runs the background refresh when it is started"""
+
+    def __init__(self, target, args, daemon) -> None:
+        self.target = target
+        self.args = args
+
+    def start(self) -> None:
+        self.target(*self.args)
+
+
+@pytest.fixture(name="cache")
+def setup_cache(clock: FakeClock) -> ODSCache:
+    """Create and return an ODS cache without a shared tier"""
+    return ODSCache(ttl=100, stale_ttl=50, max_entries=2, table_name=None, clock=clock)
+
+
+@pytest.fixture(autouse=True)
+def mock_thread(mocker: MockerFixture) -> MagicMock:
+    """Run background refreshes immediately"""
+    return mocker.patch(f"{FILE_PATH}.threading.Thread", side_effect=ImmediateThread)
+
+
+def test_practice_is_cached_until_ttl(cache: ODSCache, clock: FakeClock) -> None:
+    """Test that the email addresses are reused while the entry is fresh"""
+    # Arrange
+    fetch = MagicMock(return_value=EMAIL_ADDRESSES)
+    # Act
+    first = cache.get(ODS_CODE, fetch)
+    clock.now += 99
+    second = cache.get(" a20047 ", fetch)
+    # Assert
+    assert first == second == EMAIL_ADDRESSES
+    fetch.assert_called_once_with(ODS_CODE)
+    assert cache.stats() == {
+        "hits": 1,
+        "shared_hits": 0,
+        "stale_hits": 0,
+        "misses": 1,
+        "refreshes": 0,
+        "hit_rate": 0.5,
+        "entries": 1,
+    }
+
+
+def test_stale_practice_is_served_and_refreshed(
+    cache: ODSCache, clock: FakeClock
+) -> None:
+    """Test that a stale entry is returned while it is refreshed in the background"""
+    # Arrange
+    cache.get(ODS_CODE, MagicMock(return_value=EMAIL_ADDRESSES))
+    clock.now += 100
+    fetch = MagicMock(return_value=["new@test.com"])
+    # Act
+    stale = cache.get(ODS_CODE, fetch)
+    refreshed = cache.get(ODS_CODE, fetch)
+    # Assert
+    assert stale == EMAIL_ADDRESSES
+    assert refreshed == ["new@test.com"]
+    fetch.assert_called_once_with(ODS_CODE)
+    assert (cache.stale_hits, cache.stats()["refreshes"]) == (1, 1)
+
+
+def test_failed_refresh_keeps_stale_practice(
+    cache: ODSCache, clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a stale entry is still served if the refresh fails"""
+    # Arrange
+    mock_write_log = mocker.patch(f"{FILE_PATH}.write_log")
+    cache.get(ODS_CODE, MagicMock(return_value=EMAIL_ADDRESSES))
+    clock.now += 120
+    # Act
+    result = cache.get(ODS_CODE, MagicMock(side_effect=Exception("Timeout")))
+    # Assert
+    assert result == EMAIL_ADDRESSES
+    assert mock_write_log.call_args.args[0] == "WARNING"
+    assert cache.stats()["refreshes"] == 0
+
+
+def test_practice_not_found_on_refresh_is_removed(
+    cache: ODSCache, clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a stale entry stops being served once ODS responds 404"""
+    # Arrange
+    mocker.patch(f"{FILE_PATH}.write_log")
+    cache.get(ODS_CODE, MagicMock(return_value=EMAIL_ADDRESSES))
+    clock.now += 120
+    response = MagicMock(spec=Response)
+    response.status_code = 404
+    fetch = MagicMock(side_effect=HTTPError("Not found", response=response))
+    # Act
+    stale = cache.get(ODS_CODE, fetch)
+    # Assert
+    assert stale == EMAIL_ADDRESSES
+    assert cache.stats()["entries"] == 0
+    with pytest.raises(HTTPError, match="Not found"):
+        cache.get(ODS_CODE, fetch)
+
+
+def test_practice_is_kept_when_refresh_fails_with_server_error(
+    cache: ODSCache, clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that only a 404 response removes the stale entry"""
+    # Arrange
+    mocker.patch(f"{FILE_PATH}.write_log")
+    cache.get(ODS_CODE, MagicMock(return_value=EMAIL_ADDRESSES))
+    clock.now += 120
+    response = MagicMock(spec=Response)
+    response.status_code = 500
+    fetch = MagicMock(side_effect=HTTPError("Server error", response=response))
+    # Act
+    cache.get(ODS_CODE, fetch)
+    result = cache.get(ODS_CODE, fetch)
+    # Assert
+    assert result == EMAIL_ADDRESSES
+    assert cache.stats()["entries"] == 1
+
+
+def test_expired_practice_is_fetched(cache: ODSCache, clock: FakeClock) -> None:
+    """Test that an entry is no longer served once the stale period has passed"""
+    # Arrange
+    cache.get(ODS_CODE, MagicMock(return_value=EMAIL_ADDRESSES))
+    clock.now += 150
+    fetch = MagicMock(side_effect=Exception("Timeout"))
+    # Act & Assert
+    with pytest.raises(Exception, match="Timeout"):
+        cache.get(ODS_CODE, fetch)
+    assert cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_practice_is_evicted(cache: ODSCache) -> None:
+    """Test that the in-memory tier is limited to the maximum number of entries"""
+    # Arrange
+    fetch = MagicMock(return_value=EMAIL_ADDRESSES)
+    cache.get("A1", fetch)
+    cache.get("A2", fetch)
+    cache.get("A1", fetch)
+    # Act
+    cache.get("A3", fetch)
+    cache.get("A1", fetch)
+    cache.get("A2", fetch)
+    # Assert
+    assert [args.args[0] for args in fetch.call_args_list] == ["A1", "A2", "A3", "A2"]
+
+
+def test_shared_tier_is_used_on_memory_miss(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a practice stored by another container is reused"""
+    # Arrange
+    mock_client = mocker.patch(f"{FILE_PATH}.get_client")
+    mock_client.return_value.get_item.return_value = {
+        "Item": {
+            "CacheKey": {"S": f"ODS|{ODS_CODE}"},
+            "Body": {"S": '["test@test.com"]'},
+            "FreshUntil": {"N": str(clock.now + 100)},
+            "ExpiresAt": {"N": str(clock.now + 150)},
+        }
+    }
+    cache = ODSCache(table_name="ods-cache", clock=clock)
+    fetch = MagicMock()
+    # Act
+    result = cache.get(ODS_CODE, fetch)
+    cache.get(ODS_CODE, fetch)
+    # Assert
+    assert result == ["test@test.com"]
+    fetch.assert_not_called()
+    mock_client.return_value.get_item.assert_called_once_with(
+        TableName="ods-cache", Key={"CacheKey": {"S": f"ODS|{ODS_CODE}"}}
+    )
+    assert cache.stats()["shared_hits"] == 1
+
+
+def test_stale_practice_is_refreshed_in_shared_tier(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a refreshed practice replaces the stale one in the shared tier"""
+    # Arrange
+    mock_client = mocker.patch(f"{FILE_PATH}.get_client")
+    mock_client.return_value.get_item.return_value = {}
+    cache = ODSCache(ttl=100, stale_ttl=50, table_name="ods-cache", clock=clock)
+    fetch = MagicMock(return_value=EMAIL_ADDRESSES)
+    cache.get(ODS_CODE, fetch)
+    clock.now += 100
+    # Act
+    cache.get(ODS_CODE, fetch)
+    # Assert
+    item = mock_client.return_value.put_item.call_args.kwargs["Item"]
+    assert item["FreshUntil"] == {"N": str(clock.now + 100)}
+    assert mock_client.return_value.put_item.call_count == 2
+
+
+def test_practice_is_written_to_shared_tier(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a fetched practice is shared with other containers"""
+    # Arrange
+    mock_client = mocker.patch(f"{FILE_PATH}.get_client")
+    mock_client.return_value.get_item.return_value = {}
+    cache = ODSCache(ttl=100, stale_ttl=50, table_name="ods-cache", clock=clock)
+    # Act
+    cache.get(ODS_CODE, MagicMock(return_value=EMAIL_ADDRESSES))
+    # Assert
+    item = mock_client.return_value.put_item.call_args.kwargs["Item"]
+    assert item == {
+        "CacheKey": {"S": f"ODS|{ODS_CODE}"},
+        "Body": {"S": '["test@test.com", "test2@test.com"]'},
+        "FreshUntil": {"N": str(clock.now + 100)},
+        "ExpiresAt": {"N": str(clock.now + 150)},
+        "TTL": {"N": str(int(clock.now + 150))},
+    }
+
+
+def test_shared_tier_errors_do_not_prevent_lookups(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that DynamoDB failures fall back to requesting ODS"""
+    # Arrange
+    mock_client = mocker.patch(f"{FILE_PATH}.get_client")
+    mock_client.return_value.get_item.side_effect = Exception("unavailable")
+    mock_client.return_value.put_item.side_effect = Exception("unavailable")
+    cache = ODSCache(table_name="ods-cache", clock=clock)
+    # Act
+    result = cache.get(ODS_CODE, MagicMock(return_value=EMAIL_ADDRESSES))
+    # Assert
+    assert result == EMAIL_ADDRESSES
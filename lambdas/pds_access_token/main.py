@@ -7,15 +7,19 @@ import uuid
 from http import HTTPStatus
 from time import time
 
-import jwt
-import requests
 from requests.exceptions import ConnectionError as connection_error
 from requests.exceptions import HTTPError, RequestException, Timeout
 from spine_aws_common import LambdaApplication
 
+from lambdas.pds_access_token.token_cache import TokenCache
 from lambdas.utils.aws.secret_manager import SecretManager
+from lambdas.utils.connection_pool import get_session
+from lambdas.utils.lazy_import import lazy_import
 from lambdas.utils.logging.logger import LOG_BASE, initialise_logger, write_log
 
+# Only imported when a new token is requested
+jwt = lazy_import("jwt")
+
 
 class PdsAccessToken(LambdaApplication):
     """Authenticates with API Service to generate an authorisation token."""
@@ -32,6 +36,9 @@ class PdsAccessToken(LambdaApplication):
 
     secret_manager = SecretManager("PDS_CREDENTIALS")
 
+    # Shared between invocations of a warm container
+    token_cache = TokenCache()
+
     def initialise(self) -> None:
         """Initialise with log object"""
         initialise_logger(self.log_object)
@@ -51,44 +58,17 @@ class PdsAccessToken(LambdaApplication):
 
         self.load_secrets()
 
-        claims = {
-            "sub": self.SETTINGS["subject"],
-            "iss": self.SETTINGS["issuer"],
-            "jti": str(uuid.uuid4()),
-            "aud": self.SETTINGS["audience"],
-            "exp": int(time()) + 300,  # 300 = 60 * 5 (5 Mins)
-        }
-
-        additional_headers = {
-            "alg": self.SETTINGS["algorithm"],
-            "typ": "JWT",
-            "kid": self.SETTINGS["key_id"],
-        }
-
-        assertion = jwt.encode(
-            claims,
-            self.SETTINGS["private_key"],
-            algorithm=self.SETTINGS["algorithm"],
-            headers=additional_headers,
-        )
-
-        payload = {
-            "grant_type": "client_credentials",
-            "client_assertion_type": "urn:ietf:params:oauth:client-assertion-type:jwt-bearer",
-            "client_assertion": assertion,
-        }
-
-        url = self.SETTINGS["token_url"]
-
         try:
-            # requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
-            response = requests.post(url, data=payload, timeout=60)
-            if response.status_code != HTTPStatus.OK:
-                raise RequestException("Failed to get 200 response from remote.")
-
-            response_dict = json.loads(response.content)
+            cache_key = self.token_cache.create_key(
+                self.SETTINGS["subject"], self.SETTINGS["audience"]
+            )
+            response_dict = self.token_cache.get_token(cache_key, self.request_token)
             self.generate_response(HTTPStatus.OK, response_dict)
             write_log("DEBUG", {"info": "PdsAccessToken : Generation successful"})
+            write_log(
+                "DEBUG",
+                {"info": f"PdsAccessToken : Token cache {self.token_cache.stats()}"},
+            )
 
         except connection_error as conn_error:
             write_log(
@@ -150,6 +130,51 @@ class PdsAccessToken(LambdaApplication):
             )
             self.generate_response(HTTPStatus.INTERNAL_SERVER_ERROR, None)
 
+    def request_token(self) -> dict:
+        """Requests a new access token from the API Service.
+
+        Returns:
+            dict: The token response from the API Service
+
+        Raises:
+            RequestException: Raised if the API Service does not return a 200 response
+        """
+        claims = {
+            "sub": self.SETTINGS["subject"],
+            "iss": self.SETTINGS["issuer"],
+            "jti": str(uuid.uuid4()),
+            "aud": self.SETTINGS["audience"],
+            "exp": int(time()) + 300,  # 300 = 60 * 5 (5 Mins)
+        }
+
+        additional_headers = {
+            "alg": self.SETTINGS["algorithm"],
+            "typ": "JWT",
+            "kid": self.SETTINGS["key_id"],
+        }
+
+        assertion = jwt.encode(
+            claims,
+            self.SETTINGS["private_key"],
+            algorithm=self.SETTINGS["algorithm"],
+            headers=additional_headers,
+        )
+
+        payload = {
+            "grant_type": "client_credentials",
+            "client_assertion_type": "urn:ietf:params:oauth:client-assertion-type:jwt-bearer",
+            "client_assertion": assertion,
+        }
+
+        url = self.SETTINGS["token_url"]
+
+        # requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+        response = get_session(url).post(url, data=payload, timeout=60)
+        if response.status_code != HTTPStatus.OK:
+            raise RequestException("Failed to get 200 response from remote.")
+
+        return json.loads(response.content)
+
     def generate_response(self, status_code: int, token):
         """Generates a response based on the supplied parameters"""
 
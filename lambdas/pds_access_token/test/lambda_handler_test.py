@@ -7,8 +7,10 @@ import jwt
 import pytest
 import requests
 from pytest_mock import MockerFixture
+from requests import Session
 
 from lambdas.pds_access_token.main import PdsAccessToken
+from lambdas.pds_access_token.token_cache import TokenCache
 from lambdas.utils.aws.secret_manager import SecretManager
 
 
@@ -63,7 +65,7 @@ def test_ensure_all_required_data_is_sent_when_requesting_token(mocker: MockerFi
     mock_response = mocker.Mock()
     mock_response.content = content_string
     mock_response.status_code = HTTPStatus.OK
-    mocker.patch.object(requests, "post", return_value=mock_response)
+    mocker.patch.object(Session, "post", return_value=mock_response)
     expected = {
         "statusCode": HTTPStatus.OK,
         "body": {"token": json.loads(mock_response.content)},
@@ -80,11 +82,40 @@ def test_ensure_all_required_data_is_sent_when_requesting_token(mocker: MockerFi
     assert sut.response == expected
 
 
+def test_cached_token_is_returned_without_requesting_a_new_token(
+    mocker: MockerFixture,
+):
+    """Test to ensure that a token is only requested once while it is valid"""
+    patch_secret(mocker)
+    clock = mocker.Mock(return_value=1000.0)
+    mocker.patch.object(
+        PdsAccessToken, "token_cache", TokenCache(table_name=None, clock=clock)
+    )
+
+    token = {"access_token": "sometoken", "expires_in": "599"}
+    mock_response = mocker.Mock()
+    mock_response.content = json.dumps(token)
+    mock_response.status_code = HTTPStatus.OK
+    mock_post = mocker.patch.object(Session, "post", return_value=mock_response)
+
+    sut = PdsAccessToken()
+    sut.start()
+    clock.return_value = 1100.0
+    sut.start()
+
+    assert sut.response == {
+        "statusCode": HTTPStatus.OK,
+        "body": {"token": {**token, "expires_in": "499"}},
+    }
+    mock_post.assert_called_once()
+    assert sut.token_cache.stats()["hits"] == 1
+
+
 def test_when_connection_error_returns_bad_result_result(mocker: MockerFixture):
     """Test to ensure that the request for token includes all fields"""
     patch_secret(mocker)
 
-    mock_post = mocker.patch.object(requests, "post", return_value=None)
+    mock_post = mocker.patch.object(Session, "post", return_value=None)
     mock_post.side_effect = requests.exceptions.ConnectionError()
     expected = {
         "statusCode": HTTPStatus.BAD_REQUEST,
@@ -101,7 +132,7 @@ def test_when_http_error_returns_bad_result_result(mocker: MockerFixture):
     """Test to ensure that the request for token includes all fields"""
     patch_secret(mocker)
 
-    mock_post = mocker.patch.object(requests, "post", return_value=None)
+    mock_post = mocker.patch.object(Session, "post", return_value=None)
     mock_post.side_effect = requests.exceptions.HTTPError()
     expected = {
         "statusCode": HTTPStatus.BAD_REQUEST,
@@ -118,7 +149,7 @@ def test_when_timeout_returns_timeout_result(mocker: MockerFixture):
     """Test to ensure that the request for token includes all fields"""
     patch_secret(mocker)
 
-    mock_post = mocker.patch.object(requests, "post", return_value=None)
+    mock_post = mocker.patch.object(Session, "post", return_value=None)
     mock_post.side_effect = requests.exceptions.Timeout()
     expected = {
         "statusCode": HTTPStatus.REQUEST_TIMEOUT,
@@ -135,7 +166,7 @@ def test_when_request_error_returns_internal_server_error_result(mocker: MockerF
     """Test to ensure that the request for token includes all fields"""
     patch_secret(mocker)
 
-    mock_post = mocker.patch.object(requests, "post", return_value=None)
+    mock_post = mocker.patch.object(Session, "post", return_value=None)
     mock_post.side_effect = requests.exceptions.RequestException()
     expected = {
         "statusCode": HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -154,7 +185,7 @@ def test_when_unexpected_error_returns_internal_server_error_result(
     """Test to ensure that the request for token includes all fields"""
     patch_secret(mocker)
 
-    mock_post = mocker.patch.object(requests, "post", return_value=None)
+    mock_post = mocker.patch.object(Session, "post", return_value=None)
     mock_post.side_effect = requests.exceptions.InvalidURL()  # Some reasonable error
     expected = {
         "statusCode": HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -0,0 +1,194 @@
+""" Unit tests for the PDS access token cache """
+
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from lambdas.conftest import FakeClock
+from lambdas.pds_access_token.token_cache import TokenCache
+
+KEY = TokenCache.create_key("client-id", "https://audience")
+
+
+@pytest.fixture(name="cache")
+def setup_cache(clock: FakeClock) -> TokenCache:
+    """Create and return a token cache without a shared tier"""
+    return TokenCache(
+        expiry_margin=60, refresh_margin=120, table_name=None, clock=clock
+    )
+
+
+def token(value: str, expires_in="599") -> dict:
+    """Creates a PDS token response"""
+    return {"access_token": value, "expires_in": expires_in, "token_type": "Bearer"}
+
+
+def test_create_key_combines_client_id_and_audience() -> None:
+    """Test that the key identifies both the client and the audience"""
+    assert TokenCache.create_key("abc", "https://aud") == "abc|https://aud"
+
+
+def test_first_request_is_a_miss_and_fetches_token(cache: TokenCache) -> None:
+    """Test that an empty cache requests a new token"""
+    # Arrange
+    fetch = MagicMock(return_value=token("one"))
+    # Act
+    result = cache.get_token(KEY, fetch)
+    # Assert
+    assert result == token("one")
+    fetch.assert_called_once()
+    assert cache.stats() == {"hits": 0, "shared_hits": 0, "misses": 1, "refreshes": 0}
+
+
+def test_cached_token_is_returned_until_expiry_margin(
+    cache: TokenCache, clock: FakeClock
+) -> None:
+    """Test that the cached token is reused and replaced once within the expiry margin"""
+    # Arrange
+    fetch = MagicMock(side_effect=[token("one"), token("two")])
+    cache.get_token(KEY, fetch)
+    # Act
+    clock.now += 400
+    second = cache.get_token(KEY, fetch)
+    clock.now += 150  # 49 seconds left, inside the 60 second margin
+    third = cache.get_token(KEY, fetch)
+    # Assert
+    assert second == token("one", expires_in="199")
+    assert third["access_token"] == "two"
+    assert fetch.call_count == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_cached_token_with_numeric_expiry_keeps_its_type(
+    cache: TokenCache, clock: FakeClock
+) -> None:
+    """Test that a numeric expires_in is rewritten as the seconds left"""
+    # Arrange
+    cache.get_token(KEY, MagicMock(return_value=token("one", expires_in=599)))
+    clock.now += 100.5
+    # Act
+    result = cache.get_token(KEY, MagicMock())
+    # Assert
+    assert result["expires_in"] == 498
+
+
+def test_token_near_expiry_is_refreshed_in_background(
+    cache: TokenCache, clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a token within the refresh margin is returned and refreshed"""
+    # Arrange
+    mock_thread = mocker.patch("lambdas.utils.tiered_cache.threading.Thread")
+    fetch = MagicMock(side_effect=[token("one"), token("two")])
+    cache.get_token(KEY, fetch)
+    clock.now += 500  # 99 seconds left
+    # Act
+    result = cache.get_token(KEY, fetch)
+    target = mock_thread.call_args.kwargs["target"]
+    target(*mock_thread.call_args.kwargs["args"])
+    # Assert
+    assert result["access_token"] == "one"
+    mock_thread.return_value.start.assert_called_once()
+    assert cache.get_token(KEY, fetch)["access_token"] == "two"
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_failed_background_refresh_keeps_cached_token(
+    cache: TokenCache, clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a failing refresh does not discard the cached token"""
+    # Arrange
+    mock_thread = mocker.patch("lambdas.utils.tiered_cache.threading.Thread")
+    fetch = MagicMock(side_effect=[token("one"), ConnectionError("down")])
+    cache.get_token(KEY, fetch)
+    clock.now += 500
+    # Act
+    cache.get_token(KEY, fetch)
+    target = mock_thread.call_args.kwargs["target"]
+    target(*mock_thread.call_args.kwargs["args"])
+    # Assert
+    assert cache.get_token(KEY, fetch)["access_token"] == "one"
+    assert cache.stats()["refreshes"] == 0
+
+
+@pytest.mark.parametrize("expires_in", [None, "not-a-number"])
+def test_token_without_expiry_is_not_cached(cache: TokenCache, expires_in) -> None:
+    """Test that responses without a usable expiry are never cached"""
+    # Arrange
+    fetch = MagicMock(return_value=token("one", expires_in))
+    # Act
+    cache.get_token(KEY, fetch)
+    cache.get_token(KEY, fetch)
+    # Assert
+    assert fetch.call_count == 2
+
+
+def test_invalidate_removes_token(cache: TokenCache) -> None:
+    """Test that an invalidated token is fetched again"""
+    # Arrange
+    fetch = MagicMock(return_value=token("one"))
+    cache.get_token(KEY, fetch)
+    # Act
+    cache.invalidate(KEY)
+    cache.get_token(KEY, fetch)
+    # Assert
+    assert fetch.call_count == 2
+
+
+def test_shared_tier_is_used_on_memory_miss(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a token stored by another container is reused"""
+    # Arrange
+    mock_client = mocker.patch("lambdas.utils.tiered_cache.get_client")
+    mock_client.return_value.get_item.return_value = {
+        "Item": {
+            "CacheKey": {"S": KEY},
+            "Token": {"S": '{"access_token": "shared", "expires_in": "599"}'},
+            "ExpiresAt": {"N": str(clock.now + 300)},
+        }
+    }
+    cache = TokenCache(table_name="token-table", clock=clock)
+    fetch = MagicMock()
+    # Act
+    result = cache.get_token(KEY, fetch)
+    cache.get_token(KEY, fetch)
+    # Assert
+    assert result == {"access_token": "shared", "expires_in": "300"}
+    fetch.assert_not_called()
+    mock_client.return_value.get_item.assert_called_once_with(
+        TableName="token-table", Key={"CacheKey": {"S": KEY}}
+    )
+    assert cache.stats()["shared_hits"] == 1
+
+
+def test_new_token_is_written_to_shared_tier(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a fetched token is stored in the shared tier"""
+    # Arrange
+    mock_client = mocker.patch("lambdas.utils.tiered_cache.get_client")
+    mock_client.return_value.get_item.return_value = {}
+    cache = TokenCache(table_name="token-table", clock=clock)
+    # Act
+    cache.get_token(KEY, MagicMock(return_value=token("one")))
+    # Assert
+    item = mock_client.return_value.put_item.call_args.kwargs["Item"]
+    assert item["CacheKey"] == {"S": KEY}
+    assert item["TTL"] == {"N": str(int(clock.now + 599))}
+
+
+def test_shared_tier_errors_do_not_prevent_token_generation(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that DynamoDB failures fall back to requesting a token"""
+    # Arrange
+    mock_client = mocker.patch("lambdas.utils.tiered_cache.get_client")
+    mock_client.return_value.get_item.side_effect = Exception("unavailable")
+    mock_client.return_value.put_item.side_effect = Exception("unavailable")
+    cache = TokenCache(table_name="token-table", clock=clock)
+    # Act
+    result = cache.get_token(KEY, MagicMock(return_value=token("one")))
+    # Assert
+    assert result["access_token"] == "one"
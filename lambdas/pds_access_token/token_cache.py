@@ -0,0 +1,146 @@
+"""Caches PDS access tokens for the lifetime of a warm Lambda container.
+
+Tokens are held in memory keyed on the client id and audience they were issued for.
+An optional DynamoDB table can be configured so that tokens are shared between
+containers, reducing the number of calls made to the PDS OAuth endpoint.
+"""
+
+import json
+from os import getenv
+from time import time
+from typing import Callable, Optional
+
+from lambdas.utils.tiered_cache import CacheEntry, TieredCache
+
+# Seconds before expiry at which a cached token is no longer handed out
+TOKEN_EXPIRY_MARGIN = int(getenv("PDS_TOKEN_EXPIRY_MARGIN", "60"))
+# Seconds before expiry at which a replacement token is requested in the background
+TOKEN_REFRESH_MARGIN = int(getenv("PDS_TOKEN_REFRESH_MARGIN", "120"))
+# Optional DynamoDB table used to share tokens between containers
+TOKEN_CACHE_TABLE_NAME = getenv("PDS_TOKEN_CACHE_TABLE_NAME")
+
+
+class TokenCache:
+    """Caches PDS access tokens, refreshing them shortly before they expire."""
+
+    def __init__(
+        self,
+        expiry_margin: int = TOKEN_EXPIRY_MARGIN,
+        refresh_margin: int = TOKEN_REFRESH_MARGIN,
+        table_name: Optional[str] = TOKEN_CACHE_TABLE_NAME,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        """Initialise the cache
+
+        Args:
+            expiry_margin (int): Seconds before expiry that a token stops being used
+            refresh_margin (int): Seconds before expiry that a background refresh starts
+            table_name (str, optional): DynamoDB table name for the shared tier
+            clock (Callable): Returns the current epoch time in seconds
+        """
+        self.expiry_margin = expiry_margin
+        self.refresh_margin = max(refresh_margin, expiry_margin)
+        self._clock = clock
+        self._cache = TieredCache(
+            "PDS token",
+            table_name=table_name,
+            value_attribute="Token",
+            clock=clock,
+        )
+
+    @staticmethod
+    def create_key(client_id: str, audience: str) -> str:
+        """Creates the cache key for a client id and audience
+
+        Args:
+            client_id (str): The client id the token is issued to
+            audience (str): The audience the token is issued for
+
+        Returns:
+            str: The cache key
+        """
+        return f"{client_id}|{audience}"
+
+    def get_token(self, key: str, fetch_token: Callable[[], dict]) -> dict:
+        """Returns a cached token for the key, fetching a new one when required.
+
+        A token that is within the refresh margin of its expiry is still returned,
+        but a replacement is requested in the background. The `expires_in` of a
+        cached token is the number of seconds it has left.
+
+        Args:
+            key (str): The cache key
+            fetch_token (Callable): Requests a new token response from PDS
+
+        Returns:
+            dict: The token response
+        """
+        cached = self._cache.get(key, margin=self.expiry_margin)
+
+        if cached is None:
+            return self.__fetch_and_store(key, fetch_token)
+
+        if cached.fresh_until <= self._clock():
+            self._cache.refresh_in_background(
+                key,
+                lambda: self.__fetch_and_store(key, fetch_token),
+                "PDS access token",
+            )
+
+        return self.__with_remaining_lifetime(cached)
+
+    def invalidate(self, key: str) -> None:
+        """Removes the token for the key from the in-memory tier
+
+        Args:
+            key (str): The cache key
+        """
+        self._cache.delete(key, shared=False)
+
+    def stats(self) -> dict:
+        """Returns the cache counters
+
+        Returns:
+            dict: hit, shared hit, miss and refresh counts
+        """
+        stats = self._cache.stats()
+        return {
+            "hits": stats["hits"],
+            "shared_hits": stats["shared_hits"],
+            "misses": stats["misses"],
+            "refreshes": stats["refreshes"],
+        }
+
+    def __fetch_and_store(self, key: str, fetch_token: Callable[[], dict]) -> dict:
+        """Fetches a new token and caches it if it carries an expiry"""
+        token = fetch_token()
+        expires_in = self.__get_expires_in(token)
+
+        if expires_in is not None:
+            expires_at = self._clock() + expires_in
+            self._cache.put(
+                key,
+                CacheEntry(
+                    value=json.dumps(token),
+                    fresh_until=expires_at - self.refresh_margin,
+                    expires_at=expires_at,
+                ),
+            )
+
+        return token
+
+    def __with_remaining_lifetime(self, cached: CacheEntry) -> dict:
+        """Returns the token with `expires_in` set to the seconds it has left"""
+        token = json.loads(cached.value)
+        remaining = max(int(cached.expires_at - self._clock()), 0)
+        expires_in = token.get("expires_in")
+        return {
+            **token,
+            "expires_in": str(remaining) if isinstance(expires_in, str) else remaining,
+        }
+
+    def __get_expires_in(self, token: dict) -> Optional[int]:
+        try:
+            return int(token["expires_in"])
+        except (KeyError, TypeError, ValueError):
+            return None
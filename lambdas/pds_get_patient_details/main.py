@@ -15,8 +15,9 @@ from fhirclient.server import FHIRNotFoundException, FHIRUnauthorizedException
 from spine_aws_common import LambdaApplication
 
 import lambdas.utils.pds.errors as err
+from lambdas.utils.connection_pool import connection_metrics
 from lambdas.utils.logging.logger import LOG_BASE, initialise_logger, write_log
-from lambdas.utils.pds.nhsnumber import NHSNumber
+from lambdas.utils.pds.nhsnumber import parse_nhs_identifier
 from lambdas.utils.pds.pdsfhirclient import PDSFHIRClient
 
 
@@ -99,8 +100,7 @@ class PdsGetPatientDetails(LambdaApplication):
         nhs_number = str(input_nhs_number)
         auth_token = str(input_auth_token)
 
-        validator = NHSNumber()
-        if not validator.is_valid_nhs_number(nhs_number):
+        if not parse_nhs_identifier(nhs_number).checksum_ok:
             write_log("WARNING", {"info": err.ERROR_NHS_NUMBER_INVALID})
             self.handle_error(HTTPStatus.BAD_REQUEST, err.ERROR_NHS_NUMBER_INVALID)
             return
@@ -119,6 +119,9 @@ class PdsGetPatientDetails(LambdaApplication):
             patient_data = patient.as_json()
 
             self.handle_success(patient_data)
+            write_log(
+                "DEBUG", {"info": f"Connection pool metrics: {connection_metrics()}"}
+            )
 
         except FHIRUnauthorizedException:
             write_log(
@@ -8,6 +8,7 @@ from zoneinfo import ZoneInfo
 from boto3 import client
 from cryptography import x509
 
+from lambdas.utils.aws.s3 import s3_cache
 from lambdas.utils.aws.secret_manager import SecretManager
 from lambdas.utils.logging.logger import write_log
 
@@ -56,9 +57,9 @@ def get_certificate_from_s3(
     Returns:
         x509.Certificate: The certificate
     """
-    response = s3_client.get_object(Bucket=bucket_name, Key=key_name)
-    write_log("DEBUG", {"info": f"Response from S3: {response}"})
-    file_contents = response["Body"].read()
+    # Certificates are revalidated by ETag, only a changed certificate is read again
+    file_contents = s3_cache.get(bucket_name, key_name, s3_client)
+    write_log("DEBUG", {"info": f"Read {len(file_contents)} bytes of {key_name}"})
 
     return x509.load_pem_x509_certificate(file_contents)
 
@@ -3,7 +3,7 @@
 from os import getenv
 
 from lambdas.utils.aws.secret_manager import SecretManager
-from lambdas.utils.email import send_email
+from lambdas.utils.email import bulk_email_client
 from lambdas.utils.logging.logger import write_log
 
 CERTIFICATE_EXPIRY_WARNING_SUBJECT = (
@@ -30,24 +30,28 @@ def hydrate_email_alert_and_send(
 
 
 def email_alert(subject: str, message: str, secret_manager: SecretManager) -> None:
-    """Send an email alert
+    """Send an email alert to each of the comma separated TEAM_EMAIL addresses
 
     Args:
         subject (str): Subject of the email
         message (str): Message of the email (Can be HTML)
         secret_manager (SecretManager): Secret manager to retrieve secrets
     """
-    try:
-        response = send_email(
-            to_email_address=getenv("TEAM_EMAIL"),
-            subject=subject,
-            body=message,
-            api_url=secret_manager.get_secret("API_URL"),
-            subscription_key=secret_manager.get_secret("SUBSCRIPTION_KEY"),
-        )
-        write_log("DEBUG", {"info": f"Email response: {response}"})
-    except ValueError as error:
-        write_log("ERROR", {"info": "Error sending email", "error": str(error)})
+    addresses = [
+        address.strip()
+        for address in getenv("TEAM_EMAIL", "").split(",")
+        if address.strip()
+    ]
+    results = bulk_email_client.send_many(
+        [(address, subject, message) for address in addresses],
+        api_url=secret_manager.get_secret("API_URL"),
+        subscription_key=secret_manager.get_secret("SUBSCRIPTION_KEY"),
+    )
+    for result in results:
+        if result.sent:
+            write_log("DEBUG", {"info": f"Email response: {result.status_code}"})
+        else:
+            write_log("ERROR", {"info": "Error sending email", "error": result.error})
 
 
 def hydrate_email_alert_message(
@@ -3,9 +3,9 @@
 import traceback
 from os import getenv
 
-from boto3 import client
 from spine_aws_common import LambdaApplication
 
+from lambdas.utils.aws.clients import get_client
 from lambdas.utils.aws.secret_manager import SecretManager
 from lambdas.utils.email import send_email
 from lambdas.utils.logging.logger import LOG_BASE, initialise_logger, write_log
@@ -33,7 +33,7 @@ class RaiseCertificateAlert(LambdaApplication):
 
     def start(self) -> dict:
         """Check all certificates in the truststore bucket"""
-        s3_client = client("s3")
+        s3_client = get_client("s3")
         bucket_name = getenv("MTLS_CERTIFICATE_BUCKET_NAME")
         certificates = list_certificates(s3_client, bucket_name)
         for certificate_name in certificates:
@@ -4,8 +4,7 @@ import traceback
 from json import dumps, loads
 from os import getenv
 
-from boto3 import client
-
+from lambdas.utils.aws.clients import get_client
 from lambdas.utils.logging.logger import write_log
 
 EXPIRY_WARNING_SLACK_ALERT_TEMPLATE_NAME = "expiry_warning_slack_alert_template.json"
@@ -33,7 +32,7 @@ def send_slack_alert(message: dict) -> None:
     """
     write_log("INFO", {"info": "Sending Slack alert"})
     try:
-        lambda_client = client("lambda")
+        lambda_client = get_client("lambda")
         response = lambda_client.invoke(
             FunctionName=getenv("SLACK_ALERTS_LAMBDA_FUNCTION_NAME"),
             InvocationType="RequestResponse",
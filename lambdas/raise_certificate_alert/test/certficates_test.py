@@ -41,27 +41,25 @@ def test_list_certificates(mock_client: MagicMock) -> None:
     assert result == ["certificate1.pem", "certificate3.pem"]
 
 
+@patch(f"{FILE_PATH}.s3_cache")
 @patch(f"{FILE_PATH}.x509")
 @patch(f"{FILE_PATH}.datetime")
 def test_get_certificate_from_s3(
-    mock_datetime: MagicMock, mock_x509: MagicMock
+    mock_datetime: MagicMock, mock_x509: MagicMock, mock_s3_cache: MagicMock
 ) -> None:
     """Test get certificate from s3"""
     # Arrange
     mock_datetime.now.return_value = "now"
     mock_x509.load_pem_x509_certificate.return_value = "certificate"
     mock_client = MagicMock()
-    mock_body = MagicMock()
-    mock_client.get_object.return_value = {"Body": mock_body}
+    mock_s3_cache.get.return_value = b"pem"
     bucket_name = "bucket_name"
     key_name = "key_name"
     # Act
     result = get_certificate_from_s3(mock_client, bucket_name, key_name)
     # Assert
-    mock_client.get_object.assert_called_once_with(Bucket=bucket_name, Key=key_name)
-    mock_x509.load_pem_x509_certificate.assert_called_once_with(
-        mock_body.read.return_value
-    )
+    mock_s3_cache.get.assert_called_once_with(bucket_name, key_name, mock_client)
+    mock_x509.load_pem_x509_certificate.assert_called_once_with(b"pem")
 
     assert result == "certificate"
 
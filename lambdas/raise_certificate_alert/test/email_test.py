@@ -3,6 +3,8 @@
 from os import environ
 from unittest.mock import MagicMock, patch
 
+from lambdas.utils.email import EmailResult
+
 from ..email import (
     email_alert,
     hydrate_email_alert_and_send,
@@ -34,20 +36,22 @@ def test_hydrate_email_alert_and_send(
     mock_email_alert.assert_called_once_with(SUBJECT, TEMPLATE, secret_manager)
 
 
-@patch(f"{FILE_PATH}.send_email")
-def test_email_alert(mock_send_email: MagicMock) -> None:
+@patch(f"{FILE_PATH}.bulk_email_client")
+def test_email_alert(mock_bulk_email_client: MagicMock) -> None:
     """Test email alert"""
     # Arrange
     secret_manager = MagicMock()
     secret_manager.get_secret.side_effect = ["api_url", "subscription_key"]
-    environ["TEAM_EMAIL"] = email = "test@test.com"
+    environ["TEAM_EMAIL"] = "test@test.com, team@test.com, "
+    mock_bulk_email_client.send_many.return_value = [
+        EmailResult("test@test.com", sent=True, status_code=200, attempts=1),
+        EmailResult("team@test.com", sent=True, status_code=202, attempts=1),
+    ]
     # Act
     email_alert(SUBJECT, MESSAGE, secret_manager)
     # Assert
-    mock_send_email.assert_called_once_with(
-        to_email_address=email,
-        subject=SUBJECT,
-        body=MESSAGE,
+    mock_bulk_email_client.send_many.assert_called_once_with(
+        [("test@test.com", SUBJECT, MESSAGE), ("team@test.com", SUBJECT, MESSAGE)],
         api_url="api_url",
         subscription_key="subscription_key",
     )
@@ -55,6 +59,28 @@ def test_email_alert(mock_send_email: MagicMock) -> None:
     del environ["TEAM_EMAIL"]
 
 
+@patch(f"{FILE_PATH}.write_log")
+@patch(f"{FILE_PATH}.bulk_email_client")
+def test_email_alert_failed(
+    mock_bulk_email_client: MagicMock, mock_write_log: MagicMock
+) -> None:
+    """Test email alert logs the emails that failed to send"""
+    # Arrange
+    secret_manager = MagicMock()
+    environ["TEAM_EMAIL"] = "test@test.com"
+    mock_bulk_email_client.send_many.return_value = [
+        EmailResult("test@test.com", sent=False, attempts=3, error="Busy")
+    ]
+    # Act
+    email_alert(SUBJECT, MESSAGE, secret_manager)
+    # Assert
+    mock_write_log.assert_called_once_with(
+        "ERROR", {"info": "Error sending email", "error": "Busy"}
+    )
+    # Cleanup
+    del environ["TEAM_EMAIL"]
+
+
 def test_hydrate_email_alert_message() -> None:
     """Test hydrate email alert message"""
     # Arrange
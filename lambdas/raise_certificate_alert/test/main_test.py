@@ -15,7 +15,7 @@ FILE_PATH = "lambdas.raise_certificate_alert.main"
 @patch(f"{FILE_PATH}.get_certificate_expiry")
 @patch(f"{FILE_PATH}.get_certificate_from_s3")
 @patch(f"{FILE_PATH}.list_certificates")
-@patch(f"{FILE_PATH}.client")
+@patch(f"{FILE_PATH}.get_client")
 @patch(f"{FILE_PATH}.hydrate_slack_alert_and_send")
 def test_raise_certificate_alert__main(
     mock_hydrate_slack_alert_and_send: MagicMock,
@@ -58,7 +58,7 @@ def test_raise_certificate_alert__main(
 
 @patch(f"{FILE_PATH}.get_certificate_from_s3")
 @patch(f"{FILE_PATH}.list_certificates")
-@patch(f"{FILE_PATH}.client")
+@patch(f"{FILE_PATH}.get_client")
 @patch(f"{FILE_PATH}.hydrate_slack_alert_and_send")
 def test_raise_certificate_alert__main__slack_alert(
     mock_hydrate_slack_alert_and_send: MagicMock,
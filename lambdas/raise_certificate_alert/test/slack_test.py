@@ -34,7 +34,7 @@ def test_hydrate_slack_alert_and_send(
     )
 
 
-@patch(f"{FILE_PATH}.client")
+@patch(f"{FILE_PATH}.get_client")
 def test_send_slack_alert(mock_client: MagicMock) -> None:
     """Test send slack alert"""
     # Arrange
@@ -1,12 +1,18 @@
-"""Redact sensitive information from EventBridge events and log to CloudWatch."""
+"""Redact sensitive information from EventBridge events and log to CloudWatch.
 
-from json import dumps
+The lambda can be invoked with a single EventBridge event, or with a batch of them
+delivered by SQS or by Firehose, in which case every event of the batch is logged
+with as few PutLogEvents calls as possible.
+"""
+
+from json import dumps, loads
 from os import getenv
 from time import time
 
-from boto3 import client
 from spine_aws_common import LambdaApplication
 
+from lambdas.utils.aws.cloudwatch_logs import CloudWatchLogsBatchWriter
+from lambdas.utils.firehose.records import OK, BatchMetrics, transform_records
 from lambdas.utils.logging.logger import LOG_BASE, initialise_logger, write_log
 
 
@@ -24,9 +30,19 @@ class RedactEventBridgeEventsAndLogToCloudWatch(LambdaApplication):
         write_log("DEBUG", {"info": f"Writing logs to log group: {log_group}"})
         write_log("DEBUG", {"info": f"Writing logs to log stream: {log_stream}"})
         self._verify_parameters(log_group, log_stream)
-        event = dict(self.event)
-        redacted_record = self._redact_sensitive_data(event)
-        self._log_to_cloudwatch(redacted_record, log_group, log_stream)
+
+        if "records" in self.event:
+            self.response = {
+                "records": self._redact_firehose_records(log_group, log_stream)
+            }
+            return
+
+        if "Records" in self.event:
+            events = [loads(record["body"]) for record in self.event["Records"]]
+        else:
+            events = [dict(self.event)]
+        redacted_records = [self._redact_sensitive_data(event) for event in events]
+        self._log_to_cloudwatch(redacted_records, log_group, log_stream)
         self.response = {"body": "Success"}
 
     def _verify_parameters(self, log_group: str, log_stream: str) -> None:
@@ -52,25 +68,46 @@ class RedactEventBridgeEventsAndLogToCloudWatch(LambdaApplication):
 
         return event_bridge_event
 
+    def _redact_firehose_records(self, log_group: str, log_stream: str) -> list[dict]:
+        """Redact and log the events of a Firehose batch.
+
+        Args:
+            log_group (str): CloudWatch log group.
+            log_stream (str): CloudWatch log stream.
+
+        Returns:
+            list[dict]: The Firehose response record of each event, holding the
+                redacted event.
+        """
+        redacted_records = []
+
+        def redact(data: bytes) -> tuple[str, bytes]:
+            redacted_record = self._redact_sensitive_data(loads(data))
+            redacted_records.append(redacted_record)
+            return OK, dumps(redacted_record).encode("utf-8")
+
+        records = list(transform_records(self.event["records"], redact, BatchMetrics()))
+        self._log_to_cloudwatch(redacted_records, log_group, log_stream)
+        return records
+
     def _log_to_cloudwatch(
-        self, redacted_record: dict, log_group: str, log_stream: str
+        self, redacted_records: list[dict], log_group: str, log_stream: str
     ) -> None:
-        """Log redacted record to CloudWatch.
+        """Log redacted records to CloudWatch in as few calls as possible.
 
         Args:
-            redacted_record (dict): Redacted record.
+            redacted_records (list[dict]): Redacted records.
             log_group (str): CloudWatch log group.
             log_stream (str): CloudWatch log stream.
         """
-        client("logs").put_log_events(
-            logGroupName=log_group,
-            logStreamName=log_stream,
-            logEvents=[
-                {
-                    "timestamp": round(time() * 1000),
-                    "message": dumps(redacted_record),
-                }
-            ],
+        writer = CloudWatchLogsBatchWriter(log_group, log_stream)
+        timestamp = round(time() * 1000)
+        for redacted_record in redacted_records:
+            writer.add(dumps(redacted_record), timestamp)
+        calls = writer.flush()
+        write_log(
+            "DEBUG",
+            {"info": f"Logged {len(redacted_records)} events in {calls} calls"},
         )
 
 
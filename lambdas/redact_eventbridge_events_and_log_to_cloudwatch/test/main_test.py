@@ -1,6 +1,8 @@
 """Collection of tests for the main module."""
 
-from unittest.mock import MagicMock, patch
+import json
+from base64 import b64decode, b64encode
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 
@@ -86,33 +88,85 @@ class TestRedactEventBridgeEventsAndLogToCloudWatch:
         )
 
     @patch(f"{FILE_PATH}.time")
-    @patch(f"{FILE_PATH}.client")
+    @patch(f"{FILE_PATH}.CloudWatchLogsBatchWriter")
     def test_log_to_cloudwatch(
-        self, mock_client: MagicMock, mock_time: MagicMock
+        self, mock_writer: MagicMock, mock_time: MagicMock
     ) -> None:
         # Arrange
-        redacted_record = {"key": "value"}
-        self.redact_eventbridge_events_and_log_to_cloudwatch.log_group = group = "group"
-        self.redact_eventbridge_events_and_log_to_cloudwatch.log_stream = stream = (
-            "stream"
-        )
+        redacted_records = [{"key": "value"}, {"key": "other"}]
+        group, stream = "group", "stream"
         mock_time.return_value = time = 0
         # Act
         self.redact_eventbridge_events_and_log_to_cloudwatch._log_to_cloudwatch(
-            redacted_record, group, stream
+            redacted_records, group, stream
         )
         # Assert
-        mock_client.assert_called_once_with("logs")
-        mock_client.return_value.put_log_events.assert_called_once_with(
-            logGroupName=group,
-            logStreamName=stream,
-            logEvents=[
+        mock_writer.assert_called_once_with(group, stream)
+        assert mock_writer.return_value.add.call_args_list == [
+            call('{"key": "value"}', time),
+            call('{"key": "other"}', time),
+        ]
+        mock_writer.return_value.flush.assert_called_once()
+
+    @patch(f"{FILE_PATH}.RedactEventBridgeEventsAndLogToCloudWatch._log_to_cloudwatch")
+    @patch(f"{FILE_PATH}.RedactEventBridgeEventsAndLogToCloudWatch._verify_parameters")
+    @patch(f"{FILE_PATH}.write_log")
+    def test_main_sqs_batch(
+        self,
+        mock_write_log: MagicMock,
+        mock_verify_parameters: MagicMock,
+        mock_log_to_cloudwatch: MagicMock,
+    ) -> None:
+        # Arrange
+        event = {
+            "Records": [
+                {"body": json.dumps({"detail": {"sensitive": {"id": str(index)}}})}
+                for index in range(3)
+            ]
+        }
+        # Act
+        response = self.redact_eventbridge_events_and_log_to_cloudwatch.main(
+            event, MagicMock()
+        )
+        # Assert
+        assert response == {"body": "Success"}
+        mock_log_to_cloudwatch.assert_called_once()
+        assert (
+            mock_log_to_cloudwatch.call_args.args[0]
+            == [{"detail": {"sensitive": {"id": "[REDACTED]"}}}] * 3
+        )
+
+    @patch(f"{FILE_PATH}.RedactEventBridgeEventsAndLogToCloudWatch._log_to_cloudwatch")
+    @patch(f"{FILE_PATH}.RedactEventBridgeEventsAndLogToCloudWatch._verify_parameters")
+    @patch(f"{FILE_PATH}.write_log")
+    def test_main_firehose_batch(
+        self,
+        mock_write_log: MagicMock,
+        mock_verify_parameters: MagicMock,
+        mock_log_to_cloudwatch: MagicMock,
+    ) -> None:
+        # Arrange
+        event = {
+            "records": [
                 {
-                    "timestamp": time,
-                    "message": '{"key": "value"}',
+                    "recordId": str(index),
+                    "data": b64encode(
+                        json.dumps({"detail": {"sensitive": {"id": "1"}}}).encode()
+                    ).decode(),
                 }
-            ],
+                for index in range(2)
+            ]
+        }
+        redacted = {"detail": {"sensitive": {"id": "[REDACTED]"}}}
+        # Act
+        response = self.redact_eventbridge_events_and_log_to_cloudwatch.main(
+            event, MagicMock()
         )
+        # Assert
+        assert [record["recordId"] for record in response["records"]] == ["0", "1"]
+        assert [record["result"] for record in response["records"]] == ["Ok", "Ok"]
+        assert json.loads(b64decode(response["records"][0]["data"])) == redacted
+        assert mock_log_to_cloudwatch.call_args.args[0] == [redacted] * 2
 
     def test_redact_eventbridge_events_and_log_to_cloudwatch_verify_parameters(
         self,
@@ -3,12 +3,90 @@
 """
 
 import json
-from base64 import b64decode, b64encode
+import re
+from typing import Any, Optional
 
 from spine_aws_common import LambdaApplication
 
+from lambdas.utils.firehose.records import (
+    OK,
+    PROCESSING_FAILED,
+    BatchMetrics,
+    dumps,
+    loads,
+    transform_batch,
+)
 from lambdas.utils.logging.logger import LOG_BASE, initialise_logger, write_log
 
+REDACTED = "[REDACTED]"
+SENSITIVE_KEY = '"sensitive"'
+UNICODE_ESCAPE = "\\u"
+KEY_SEPARATOR = re.compile(r"[ \t\n\r]*:[ \t\n\r]*")
+DECODER = json.JSONDecoder()
+
+
+def replace_sensitive_block(text: str, sensitive: Any) -> Optional[str]:
+    """Replaces the value of the sensitive block in an event without re-serialising it.
+
+    The block is only replaced when the event contains a single "sensitive" key and
+    its value is the sensitive block of the parsed event. Events containing a \\u
+    escape are not replaced, as a key written with one would not be found.
+
+    Args:
+        text (str): The event
+        sensitive (Any): The sensitive block of the parsed event
+
+    Returns:
+        Optional[str]: The redacted event, or None if the block cannot be replaced
+    """
+    if UNICODE_ESCAPE in text:
+        return None
+    start = text.find(SENSITIVE_KEY)
+    if (
+        start < 1
+        or text[start - 1] == "\\"
+        or text.find(SENSITIVE_KEY, start + len(SENSITIVE_KEY)) != -1
+    ):
+        return None
+    separator = KEY_SEPARATOR.match(text, start + len(SENSITIVE_KEY))
+    if separator is None:
+        return None
+    value, end = DECODER.raw_decode(text, separator.end())
+    if value != sensitive:
+        return None
+    return f'{text[: separator.end()]}"{REDACTED}"{text[end:]}'
+
+
+def redact(data: bytes) -> tuple[str, bytes]:
+    """Redacts the sensitive block of an event.
+
+    Args:
+        data (bytes): The event
+
+    Returns:
+        tuple[str, bytes]: The result of the transformation and the redacted event
+    """
+    text = data.decode("utf-8")
+    business_event = loads(text)
+    detail = business_event.get("detail") if isinstance(business_event, dict) else None
+
+    if not isinstance(detail, dict) or "sensitive" not in detail:
+        write_log(
+            "ERROR",
+            {
+                "info": "Processing failed because the sensitive block was not found in the passed events, see CloudWatch logs for details.",
+                "error": "",
+            },
+        )
+        return PROCESSING_FAILED, data
+
+    redacted = replace_sensitive_block(text, detail["sensitive"])
+    if redacted is not None:
+        return OK, redacted.encode("utf-8")
+
+    detail["sensitive"] = REDACTED
+    return OK, dumps(business_event)
+
 
 class RedactData(LambdaApplication):
     """Lambda process to redact sensitive values before they are stored in s3 buckets."""
@@ -21,38 +99,9 @@ class RedactData(LambdaApplication):
         """Redact all sensitive fields in a given event."""
 
         write_log("DEBUG", {"info": "Start run"})
-        outputs = []
-
-        for record in self.event["records"]:
-            business_event = json.loads(b64decode(record["data"]).decode("utf-8"))
-            result = "Ok"
-
-            if "detail" in business_event and "sensitive" in business_event["detail"]:
-                business_event["detail"]["sensitive"] = "[REDACTED]"
-                write_log("DEBUG", {"info": "Data successfully redacted for event."})
-            else:
-                result = "ProcessingFailed"
-                write_log(
-                    "ERROR",
-                    {
-                        "info": "Processing failed because the sensitive block was not found in the passed events, see CloudWatch logs for details.",
-                        "error": "",
-                    },
-                )
-
-            redacted_record = {
-                "recordId": record["recordId"],
-                "result": result,
-                "data": b64encode(json.dumps(business_event).encode("utf-8")).decode(
-                    "utf-8"
-                ),
-            }
-            outputs.append(redacted_record)
-
-        write_log(
-            "DEBUG",
-            {"info": "Processed {} records.".format(len(self.event["records"]))},
-        )
+        metrics = BatchMetrics()
+        outputs = transform_batch(self.event["records"], redact, metrics)
+        write_log("DEBUG", {"info": metrics.to_log()})
         self.response = {"records": outputs}
 
 
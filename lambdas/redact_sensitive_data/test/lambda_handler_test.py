@@ -7,7 +7,12 @@ from base64 import b64decode, b64encode, decode
 
 import pytest
 
-from lambdas.redact_sensitive_data.main import RedactData, lambda_handler
+from lambdas.redact_sensitive_data.main import (
+    RedactData,
+    lambda_handler,
+    redact,
+    replace_sensitive_block,
+)
 
 
 @pytest.fixture
@@ -133,9 +138,77 @@ def test_data_correctly_redacted(correct_sample_event, mocker):
     )
 
     # Assert
-    mock_write_log.assert_any_call(
-        "DEBUG",
-        {"info": "Data successfully redacted for event."},
-    )
+    assert mock_write_log.call_args.args[1]["info"].startswith("Processed 1 records")
     assert redacted_data["records"][0]["result"] == "Ok"
     assert redacted_event["detail"]["sensitive"] == "[REDACTED]"
+
+
+def test_redacted_event_is_not_reserialised(mocker):
+    """Test that only the sensitive block of the event is replaced"""
+
+    # Arrange
+    mocker.patch("lambdas.redact_sensitive_data.main.write_log")
+    event = '{"detail": {"sensitive" : {"a": [1, "}"]},  "standard": {"b": 1.50}}}'
+
+    # Act
+    result, redacted = redact(event.encode("utf-8"))
+
+    # Assert
+    assert result == "Ok"
+    assert (
+        redacted
+        == b'{"detail": {"sensitive" : "[REDACTED]",  "standard": {"b": 1.50}}}'
+    )
+
+
+@pytest.mark.parametrize(
+    "event",
+    [
+        '{"detail": {"sensitive": 1, "standard": {"sensitive": 2}}}',
+        '{"detail": {"sens\\u0069tive": 1, "standard": {"sensitive": 2}}}',
+        '{"detail": {"sens\\u0069tive": {"nhs": "9000000009"}, '
+        '"standard": {"sensitive": {"nhs": "9000000009"}}}}',
+        '{"detail": {"sensitive": 1}, "sensitive": 1}',
+    ],
+)
+def test_ambiguous_sensitive_block_is_redacted_by_reserialising(event: str, mocker):
+    """Test that events where the sensitive block cannot be found in the text are parsed and reserialised"""
+
+    # Arrange
+    mocker.patch("lambdas.redact_sensitive_data.main.write_log")
+    expected = json.loads(event)
+    expected["detail"]["sensitive"] = "[REDACTED]"
+
+    # Act
+    in_place = replace_sensitive_block(event, json.loads(event)["detail"]["sensitive"])
+    result, redacted = redact(event.encode("utf-8"))
+
+    # Assert
+    assert in_place is None
+    assert result == "Ok"
+    assert json.loads(redacted) == expected
+
+
+def test_records_are_returned_in_order(
+    correct_sample_event, incorrect_sample_event, mocker
+):
+    """Test that every record of a batch is returned in order with its own result"""
+
+    # Arrange
+    mocker.patch("lambdas.redact_sensitive_data.main.write_log")
+    records = []
+    for index in range(3):
+        for sample in (correct_sample_event, incorrect_sample_event):
+            record = dict(sample["records"][0], recordId=f"{index}-{len(records)}")
+            records.append(record)
+    record_ids = [record["recordId"] for record in records]
+
+    # Act
+    response = lambda_handler({"records": records}, {})
+
+    # Assert
+    assert [record["recordId"] for record in response["records"]] == record_ids
+    assert [record["result"] for record in response["records"]] == [
+        "Ok",
+        "ProcessingFailed",
+    ] * 3
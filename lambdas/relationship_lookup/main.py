@@ -13,8 +13,9 @@ from fhirclient.server import FHIRNotFoundException, FHIRUnauthorizedException
 from spine_aws_common import LambdaApplication
 
 import lambdas.utils.pds.errors as err
+from lambdas.utils.connection_pool import connection_metrics
 from lambdas.utils.logging.logger import LOG_BASE, initialise_logger, write_log
-from lambdas.utils.pds.nhsnumber import NHSNumber
+from lambdas.utils.pds.nhsnumber import parse_nhs_identifier
 from lambdas.utils.pds.pdsfhirclient import PDSFHIRClient
 
 
@@ -39,7 +40,6 @@ class RelationshipLookup(LambdaApplication):
 
         write_log("DEBUG", {"info": "RelationshipLookup : Start ran"})
 
-        validator = NHSNumber()
         input_nhs_number = self.event.get(self.PARAMETER_NHSNUMBER, 0)
         input_auth_token = self.event.get(self.PARAMETER_AUTH_TKN, 0)
 
@@ -60,7 +60,7 @@ class RelationshipLookup(LambdaApplication):
             return
 
         # Validate NHS Number - Exit if invalid
-        if not validator.is_valid_nhs_number(input_nhs_number):
+        if not parse_nhs_identifier(input_nhs_number).checksum_ok:
             write_log("WARNING", {"info": err.ERROR_NHS_NUMBER_INVALID})
             self.generate_response(
                 HTTPStatus.BAD_REQUEST, error=err.ERROR_NHS_NUMBER_INVALID
@@ -83,6 +83,9 @@ class RelationshipLookup(LambdaApplication):
         try:
             pds_data = self.retrieve_relationship(nhs_number, auth_token)
             self.generate_response(HTTPStatus.OK, pds_data=pds_data)
+            write_log(
+                "DEBUG", {"info": f"Connection pool metrics: {connection_metrics()}"}
+            )
 
         except FHIRNotFoundException:
             # Not logging 404 requests
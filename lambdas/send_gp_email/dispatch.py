@@ -0,0 +1,126 @@
+"""Sends a GP email to every address of a practice at once.
+
+The emails are sent by the bulk email client, concurrently and within the rate
+limit of SendNHSMail, retrying transient failures.
+
+Every email has an idempotency key, made from the reference code, the hydrated email
+and the address. The key of each sent email is recorded on the access request, so
+an invocation that is retried after some of the emails were sent only sends the
+remaining ones.
+"""
+
+from dataclasses import dataclass
+from hashlib import sha256
+from typing import Callable, Optional
+
+from lambdas.utils.email import (
+    BulkEmailClient,
+    EmailMessage,
+    EmailResult,
+    bulk_email_client,
+)
+from lambdas.utils.logging.logger import write_log
+
+
+@dataclass
+class SendResult:
+    """The outcome of sending the email to one address."""
+
+    email_address: str
+    idempotency_key: str
+    sent: bool
+    attempts: int = 0
+    skipped: bool = False
+    error: Optional[str] = None
+
+
+def create_idempotency_key(reference_code: str, email_id: str, address: str) -> str:
+    """Creates the idempotency key of an email to an address
+
+    Args:
+        reference_code (str): The reference code of the access request
+        email_id (str): Identifies the email, e.g. its S3 key
+        address (str): The address the email is sent to
+
+    Returns:
+        str: The idempotency key
+    """
+    return sha256(f"{reference_code}|{email_id}|{address}".encode()).hexdigest()
+
+
+class GPEmailDispatcher:
+    """Sends an email to the addresses it has not been sent to yet"""
+
+    def __init__(self, email_client: BulkEmailClient = bulk_email_client) -> None:
+        """Initialise the dispatcher
+
+        Args:
+            email_client (BulkEmailClient): Sends the emails
+        """
+        self.email_client = email_client
+
+    def dispatch(
+        self,
+        addresses: list[str],
+        subject: str,
+        body: str,
+        api_url: str,
+        subscription_key: str,
+        reference_code: str,
+        email_id: str,
+        sent_keys: Optional[set[str]] = None,
+        on_sent: Optional[Callable[[SendResult], None]] = None,
+    ) -> list[SendResult]:
+        """Sends the email to every address that it has not been sent to
+
+        Args:
+            addresses (list[str]): The addresses to send the email to
+            subject (str): Email subject
+            body (str): Email body
+            api_url (str): SendNHSMail URL
+            subscription_key (str): SendNHSMail API key
+            reference_code (str): The reference code of the access request
+            email_id (str): Identifies the email, e.g. its S3 key
+            sent_keys (set[str], optional): Idempotency keys of emails already sent
+            on_sent (Callable, optional): Called with the result of each sent email
+
+        Returns:
+            list[SendResult]: The result for each address, in order
+        """
+        sent_keys = sent_keys or set()
+        results: list[SendResult] = []
+        pending: list[SendResult] = []
+        for address in dict.fromkeys(addresses):
+            result = SendResult(
+                address,
+                create_idempotency_key(reference_code, email_id, address),
+                sent=False,
+            )
+            if result.idempotency_key in sent_keys:
+                write_log("INFO", {"info": f"Email already sent to : {address}"})
+                result.sent = result.skipped = True
+            else:
+                pending.append(result)
+            results.append(result)
+
+        def update(index: int, email_result: EmailResult) -> None:
+            result = pending[index]
+            result.sent = email_result.sent
+            result.attempts = email_result.attempts
+            result.error = email_result.error
+            if on_sent is not None and result.sent:
+                on_sent(result)
+
+        email_results = self.email_client.send_many(
+            [EmailMessage(result.email_address, subject, body) for result in pending],
+            api_url,
+            subscription_key,
+            on_sent=update,
+        )
+        for index, email_result in enumerate(email_results):
+            if not email_result.sent:
+                update(index, email_result)
+        return results
+
+
+gp_email_dispatcher = GPEmailDispatcher()
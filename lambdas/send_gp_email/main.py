@@ -1,14 +1,18 @@
 from http import HTTPStatus
 from json import loads
 from os import getenv
-from typing import Optional
 
 from spine_aws_common import LambdaApplication
 
-from lambdas.utils.aws.dynamodb import AccessRequestStates, get_item, update_status
+from lambdas.send_gp_email.dispatch import SendResult, gp_email_dispatcher
+from lambdas.utils.aws.dynamodb import (
+    AccessRequestStates,
+    get_item,
+    record_email_sent,
+    update_status,
+)
 from lambdas.utils.aws.s3 import get_s3_file
 from lambdas.utils.aws.secret_manager import SecretManager
-from lambdas.utils.email import send_email
 from lambdas.utils.logging.logger import LOG_BASE, initialise_logger, write_log
 
 
@@ -42,10 +46,15 @@ class SendGPEmail(LambdaApplication):
                 )
             # Get the email
             email_contents = self.__load_email_content(rec)
-            # Send the email
-            email_addr = rec["GPEmailAddresses"]["L"]
-            self.send_gp_email(email_addr, email_contents)
-            # Update status to mark it as sent
+            # Send the email to every address
+            results = self.send_gp_email(rec, email_contents)
+            failed = [result for result in results if not result.sent]
+            if failed:
+                raise ValueError(
+                    f"Email failed to send to {len(failed)} of {len(results)} "
+                    "GP email addresses"
+                )
+            # Update status to mark it as sent, once every email has been sent
             self.__update_status(event_contents)
 
             # Completed successfully - return
@@ -130,28 +139,36 @@ class SendGPEmail(LambdaApplication):
             rec["detail"]["referenceCode"], AccessRequestStates.ACCESS_REQUEST_SENT
         )
 
-    def send_gp_email(self, email_addr: list, contents: dict) -> Optional[str]:
-        """Send an email using NHSUK SendNHSMail API
+    def send_gp_email(self, rec: dict, contents: dict) -> list[SendResult]:
+        """Send the email to every GP email address using NHSUK SendNHSMail API
+
+        Emails already sent by an earlier attempt, recorded by their idempotency
+        keys in SentEmailKeys, are not sent again.
 
         Args:
-            event_contents (dict): The contents of the event
+            rec (dict): The access request record from Dynamo Db
+            contents (dict): Email contents
 
         Returns:
-            str: Success message
+            list[SendResult]: The outcome for each address
         """
         api_url = self.secret_manager.get_secret("API_URL")
         subscription_key = self.secret_manager.get_secret("SUBSCRIPTION_KEY")
-
-        for email in email_addr:
-            to_email_address = email["S"]
-            subject = contents["email_subject"]
-            body = contents["email_body"]
-
-            write_log("INFO", {"info": f"Sending email to : {to_email_address}"})
-            # Send mail raises exception on failed emails
-            # Allow exception to bubble up as it cause lambda to fail and rety
-            send_email(to_email_address, subject, body, api_url, subscription_key)
-        return "Email sent successfully."
+        reference_code = rec["ReferenceCode"]["S"]
+
+        return gp_email_dispatcher.dispatch(
+            [email["S"] for email in rec["GPEmailAddresses"]["L"]],
+            contents["email_subject"],
+            contents["email_body"],
+            api_url,
+            subscription_key,
+            reference_code,
+            email_id=rec["S3Key"]["S"],
+            sent_keys=set(rec.get("SentEmailKeys", {}).get("SS", [])),
+            on_sent=lambda result: record_email_sent(
+                reference_code, result.idempotency_key
+            ),
+        )
 
 
 send_gp_email = SendGPEmail(additional_log_config=LOG_BASE)
@@ -0,0 +1,103 @@
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from lambdas.send_gp_email.dispatch import (
+    GPEmailDispatcher,
+    SendResult,
+    create_idempotency_key,
+)
+from lambdas.utils.email import EmailMessage, EmailResult
+
+FILE_PATH = "lambdas.send_gp_email.dispatch"
+EMAIL = ("Subject", "Body", "https://example.com", "key", "ABC123", "ABC123.json")
+
+
+@pytest.fixture(autouse=True)
+def mock_write_log(mocker: MockerFixture) -> MagicMock:
+    """Patch the logger, which is initialised by the lambda"""
+    return mocker.patch(f"{FILE_PATH}.write_log")
+
+
+@pytest.fixture(name="email_client")
+def setup_email_client() -> MagicMock:
+    """Create an email client that sends every email but b@nhs.net"""
+
+    def send_many(messages, api_url, subscription_key, on_sent=None):
+        results = []
+        for index, message in enumerate(messages):
+            sent = message.to_email_address != "b@nhs.net"
+            result = EmailResult(
+                message.to_email_address,
+                sent=sent,
+                attempts=1 if sent else 3,
+                error=None if sent else "Busy",
+            )
+            if sent and on_sent is not None:
+                on_sent(index, result)
+            results.append(result)
+        return results
+
+    return MagicMock(send_many=MagicMock(side_effect=send_many))
+
+
+def test_emails_are_sent_in_bulk(email_client: MagicMock) -> None:
+    """Test that every address is sent to in one batch and the results mapped"""
+    # Arrange
+    on_sent = MagicMock()
+    # Act
+    results = GPEmailDispatcher(email_client).dispatch(
+        ["a@nhs.net", "b@nhs.net", "c@nhs.net"], *EMAIL, on_sent=on_sent
+    )
+    # Assert
+    assert [(result.email_address, result.sent) for result in results] == [
+        ("a@nhs.net", True),
+        ("b@nhs.net", False),
+        ("c@nhs.net", True),
+    ]
+    assert (results[1].attempts, results[1].error) == (3, "Busy")
+    email_client.send_many.assert_called_once()
+    assert email_client.send_many.call_args.args == (
+        [
+            EmailMessage("a@nhs.net", "Subject", "Body"),
+            EmailMessage("b@nhs.net", "Subject", "Body"),
+            EmailMessage("c@nhs.net", "Subject", "Body"),
+        ],
+        "https://example.com",
+        "key",
+    )
+    assert [call.args[0].email_address for call in on_sent.call_args_list] == [
+        "a@nhs.net",
+        "c@nhs.net",
+    ]
+
+
+def test_sent_emails_are_not_sent_again(email_client: MagicMock) -> None:
+    """Test that addresses with a recorded idempotency key are skipped"""
+    # Arrange
+    sent_key = create_idempotency_key("ABC123", "ABC123.json", "a@nhs.net")
+    # Act
+    results = GPEmailDispatcher(email_client).dispatch(
+        ["a@nhs.net", "c@nhs.net", "c@nhs.net"], *EMAIL, sent_keys={sent_key}
+    )
+    # Assert
+    assert results[0] == SendResult(
+        "a@nhs.net", sent_key, sent=True, attempts=0, skipped=True
+    )
+    assert len(results) == 2
+    assert email_client.send_many.call_args.args[0] == [
+        EmailMessage("c@nhs.net", "Subject", "Body")
+    ]
+
+
+def test_idempotency_key_differs_per_email_and_address() -> None:
+    """Test that the idempotency key identifies the email and the address"""
+    # Act
+    keys = {
+        create_idempotency_key("ABC123", "ABC123-1.json", "a@nhs.net"),
+        create_idempotency_key("ABC123", "ABC123-2.json", "a@nhs.net"),
+        create_idempotency_key("ABC123", "ABC123-1.json", "b@nhs.net"),
+    }
+    # Assert
+    assert len(keys) == 3
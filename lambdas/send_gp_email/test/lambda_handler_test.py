@@ -2,6 +2,7 @@ from json import dumps
 from os import environ
 from unittest.mock import MagicMock, patch
 
+from lambdas.send_gp_email.dispatch import SendResult
 from lambdas.send_gp_email.main import SendGPEmail, lambda_handler
 
 FILE_PATH = "lambdas.send_gp_email.main"
@@ -65,3 +66,61 @@ def test_lambda_handler(
     mock_update_status.assert_called_once()
 
     assert response == {"statusCode": 200, "body": {"message": "OK"}}
+
+
+@patch(f"{FILE_PATH}.send_gp_email._SendGPEmail__get_item")
+@patch(f"{FILE_PATH}.send_gp_email._SendGPEmail__load_email_content")
+@patch(f"{FILE_PATH}.send_gp_email.send_gp_email")
+@patch(f"{FILE_PATH}.send_gp_email._SendGPEmail__update_status")
+def test_lambda_handler_email_failed(
+    mock_update_status: MagicMock,
+    mock_send_gp_email: MagicMock,
+    mock_load_email_content: MagicMock,
+    mock_get_item: MagicMock,
+):
+    # Arrange
+    mock_get_item.return_value = {"GPEmailAddresses": {"L": "email"}}
+    mock_send_gp_email.return_value = [
+        SendResult("a@nhs.net", "1", sent=True),
+        SendResult("b@nhs.net", "2", sent=False),
+    ]
+    # Act
+    response = lambda_handler(DYNAMO_DB_MOCK_EVENT.copy(), {})
+    # Assert
+    mock_update_status.assert_not_called()
+    assert response == {
+        "statusCode": 500,
+        "body": {"message": "Email failed to send to 1 of 2 GP email addresses"},
+    }
+
+
+@patch(f"{FILE_PATH}.record_email_sent")
+@patch(f"{FILE_PATH}.gp_email_dispatcher")
+def test_send_gp_email(mock_dispatcher: MagicMock, mock_record_email_sent: MagicMock):
+    # Arrange
+    sut = SendGPEmail()
+    sut.secret_manager = MagicMock()
+    sut.secret_manager.get_secret.side_effect = ["url", "key"]
+    rec = {
+        "ReferenceCode": {"S": "y1pr38jpv"},
+        "S3Key": {"S": "y1pr38jpv.json"},
+        "GPEmailAddresses": {"L": [{"S": "a@nhs.net"}, {"S": "b@nhs.net"}]},
+        "SentEmailKeys": {"SS": ["1"]},
+    }
+    # Act
+    results = sut.send_gp_email(rec, {"email_subject": "Subject", "email_body": "Body"})
+    # Assert
+    assert results == mock_dispatcher.dispatch.return_value
+    args, kwargs = mock_dispatcher.dispatch.call_args
+    assert args == (
+        ["a@nhs.net", "b@nhs.net"],
+        "Subject",
+        "Body",
+        "url",
+        "key",
+        "y1pr38jpv",
+    )
+    assert kwargs["email_id"] == "y1pr38jpv.json"
+    assert kwargs["sent_keys"] == {"1"}
+    kwargs["on_sent"](SendResult("a@nhs.net", "2", sent=True))
+    mock_record_email_sent.assert_called_once_with("y1pr38jpv", "2")
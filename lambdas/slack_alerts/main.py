@@ -3,7 +3,8 @@
 from os import getenv
 
 from aws_lambda_powertools import Logger
-from requests import post
+
+from lambdas.utils.connection_pool import get_session
 
 logger = Logger()
 
@@ -28,7 +29,8 @@ def send_slack_message(message: dict) -> None:
     Args:
         message (dict): Message to send to Slack
     """
-    response = post(getenv("SLACK_WEBHOOK_URL"), json=message)
+    webhook_url = getenv("SLACK_WEBHOOK_URL")
+    response = get_session(webhook_url).post(webhook_url, json=message)
     logger.info(
         "Sent to Slack",
         status_code=response.status_code,
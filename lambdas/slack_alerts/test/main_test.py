@@ -21,10 +21,11 @@ def test_slack_alerts(mock_send_slack_message: MagicMock) -> None:
     mock_send_slack_message.assert_called_once_with(event)
 
 
-@patch("lambdas.slack_alerts.main.post")
-def test_send_slack_message(mock_post: MagicMock) -> None:
+@patch("lambdas.slack_alerts.main.get_session")
+def test_send_slack_message(mock_get_session: MagicMock) -> None:
     """Test the send_slack_message function."""
     # Arrange
+    mock_post = mock_get_session.return_value.post
     mock_post.return_value = MagicMock(status_code=200, reason="OK", text="OK")
     message = {"message": "test"}
     environ["SLACK_WEBHOOK_URL"] = webhook = "https://hooks.slack.com/services/test"
@@ -43,12 +44,13 @@ def test_send_slack_message(mock_post: MagicMock) -> None:
         (500, "TEST"),
     ],
 )
-@patch("lambdas.slack_alerts.main.post")
+@patch("lambdas.slack_alerts.main.get_session")
 def test_send_slack_message__api_error(
-    mock_post: MagicMock, status_code: int, reason: str
+    mock_get_session: MagicMock, status_code: int, reason: str
 ) -> None:
     """Test the send_slack_message function."""
     # Arrange
+    mock_post = mock_get_session.return_value.post
     mock_post.return_value = MagicMock(status_code=status_code, reason=reason)
     message = {"message": "test"}
     environ["SLACK_WEBHOOK_URL"] = webhook = "https://hooks.slack.com/services/test"
@@ -1,124 +1,229 @@
-import ast
-import base64
-import copy
 import json
 import os
 import sys
 
-from google.protobuf.internal.decoder import _DecodeVarint
-from google.protobuf.json_format import MessageToDict
 from opentelemetry.proto.collector.metrics.v1.metrics_service_pb2 import (
     ExportMetricsServiceRequest,
 )
 
+from lambdas.utils.firehose.records import OK, BatchMetrics, transform_batch
+
+DEFAULT_SOURCETYPE = "aws:cloudwatch"
+METRIC_NAME_PREFIX = "amazonaws.com/"
+# Splunk statistic for each value of a JSON metric
+STATISTICS = {"count": "SampleCount", "sum": "Sum", "max": "Maximum", "min": "Minimum"}
+# OpenTelemetry 0.7 data points hold their dimensions in field 1, the labels, which
+# OpenTelemetry 1.0 replaced with the attributes
+LABELS_FIELD_NUMBER = 1
+LENGTH_DELIMITED = 2
+
 
 # https://github.com/splunk/splunk-aws-cloudwatch-streaming-metrics-processor/blob/main/SplunkAWSCloudWatchStreamingMetricsProcessor/lambda_function.py
 def lambda_handler(event, context):
-    metrics = []
-    for record in event["records"]:
-        record_data = record["data"]
-        base64_decoded = base64.b64decode(record_data)
-        if os.environ["METRICS_OUTPUT_FORMAT"].lower() == "otel":
-            metric_data = read_delimited(base64_decoded, ExportMetricsServiceRequest)
-            metric_encoded_bytes = base64.b64encode(
-                bytearray(
-                    # please note that in future AWS may send multiple ResourceMetrics in one request
-                    json.dumps(metric_data[0]),
-                    "utf-8",
-                )
-            )
-        elif os.environ["METRICS_OUTPUT_FORMAT"].lower() == "json":
-            decoded_metrics = base64_decoded.decode("utf-8").splitlines()
-            transformed_metric_data = transform_json_metric_event(decoded_metrics)
-            metric_encoded_bytes = base64.b64encode(
-                bytearray(
-                    # please note that in future AWS may send multiple ResourceMetrics in one request
-                    json.dumps(transformed_metric_data),
-                    "utf-8",
-                )
-            )
-        else:
-            print("Invalid METRICS_OUTPUT_FORMAT value. Set to either json or otel")
-            sys.exit(1)
+    output_format = os.environ["METRICS_OUTPUT_FORMAT"].lower()
+    if output_format == "otel":
+        transform = transform_otel_record
+    elif output_format == "json":
+        transform = transform_json_record
+    else:
+        print("Invalid METRICS_OUTPUT_FORMAT value. Set to either json or otel")
+        sys.exit(1)
+
+    # Records are transformed in parallel when FIREHOSE_TRANSFORM_MODE is parallel
+    records = transform_batch(event["records"], transform, BatchMetrics())
+    return {"records": records}
 
-        metric_encoded_string = str(metric_encoded_bytes, "utf-8")
-        event_map = copy.deepcopy(record)
-        event_map["data"] = metric_encoded_string
-        event_map["result"] = "Ok"
-        metrics.append(event_map)
 
-    return {"records": metrics}
+def get_sourcetype():
+    """Returns the Splunk sourcetype of metric events"""
+    # Modify sourcetype in token for aws:cloudwatch:metric if required
+    return os.environ.get("SPLUNK_CLOUDWATCH_SOURCETYPE") or DEFAULT_SOURCETYPE
 
 
-def transform_json_metric_event(metrics):
+def transform_otel_record(data):
+    """Transforms the data of a record sent in the OpenTelemetry format
+
+    A record holds one or more size delimited requests, each of which may hold
+    several ResourceMetrics. Every data point of every request is returned.
+    """
+    sourcetype = get_sourcetype()
+    events = [
+        event
+        for request in read_delimited(data, ExportMetricsServiceRequest)
+        for event in transform_otel_metric_event(request, sourcetype)
+    ]
+    return OK, json.dumps(events).encode("utf-8")
+
+
+def transform_json_record(data):
+    """Transforms the data of a record sent in the JSON format"""
+    transformed_metric_data = transform_json_metric_event(
+        data.splitlines(), get_sourcetype()
+    )
+    return OK, json.dumps(transformed_metric_data).encode("utf-8")
+
+
+def transform_json_metric_event(metrics, sourcetype=None):
     """
     Convert streaming metrics event format similar to output AWS TA metric event format
     (The conversion helps the AWS app to interpret metrics and help populating existing dashboards)
     """
+    sourcetype = sourcetype or get_sourcetype()
     events = []
     for metric_string in metrics:
-        metric = ast.literal_eval(metric_string)
-        metric_event = copy.deepcopy(metric)
-        # reformat metric_dimensions
-        extracted_dims = {
-            "dims": ",".join(
-                [
-                    "{}=[{}]".format(key, value)
-                    for key, value in metric_event["dimensions"].items()
-                ]
-            )
-        }
-        metric_event["metric_dimensions"] = extracted_dims["dims"]
-        metric_event.pop("dimensions")
-        # reformat metric values
-        for k, v in metric_event["value"].items():
-            if k == "count":
-                metric_event["SampleCount"] = v
-            if k == "sum":
-                metric_event["Sum"] = v
-            if k == "max":
-                metric_event["Maximum"] = v
-            if k == "min":
-                metric_event["Minimum"] = v
-
+        if not metric_string.strip():
+            continue
+        # Each metric is parsed into a new dict, which becomes the Splunk event
+        metric_event = json.loads(metric_string)
+        dimensions = metric_event.pop("dimensions")
+        values = metric_event.pop("value")
+        metric_event["metric_dimensions"] = ",".join(
+            [f"{key}=[{value}]" for key, value in dimensions.items()]
+        )
+        for key, value in values.items():
+            if key in STATISTICS:
+                metric_event[STATISTICS[key]] = value
         metric_event["Average"] = metric_event["Sum"] / metric_event["SampleCount"]
-        metric_event.pop("value")
-        # build splunk event
-        # Modify sourcetype in token for aws:cloudwatch:metric if required
-        if os.environ["SPLUNK_CLOUDWATCH_SOURCETYPE"]:
-            sourcetype = os.environ["SPLUNK_CLOUDWATCH_SOURCETYPE"]
-        else:
-            sourcetype = "aws:cloudwatch"
-
-        event = {
-            "event": metric_event,
-            "source": "{}:{}".format(metric_event["region"], metric_event["namespace"]),
-            "sourcetype": sourcetype,
-            "time": metric_event["timestamp"],
-        }
-        events.append(event)
+
+        events.append(
+            {
+                "event": metric_event,
+                "source": f"{metric_event['region']}:{metric_event['namespace']}",
+                "sourcetype": sourcetype,
+                "time": metric_event["timestamp"],
+            }
+        )
 
     return events
 
 
-def convert_protobuf_dict(metric):
-    return MessageToDict(metric)
+def transform_otel_metric_event(request, sourcetype):
+    """
+    Convert the summary data points of an OpenTelemetry request into Splunk events in
+    the same format as the JSON metrics, reading the protobuf messages directly
+    """
+    for resource_metrics in request.resource_metrics:
+        resource = get_attributes(resource_metrics.resource.attributes)
+        stream_name = resource.get("aws.exporter.arn", "").rpartition("/")[2]
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                # e.g. amazonaws.com/AWS/EC2/CPUUtilization
+                default_namespace, _, default_metric_name = metric.name[
+                    len(METRIC_NAME_PREFIX) :
+                ].rpartition("/")
+                for data_point in metric.summary.data_points:
+                    dimensions = get_dimensions(data_point)
+                    namespace = dimensions.pop("Namespace", default_namespace)
+                    metric_name = dimensions.pop("MetricName", default_metric_name)
+                    timestamp = data_point.time_unix_nano // 1_000_000
+                    metric_event = {
+                        "metric_stream_name": stream_name,
+                        "account_id": resource.get("cloud.account.id", ""),
+                        "region": resource.get("cloud.region", ""),
+                        "namespace": namespace,
+                        "metric_name": metric_name,
+                        "timestamp": timestamp,
+                        "unit": metric.unit,
+                        "metric_dimensions": ",".join(
+                            [f"{key}=[{value}]" for key, value in dimensions.items()]
+                        ),
+                        "SampleCount": data_point.count,
+                        "Sum": data_point.sum,
+                    }
+                    for quantile in data_point.quantile_values:
+                        if quantile.quantile == 1.0:
+                            metric_event["Maximum"] = quantile.value
+                        elif quantile.quantile == 0.0:
+                            metric_event["Minimum"] = quantile.value
+                    metric_event["Average"] = (
+                        data_point.sum / data_point.count if data_point.count else 0.0
+                    )
+                    yield {
+                        "event": metric_event,
+                        "source": f"{metric_event['region']}:{namespace}",
+                        "sourcetype": sourcetype,
+                        "time": timestamp,
+                    }
+
+
+def get_attributes(attributes):
+    """Returns the string values of OpenTelemetry attributes by key"""
+    return {attribute.key: attribute.value.string_value for attribute in attributes}
+
+
+def get_dimensions(data_point):
+    """Returns the dimensions of a data point, as OpenTelemetry 1.0 attributes or as
+    OpenTelemetry 0.7 labels, which are unknown fields to the 1.0 messages"""
+    dimensions = get_attributes(data_point.attributes)
+    for field in data_point.UnknownFields():
+        if (
+            field.field_number == LABELS_FIELD_NUMBER
+            and field.wire_type == LENGTH_DELIMITED
+        ):
+            label = read_string_fields(field.data)
+            dimensions[label.get(1, "")] = label.get(2, "")
+    return dimensions
+
+
+def read_string_fields(data):
+    """Reads a message of string fields, such as an OpenTelemetry 0.7 StringKeyValue,
+    into a dict of the fields by field number"""
+    view = memoryview(data)
+    fields = {}
+    position = 0
+    while position < len(view):
+        tag, position = decode_varint(view, position)
+        if tag & 0x7 != LENGTH_DELIMITED:
+            raise ValueError(f"Field {tag >> 3} is not a string")
+        length, position = decode_varint(view, position)
+        fields[tag >> 3] = str(view[position : position + length], "utf-8")
+        position += length
+    return fields
+
+
+def decode_varint(view, position):
+    """Decodes a protobuf varint without copying the data
+
+    Args:
+        view (memoryview): The data
+        position (int): The position of the varint
+
+    Returns:
+        tuple[int, int]: The value and the position after the varint
+
+    Raises:
+        ValueError: The varint is truncated or longer than 64 bits
+    """
+    result = shift = 0
+    while position < len(view) and shift < 64:
+        byte = view[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+    raise ValueError("Truncated or invalid varint")
 
 
 def read_delimited(data, metric_type):
-    result = []
-    start = 0
-    while len(data) > 0 and start < len(data):
-        (msg_length, hdr_length) = _DecodeVarint(data[start:], 0)
-        # read message as a byte string
-        proto_str = data[start + hdr_length : start + msg_length + hdr_length]
-        # EOF
-        if len(proto_str) == 0:
-            return
-        start = start + msg_length + hdr_length
+    """Reads size delimited protobuf messages from a memoryview of the data
+
+    Each message is parsed from a view of its own bytes, so the data is not copied.
+
+    Yields:
+        The message of each size delimited block, in order
+    """
+    view = memoryview(data)
+    position = 0
+    while position < len(view):
+        msg_length, position = decode_varint(view, position)
+        end = position + msg_length
+        if end > len(view):
+            raise ValueError(
+                f"Message of {msg_length} bytes is truncated at {len(view)} bytes"
+            )
         # de-serialize the bytes into a protobuf message
         msg = metric_type()
-        msg.ParseFromString(proto_str)
-        result.append(convert_protobuf_dict(msg))
-
-    return result
+        msg.ParseFromString(view[position:end])
+        position = end
+        yield msg
@@ -1,6 +1,19 @@
+import json
 import os
+from base64 import b64decode
 
-from ..main import lambda_handler
+import pytest
+from opentelemetry.proto.collector.metrics.v1.metrics_service_pb2 import (
+    ExportMetricsServiceRequest,
+)
+
+from ..main import (
+    decode_varint,
+    lambda_handler,
+    read_delimited,
+    transform_json_record,
+    transform_otel_record,
+)
 
 
 def test_lambda_handler_json_format():
@@ -21,6 +34,27 @@ def test_lambda_handler_json_format():
 
     ret = lambda_handler(event, "")
     assert ret["records"][0]["result"] == "Ok"
+    events = json.loads(b64decode(ret["records"][0]["data"]))
+    assert events[0] == {
+        "event": {
+            "metric_stream_name": "test-cw-metric-stream",
+            "account_id": "112543817624",
+            "region": "us-west-2",
+            "namespace": "AWS/EC2",
+            "metric_name": "StatusCheckFailed",
+            "timestamp": 1617727740000,
+            "unit": "Count",
+            "metric_dimensions": "InstanceId=[i-0e436f6848d37dd42]",
+            "SampleCount": 1.0,
+            "Sum": 0.0,
+            "Maximum": 0.0,
+            "Minimum": 0.0,
+            "Average": 0.0,
+        },
+        "source": "us-west-2:AWS/EC2",
+        "sourcetype": "aws:cloudwatch",
+        "time": 1617727740000,
+    }
 
 
 def test_lambda_handler_otel_format():
@@ -42,3 +76,175 @@ def test_lambda_handler_otel_format():
 
     ret = lambda_handler(event, "")
     assert ret["records"][0]["result"] == "Ok"
+    events = json.loads(b64decode(ret["records"][0]["data"]))
+    assert len(events) == 40
+    assert events[0] == {
+        "event": {
+            "metric_stream_name": "test-cw-metric-stream",
+            "account_id": "112543817624",
+            "region": "us-west-2",
+            "namespace": "AWS/EC2",
+            "metric_name": "EBSWriteBytes",
+            "timestamp": 1617726060000,
+            "unit": "By",
+            "metric_dimensions": "InstanceId=[i-079695e2db8f74d10]",
+            "SampleCount": 2,
+            "Sum": 11331072.0,
+            "Minimum": 5181952.0,
+            "Maximum": 6149120.0,
+            "Average": 5665536.0,
+        },
+        "source": "us-west-2:AWS/EC2",
+        "sourcetype": "aws:cloudwatch:metric",
+        "time": 1617726060000,
+    }
+
+
+def create_request(region: str, *values: float) -> ExportMetricsServiceRequest:
+    """Create an OpenTelemetry 1.0 request with a data point for each value"""
+    request = ExportMetricsServiceRequest()
+    resource_metrics = request.resource_metrics.add()
+    for key, value in (
+        ("cloud.account.id", "123456789012"),
+        ("cloud.region", region),
+        ("aws.exporter.arn", f"arn:aws:cloudwatch:{region}:1:metric-stream/stream"),
+    ):
+        attribute = resource_metrics.resource.attributes.add(key=key)
+        attribute.value.string_value = value
+    metric = resource_metrics.scope_metrics.add().metrics.add(
+        name="amazonaws.com/AWS/Lambda/Duration", unit="Milliseconds"
+    )
+    for value in values:
+        data_point = metric.summary.data_points.add(
+            time_unix_nano=1_700_000_000_123_000_000, count=2, sum=value * 2
+        )
+        data_point.attributes.add(key="FunctionName").value.string_value = "proxy"
+        data_point.quantile_values.add(quantile=0.0, value=value - 1)
+        data_point.quantile_values.add(quantile=1.0, value=value + 1)
+    return request
+
+
+def delimited(*requests: ExportMetricsServiceRequest) -> bytes:
+    """Serialise requests as size delimited messages"""
+    data = b""
+    for request in requests:
+        message = request.SerializeToString()
+        data += encode_varint(len(message)) + message
+    return data
+
+
+def encode_varint(value: int) -> bytes:
+    """Encode a protobuf varint"""
+    encoded = bytearray()
+    while value >= 0x80:
+        encoded.append(value & 0x7F | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 2**32, 2**63])
+def test_decode_varint(value: int):
+    """Test that varints are decoded from any position of a memoryview"""
+    # Arrange
+    view = memoryview(b"\xff" + encode_varint(value) + b"\x01")
+    # Act
+    result = decode_varint(view, 1)
+    # Assert
+    assert result == (value, len(view) - 1)
+
+
+@pytest.mark.parametrize("data", [b"", b"\x80", b"\xff" * 10])
+def test_decode_varint_invalid(data: bytes):
+    """Test that truncated and overlong varints raise an error"""
+    # Act & Assert
+    with pytest.raises(ValueError):
+        decode_varint(memoryview(data), 0)
+
+
+def test_read_delimited():
+    """Test that every size delimited message is read, in order"""
+    # Arrange
+    data = delimited(create_request("eu-west-2", 1), create_request("us-east-1", 2))
+    # Act
+    result = list(read_delimited(data, ExportMetricsServiceRequest))
+    # Assert
+    assert result == [create_request("eu-west-2", 1), create_request("us-east-1", 2)]
+
+
+def test_read_delimited_truncated():
+    """Test that a truncated message raises an error"""
+    # Arrange
+    data = delimited(create_request("eu-west-2", 1))[:-1]
+    # Act & Assert
+    with pytest.raises(ValueError):
+        list(read_delimited(data, ExportMetricsServiceRequest))
+
+
+def test_transform_otel_record_reads_every_resource_metrics(monkeypatch):
+    """Test that the data points of every request and ResourceMetrics are returned"""
+    # Arrange
+    monkeypatch.setenv("SPLUNK_CLOUDWATCH_SOURCETYPE", "aws:cloudwatch:metric")
+    first = create_request("eu-west-2", 10, 20)
+    first.resource_metrics.extend(create_request("eu-west-1", 30).resource_metrics)
+    data = delimited(first, create_request("us-east-1", 40))
+    # Act
+    result, transformed = transform_otel_record(data)
+    # Assert
+    events = json.loads(transformed)
+    assert result == "Ok"
+    assert [(event["source"], event["event"]["Sum"]) for event in events] == [
+        ("eu-west-2:AWS/Lambda", 20.0),
+        ("eu-west-2:AWS/Lambda", 40.0),
+        ("eu-west-1:AWS/Lambda", 60.0),
+        ("us-east-1:AWS/Lambda", 80.0),
+    ]
+    assert events[0] == {
+        "event": {
+            "metric_stream_name": "stream",
+            "account_id": "123456789012",
+            "region": "eu-west-2",
+            "namespace": "AWS/Lambda",
+            "metric_name": "Duration",
+            "timestamp": 1700000000123,
+            "unit": "Milliseconds",
+            "metric_dimensions": "FunctionName=[proxy]",
+            "SampleCount": 2,
+            "Sum": 20.0,
+            "Minimum": 9.0,
+            "Maximum": 11.0,
+            "Average": 10.0,
+        },
+        "source": "eu-west-2:AWS/Lambda",
+        "sourcetype": "aws:cloudwatch:metric",
+        "time": 1700000000123,
+    }
+
+
+def test_transform_json_record_skips_blank_lines(monkeypatch):
+    """Test that JSON metrics are parsed line by line, ignoring blank lines"""
+    # Arrange
+    monkeypatch.delenv("SPLUNK_CLOUDWATCH_SOURCETYPE", raising=False)
+    metric = {
+        "metric_stream_name": "stream",
+        "account_id": "123456789012",
+        "region": "eu-west-2",
+        "namespace": "AWS/Lambda",
+        "metric_name": "Errors",
+        "dimensions": {"FunctionName": "proxy", "Resource": "proxy"},
+        "timestamp": 1700000000000,
+        "value": {"count": 4.0, "sum": 2.0, "max": 1.0, "min": 0.0},
+        "unit": "Count",
+    }
+    data = f"{json.dumps(metric)}\n\n{json.dumps(metric)}\n".encode()
+    # Act
+    result, transformed = transform_json_record(data)
+    # Assert
+    events = json.loads(transformed)
+    assert result == "Ok"
+    assert len(events) == 2
+    assert events[0]["event"]["metric_dimensions"] == (
+        "FunctionName=[proxy],Resource=[proxy]"
+    )
+    assert events[0]["event"]["Average"] == 0.5
+    assert events[0]["sourcetype"] == "aws:cloudwatch"
@@ -0,0 +1,177 @@
+"""Shared boto3 clients and resources.
+
+Creating a boto3 client loads the service model and endpoint data, which takes tens
+of milliseconds. A client is kept at module level for each service, region and
+configuration, so that a warm Lambda container creates it once and reuses it, along
+with its open connections, between invocations.
+
+Clients are thread safe once created, but creating them through a session is not,
+so they are created under a lock. Resources are not thread safe, so a resource is
+only shared between calls made on the same thread.
+"""
+
+from os import getenv
+from threading import Lock, local
+from typing import Optional
+
+from boto3.session import Session
+from botocore.config import Config
+
+MAX_POOL_CONNECTIONS = int(getenv("AWS_MAX_POOL_CONNECTIONS", "10"))
+RETRY_MODE = getenv("AWS_RETRY_MODE", "adaptive")
+MAX_ATTEMPTS = int(getenv("AWS_MAX_ATTEMPTS", "3"))
+
+
+class AWSClientRegistry:
+    """Creates and keeps one boto3 client per service, region and configuration"""
+
+    def __init__(
+        self,
+        max_pool_connections: int = MAX_POOL_CONNECTIONS,
+        retry_mode: str = RETRY_MODE,
+        max_attempts: int = MAX_ATTEMPTS,
+    ) -> None:
+        """Initialise the registry
+
+        Args:
+            max_pool_connections (int): Maximum number of connections kept open per client
+            retry_mode (str): The botocore retry mode, e.g. 'adaptive' or 'standard'
+            max_attempts (int): Maximum number of attempts made for a request
+        """
+        self.max_pool_connections = max_pool_connections
+        self.retry_mode = retry_mode
+        self.max_attempts = max_attempts
+        self._session: Optional[Session] = None
+        self._clients: dict[tuple, object] = {}
+        self._resources = local()
+        self._lock = Lock()
+
+    @staticmethod
+    def get_key(service_name: str, region_name: Optional[str], options: dict) -> tuple:
+        """Returns the key the client is kept under
+
+        Args:
+            service_name (str): The AWS service, e.g. 'dynamodb'
+            region_name (str): The AWS region, or None for the default region
+            options (dict): Additional botocore configuration options
+
+        Returns:
+            tuple: The service, region and configuration options
+        """
+        return service_name, region_name, repr(sorted(options.items()))
+
+    def get_config(self, options: dict) -> Config:
+        """Returns the botocore configuration for a client
+
+        Args:
+            options (dict): Additional botocore configuration options,
+                which take precedence over the registry defaults
+
+        Returns:
+            Config: Configuration with the pool size and retry mode applied
+        """
+        config = Config(
+            max_pool_connections=self.max_pool_connections,
+            retries={
+                "mode": self.retry_mode,
+                "total_max_attempts": self.max_attempts,
+            },
+        )
+        return config.merge(Config(**options)) if options else config
+
+    def get_client(
+        self, service_name: str, region_name: Optional[str] = None, **options
+    ):
+        """Returns the shared client for the service, creating it if required
+
+        Args:
+            service_name (str): The AWS service, e.g. 'dynamodb'
+            region_name (str, optional): The AWS region, defaults to the configured region
+            **options: Additional botocore configuration options, e.g. read_timeout
+
+        Returns:
+            BaseClient: The boto3 client
+        """
+        key = self.get_key(service_name, region_name, options)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self.__get_session().client(
+                        service_name,
+                        region_name=region_name,
+                        config=self.get_config(options),
+                    )
+                    self._clients[key] = client
+        return client
+
+    def get_resource(
+        self, service_name: str, region_name: Optional[str] = None, **options
+    ):
+        """Returns the resource for the service on this thread, creating it if required
+
+        Args:
+            service_name (str): The AWS service, e.g. 'dynamodb'
+            region_name (str, optional): The AWS region, defaults to the configured region
+            **options: Additional botocore configuration options, e.g. read_timeout
+
+        Returns:
+            ServiceResource: The boto3 resource
+        """
+        key = self.get_key(service_name, region_name, options)
+        resources = self._resources.__dict__.setdefault("resources", {})
+        resource = resources.get(key)
+        if resource is None:
+            with self._lock:
+                resource = self.__get_session().resource(
+                    service_name,
+                    region_name=region_name,
+                    config=self.get_config(options),
+                )
+            resources[key] = resource
+        return resource
+
+    def clear(self) -> None:
+        """Discards the clients and resources, which are created again when next used"""
+        with self._lock:
+            self._clients.clear()
+            self._resources = local()
+            self._session = None
+
+    def __get_session(self) -> Session:
+        """Returns the session clients are created from, must be called under the lock"""
+        if self._session is None:
+            self._session = Session()
+        return self._session
+
+
+CLIENT_REGISTRY = AWSClientRegistry()
+
+
+def get_client(service_name: str, region_name: Optional[str] = None, **options):
+    """Returns the shared client for the service
+
+    Args:
+        service_name (str): The AWS service, e.g. 'dynamodb'
+        region_name (str, optional): The AWS region, defaults to the configured region
+        **options: Additional botocore configuration options, e.g. read_timeout
+
+    Returns:
+        BaseClient: The boto3 client
+    """
+    return CLIENT_REGISTRY.get_client(service_name, region_name, **options)
+
+
+def get_resource(service_name: str, region_name: Optional[str] = None, **options):
+    """Returns the resource for the service, shared on this thread
+
+    Args:
+        service_name (str): The AWS service, e.g. 'dynamodb'
+        region_name (str, optional): The AWS region, defaults to the configured region
+        **options: Additional botocore configuration options, e.g. read_timeout
+
+    Returns:
+        ServiceResource: The boto3 resource
+    """
+    return CLIENT_REGISTRY.get_resource(service_name, region_name, **options)
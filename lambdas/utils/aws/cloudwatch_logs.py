@@ -0,0 +1,163 @@
+"""Writes events to a CloudWatch Logs stream in batches.
+
+Events are buffered and sent with as few PutLogEvents calls as the limits of the
+API allow: a call holds up to 10,000 events and 1 MB, where each event counts the
+UTF-8 size of its message plus 26 bytes, and the events of a call must be in
+chronological order and span no more than 24 hours. Buffered events are sorted by
+timestamp when they are sent. Throttled calls are retried with a backoff, and a call
+rejected for its sequence token is retried with the token CloudWatch expects.
+"""
+
+from os import getenv
+from time import sleep, time
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from lambdas.utils.aws.clients import get_client
+from lambdas.utils.logging.logger import write_log
+
+# PutLogEvents limits
+MAX_BATCH_EVENTS = 10_000
+MAX_BATCH_BYTES = 1_048_576
+MAX_BATCH_SPAN_MS = 24 * 60 * 60 * 1000
+EVENT_OVERHEAD_BYTES = 26
+MAX_EVENT_BYTES = 256 * 1024
+
+MAX_LOG_RETRIES = int(getenv("LOG_BATCH_MAX_RETRIES", "3"))
+LOG_RETRY_BACKOFF = float(getenv("LOG_BATCH_RETRY_BACKOFF", "0.2"))
+
+RETRYABLE_ERRORS = {
+    "InvalidSequenceTokenException",
+    "ServiceUnavailableException",
+    "ThrottlingException",
+}
+
+
+class CloudWatchLogsBatchWriter:
+    """Buffers log events and sends them to a log stream in batches"""
+
+    def __init__(
+        self,
+        log_group: str,
+        log_stream: str,
+        logs_client=None,
+        max_events: int = MAX_BATCH_EVENTS,
+        max_bytes: int = MAX_BATCH_BYTES,
+        max_retries: int = MAX_LOG_RETRIES,
+        retry_backoff: float = LOG_RETRY_BACKOFF,
+    ) -> None:
+        self.log_group = log_group
+        self.log_stream = log_stream
+        self.logs_client = logs_client or get_client("logs")
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._events: list[dict] = []
+        self._sequence_token: Optional[str] = None
+
+    @staticmethod
+    def get_event_size(event: dict) -> int:
+        """Returns the size of a log event, as counted by PutLogEvents"""
+        return len(event["message"].encode("utf-8")) + EVENT_OVERHEAD_BYTES
+
+    def add(self, message: str, timestamp: Optional[int] = None) -> None:
+        """Buffers a log event
+
+        Args:
+            message (str): The message to log
+            timestamp (Optional[int]): Milliseconds since the epoch, defaults to now
+
+        Raises:
+            ValueError: The message is larger than a log event can be
+        """
+        event = {
+            "timestamp": round(time() * 1000) if timestamp is None else timestamp,
+            "message": message,
+        }
+        if self.get_event_size(event) > MAX_EVENT_BYTES:
+            raise ValueError(
+                f"Log event of {self.get_event_size(event)} bytes is larger than "
+                f"{MAX_EVENT_BYTES} bytes"
+            )
+        self._events.append(event)
+
+    def pending(self) -> int:
+        """Returns the number of buffered events"""
+        return len(self._events)
+
+    def flush(self) -> int:
+        """Sends the buffered events
+
+        Returns:
+            int: The number of PutLogEvents calls made
+        """
+        events = sorted(self._events, key=lambda event: event["timestamp"])
+        self._events = []
+        calls = 0
+        for batch in self.__batches(events):
+            self.__send(batch)
+            calls += 1
+        return calls
+
+    def __batches(self, events: list[dict]):
+        """Splits events, in chronological order, into batches within the limits"""
+        batch, size = [], 0
+        for event in events:
+            event_size = self.get_event_size(event)
+            if batch and (
+                len(batch) >= self.max_events
+                or size + event_size > self.max_bytes
+                or event["timestamp"] - batch[0]["timestamp"] > MAX_BATCH_SPAN_MS
+            ):
+                yield batch
+                batch, size = [], 0
+            batch.append(event)
+            size += event_size
+        if batch:
+            yield batch
+
+    def __send(self, events: list[dict]) -> None:
+        """Sends a batch, retrying when it is throttled or out of sequence
+
+        Args:
+            events (list[dict]): Log events, within the batch limits
+
+        Raises:
+            ClientError: The batch could not be sent after retrying
+        """
+        for attempt in range(self.max_retries + 1):
+            request = {
+                "logGroupName": self.log_group,
+                "logStreamName": self.log_stream,
+                "logEvents": events,
+            }
+            if self._sequence_token:
+                request["sequenceToken"] = self._sequence_token
+            try:
+                response = self.logs_client.put_log_events(**request)
+            except ClientError as error:
+                code = error.response.get("Error", {}).get("Code")
+                if code == "DataAlreadyAcceptedException":
+                    return
+                if attempt == self.max_retries or code not in RETRYABLE_ERRORS:
+                    raise
+                if code == "InvalidSequenceTokenException":
+                    self._sequence_token = error.response.get("expectedSequenceToken")
+                else:
+                    sleep(self.retry_backoff * 2**attempt)
+                continue
+
+            self._sequence_token = response.get("nextSequenceToken")
+            rejected = response.get("rejectedLogEventsInfo")
+            if rejected:
+                write_log(
+                    "WARNING",
+                    {"info": f"CloudWatch Logs rejected log events: {rejected}"},
+                )
+            write_log(
+                "DEBUG",
+                {"info": f"Sent {len(events)} log events, attempt {attempt + 1}"},
+            )
+            return
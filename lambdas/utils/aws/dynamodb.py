@@ -5,10 +5,10 @@ from enum import Enum
 from os import getenv
 from time import time
 
-from boto3 import client
 from boto3.dynamodb.types import TypeSerializer
 from botocore.exceptions import DataNotFoundError
 
+from lambdas.utils.aws.clients import get_client
 from lambdas.utils.logging.logger import write_log
 
 TTL = int(getenv("DYNAMODB_TTL", "604800"))
@@ -38,7 +38,7 @@ def put_item(access_request: StoreAccessRequest) -> dict:
     Returns:
         dict: The response from DynamoDB
     """
-    dynamodb = client("dynamodb", region_name="eu-west-2")
+    dynamodb = get_client("dynamodb", region_name="eu-west-2")
     setattr(access_request, "TTL", __get_time_to_live())
     serialized_data = __serialize_data(access_request.__dict__)
     response = dynamodb.put_item(
@@ -60,7 +60,7 @@ def get_item(reference_code: str) -> dict:
     Returns:
         dict: The response from DynamoDB
     """
-    dynamodb = client("dynamodb", region_name="eu-west-2")
+    dynamodb = get_client("dynamodb", region_name="eu-west-2")
     key = {"ReferenceCode": {"S": str(reference_code)}}
     rec = dynamodb.get_item(TableName=getenv("DYNAMODB_TABLE_NAME"), Key=key)
 
@@ -77,7 +77,7 @@ def get_item(reference_code: str) -> dict:
 
 
 def update_status(reference_code: str, status: AccessRequestStates) -> None:
-    dynamodb = client("dynamodb", region_name="eu-west-2")
+    dynamodb = get_client("dynamodb", region_name="eu-west-2")
     key = {"ReferenceCode": {"S": str(reference_code)}}
 
     response = dynamodb.update_item(
@@ -92,6 +92,25 @@ def update_status(reference_code: str, status: AccessRequestStates) -> None:
     )
 
 
+def record_email_sent(reference_code: str, idempotency_key: str) -> None:
+    """Adds the idempotency key of a sent email to the access request
+
+    Args:
+        reference_code (str): The reference code of the access request
+        idempotency_key (str): Identifies the email and its recipient
+    """
+    dynamodb = get_client("dynamodb", region_name="eu-west-2")
+    dynamodb.update_item(
+        TableName=getenv("DYNAMODB_TABLE_NAME"),
+        Key={"ReferenceCode": {"S": str(reference_code)}},
+        UpdateExpression="add SentEmailKeys :keys",
+        ExpressionAttributeValues={":keys": {"SS": [idempotency_key]}},
+    )
+    write_log(
+        "INFO", {"info": f"Email {idempotency_key} recorded as sent: {reference_code}"}
+    )
+
+
 def __get_time_to_live() -> int:
     return int(time()) + TTL
 
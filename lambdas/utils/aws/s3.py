@@ -1,4 +1,228 @@
-from boto3 import client
+"""Reads and writes S3 objects.
+
+Objects read with `get_s3_file` are cached for the lifetime of a warm Lambda
+container, keyed on the bucket and key, along with their ETag. A cached object is
+revalidated with a conditional GetObject (If-None-Match), to which S3 replies 304 Not
+Modified without the object when it has not changed, so a repeated read costs no
+more than a HEAD request. Objects up to S3_CACHE_MAX_OBJECT_BYTES are held in memory,
+larger objects are streamed in chunks to a file in /tmp and read from there. Both
+tiers evict the least recently used objects to stay within their size limits.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import sha256
+from os import getenv
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from lambdas.utils.aws.clients import get_client
+from lambdas.utils.logging.logger import write_log
+
+# Maximum size of the objects held in memory, and of each of them
+S3_CACHE_MAX_BYTES = int(getenv("S3_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+S3_CACHE_MAX_OBJECT_BYTES = int(getenv("S3_CACHE_MAX_OBJECT_BYTES", str(1024 * 1024)))
+# Directory and maximum size of the larger objects, an empty directory disables it
+S3_CACHE_DIR = getenv("S3_CACHE_DIR", "/tmp/s3_cache")
+S3_CACHE_MAX_DISK_BYTES = int(getenv("S3_CACHE_MAX_DISK_BYTES", str(256 * 1024**2)))
+CHUNK_BYTES = 64 * 1024
+
+
+@dataclass
+class CachedObject:
+    """The ETag and size of an S3 object, and its body or the file holding it."""
+
+    etag: str
+    size: int
+    body: Optional[bytes] = None
+    path: Optional[str] = None
+
+
+class S3ObjectCache:
+    """Caches S3 objects in memory and /tmp, revalidating them by ETag."""
+
+    def __init__(
+        self,
+        max_bytes: int = S3_CACHE_MAX_BYTES,
+        max_object_bytes: int = S3_CACHE_MAX_OBJECT_BYTES,
+        cache_dir: Optional[str] = S3_CACHE_DIR,
+        max_disk_bytes: int = S3_CACHE_MAX_DISK_BYTES,
+    ) -> None:
+        """Initialise the cache
+
+        Args:
+            max_bytes (int): Maximum size of the objects held in memory
+            max_object_bytes (int): Maximum size of an object held in memory
+            cache_dir (str, optional): Directory for larger objects, None disables it
+            max_disk_bytes (int): Maximum size of the objects held in cache_dir
+        """
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._objects: OrderedDict[str, CachedObject] = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.not_modified = 0
+        self.misses = 0
+
+    @staticmethod
+    def create_key(bucket: str, key: str) -> str:
+        """Creates the cache key for an object
+
+        Args:
+            bucket (str): The name of the bucket
+            key (str): The key of the object
+
+        Returns:
+            str: The cache key
+        """
+        return f"{bucket}/{key}"
+
+    def get(self, bucket: str, key: str, s3_client=None) -> bytes:
+        """Returns the body of an object, from the cache if it has not changed
+
+        Args:
+            bucket (str): The name of the bucket
+            key (str): The key of the object
+            s3_client (optional): The S3 boto3 client, defaults to the shared client
+
+        Returns:
+            bytes: The body of the object
+        """
+        s3_client = s3_client or get_client("s3")
+        cache_key = self.create_key(bucket, key)
+        with self._lock:
+            cached = self._objects.get(cache_key)
+
+        request = {"Bucket": bucket, "Key": key}
+        if cached is not None:
+            request["IfNoneMatch"] = cached.etag
+        try:
+            response = s3_client.get_object(**request)
+        except ClientError as error:
+            if cached is None or not self.is_not_modified(error):
+                raise
+            body = self.__read_cached(cache_key, cached)
+            if body is not None:
+                self.not_modified += 1
+                write_log("DEBUG", {"info": f"S3 object {cache_key} not modified"})
+                return body
+            # The cached file was removed, read the object again
+            response = s3_client.get_object(Bucket=bucket, Key=key)
+
+        self.misses += 1
+        return self.__read_and_store(cache_key, response)
+
+    @staticmethod
+    def is_not_modified(error: ClientError) -> bool:
+        """Returns whether GetObject replied 304 Not Modified"""
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        code = error.response.get("Error", {}).get("Code")
+        return status == 304 or code in ("304", "NotModified")
+
+    def clear(self) -> None:
+        """Removes every object from the cache and resets the counters"""
+        with self._lock:
+            while self._objects:
+                self.__remove(self._objects.popitem(last=False)[1])
+        self.not_modified = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns the cache counters
+
+        Returns:
+            dict: not modified and miss counts, the number of objects held and the
+                bytes held in memory and on disk
+        """
+        return {
+            "not_modified": self.not_modified,
+            "misses": self.misses,
+            "objects": len(self._objects),
+            "memory_bytes": self.memory_bytes,
+            "disk_bytes": self.disk_bytes,
+        }
+
+    def __read_cached(self, cache_key: str, cached: CachedObject) -> Optional[bytes]:
+        """Reads a cached object and marks it as the most recently used"""
+        if cached.body is not None:
+            body = cached.body
+        else:
+            try:
+                with open(cached.path, "rb") as file:
+                    body = file.read()
+            except OSError:
+                body = None
+        with self._lock:
+            if body is None:
+                if self._objects.get(cache_key) is cached:
+                    del self._objects[cache_key]
+                    self.__remove(cached)
+            elif cache_key in self._objects:
+                self._objects.move_to_end(cache_key)
+        return body
+
+    def __read_and_store(self, cache_key: str, response: dict) -> bytes:
+        """Reads the body of a GetObject response, caching it when it fits"""
+        etag = response.get("ETag")
+        size = response.get("ContentLength", 0)
+        if etag and size <= self.max_object_bytes:
+            body = response["Body"].read()
+            self.__store(cache_key, CachedObject(etag, len(body), body=body))
+            return body
+        if not etag or not self.cache_dir or size > self.max_disk_bytes:
+            return response["Body"].read()
+
+        # Stream large objects to disk rather than holding a second copy in memory
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, sha256(cache_key.encode()).hexdigest())
+        partial = f"{path}.{threading.get_ident()}.part"
+        with open(partial, "wb") as file:
+            for chunk in response["Body"].iter_chunks(CHUNK_BYTES):
+                file.write(chunk)
+        os.replace(partial, path)
+        self.__store(cache_key, CachedObject(etag, size, path=path))
+        with open(path, "rb") as file:
+            return file.read()
+
+    def __store(self, cache_key: str, cached: CachedObject) -> None:
+        """Adds an object, evicting the least recently used beyond the limits"""
+        with self._lock:
+            previous = self._objects.pop(cache_key, None)
+            if previous is not None and previous.path != cached.path:
+                self.__remove(previous)
+            elif previous is not None:
+                self.__count(previous, -1)
+            self._objects[cache_key] = cached
+            self.__count(cached, 1)
+            while self._objects and (
+                self.memory_bytes > self.max_bytes
+                or self.disk_bytes > self.max_disk_bytes
+            ):
+                self.__remove(self._objects.popitem(last=False)[1])
+
+    def __count(self, cached: CachedObject, sign: int) -> None:
+        if cached.body is not None:
+            self.memory_bytes += sign * cached.size
+        else:
+            self.disk_bytes += sign * cached.size
+
+    def __remove(self, cached: CachedObject) -> None:
+        """Releases an object removed from the cache, deleting its file"""
+        self.__count(cached, -1)
+        if cached.path is not None:
+            try:
+                os.remove(cached.path)
+            except OSError:
+                pass
+
+
+s3_cache = S3ObjectCache()
 
 
 def get_s3_file(bucket: str, file_name: str) -> str:
@@ -11,12 +235,10 @@ def get_s3_file(bucket: str, file_name: str) -> str:
     Returns:
         str: The contents of the file
     """
-    s3 = client("s3")
-    response = s3.get_object(Bucket=bucket, Key=file_name)
-    return response["Body"].read().decode("utf-8")
+    return s3_cache.get(bucket, file_name).decode("utf-8")
 
 
 def put_s3_file(bucket: str, file_name: str, body: str) -> str:
-    s3 = client("s3")
+    s3 = get_client("s3")
     response = s3.put_object(Bucket=bucket, Key=file_name, Body=body)
     print(f"Response {response}")
@@ -8,9 +8,9 @@ Raises:
 import json
 import os
 
-import boto3
 from botocore.exceptions import ClientError
 
+from lambdas.utils.aws.clients import get_client
 from lambdas.utils.logging.logger import write_log
 
 
@@ -61,10 +61,7 @@ class SecretManager:
 
         # Create a client to access the secrets manager service
         # Region name is retrieved from the environment store
-        session = boto3.session.Session()
-        client = session.client(
-            service_name="secretsmanager", region_name=self.store_region
-        )
+        client = get_client("secretsmanager", region_name=self.store_region)
 
         try:
             # Retrieve information from the specific store
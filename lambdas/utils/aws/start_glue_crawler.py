@@ -1,9 +1,9 @@
 import os
 
-import boto3
 from botocore.exceptions import ClientError
 from spine_aws_common import LambdaApplication
 
+from lambdas.utils.aws.clients import get_client
 from lambdas.utils.logging.logger import initialise_logger, write_log
 
 
@@ -31,4 +31,4 @@ class StartGlueCrawler(LambdaApplication):
             )
 
     def _create_glue_client(self, client_region="eu-west-2"):
-        return boto3.client("glue", client_region)
+        return get_client("glue", client_region)
@@ -0,0 +1,105 @@
+"""Unit tests for the shared boto3 clients"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pytest_mock import MockerFixture
+
+from lambdas.utils.aws import clients
+from lambdas.utils.aws.clients import AWSClientRegistry
+
+REGION = "eu-west-2"
+
+
+@pytest.fixture(name="registry")
+def setup_registry() -> AWSClientRegistry:
+    """Create and return a registry with known defaults"""
+    return AWSClientRegistry(
+        max_pool_connections=20, retry_mode="adaptive", max_attempts=4
+    )
+
+
+def test_client_is_created_once(registry: AWSClientRegistry) -> None:
+    """Test that repeated requests for a client return the same client"""
+    # Act
+    first = registry.get_client("dynamodb", region_name=REGION)
+    second = registry.get_client("dynamodb", region_name=REGION)
+    # Assert
+    assert first is second
+    assert first.meta.service_model.service_name == "dynamodb"
+
+
+def test_clients_are_kept_per_service_region_and_config(
+    registry: AWSClientRegistry,
+) -> None:
+    """Test that clients with a different key are not shared"""
+    # Act
+    dynamodb = registry.get_client("dynamodb", region_name=REGION)
+    other_region = registry.get_client("dynamodb", region_name="eu-west-1")
+    other_config = registry.get_client("dynamodb", region_name=REGION, read_timeout=5)
+    s3 = registry.get_client("s3", region_name=REGION)
+    # Assert
+    assert len({id(dynamodb), id(other_region), id(other_config), id(s3)}) == 4
+    assert other_region.meta.region_name == "eu-west-1"
+
+
+def test_client_config(registry: AWSClientRegistry) -> None:
+    """Test that the pool size and retry mode are applied, with options taking precedence"""
+    # Act
+    client = registry.get_client("dynamodb", region_name=REGION, read_timeout=5)
+    # Assert
+    config = client.meta.config
+    assert config.max_pool_connections == 20
+    assert config.retries == {"mode": "adaptive", "total_max_attempts": 4}
+    assert config.read_timeout == 5
+
+
+def test_concurrent_requests_create_one_client(registry: AWSClientRegistry) -> None:
+    """Test that a client is only created once when requested from many threads"""
+    # Act
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(lambda _: registry.get_client("s3", REGION), range(32))
+        )
+    # Assert
+    assert all(result is results[0] for result in results)
+
+
+def test_resources_are_kept_per_thread(registry: AWSClientRegistry) -> None:
+    """Test that a resource is reused on a thread but not shared between threads"""
+    # Act
+    first = registry.get_resource("dynamodb", region_name=REGION)
+    second = registry.get_resource("dynamodb", region_name=REGION)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_thread = executor.submit(
+            registry.get_resource, "dynamodb", REGION
+        ).result()
+    # Assert
+    assert first is second
+    assert other_thread is not first
+
+
+def test_clear(registry: AWSClientRegistry) -> None:
+    """Test that clients are created again after the registry is cleared"""
+    # Arrange
+    client = registry.get_client("s3", region_name=REGION)
+    resource = registry.get_resource("dynamodb", region_name=REGION)
+    # Act
+    registry.clear()
+    # Assert
+    assert registry.get_client("s3", region_name=REGION) is not client
+    assert registry.get_resource("dynamodb", region_name=REGION) is not resource
+
+
+def test_module_functions_use_the_shared_registry(mocker: MockerFixture) -> None:
+    """Test that get_client and get_resource use the module level registry"""
+    # Arrange
+    mock_registry = mocker.patch.object(clients, "CLIENT_REGISTRY")
+    # Act
+    client = clients.get_client("s3", REGION, read_timeout=5)
+    resource = clients.get_resource("dynamodb")
+    # Assert
+    assert client == mock_registry.get_client.return_value
+    assert resource == mock_registry.get_resource.return_value
+    mock_registry.get_client.assert_called_once_with("s3", REGION, read_timeout=5)
+    mock_registry.get_resource.assert_called_once_with("dynamodb", None)
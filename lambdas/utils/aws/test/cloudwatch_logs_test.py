@@ -0,0 +1,189 @@
+"""Unit tests for the CloudWatch Logs batch writer"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ClientError
+from pytest_mock import MockerFixture
+
+from lambdas.utils.aws.cloudwatch_logs import (
+    MAX_BATCH_SPAN_MS,
+    CloudWatchLogsBatchWriter,
+)
+
+FILE_PATH = "lambdas.utils.aws.cloudwatch_logs"
+
+
+@pytest.fixture(autouse=True)
+def mock_write_log(mocker: MockerFixture) -> MagicMock:
+    """Patch the logger, which is initialised by the lambda"""
+    return mocker.patch(f"{FILE_PATH}.write_log")
+
+
+@pytest.fixture(name="client")
+def setup_client() -> MagicMock:
+    """Create a CloudWatch Logs client where every call succeeds"""
+    client = MagicMock()
+    client.put_log_events.return_value = {}
+    return client
+
+
+def client_error(code: str, **response) -> ClientError:
+    """Create an error returned by PutLogEvents"""
+    return ClientError({"Error": {"Code": code}, **response}, "PutLogEvents")
+
+
+def sent_batches(client: MagicMock) -> list[list[dict]]:
+    """Returns the log events of each PutLogEvents call"""
+    return [call.kwargs["logEvents"] for call in client.put_log_events.call_args_list]
+
+
+def test_events_are_sent_in_one_call_in_chronological_order(client: MagicMock):
+    """Test that buffered events are sorted by timestamp and sent together"""
+    # Arrange
+    writer = CloudWatchLogsBatchWriter("group", "stream", client)
+    for timestamp in (3, 1, 2):
+        writer.add(f"event {timestamp}", timestamp)
+    # Act
+    calls = writer.flush()
+    # Assert
+    assert calls == 1
+    assert writer.pending() == 0
+    client.put_log_events.assert_called_once_with(
+        logGroupName="group",
+        logStreamName="stream",
+        logEvents=[
+            {"timestamp": 1, "message": "event 1"},
+            {"timestamp": 2, "message": "event 2"},
+            {"timestamp": 3, "message": "event 3"},
+        ],
+    )
+
+
+def test_events_default_to_the_current_time(client: MagicMock, mocker):
+    """Test that an event without a timestamp is logged at the current time"""
+    # Arrange
+    mocker.patch(f"{FILE_PATH}.time", return_value=1.5)
+    writer = CloudWatchLogsBatchWriter("group", "stream", client)
+    # Act
+    writer.add("event")
+    writer.flush()
+    # Assert
+    assert sent_batches(client) == [[{"timestamp": 1500, "message": "event"}]]
+
+
+@pytest.mark.parametrize(
+    "kwargs, timestamps, expected",
+    [
+        ({"max_events": 2}, [1, 2, 3, 4, 5], [2, 2, 1]),
+        ({"max_bytes": 2 * 33}, [1, 2, 3], [2, 1]),
+        ({}, [0, MAX_BATCH_SPAN_MS, MAX_BATCH_SPAN_MS + 1], [2, 1]),
+    ],
+)
+def test_batches_are_split_at_the_limits(
+    client: MagicMock, kwargs: dict, timestamps: list[int], expected: list[int]
+):
+    """Test that batches are split by event count, size and time span"""
+    # Arrange
+    writer = CloudWatchLogsBatchWriter("group", "stream", client, **kwargs)
+    for timestamp in timestamps:
+        writer.add("seven b", timestamp)
+    # Act
+    calls = writer.flush()
+    # Assert
+    assert calls == len(expected)
+    assert [len(batch) for batch in sent_batches(client)] == expected
+
+
+def test_events_larger_than_the_limit_are_rejected(client: MagicMock):
+    """Test that an event that cannot be logged raises an error"""
+    # Arrange
+    writer = CloudWatchLogsBatchWriter("group", "stream", client)
+    # Act & Assert
+    with pytest.raises(ValueError):
+        writer.add("x" * 256 * 1024, 1)
+    assert writer.pending() == 0
+
+
+def test_throttled_calls_are_retried(client: MagicMock, mocker):
+    """Test that a throttled call is retried with a backoff"""
+    # Arrange
+    sleep = mocker.patch(f"{FILE_PATH}.sleep")
+    client.put_log_events.side_effect = [
+        client_error("ThrottlingException"),
+        client_error("ServiceUnavailableException"),
+        {},
+    ]
+    writer = CloudWatchLogsBatchWriter("group", "stream", client, retry_backoff=0.1)
+    writer.add("event", 1)
+    # Act
+    writer.flush()
+    # Assert
+    assert client.put_log_events.call_count == 3
+    assert [call.args[0] for call in sleep.call_args_list] == [0.1, 0.2]
+
+
+def test_calls_failing_every_retry_raise_an_error(client: MagicMock, mocker):
+    """Test that the error is raised once the retries are used up"""
+    # Arrange
+    mocker.patch(f"{FILE_PATH}.sleep")
+    client.put_log_events.side_effect = client_error("ThrottlingException")
+    writer = CloudWatchLogsBatchWriter("group", "stream", client, max_retries=2)
+    writer.add("event", 1)
+    # Act & Assert
+    with pytest.raises(ClientError):
+        writer.flush()
+    assert client.put_log_events.call_count == 3
+
+
+def test_other_errors_are_not_retried(client: MagicMock):
+    """Test that errors that will not succeed on retry are raised immediately"""
+    # Arrange
+    client.put_log_events.side_effect = client_error("ResourceNotFoundException")
+    writer = CloudWatchLogsBatchWriter("group", "stream", client)
+    writer.add("event", 1)
+    # Act & Assert
+    with pytest.raises(ClientError):
+        writer.flush()
+    client.put_log_events.assert_called_once()
+
+
+def test_sequence_tokens(client: MagicMock):
+    """Test that the expected sequence token is used after an out of sequence call"""
+    # Arrange
+    client.put_log_events.side_effect = [
+        client_error("InvalidSequenceTokenException", expectedSequenceToken="2"),
+        {"nextSequenceToken": "3"},
+        client_error("DataAlreadyAcceptedException"),
+    ]
+    writer = CloudWatchLogsBatchWriter("group", "stream", client)
+    # Act
+    writer.add("event", 1)
+    writer.flush()
+    writer.add("event", 2)
+    writer.flush()
+    # Assert
+    assert [
+        call.kwargs.get("sequenceToken")
+        for call in client.put_log_events.call_args_list
+    ] == [None, "2", "3"]
+
+
+def test_rejected_events_are_logged(client: MagicMock, mock_write_log: MagicMock):
+    """Test that events rejected by CloudWatch Logs are reported"""
+    # Arrange
+    client.put_log_events.return_value = {
+        "rejectedLogEventsInfo": {"tooOldLogEventEndIndex": 1}
+    }
+    writer = CloudWatchLogsBatchWriter("group", "stream", client)
+    writer.add("event", 1)
+    # Act
+    writer.flush()
+    # Assert
+    mock_write_log.assert_any_call(
+        "WARNING",
+        {
+            "info": "CloudWatch Logs rejected log events: "
+            "{'tooOldLogEventEndIndex': 1}"
+        },
+    )
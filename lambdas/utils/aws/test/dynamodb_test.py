@@ -10,6 +10,7 @@ from lambdas.utils.aws.dynamodb import (
     StoreAccessRequest,
     get_item,
     put_item,
+    record_email_sent,
     update_status,
 )
 
@@ -19,7 +20,7 @@ def test_put_item(mocker: MockerFixture) -> None:
     environ["DYNAMODB_TABLE_NAME"] = dynamodb_table_name = "DYNAMODB_TABLE_NAME"
     environ["DYNAMODB_TTL"] = "604800"
 
-    mock_client = mocker.patch("lambdas.utils.aws.dynamodb.client")
+    mock_client = mocker.patch("lambdas.utils.aws.dynamodb.get_client")
     mock_time = mocker.patch("lambdas.utils.aws.dynamodb.time")
     mock_time.return_value = 1234567890
 
@@ -61,7 +62,7 @@ def test_get_item(mocker: MockerFixture) -> None:
     rtn = {"Item": {"ReferenceCode": {"S": reference_code}}}
 
     environ["DYNAMODB_TABLE_NAME"] = dynamodb_table_name = "DYNAMODB_TABLE_NAME"
-    mock_client = mocker.patch("lambdas.utils.aws.dynamodb.client")
+    mock_client = mocker.patch("lambdas.utils.aws.dynamodb.get_client")
     mock_client.return_value.get_item.return_value = rtn
 
     # Act
@@ -80,7 +81,7 @@ def test_update_status(mocker: MockerFixture) -> None:
     # Arrange
     environ["DYNAMODB_TABLE_NAME"] = dynamodb_table_name = "DYNAMODB_TABLE_NAME"
 
-    mock_client = mocker.patch("lambdas.utils.aws.dynamodb.client")
+    mock_client = mocker.patch("lambdas.utils.aws.dynamodb.get_client")
 
     reference_code = "ABC123"
     key = {"ReferenceCode": {"S": str(reference_code)}}
@@ -100,3 +101,20 @@ def test_update_status(mocker: MockerFixture) -> None:
 
     # Cleanup
     del environ["DYNAMODB_TABLE_NAME"]
+
+
+def test_record_email_sent(mocker: MockerFixture) -> None:
+    # Arrange
+    environ["DYNAMODB_TABLE_NAME"] = dynamodb_table_name = "DYNAMODB_TABLE_NAME"
+    mock_client = mocker.patch("lambdas.utils.aws.dynamodb.get_client")
+    # Act
+    record_email_sent("ABC123", "key")
+    # Assert
+    mock_client.return_value.update_item.assert_called_once_with(
+        TableName=dynamodb_table_name,
+        Key={"ReferenceCode": {"S": "ABC123"}},
+        UpdateExpression="add SentEmailKeys :keys",
+        ExpressionAttributeValues={":keys": {"SS": ["key"]}},
+    )
+    # Cleanup
+    del environ["DYNAMODB_TABLE_NAME"]
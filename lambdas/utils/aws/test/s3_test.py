@@ -1,32 +1,75 @@
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
 from pytest_mock import MockerFixture
 
-from lambdas.utils.aws.s3 import get_s3_file, put_s3_file
+from lambdas.utils.aws.s3 import S3ObjectCache, get_s3_file, put_s3_file
+
+FILE_PATH = "lambdas.utils.aws.s3"
+
+
+@pytest.fixture(autouse=True)
+def mock_write_log(mocker: MockerFixture) -> MagicMock:
+    """Patch the logger, which is initialised by the lambda"""
+    return mocker.patch(f"{FILE_PATH}.write_log")
+
+
+class FakeS3:
+    """An S3 client holding objects, which replies 304 to matching ETags"""
+
+    def __init__(self) -> None:
+        self.objects: dict[str, tuple[bytes, str]] = {}
+        self.requests: list[dict] = []
+
+    def put(self, key: str, body: bytes, etag: str) -> None:
+        self.objects[key] = (body, etag)
+
+    def get_object(self, **request) -> dict:
+        self.requests.append(request)
+        body, etag = self.objects[request["Key"]]
+        if request.get("IfNoneMatch") == etag:
+            raise ClientError(
+                {
+                    "Error": {"Code": "304", "Message": "Not Modified"},
+                    "ResponseMetadata": {"HTTPStatusCode": 304},
+                },
+                "GetObject",
+            )
+        return {
+            "Body": StreamingBody(BytesIO(body), len(body)),
+            "ContentLength": len(body),
+            "ETag": etag,
+        }
+
+
+@pytest.fixture(name="s3")
+def setup_s3() -> FakeS3:
+    """Create an S3 client holding a template"""
+    s3 = FakeS3()
+    s3.put("template.json", b'{"subject": "test"}', '"1"')
+    return s3
 
 
 def test_get_s3_file(mocker: MockerFixture) -> None:
     """Test get_s3_file"""
     # Arrange
-    mock_client = mocker.patch("lambdas.utils.aws.s3.client")
-    file_name = "file"
-    bucket = "bucket"
+    mock_cache = mocker.patch(f"{FILE_PATH}.s3_cache")
+    mock_cache.get.return_value = b"contents"
     # Act
-    assert (
-        get_s3_file(bucket, file_name)
-        == mock_client.return_value.get_object.return_value["Body"]
-        .read()
-        .decode.return_value
-    )
+    result = get_s3_file("bucket", "file")
     # Assert
-    mock_client.assert_called_once_with("s3")
-    mock_client.return_value.get_object.assert_called_once_with(
-        Bucket=bucket, Key=file_name
-    )
+    assert result == "contents"
+    mock_cache.get.assert_called_once_with("bucket", "file")
 
 
 def test_put_s3_file(mocker: MockerFixture) -> None:
     """Test put_s3_file"""
     # Arrange
-    mock_client = mocker.patch("lambdas.utils.aws.s3.client")
+    mock_client = mocker.patch("lambdas.utils.aws.s3.get_client")
     file_name = "file"
     bucket = "bucket"
     # Act
@@ -36,3 +79,135 @@ def test_put_s3_file(mocker: MockerFixture) -> None:
     mock_client.return_value.put_object.assert_called_once_with(
         Body="content", Bucket=bucket, Key=file_name
     )
+
+
+def test_cached_object_is_revalidated(s3: FakeS3) -> None:
+    """Test that a repeated read sends the ETag and uses the cached object"""
+    # Arrange
+    cache = S3ObjectCache(cache_dir=None)
+    # Act
+    first = cache.get("bucket", "template.json", s3)
+    second = cache.get("bucket", "template.json", s3)
+    # Assert
+    assert first == second == b'{"subject": "test"}'
+    assert s3.requests == [
+        {"Bucket": "bucket", "Key": "template.json"},
+        {"Bucket": "bucket", "Key": "template.json", "IfNoneMatch": '"1"'},
+    ]
+    assert cache.stats() == {
+        "not_modified": 1,
+        "misses": 1,
+        "objects": 1,
+        "memory_bytes": 19,
+        "disk_bytes": 0,
+    }
+
+
+def test_changed_object_is_read_again(s3: FakeS3) -> None:
+    """Test that an object with a new ETag replaces the cached object"""
+    # Arrange
+    cache = S3ObjectCache(cache_dir=None)
+    cache.get("bucket", "template.json", s3)
+    s3.put("template.json", b"changed", '"2"')
+    # Act
+    result = cache.get("bucket", "template.json", s3)
+    # Assert
+    assert result == b"changed"
+    assert cache.get("bucket", "template.json", s3) == b"changed"
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["memory_bytes"] == 7
+
+
+def test_least_recently_used_objects_are_evicted(s3: FakeS3) -> None:
+    """Test that objects are evicted to stay within the memory limit"""
+    # Arrange
+    for key in "abc":
+        s3.put(key, b"0123456789", f'"{key}"')
+    cache = S3ObjectCache(max_bytes=20, cache_dir=None)
+    cache.get("bucket", "a", s3)
+    cache.get("bucket", "b", s3)
+    cache.get("bucket", "a", s3)
+    # Act
+    cache.get("bucket", "c", s3)
+    # Assert
+    assert cache.stats()["objects"] == 2
+    assert cache.stats()["memory_bytes"] == 20
+    cache.get("bucket", "b", s3)
+    assert "IfNoneMatch" not in s3.requests[-1]
+
+
+def test_large_objects_are_streamed_to_disk(s3: FakeS3, tmp_path: Path) -> None:
+    """Test that an object too large for memory is cached in the cache directory"""
+    # Arrange
+    body = bytes(range(256)) * 1024
+    s3.put("large.pem", body, '"large"')
+    cache = S3ObjectCache(max_object_bytes=1024, cache_dir=str(tmp_path))
+    # Act
+    first = cache.get("bucket", "large.pem", s3)
+    second = cache.get("bucket", "large.pem", s3)
+    # Assert
+    assert first == second == body
+    assert [path.read_bytes() for path in tmp_path.iterdir()] == [body]
+    assert cache.stats()["disk_bytes"] == len(body)
+    assert cache.stats()["memory_bytes"] == 0
+    assert s3.requests[-1]["IfNoneMatch"] == '"large"'
+
+
+def test_removed_cache_file_is_read_again(s3: FakeS3, tmp_path: Path) -> None:
+    """Test that the object is read again if its cache file has been removed"""
+    # Arrange
+    s3.put("large.pem", b"certificate", '"large"')
+    cache = S3ObjectCache(max_object_bytes=1, cache_dir=str(tmp_path))
+    cache.get("bucket", "large.pem", s3)
+    for path in tmp_path.iterdir():
+        path.unlink()
+    # Act
+    result = cache.get("bucket", "large.pem", s3)
+    # Assert
+    assert result == b"certificate"
+    assert "IfNoneMatch" not in s3.requests[-1]
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_large_objects_are_not_cached_without_a_directory(s3: FakeS3) -> None:
+    """Test that large objects are read without caching when there is no directory"""
+    # Arrange
+    cache = S3ObjectCache(max_object_bytes=1, cache_dir=None)
+    # Act
+    cache.get("bucket", "template.json", s3)
+    cache.get("bucket", "template.json", s3)
+    # Assert
+    assert cache.stats()["objects"] == 0
+    assert cache.stats()["misses"] == 2
+
+
+def test_other_errors_are_raised(s3: FakeS3) -> None:
+    """Test that errors other than Not Modified are raised"""
+    # Arrange
+    cache = S3ObjectCache(cache_dir=None)
+    cache.get("bucket", "template.json", s3)
+    s3.get_object = MagicMock(
+        side_effect=ClientError({"Error": {"Code": "AccessDenied"}}, "GetObject")
+    )
+    # Act & Assert
+    with pytest.raises(ClientError):
+        cache.get("bucket", "template.json", s3)
+
+
+def test_clear(s3: FakeS3, tmp_path: Path) -> None:
+    """Test that clearing the cache removes the objects and their files"""
+    # Arrange
+    s3.put("large.pem", b"certificate", '"large"')
+    cache = S3ObjectCache(max_object_bytes=1, cache_dir=str(tmp_path))
+    cache.get("bucket", "large.pem", s3)
+    # Act
+    cache.clear()
+    # Assert
+    assert cache.stats() == {
+        "not_modified": 0,
+        "misses": 0,
+        "objects": 0,
+        "memory_bytes": 0,
+        "disk_bytes": 0,
+    }
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,66 @@
+# coding: utf-8
+# Generated by lambdas.utils.event_utilities.slotted_bindings from
+# lambdas.utils.code_bindings.base_event.Event, do not edit.
+import pprint
+
+
+class Event:
+    __slots__ = ("Detail", "DetailType", "EventBusName", "Source")
+
+    _types = {
+        "Detail": "Detail",
+        "DetailType": "str",
+        "EventBusName": "str",
+        "Source": "str",
+    }
+
+    _attribute_map = {
+        "Detail": "Detail",
+        "DetailType": "DetailType",
+        "EventBusName": "EventBusName",
+        "Source": "Source",
+    }
+
+    def __init__(self, Detail=None, DetailType=None, EventBusName=None, Source=None):
+        self.Detail = Detail
+        self.DetailType = DetailType
+        self.EventBusName = EventBusName
+        self.Source = Source
+
+    def to_dict(self):
+        result = {}
+
+        for attr in self._types:
+            value = getattr(self, attr)
+            if isinstance(value, list):
+                result[attr] = [
+                    x.to_dict() if hasattr(x, "to_dict") else x for x in value
+                ]
+            elif hasattr(value, "to_dict"):
+                result[attr] = value.to_dict()
+            elif isinstance(value, dict):
+                result[attr] = {
+                    key: item.to_dict() if hasattr(item, "to_dict") else item
+                    for key, item in value.items()
+                }
+            else:
+                result[attr] = value
+
+        return result
+
+    def to_str(self):
+        return pprint.pformat(self.to_dict())
+
+    def __repr__(self):
+        return self.to_str()
+
+    def __eq__(self, other):
+        if not isinstance(other, Event):
+            return False
+
+        return all(
+            getattr(self, attr) == getattr(other, attr) for attr in self.__slots__
+        )
+
+    def __ne__(self, other):
+        return not self == other
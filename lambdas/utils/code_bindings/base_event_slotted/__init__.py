@@ -0,0 +1,10 @@
+# coding: utf-8
+# Generated by lambdas.utils.event_utilities.slotted_bindings from
+# lambdas.utils.code_bindings.base_event, do not edit.
+
+from lambdas.utils.code_bindings.base_event_slotted.Detail import Detail
+from lambdas.utils.code_bindings.base_event_slotted.Detail_metadata import (
+    Detail_metadata,
+)
+from lambdas.utils.code_bindings.base_event_slotted.Event import Event
+from lambdas.utils.code_bindings.base_event_slotted.marshaller import Marshaller
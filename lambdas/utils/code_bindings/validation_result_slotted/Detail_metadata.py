@@ -0,0 +1,68 @@
+# coding: utf-8
+# Generated by lambdas.utils.event_utilities.slotted_bindings from
+# lambdas.utils.code_bindings.validation_result.Detail_metadata, do not edit.
+import pprint
+
+
+class Detail_metadata:
+    __slots__ = ("client_key", "correlation_id", "created", "request_id")
+
+    _types = {
+        "client_key": "str",
+        "correlation_id": "str",
+        "created": "str",
+        "request_id": "str",
+    }
+
+    _attribute_map = {
+        "client_key": "client-key",
+        "correlation_id": "correlation-id",
+        "created": "created",
+        "request_id": "request-id",
+    }
+
+    def __init__(
+        self, client_key=None, correlation_id=None, created=None, request_id=None
+    ):
+        self.client_key = client_key
+        self.correlation_id = correlation_id
+        self.created = created
+        self.request_id = request_id
+
+    def to_dict(self):
+        result = {}
+
+        for attr in self._types:
+            value = getattr(self, attr)
+            if isinstance(value, list):
+                result[attr] = [
+                    x.to_dict() if hasattr(x, "to_dict") else x for x in value
+                ]
+            elif hasattr(value, "to_dict"):
+                result[attr] = value.to_dict()
+            elif isinstance(value, dict):
+                result[attr] = {
+                    key: item.to_dict() if hasattr(item, "to_dict") else item
+                    for key, item in value.items()
+                }
+            else:
+                result[attr] = value
+
+        return result
+
+    def to_str(self):
+        return pprint.pformat(self.to_dict())
+
+    def __repr__(self):
+        return self.to_str()
+
+    def __eq__(self, other):
+        if not isinstance(other, Detail_metadata):
+            return False
+
+        return all(
+            getattr(self, attr) == getattr(other, attr) for attr in self.__slots__
+        )
+
+    def __ne__(self, other):
+        return not self == other
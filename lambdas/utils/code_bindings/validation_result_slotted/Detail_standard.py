@@ -0,0 +1,68 @@
+# coding: utf-8
+# Generated by lambdas.utils.event_utilities.slotted_bindings from
+# lambdas.utils.code_bindings.validation_result.Detail_standard, do not edit.
+import pprint
+
+
+class Detail_standard:
+    __slots__ = ("proxy_identifier_type", "relationship_type", "validation_result_info")
+
+    _types = {
+        "proxy_identifier_type": "str",
+        "relationship_type": "str",
+        "validation_result_info": "object",
+    }
+
+    _attribute_map = {
+        "proxy_identifier_type": "proxy-identifier-type",
+        "relationship_type": "relationship-type",
+        "validation_result_info": "validation-result-info",
+    }
+
+    def __init__(
+        self,
+        proxy_identifier_type=None,
+        relationship_type=None,
+        validation_result_info=None,
+    ):
+        self.proxy_identifier_type = proxy_identifier_type
+        self.relationship_type = relationship_type
+        self.validation_result_info = validation_result_info
+
+    def to_dict(self):
+        result = {}
+
+        for attr in self._types:
+            value = getattr(self, attr)
+            if isinstance(value, list):
+                result[attr] = [
+                    x.to_dict() if hasattr(x, "to_dict") else x for x in value
+                ]
+            elif hasattr(value, "to_dict"):
+                result[attr] = value.to_dict()
+            elif isinstance(value, dict):
+                result[attr] = {
+                    key: item.to_dict() if hasattr(item, "to_dict") else item
+                    for key, item in value.items()
+                }
+            else:
+                result[attr] = value
+
+        return result
+
+    def to_str(self):
+        return pprint.pformat(self.to_dict())
+
+    def __repr__(self):
+        return self.to_str()
+
+    def __eq__(self, other):
+        if not isinstance(other, Detail_standard):
+            return False
+
+        return all(
+            getattr(self, attr) == getattr(other, attr) for attr in self.__slots__
+        )
+
+    def __ne__(self, other):
+        return not self == other
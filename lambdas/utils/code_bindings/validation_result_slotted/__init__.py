@@ -0,0 +1,16 @@
+# coding: utf-8
+# Generated by lambdas.utils.event_utilities.slotted_bindings from
+# lambdas.utils.code_bindings.validation_result, do not edit.
+
+from lambdas.utils.code_bindings.validation_result_slotted.Detail import Detail
+from lambdas.utils.code_bindings.validation_result_slotted.Detail_metadata import (
+    Detail_metadata,
+)
+from lambdas.utils.code_bindings.validation_result_slotted.Detail_sensitive import (
+    Detail_sensitive,
+)
+from lambdas.utils.code_bindings.validation_result_slotted.Detail_standard import (
+    Detail_standard,
+)
+from lambdas.utils.code_bindings.validation_result_slotted.Event import Event
+from lambdas.utils.code_bindings.validation_result_slotted.marshaller import Marshaller
@@ -0,0 +1,185 @@
+"""Shared HTTP connection pools for outbound requests.
+
+A single `requests.Session` is kept per host at module level so that a warm Lambda
+container reuses open TCP/TLS connections between invocations instead of paying the
+handshake cost on every request.
+"""
+
+from os import getenv
+from threading import Lock
+from typing import Optional, Union
+from urllib.parse import urlparse
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_MAXSIZE = int(getenv("HTTP_POOL_MAXSIZE", "10"))
+MAX_RETRIES = int(getenv("HTTP_MAX_RETRIES", "2"))
+BACKOFF_FACTOR = float(getenv("HTTP_BACKOFF_FACTOR", "0.3"))
+CONNECT_TIMEOUT = float(getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(getenv("HTTP_READ_TIMEOUT", "30"))
+
+# Only idempotent methods are retried on these status codes,
+# connection failures are retried for all methods as no request was sent
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+Timeout = Union[float, tuple[float, float]]
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTP adapter that applies a default timeout to requests that do not set one"""
+
+    def __init__(self, timeout: Timeout, *args, **kwargs) -> None:
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        """Sends the request, applying the default timeout if none was supplied"""
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class ConnectionPoolManager:
+    """Creates and keeps one pooled, keep-alive session per host"""
+
+    def __init__(
+        self,
+        pool_maxsize: int = POOL_MAXSIZE,
+        max_retries: int = MAX_RETRIES,
+        backoff_factor: float = BACKOFF_FACTOR,
+        timeout: Timeout = (CONNECT_TIMEOUT, READ_TIMEOUT),
+    ) -> None:
+        """Initialise the manager
+
+        Args:
+            pool_maxsize (int): Maximum number of connections kept open per host
+            max_retries (int): Number of retries for failed connections and retryable statuses
+            backoff_factor (float): Backoff factor applied between retries
+            timeout (Timeout): Default (connect, read) timeout in seconds
+        """
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self._sessions: dict[str, Session] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def get_host(url: Optional[str]) -> str:
+        """Returns the scheme and host of the URL, used as the pool key
+
+        Args:
+            url (str): The URL being requested
+
+        Returns:
+            str: The scheme and host, e.g. 'https://example.com'
+        """
+        parsed_url = urlparse(url or "")
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def get_session(self, url: Optional[str]) -> Session:
+        """Returns the shared session for the host of the URL, creating it if required
+
+        Args:
+            url (str): The URL being requested
+
+        Returns:
+            Session: Session with a pooled, retrying adapter
+        """
+        host = self.get_host(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self.create_session()
+                self._sessions[host] = session
+        return session
+
+    def create_session(self) -> Session:
+        """Creates a new session with a pooled, retrying adapter
+
+        Returns:
+            Session: The new session
+        """
+        retry = Retry(
+            total=self.max_retries,
+            read=0,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            raise_on_status=False,
+        )
+        adapter = TimeoutHTTPAdapter(
+            timeout=self.timeout,
+            pool_connections=1,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        session = Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def metrics(self) -> dict:
+        """Returns the request and connection counts for each host
+
+        The reuse rate is the proportion of requests that were sent
+        over an already open connection.
+
+        Returns:
+            dict: Metrics keyed by host
+        """
+        rtn = {}
+        with self._lock:
+            sessions = dict(self._sessions)
+
+        for host, session in sessions.items():
+            requests = 0
+            connections = 0
+            # The same adapter is mounted for both http and https
+            adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+            for adapter in adapters.values():
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    requests += pools[key].num_requests
+                    connections += pools[key].num_connections
+
+            reuse_rate = 1 - connections / requests if requests else 0.0
+            rtn[host] = {
+                "requests": requests,
+                "connections": connections,
+                "reuse_rate": round(max(reuse_rate, 0.0), 3),
+            }
+
+        return rtn
+
+    def close(self) -> None:
+        """Closes every session and discards the pools"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+POOL_MANAGER = ConnectionPoolManager()
+
+
+def get_session(url: Optional[str]) -> Session:
+    """Returns the shared session for the host of the URL
+
+    Args:
+        url (str): The URL being requested
+
+    Returns:
+        Session: Session with a pooled, retrying adapter
+    """
+    return POOL_MANAGER.get_session(url)
+
+
+def connection_metrics() -> dict:
+    """Returns the request, connection and reuse rate metrics for each host
+
+    Returns:
+        dict: Metrics keyed by host
+    """
+    return POOL_MANAGER.metrics()
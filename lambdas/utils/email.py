@@ -1,12 +1,56 @@
+"""Sends emails with the NHSUK SendNHSMail API.
+
+`send_email` sends one email. `BulkEmailClient.send_many` sends a batch of emails on
+a bounded worker pool, over the shared keep-alive session of the SendNHSMail host,
+no faster than EMAIL_RATE_LIMIT emails per second so that a burst of emails stays
+within the SendNHSMail quota. Connection errors, timeouts and 429 or 5xx responses
+are retried with a jittered exponential backoff, and the outcome of every email is
+returned rather than raised.
+"""
+
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from json import dumps
+from os import getenv
+from time import monotonic, sleep
+from typing import Callable, NamedTuple, Optional
 
-from requests import Response, post
+from requests import Response
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import Timeout
 
+from .connection_pool import get_session
 from .logging.logger import write_log
 
+# Seconds to wait for SendNHSMail to accept an email
+SEND_EMAIL_TIMEOUT = float(getenv("SEND_EMAIL_TIMEOUT", "10"))
+# Maximum number of emails being sent at once, and sent per second, per container
+EMAIL_MAX_CONCURRENCY = int(getenv("EMAIL_MAX_CONCURRENCY", "4"))
+EMAIL_RATE_LIMIT = float(getenv("EMAIL_RATE_LIMIT", "10"))
+# Attempts made to send each email, and the backoff before the first retry in seconds
+EMAIL_MAX_ATTEMPTS = int(getenv("EMAIL_MAX_ATTEMPTS", "3"))
+EMAIL_RETRY_BACKOFF = float(getenv("EMAIL_RETRY_BACKOFF", "0.5"))
+
+TRANSIENT_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class EmailNotSentError(ValueError):
+    """SendNHSMail did not accept the email"""
+
+    def __init__(self, message: str, status_code: int) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
 
 def send_email(
-    to_email_address: str, subject: str, body: str, api_url: str, subscription_key: str
+    to_email_address: str,
+    subject: str,
+    body: str,
+    api_url: str,
+    subscription_key: str,
+    timeout: float = SEND_EMAIL_TIMEOUT,
 ) -> Response:
     """Send an email using NHSUK SendNHSMail API
 
@@ -16,8 +60,9 @@ def send_email(
         body (str): Email body
         api_url (str): URL to send email to
         subscription_key (str): API key
+        timeout (float): Seconds to wait for the API
     """
-    response = post(
+    response = get_session(api_url).post(
         url=api_url,
         headers={"Subscription-Key": subscription_key},
         data=dumps(
@@ -27,7 +72,7 @@ def send_email(
                 "body": body,
             }
         ),
-        timeout=10,
+        timeout=timeout,
     )
 
     if response.status_code == 200:
@@ -42,6 +87,195 @@ def send_email(
             },
         )
         write_log("INFO", {"info": f"Response: {response.text}"})
-        raise ValueError("Email failed to be added to NHS Send Mail queue.")
+        raise EmailNotSentError(
+            "Email failed to be added to NHS Send Mail queue.", response.status_code
+        )
 
     return response
+
+
+class EmailMessage(NamedTuple):
+    """An email to send"""
+
+    to_email_address: str
+    subject: str
+    body: str
+
+
+@dataclass
+class EmailResult:
+    """The outcome of sending an email"""
+
+    to_email_address: str
+    sent: bool = False
+    status_code: Optional[int] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+def is_transient(error: Exception) -> bool:
+    """Returns whether sending the email again may succeed"""
+    if isinstance(error, EmailNotSentError):
+        return error.status_code in TRANSIENT_STATUS_CODES
+    return isinstance(error, (RequestsConnectionError, Timeout))
+
+
+class RateLimiter:
+    """Spaces out calls so that no more than `rate` are made per second"""
+
+    def __init__(self, rate: float) -> None:
+        """Initialise the limiter
+
+        Args:
+            rate (float): Calls per second, 0 or less to not limit the rate
+        """
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Waits until the next call is allowed"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            sleep(wait)
+
+
+class BulkEmailClient:
+    """Sends batches of emails concurrently, within a rate limit"""
+
+    def __init__(
+        self,
+        max_concurrency: int = EMAIL_MAX_CONCURRENCY,
+        rate_limit: float = EMAIL_RATE_LIMIT,
+        max_attempts: int = EMAIL_MAX_ATTEMPTS,
+        retry_backoff: float = EMAIL_RETRY_BACKOFF,
+        timeout: float = SEND_EMAIL_TIMEOUT,
+    ) -> None:
+        """Initialise the client
+
+        Args:
+            max_concurrency (int): Maximum number of emails being sent at once
+            rate_limit (float): Maximum number of emails sent per second
+            max_attempts (int): Attempts made to send each email
+            retry_backoff (float): Backoff before the first retry in seconds
+            timeout (float): Seconds to wait for the API to accept each email
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_attempts = max(max_attempts, 1)
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(rate_limit)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def send_many(
+        self,
+        messages: list[EmailMessage],
+        api_url: str,
+        subscription_key: str,
+        on_sent: Optional[Callable[[int, EmailResult], None]] = None,
+    ) -> list[EmailResult]:
+        """Sends every email, returning the outcome of each
+
+        Args:
+            messages (list[EmailMessage]): The emails, or (recipient, subject, body)
+            api_url (str): URL to send email to
+            subscription_key (str): API key
+            on_sent (Callable, optional): Called with the index and result of each
+                email as soon as it has been sent
+
+        Returns:
+            list[EmailResult]: The result of each email, in order
+        """
+        if len(messages) == 1:
+            # Not worth handing a single email to the worker pool
+            message = EmailMessage(*messages[0])
+            return [self.__send(0, message, api_url, subscription_key, on_sent)]
+        executor = self.__get_executor()
+        futures = [
+            executor.submit(
+                self.__send,
+                index,
+                EmailMessage(*message),
+                api_url,
+                subscription_key,
+                on_sent,
+            )
+            for index, message in enumerate(messages)
+        ]
+        results = [future.result() for future in futures]
+        write_log(
+            "INFO",
+            {
+                "info": f"Sent {sum(result.sent for result in results)} of "
+                f"{len(results)} emails"
+            },
+        )
+        return results
+
+    def __send(
+        self,
+        index: int,
+        message: EmailMessage,
+        api_url: str,
+        subscription_key: str,
+        on_sent: Optional[Callable[[int, EmailResult], None]],
+    ) -> EmailResult:
+        """Sends one email, retrying transient failures"""
+        result = EmailResult(message.to_email_address)
+        while True:
+            result.attempts += 1
+            self.rate_limiter.acquire()
+            try:
+                response = send_email(
+                    *message, api_url, subscription_key, timeout=self.timeout
+                )
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                result.error = str(error)
+                result.status_code = getattr(error, "status_code", None)
+                if not is_transient(error) or result.attempts >= self.max_attempts:
+                    write_log(
+                        "WARNING",
+                        {
+                            "info": f"Email to {message.to_email_address} failed "
+                            f"after {result.attempts} attempts - {error}"
+                        },
+                    )
+                    return result
+                # Full jitter, so retries to the same host are spread out
+                sleep(
+                    random.uniform(0, self.retry_backoff * 2 ** (result.attempts - 1))
+                )
+                continue
+
+            result.sent, result.error = True, None
+            result.status_code = response.status_code
+            if on_sent is not None:
+                try:
+                    on_sent(index, result)
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    write_log(
+                        "WARNING",
+                        {
+                            "info": f"Error handling the email sent to "
+                            f"{message.to_email_address} - {error}"
+                        },
+                    )
+            return result
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        """Returns the worker pool, which is kept for the lifetime of the container"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="email"
+                )
+            return self._executor
+
+
+bulk_email_client = BulkEmailClient()
@@ -0,0 +1,290 @@
+"""Publishes events to EventBridge from a background worker.
+
+Events are handed to a bounded queue and returned from straight away, so that the
+caller does not wait for EventBridge. A worker thread publishes the queued events in
+batches. `drain` waits for the queue to empty, and is called before the Lambda
+returns so that no events are left in a frozen container.
+
+Events that cannot be queued because the queue is full, that fail to publish, or that
+are still queued when `drain` times out, are written to a local spool file. When a
+fallback SQS queue is configured, the spooled events are sent to it by `drain`,
+otherwise they are published again by the next `drain`. Only the events that fail to
+be forwarded stay in the spool. Events that can never be published, because they are
+too large or invalid, are logged and dropped rather than spooled.
+"""
+
+import atexit
+import json
+import os
+import threading
+from os import getenv
+from queue import Empty, Full, Queue
+from time import monotonic
+from typing import Callable, Optional
+
+from lambdas.utils.aws.clients import get_client
+from lambdas.utils.event_utilities.batch_event_publisher import (
+    BatchEventPublisher,
+    EventPublishError,
+)
+from lambdas.utils.logging.logger import write_log
+
+MAX_QUEUE_SIZE = int(getenv("AUDIT_EVENT_MAX_QUEUE_SIZE", "100"))
+DRAIN_TIMEOUT = float(getenv("AUDIT_EVENT_DRAIN_TIMEOUT", "2"))
+SPOOL_PATH = getenv("AUDIT_EVENT_SPOOL_PATH", "/tmp/audit_events.jsonl")
+FALLBACK_QUEUE_URL = getenv("AUDIT_EVENT_FALLBACK_QUEUE_URL")
+
+# Maximum number of messages in a SendMessageBatch call
+SQS_BATCH_SIZE = 10
+
+
+class AsyncEventPublisher:
+    """Publishes PutEvents entries from a background thread"""
+
+    def __init__(
+        self,
+        max_queue_size: int = MAX_QUEUE_SIZE,
+        drain_timeout: float = DRAIN_TIMEOUT,
+        spool_path: str = SPOOL_PATH,
+        fallback_queue_url: Optional[str] = FALLBACK_QUEUE_URL,
+        publisher_factory: Callable[[], BatchEventPublisher] = BatchEventPublisher,
+    ) -> None:
+        """Initialise the publisher, the worker is started when an event is submitted
+
+        Args:
+            max_queue_size (int): Maximum number of events waiting to be published
+            drain_timeout (float): Seconds drain waits for the queue to empty
+            spool_path (str): File events are written to when they cannot be published
+            fallback_queue_url (str, optional): SQS queue spooled events are sent to
+            publisher_factory (Callable): Creates the publisher used by the worker
+        """
+        self.drain_timeout = drain_timeout
+        self.spool_path = spool_path
+        self.fallback_queue_url = fallback_queue_url
+        self.publisher_factory = publisher_factory
+        self._queue: Queue = Queue(maxsize=max_queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._publisher: Optional[BatchEventPublisher] = None
+        self._worker_lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        """True once an event has been submitted"""
+        return self._worker is not None
+
+    def submit(self, entry: dict) -> None:
+        """Queues the event to be published, spooling it if the queue is full
+
+        Args:
+            entry (dict): The PutEvents request entry
+        """
+        self.__start_worker()
+        try:
+            self._queue.put_nowait(entry)
+        except Full:
+            write_log("WARNING", {"info": "Audit event queue is full, spooling event"})
+            self.__spool([entry])
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        """Waits for the queued events to be published, then handles spooled events
+
+        Events still queued after the timeout, or buffered by the worker but not yet
+        sent, are spooled. Spooled events are sent to the fallback queue if there is
+        one, otherwise they are published.
+
+        Args:
+            timeout (float, optional): Seconds to wait, defaults to the drain timeout
+        """
+        deadline = monotonic() + (self.drain_timeout if timeout is None else timeout)
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    break
+                self._queue.all_tasks_done.wait(remaining)
+
+        timed_out = []
+        while True:
+            try:
+                timed_out.append(self._queue.get_nowait())
+            except Empty:
+                break
+            self._queue.task_done()
+        # The worker only sends its batch once the queue is empty, which it will not
+        # see while waiting for the next event
+        if self._publisher is not None:
+            timed_out = self._publisher.take_pending() + timed_out
+        if timed_out:
+            write_log(
+                "WARNING",
+                {"info": f"Spooling {len(timed_out)} audit events not yet published"},
+            )
+            self.__spool(timed_out)
+
+        self.__forward_spool()
+
+    def __start_worker(self) -> None:
+        """Starts the worker thread if it is not running"""
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self.__run, name="audit-event-publisher", daemon=True
+                )
+                self._worker.start()
+
+    def __run(self) -> None:
+        """Publishes queued events, sending the batch once the queue is empty"""
+        publisher = self._publisher = self.publisher_factory()
+        while True:
+            entry = self._queue.get()
+            try:
+                self.__publish(publisher, [entry])
+                if self._queue.empty():
+                    publisher.flush()
+            except EventPublishError as error:
+                write_log(
+                    "ERROR",
+                    {"info": "Failed to publish audit events", "error": error},
+                )
+                self.__spool(error.failed_entries)
+            except ValueError as error:
+                self.__drop(entry, error)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                write_log(
+                    "ERROR",
+                    {"info": "Failed to publish audit event", "error": error},
+                )
+                self.__spool([entry])
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def __publish(publisher: BatchEventPublisher, entries: list[dict]) -> None:
+        """Adds the entries to the publisher's batch"""
+        for entry in entries:
+            publisher.publish(
+                entry["DetailType"],
+                entry["Detail"],
+                entry["EventBusName"],
+                entry["Source"],
+            )
+
+    @staticmethod
+    def __drop(entry: dict, error: Exception) -> None:
+        """Logs an entry that can never be published, which is not spooled"""
+        write_log(
+            "ERROR",
+            {
+                "info": "Dropping audit event that cannot be published",
+                "detail_type": entry.get("DetailType"),
+                "error": error,
+            },
+        )
+
+    def __spool(self, entries: list[dict]) -> None:
+        """Appends the entries to the spool file"""
+        with self._spool_lock, open(self.spool_path, "a", encoding="utf-8") as file:
+            for entry in entries:
+                file.write(json.dumps(entry) + "\n")
+
+    def __take_spool(self) -> list[dict]:
+        """Removes and returns the spooled entries"""
+        with self._spool_lock:
+            if not os.path.exists(self.spool_path):
+                return []
+            with open(self.spool_path, "r", encoding="utf-8") as file:
+                entries = [json.loads(line) for line in file if line.strip()]
+            os.remove(self.spool_path)
+        return entries
+
+    def __forward_spool(self) -> None:
+        """Sends the spooled events to the fallback queue, or publishes them.
+
+        Only the events that fail to be forwarded are spooled again.
+        """
+        entries = self.__take_spool()
+        if not entries:
+            return
+
+        publisher = self.publisher_factory()
+        publishable = []
+        for entry in entries:
+            try:
+                publisher.check_entry(entry)
+                publishable.append(entry)
+            except ValueError as error:
+                self.__drop(entry, error)
+
+        if self.fallback_queue_url:
+            failed = self.__send_to_fallback_queue(publishable)
+        else:
+            failed = self.__publish_spooled(publisher, publishable)
+
+        write_log(
+            "INFO",
+            {
+                "info": f"Forwarded {len(publishable) - len(failed)} of "
+                f"{len(entries)} spooled audit events"
+            },
+        )
+        if failed:
+            write_log(
+                "ERROR",
+                {"info": f"Failed to forward {len(failed)} spooled audit events"},
+            )
+            self.__spool(failed)
+
+    def __publish_spooled(
+        self, publisher: BatchEventPublisher, entries: list[dict]
+    ) -> list[dict]:
+        """Publishes the entries, returning those that failed"""
+        failed = []
+        for entry in entries:
+            try:
+                self.__publish(publisher, [entry])
+            except EventPublishError as error:
+                failed += error.failed_entries
+            except ValueError as error:
+                self.__drop(entry, error)
+        try:
+            publisher.flush()
+        except EventPublishError as error:
+            failed += error.failed_entries
+        return failed
+
+    def __send_to_fallback_queue(self, entries: list[dict]) -> list[dict]:
+        """Sends the entries to the fallback SQS queue, returning those that failed"""
+        sqs = get_client("sqs")
+        failed = []
+        for start in range(0, len(entries), SQS_BATCH_SIZE):
+            batch = entries[start : start + SQS_BATCH_SIZE]
+            try:
+                response = sqs.send_message_batch(
+                    QueueUrl=self.fallback_queue_url,
+                    Entries=[
+                        {"Id": str(index), "MessageBody": json.dumps(entry)}
+                        for index, entry in enumerate(batch)
+                    ],
+                )
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                write_log(
+                    "ERROR",
+                    {"info": "Failed to send audit events to SQS", "error": error},
+                )
+                failed += batch
+                continue
+            failed += [
+                batch[int(result["Id"])] for result in response.get("Failed", [])
+            ]
+        return failed
+
+
+AUDIT_EVENT_PUBLISHER = AsyncEventPublisher()
+
+
+@atexit.register
+def drain_at_exit() -> None:
+    """Publishes the queued audit events when the process exits"""
+    if AUDIT_EVENT_PUBLISHER.started:
+        AUDIT_EVENT_PUBLISHER.drain()
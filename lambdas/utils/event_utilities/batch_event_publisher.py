@@ -0,0 +1,334 @@
+"""Publishes events to EventBridge in batches.
+
+Events are buffered and sent with a single PutEvents call once the batch is full,
+i.e. it holds 10 entries or the next entry would take it over 256 KB, once the
+oldest buffered event reaches the maximum age, and when `flush` is called. Entries
+that fail in a partially successful PutEvents call are retried on their own.
+
+The age is checked by a timer, so a batch is sent without waiting for another event.
+Entries that still fail when a batch is sent by the timer are raised by the next
+`flush`, or returned by `take_pending`. Callers flush at the end of each invocation.
+The buffers are also flushed when the process exits, but this is best effort only, as
+it does not happen when a Lambda container is frozen or killed.
+"""
+
+import atexit
+import threading
+import weakref
+from collections import deque
+from os import getenv
+from time import monotonic, perf_counter, sleep
+from typing import Optional
+
+import botocore.exceptions
+
+from lambdas.utils.event_utilities.event_publisher import (
+    EventPublisher,
+    ValidationResultEventPublisher,
+)
+from lambdas.utils.logging.logger import write_log
+
+# PutEvents limits
+MAX_BATCH_ENTRIES = 10
+MAX_BATCH_BYTES = 256 * 1024
+
+MAX_BATCH_AGE = float(getenv("EVENT_BATCH_MAX_AGE", "1"))
+MAX_BATCH_RETRIES = int(getenv("EVENT_BATCH_MAX_RETRIES", "2"))
+BATCH_RETRY_BACKOFF = float(getenv("EVENT_BATCH_RETRY_BACKOFF", "0.1"))
+
+# Number of the most recent PutEvents latencies kept by a publisher
+LATENCY_SAMPLES = 100
+
+# Size added for the timestamp of an entry, when calculating the size of a batch
+ENTRY_TIME_BYTES = 14
+
+
+class EventPublishError(Exception):
+    """Raised when events could not be sent to EventBridge after retrying"""
+
+    def __init__(self, failed_entries: list[dict], error_codes: set[str]) -> None:
+        self.failed_entries = failed_entries
+        self.error_codes = error_codes
+        super().__init__(
+            f"{len(failed_entries)} events failed to send to Event Bridge with "
+            f"errors: {', '.join(sorted(error_codes))}"
+        )
+
+
+class BatchEventPublisher(EventPublisher):
+    """Buffers events and sends them to EventBridge in batches"""
+
+    def __init__(
+        self,
+        eventbridge_client=None,
+        max_entries: int = MAX_BATCH_ENTRIES,
+        max_bytes: int = MAX_BATCH_BYTES,
+        max_age: float = MAX_BATCH_AGE,
+        max_retries: int = MAX_BATCH_RETRIES,
+        retry_backoff: float = BATCH_RETRY_BACKOFF,
+    ) -> None:
+        """Initialise the publisher
+
+        Args:
+            eventbridge_client (optional): EventBridge client, defaults to the shared client
+            max_entries (int): Maximum number of entries sent in a PutEvents call
+            max_bytes (int): Maximum size of the entries sent in a PutEvents call
+            max_age (float): Seconds after which buffered events are sent
+            max_retries (int): Number of times failed entries are retried
+            retry_backoff (float): Seconds waited before the first retry, doubling after each
+        """
+        super().__init__(eventbridge_client)
+        self.max_entries = min(max_entries, MAX_BATCH_ENTRIES)
+        self.max_bytes = min(max_bytes, MAX_BATCH_BYTES)
+        self.max_age = max_age
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        # Milliseconds taken by the most recent PutEvents calls
+        self.batch_latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._entries: list[dict] = []
+        self._size = 0
+        self._oldest: Optional[float] = None
+        self._timer: Optional[threading.Timer] = None
+        self._failed_entries: list[dict] = []
+        self._error_codes: set[str] = set()
+        self._lock = threading.Lock()
+        _PUBLISHERS.add(self)
+
+    @staticmethod
+    def get_entry_size(entry: dict) -> int:
+        """Returns the size of the entry, as calculated by EventBridge
+
+        Args:
+            entry (dict): The PutEvents request entry
+
+        Returns:
+            int: The size of the entry in bytes
+        """
+        size = ENTRY_TIME_BYTES
+        for key in ("Source", "DetailType", "Detail"):
+            size += len((entry.get(key) or "").encode("utf-8"))
+        for resource in entry.get("Resources", []):
+            size += len(resource.encode("utf-8"))
+        return size
+
+    def check_entry(self, entry: dict) -> None:
+        """Checks that the entry can be sent in a PutEvents call
+
+        Args:
+            entry (dict): The PutEvents request entry
+
+        Raises:
+            ValueError: The entry is missing a field, has a field that is not a
+                string, or is larger than a PutEvents call allows
+        """
+        for key in ("DetailType", "Detail", "EventBusName", "Source"):
+            if not isinstance(entry.get(key), str):
+                raise ValueError(f"The event {key} must be a string")
+
+        size = self.get_entry_size(entry)
+        if size > self.max_bytes:
+            raise ValueError(
+                f"The event is {size} bytes, the maximum size is {self.max_bytes} bytes"
+            )
+
+    def publish(self, detail_type, detail, event_bus_name, source) -> bool:
+        """Buffers the event, sending the batch if it is full or has reached its age
+
+        Returns:
+            bool: True once the event is buffered
+
+        Raises:
+            ValueError: The event can never be sent, see `check_entry`
+            EventPublishError: Events in the batches sent by this call failed after
+                retrying
+        """
+        entry = {
+            "DetailType": detail_type,
+            "Detail": detail,
+            "EventBusName": event_bus_name,
+            "Source": source,
+        }
+        self.check_entry(entry)
+        size = self.get_entry_size(entry)
+
+        batches = []
+        with self._lock:
+            if self._size + size > self.max_bytes:
+                batches.append(self.__take_entries())
+
+            self._entries.append(entry)
+            self._size += size
+            self._oldest = self._oldest or monotonic()
+
+            if (
+                len(self._entries) >= self.max_entries
+                or monotonic() - self._oldest >= self.max_age
+            ):
+                batches.append(self.__take_entries())
+            elif self._timer is None:
+                self.__start_timer()
+
+        failed_entries: list[dict] = []
+        error_codes: set[str] = set()
+        for batch in batches:
+            try:
+                self.__send(batch)
+            except EventPublishError as error:
+                failed_entries += error.failed_entries
+                error_codes |= error.error_codes
+        if failed_entries:
+            raise EventPublishError(failed_entries, error_codes)
+        return True
+
+    def flush(self) -> None:
+        """Sends the buffered events
+
+        Raises:
+            EventPublishError: Events failed to send after retrying, including events
+                sent by the timer since the last flush
+        """
+        with self._lock:
+            batch = self.__take_entries()
+            failed_entries, error_codes = self.__take_failures()
+        if batch:
+            try:
+                self.__send(batch)
+            except EventPublishError as error:
+                if not failed_entries:
+                    raise
+                failed_entries += error.failed_entries
+                error_codes |= error.error_codes
+        if failed_entries:
+            raise EventPublishError(failed_entries, error_codes)
+
+    def take_pending(self) -> list[dict]:
+        """Removes and returns the buffered events, and the events the timer failed to
+        send, without sending them"""
+        with self._lock:
+            failed_entries, _ = self.__take_failures()
+            return failed_entries + self.__take_entries()
+
+    def pending(self) -> int:
+        """Returns the number of buffered events"""
+        with self._lock:
+            return len(self._entries)
+
+    def __take_entries(self) -> list[dict]:
+        """Removes and returns the buffered entries, must be called under the lock"""
+        entries = self._entries
+        self._entries = []
+        self._size = 0
+        self._oldest = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return entries
+
+    def __take_failures(self) -> tuple[list[dict], set[str]]:
+        """Removes and returns the entries the timer failed to send, and their error
+        codes, must be called under the lock"""
+        failures = (self._failed_entries, self._error_codes)
+        self._failed_entries = []
+        self._error_codes = set()
+        return failures
+
+    def __start_timer(self) -> None:
+        """Starts a timer to send the batch at its maximum age, must be called under
+        the lock"""
+        self._timer = threading.Timer(
+            self.max_age, self.__send_aged_batch, args=(self._oldest,)
+        )
+        self._timer.daemon = True
+        self._timer.start()
+
+    def __send_aged_batch(self, oldest: float) -> None:
+        """Sends the batch from the timer, unless it has already been sent"""
+        with self._lock:
+            if self._oldest != oldest:
+                return
+            self._timer = None
+            batch = self.__take_entries()
+
+        try:
+            self.__send(batch)
+        except EventPublishError as error:
+            write_log(
+                "WARNING",
+                {"info": "Failed to send aged batch of events", "error": error},
+            )
+            with self._lock:
+                self._failed_entries += error.failed_entries
+                self._error_codes |= error.error_codes
+
+    def __send(self, entries: list[dict]) -> None:
+        """Sends a batch, retrying the entries that fail
+
+        Args:
+            entries (list[dict]): PutEvents request entries, within the batch limits
+
+        Raises:
+            EventPublishError: Entries still failed after retrying, or the PutEvents
+                call was rejected, in which case every entry of the batch failed
+        """
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+            start = perf_counter()
+            try:
+                response = self.eventbridge_client.put_events(Entries=entries)
+            except (
+                botocore.exceptions.BotoCoreError,
+                botocore.exceptions.ClientError,
+            ) as error:
+                # The entries have already been taken from the buffer, so they are
+                # handed back to the caller to be spooled
+                raise EventPublishError(entries, {type(error).__name__}) from error
+            latency = (perf_counter() - start) * 1000
+            self.batch_latencies.append(latency)
+
+            # Results are in the same order as the request entries, failed entries
+            # have an error code rather than an event id
+            failed = [
+                (entry, result.get("ErrorCode"))
+                for entry, result in zip(entries, response.get("Entries", []))
+                if "EventId" not in result
+            ]
+            write_log(
+                "DEBUG",
+                {
+                    "info": f"Sent {len(entries)} events to Event Bridge in "
+                    f"{latency:.1f}ms, {len(failed)} failed, attempt {attempt + 1}"
+                },
+            )
+            if not failed:
+                return
+            entries = [entry for entry, _ in failed]
+
+        raise EventPublishError(entries, {str(error_code) for _, error_code in failed})
+
+
+class BatchValidationResultEventPublisher(
+    ValidationResultEventPublisher, BatchEventPublisher
+):
+    """Buffers validation result events and sends them to EventBridge in batches"""
+
+
+_PUBLISHERS: "weakref.WeakSet[BatchEventPublisher]" = weakref.WeakSet()
+
+
+@atexit.register
+def flush_all() -> None:
+    """Sends the events buffered by every batch publisher when the process exits.
+
+    This is best effort only, as it is not called when a Lambda container is frozen
+    or killed.
+    """
+    for publisher in list(_PUBLISHERS):
+        try:
+            publisher.flush()
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            write_log(
+                "ERROR",
+                {"info": "Failed to send buffered events", "error": error},
+            )
@@ -0,0 +1,198 @@
+"""Marshaller for the generated event code bindings that plans each type once.
+
+The generated `Marshaller` of each binding package works out how to marshall an
+object from its type, `_types` and `_attribute_map` on every call, and parses type
+names such as 'list[str]' for every field it unmarshalls. `CompiledMarshaller`
+produces the same output, but builds a plan for each type the first time it is seen
+and reuses it, so marshalling an object is a single pass over its fields.
+"""
+
+import datetime
+import re
+from types import ModuleType
+from typing import Any, Callable
+
+import six
+
+Plan = Callable[[Any], Any]
+
+PRIMITIVE_TYPES = (float, bool, bytes, six.text_type) + six.integer_types
+
+NATIVE_TYPES_MAPPING = {
+    "int": int,
+    "long": int,
+    "float": float,
+    "str": str,
+    "bool": bool,
+    "date": datetime.date,
+    "datetime": datetime.datetime,
+    "object": object,
+}
+
+LIST_TYPE_PATTERN = re.compile(r"list\[(.*)\]")
+DICT_TYPE_PATTERN = re.compile(r"dict\(([^,]*), (.*)\)")
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _isoformat(value: Any) -> str:
+    return value.isoformat()
+
+
+class CompiledMarshaller:
+    """Marshalls and unmarshalls the bindings in a package using a plan per type"""
+
+    def __init__(self, bindings: ModuleType, marshaller: type) -> None:
+        """Initialise the marshaller
+
+        Args:
+            bindings (ModuleType): The binding package, e.g. code_bindings.validation_result
+            marshaller (type): The package's generated Marshaller, used for the models
+                that choose their type when unmarshalled
+        """
+        self.bindings = bindings
+        self.marshaller = marshaller
+        self._marshall_plans: dict[type, Plan] = {}
+        self._unmarshall_plans: dict[Any, Plan] = {}
+
+    def marshall(self, obj: Any) -> Any:
+        """Returns the JSON compatible form of the object, as Marshaller.marshall does
+
+        Args:
+            obj (Any): A binding object, or a value of one of its fields
+
+        Returns:
+            Any: The marshalled object
+        """
+        if obj is None:
+            return None
+        obj_type = type(obj)
+        plan = self._marshall_plans.get(obj_type)
+        if plan is None:
+            plan = self._marshall_plans[obj_type] = self.__plan_marshall(obj_type)
+        return plan(obj)
+
+    def unmarshall(self, data: Any, type_name: Any) -> Any:
+        """Returns the data as the type, as Marshaller.unmarshall does
+
+        Args:
+            data (Any): The marshalled data
+            type_name (Any): The binding class or type name, e.g. 'list[str]'
+
+        Returns:
+            Any: The unmarshalled object
+        """
+        if data is None:
+            return None
+        plan = self._unmarshall_plans.get(type_name)
+        if plan is None:
+            plan = self._unmarshall_plans[type_name] = self.__plan_unmarshall(type_name)
+        return plan(data)
+
+    def __plan_marshall(self, obj_type: type) -> Plan:
+        """Returns the function that marshalls objects of the type"""
+        if issubclass(obj_type, PRIMITIVE_TYPES):
+            return _identity
+        if issubclass(obj_type, list):
+            return lambda obj: [self.marshall(sub_obj) for sub_obj in obj]
+        if issubclass(obj_type, tuple):
+            return lambda obj: tuple(self.marshall(sub_obj) for sub_obj in obj)
+        if issubclass(obj_type, (datetime.datetime, datetime.date)):
+            return _isoformat
+        if issubclass(obj_type, dict):
+            return lambda obj: {key: self.marshall(val) for key, val in obj.items()}
+
+        attribute_map = obj_type._attribute_map  # pylint: disable=protected-access
+        types = obj_type._types  # pylint: disable=protected-access
+        fields = tuple((attr, attribute_map[attr]) for attr in types)
+        marshall = self.marshall
+
+        def marshall_model(obj: Any) -> dict:
+            rtn = {}
+            for attr, key in fields:
+                value = getattr(obj, attr)
+                if value is not None:
+                    rtn[key] = value if type(value) is str else marshall(value)
+            return rtn
+
+        return marshall_model
+
+    def __plan_unmarshall(self, type_name: Any) -> Plan:
+        """Returns the function that unmarshalls data as the type"""
+        if isinstance(type_name, str):
+            if type_name.startswith("list["):
+                sub_type = LIST_TYPE_PATTERN.match(type_name).group(1)
+                return lambda data: [self.unmarshall(item, sub_type) for item in data]
+
+            if type_name.startswith("dict("):
+                sub_type = DICT_TYPE_PATTERN.match(type_name).group(2)
+                return lambda data: {
+                    key: self.unmarshall(value, sub_type) for key, value in data.items()
+                }
+
+            if type_name in NATIVE_TYPES_MAPPING:
+                type_name = NATIVE_TYPES_MAPPING[type_name]
+            else:
+                type_name = getattr(self.bindings, type_name)
+
+        if type_name in PRIMITIVE_TYPES:
+            return self.__plan_unmarshall_primitive(type_name)
+        if type_name == object:
+            return _identity
+        if type_name in (datetime.date, datetime.datetime):
+            return self.__plan_unmarshall_date(type_name)
+        return self.__plan_unmarshall_model(type_name)
+
+    @staticmethod
+    def __plan_unmarshall_primitive(primitive_type: type) -> Plan:
+        """Returns the function that unmarshalls a primitive value"""
+
+        def unmarshall_primitive(data: Any) -> Any:
+            try:
+                return primitive_type(data)
+            except UnicodeEncodeError:
+                return six.text_type(data)
+            except TypeError:
+                return data
+
+        return unmarshall_primitive
+
+    @staticmethod
+    def __plan_unmarshall_date(date_type: type) -> Plan:
+        """Returns the function that parses a date or datetime string"""
+        try:
+            from dateutil.parser import parse  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            return _identity
+
+        if date_type == datetime.date:
+            return lambda string: parse(string).date()
+        return parse
+
+    def __plan_unmarshall_model(self, model: type) -> Plan:
+        """Returns the function that creates a binding object from the data"""
+        types = model._types  # pylint: disable=protected-access
+        if not types:
+            return _identity
+
+        # Models that choose their type from the data, or that are also dicts,
+        # are left to the generated marshaller
+        if "get_real_child_model" in model.__dict__ or issubclass(model, dict):
+            return lambda data: self.marshaller.unmarshall(data, model)
+
+        attribute_map = model._attribute_map  # pylint: disable=protected-access
+        fields = tuple(
+            (attr, attribute_map[attr], attr_type) for attr, attr_type in types.items()
+        )
+
+        def unmarshall_model(data: Any) -> Any:
+            kwargs = {}
+            if isinstance(data, (list, dict)):
+                for attr, key, attr_type in fields:
+                    if key in data:
+                        kwargs[attr] = self.unmarshall(data[key], attr_type)
+            return model(**kwargs)
+
+        return unmarshall_model
@@ -1,11 +1,17 @@
 import json
 
-import boto3
 import botocore.exceptions
 
+from lambdas.utils.aws.clients import get_client
+from lambdas.utils.code_bindings import validation_result as validation_result_bindings
 from lambdas.utils.code_bindings.validation_result import (
     Marshaller as ValidationResult_Marshaller,
 )
+from lambdas.utils.event_utilities.compiled_marshaller import CompiledMarshaller
+
+VALIDATION_RESULT_MARSHALLER = CompiledMarshaller(
+    validation_result_bindings, ValidationResult_Marshaller
+)
 
 
 class EventPublisher:
@@ -45,30 +51,40 @@ class EventPublisher:
                 "The parameters you provided are incorrect: {}".format(error)
             )
 
-        finally:
-            self.eventbridge_client.close()
-
     def _create_eventbridge_client(self, client_region="eu-west-2"):
-        return boto3.client("events", client_region)
+        return get_client("events", client_region)
 
 
 class ValidationResultEventPublisher(EventPublisher):
     def publish(self, validation_result):
-        self._try_marshall(validation_result)
-        event_detail_string = json.dumps(
-            ValidationResult_Marshaller.marshall(validation_result.Detail)
-        )
+        entry = self.create_entry(validation_result)
         return super().publish(
-            validation_result.DetailType,
-            event_detail_string,
-            validation_result.EventBusName,
-            validation_result.Source,
+            entry["DetailType"],
+            entry["Detail"],
+            entry["EventBusName"],
+            entry["Source"],
         )
 
-    def _try_marshall(self, validation_result):
+    @classmethod
+    def create_entry(cls, validation_result) -> dict:
+        """Returns the PutEvents request entry for the validation result
+
+        The event is marshalled once, validating it, and its marshalled detail is used
+        as the entry detail.
+        """
+        event = cls._try_marshall(validation_result)
+        return {
+            "DetailType": validation_result.DetailType,
+            "Detail": json.dumps(event.get("Detail")),
+            "EventBusName": validation_result.EventBusName,
+            "Source": validation_result.Source,
+        }
+
+    @staticmethod
+    def _try_marshall(validation_result) -> dict:
         try:
             # Try to serialise the object to JSON to validate its in the correct format
-            ValidationResult_Marshaller.marshall(validation_result)
+            return VALIDATION_RESULT_MARSHALLER.marshall(validation_result)
         except Exception as e:
             # Failed to serialise the object, it does not match the event schema
-            raise Exception("Event object invalid, Exception encountered:" + e)
+            raise Exception("Event object invalid, Exception encountered:" + str(e))
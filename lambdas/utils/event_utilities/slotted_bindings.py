@@ -0,0 +1,238 @@
+"""Generates `__slots__` based versions of the event code bindings.
+
+The code bindings downloaded from the EventBridge schema registry store each field
+in an instance `__dict__` behind a property and setter. The slotted bindings keep
+the same classes, constructors, `_types` and `_attribute_map`, so they can be used
+with `Marshaller`, `CompiledMarshaller` and `event_consumer.unmarshall` in the same
+way, but store fields in `__slots__`, which makes instances smaller and quicker to
+create. Each slotted package has its own `Marshaller` that unmarshalls into the
+slotted classes.
+
+Run from the repository root after updating the code bindings:
+    python -m lambdas.utils.event_utilities.slotted_bindings [package ...]
+"""
+
+import argparse
+import importlib
+import inspect
+import re
+from pathlib import Path
+from types import ModuleType
+
+BINDINGS_PACKAGE = "lambdas.utils.code_bindings"
+BINDINGS_PATH = Path(__file__).parent.parent / "code_bindings"
+SLOTTED_SUFFIX = "_slotted"
+GENERATED_PACKAGES = ("base_event", "validation_result")
+
+HEADER = """# coding: utf-8
+# Generated by lambdas.utils.event_utilities.slotted_bindings from
+# {source}, do not edit.
+"""
+
+MODEL_TEMPLATE = """{header}import pprint
+
+
+class {name}:
+    __slots__ = {slots}
+
+    _types = {types}
+
+    _attribute_map = {attribute_map}
+
+    def __init__(self, {parameters}):
+{assignments}
+
+    def to_dict(self):
+        result = {{}}
+
+        for attr in self._types:
+            value = getattr(self, attr)
+            if isinstance(value, list):
+                result[attr] = [x.to_dict() if hasattr(x, "to_dict") else x for x in value]
+            elif hasattr(value, "to_dict"):
+                result[attr] = value.to_dict()
+            elif isinstance(value, dict):
+                result[attr] = {{
+                    key: item.to_dict() if hasattr(item, "to_dict") else item
+                    for key, item in value.items()
+                }}
+            else:
+                result[attr] = value
+
+        return result
+
+    def to_str(self):
+        return pprint.pformat(self.to_dict())
+
+    def __repr__(self):
+        return self.to_str()
+
+    def __eq__(self, other):
+        if not isinstance(other, {name}):
+            return False
+
+        return all(
+            getattr(self, attr) == getattr(other, attr) for attr in self.__slots__
+        )
+
+    def __ne__(self, other):
+        return not self == other
+"""
+
+
+def get_models(package: ModuleType) -> list[type]:
+    """Returns the binding classes exported by a code bindings package
+
+    Args:
+        package (ModuleType): The code bindings package, e.g. validation_result
+
+    Returns:
+        list[type]: The binding classes, in name order
+    """
+    return sorted(
+        (
+            value
+            for value in vars(package).values()
+            if inspect.isclass(value)
+            and hasattr(value, "_types")
+            and value.__module__.startswith(f"{package.__name__}.")
+        ),
+        key=lambda model: model.__name__,
+    )
+
+
+def render_model(source: str, model: type) -> str:
+    """Returns the source of the slotted version of a binding class
+
+    Args:
+        source (str): The name of the module the binding class is defined in
+        model (type): The binding class
+
+    Returns:
+        str: The source of the slotted binding class module
+    """
+    fields = list(model._types)  # pylint: disable=protected-access
+    return MODEL_TEMPLATE.format(
+        header=HEADER.format(source=source),
+        name=model.__name__,
+        slots=repr(tuple(fields)),
+        types=repr(model._types),  # pylint: disable=protected-access
+        attribute_map=repr(model._attribute_map),  # pylint: disable=protected-access
+        parameters=", ".join(f"{field}=None" for field in fields),
+        assignments="\n".join(f"        self.{field} = {field}" for field in fields)
+        or "        pass",
+    )
+
+
+def render_init(package_name: str, models: list[type]) -> str:
+    """Returns the source of the __init__.py of a slotted bindings package
+
+    Args:
+        package_name (str): The name of the code bindings package
+        models (list[type]): The binding classes of the package
+
+    Returns:
+        str: The source of the package __init__.py
+    """
+    slotted = f"{BINDINGS_PACKAGE}.{package_name}{SLOTTED_SUFFIX}"
+    imports = [
+        f"from {slotted}.{model.__name__} import {model.__name__}\n" for model in models
+    ]
+    imports.append(f"from {slotted}.marshaller import Marshaller\n")
+    return (
+        HEADER.format(source=f"{BINDINGS_PACKAGE}.{package_name}")
+        + "\n"
+        + "".join(imports)
+    )
+
+
+def render_marshaller(package_name: str) -> str:
+    """Returns the source of the marshaller of a slotted bindings package
+
+    The generated marshaller looks up binding classes by name in its package, so the
+    slotted marshaller is a copy that looks them up in the slotted package.
+
+    Args:
+        package_name (str): The name of the code bindings package
+
+    Raises:
+        ValueError: When the marshaller does not import its package as expected
+
+    Returns:
+        str: The source of the slotted marshaller module
+    """
+    source = (BINDINGS_PATH / package_name / "marshaller.py").read_text(
+        encoding="utf-8"
+    )
+    package_import = re.compile(
+        rf"^from {re.escape(BINDINGS_PACKAGE)} import {package_name}$", re.MULTILINE
+    )
+    if not package_import.search(source):
+        raise ValueError(f"{package_name}/marshaller.py does not import its package")
+    source = package_import.sub(
+        f"from {BINDINGS_PACKAGE} import {package_name}{SLOTTED_SUFFIX} "
+        f"as {package_name}",
+        source,
+    )
+    return (
+        HEADER.format(source=f"{BINDINGS_PACKAGE}.{package_name}.marshaller") + source
+    )
+
+
+def generate(package_name: str) -> dict[str, str]:
+    """Generates the slotted version of a code bindings package
+
+    Args:
+        package_name (str): The name of the code bindings package, e.g. base_event
+
+    Returns:
+        dict[str, str]: The source of each module, by file name
+    """
+    import black  # pylint: disable=import-outside-toplevel
+
+    package = importlib.import_module(f"{BINDINGS_PACKAGE}.{package_name}")
+    models = get_models(package)
+    files = {
+        f"{model.__name__}.py": render_model(model.__module__, model)
+        for model in models
+    }
+    files["__init__.py"] = render_init(package_name, models)
+    files["marshaller.py"] = render_marshaller(package_name)
+    return {
+        file_name: black.format_str(source, mode=black.Mode())
+        for file_name, source in files.items()
+    }
+
+
+def write(package_name: str) -> Path:
+    """Generates the slotted version of a code bindings package and writes it
+
+    Args:
+        package_name (str): The name of the code bindings package
+
+    Returns:
+        Path: The directory the package was written to
+    """
+    path = BINDINGS_PATH / f"{package_name}{SLOTTED_SUFFIX}"
+    path.mkdir(exist_ok=True)
+    for file_name, source in generate(package_name).items():
+        (path / file_name).write_text(source, encoding="utf-8")
+    return path
+
+
+def main() -> None:
+    """Generates the slotted bindings packages"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "packages",
+        nargs="*",
+        default=GENERATED_PACKAGES,
+        help="code bindings packages to generate slotted versions of",
+    )
+    args = parser.parse_args()
+    for package_name in args.packages:
+        print(f"Generated {write(package_name)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Unit tests for the async event publisher"""
+
+import json
+import os
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ClientError, ParamValidationError
+from pytest_mock import MockerFixture
+
+from lambdas.utils.event_utilities.async_event_publisher import AsyncEventPublisher
+from lambdas.utils.event_utilities.batch_event_publisher import BatchEventPublisher
+
+FILE_PATH = "lambdas.utils.event_utilities.async_event_publisher"
+QUEUE_URL = "https://sqs.eu-west-2.amazonaws.com/123456789012/audit-fallback"
+
+
+@pytest.fixture(autouse=True)
+def mock_write_log(mocker: MockerFixture) -> None:
+    """Patch the loggers, which are initialised by the lambda"""
+    mocker.patch(f"{FILE_PATH}.write_log")
+    mocker.patch("lambdas.utils.event_utilities.batch_event_publisher.write_log")
+
+
+@pytest.fixture(name="client")
+def setup_client() -> MagicMock:
+    """Create an EventBridge client where every entry succeeds"""
+    client = MagicMock()
+    client.put_events.side_effect = lambda Entries: {
+        "Entries": [{"EventId": str(index)} for index, _ in enumerate(Entries)]
+    }
+    return client
+
+
+@pytest.fixture(name="spool_path")
+def setup_spool_path(tmp_path) -> str:
+    """Return a spool file path for the test"""
+    return str(tmp_path / "audit_events.jsonl")
+
+
+def create_entry(index: int) -> dict:
+    """Returns a PutEvents entry"""
+    return {
+        "DetailType": f"Type {index}",
+        "Detail": "{}",
+        "EventBusName": "event-bus",
+        "Source": "Source",
+    }
+
+
+def create_publisher(client: MagicMock, spool_path: str, **kwargs):
+    """Returns a publisher using the client"""
+    return AsyncEventPublisher(
+        spool_path=spool_path,
+        publisher_factory=lambda: BatchEventPublisher(
+            client, max_age=60, retry_backoff=0
+        ),
+        **kwargs,
+    )
+
+
+def sent_entries(client: MagicMock) -> list[str]:
+    """Returns the detail type of each entry sent to EventBridge"""
+    return [
+        entry["DetailType"]
+        for call in client.put_events.call_args_list
+        for entry in call.kwargs["Entries"]
+    ]
+
+
+def test_submitted_events_are_published_in_the_background(
+    client: MagicMock, spool_path: str
+) -> None:
+    """Test that submitted events are published by the worker before drain returns"""
+    # Arrange
+    publisher = create_publisher(client, spool_path)
+    # Act
+    for index in range(3):
+        publisher.submit(create_entry(index))
+    publisher.drain(timeout=5)
+    # Assert
+    assert publisher.started
+    assert sorted(sent_entries(client)) == ["Type 0", "Type 1", "Type 2"]
+
+
+def test_events_are_spooled_when_the_queue_is_full(
+    client: MagicMock, spool_path: str
+) -> None:
+    """Test that events that cannot be queued are spooled, then published by drain"""
+    # Arrange
+    release = threading.Event()
+
+    def put_events(Entries: list) -> dict:
+        release.wait(5)
+        return {"Entries": [{"EventId": "1"} for _ in Entries]}
+
+    client.put_events.side_effect = put_events
+    publisher = create_publisher(client, spool_path, max_queue_size=1)
+    # Act
+    for index in range(4):
+        publisher.submit(create_entry(index))
+    with open(spool_path, "r", encoding="utf-8") as file:
+        spooled = [json.loads(line)["DetailType"] for line in file]
+    release.set()
+    publisher.drain(timeout=5)
+    # Assert
+    assert spooled
+    assert sorted(sent_entries(client)) == ["Type 0", "Type 1", "Type 2", "Type 3"]
+
+
+def test_events_not_published_before_the_timeout_are_spooled(
+    client: MagicMock, spool_path: str, mocker: MockerFixture
+) -> None:
+    """Test that queued events are spooled and sent to the fallback queue on timeout"""
+    # Arrange
+    started = threading.Event()
+    release = threading.Event()
+
+    def put_events(Entries: list) -> dict:
+        started.set()
+        release.wait(5)
+        return {"Entries": [{"EventId": "1"} for _ in Entries]}
+
+    client.put_events.side_effect = put_events
+    mock_get_client = mocker.patch(f"{FILE_PATH}.get_client")
+    mock_get_client.return_value.send_message_batch.return_value = {"Failed": []}
+    publisher = create_publisher(client, spool_path, fallback_queue_url=QUEUE_URL)
+    # Act
+    publisher.submit(create_entry(0))
+    started.wait(5)
+    for index in range(1, 3):
+        publisher.submit(create_entry(index))
+    publisher.drain(timeout=0.1)
+    release.set()
+    publisher.drain(timeout=5)
+    # Assert
+    mock_get_client.assert_called_once_with("sqs")
+    sqs_entries = mock_get_client.return_value.send_message_batch.call_args.kwargs
+    assert sqs_entries["QueueUrl"] == QUEUE_URL
+    assert [
+        json.loads(entry["MessageBody"])["DetailType"]
+        for entry in sqs_entries["Entries"]
+    ] == ["Type 1", "Type 2"]
+
+
+def test_events_buffered_by_the_worker_are_spooled_on_timeout(
+    client: MagicMock, spool_path: str
+) -> None:
+    """Test that events buffered by the worker are not lost when drain times out"""
+    # Arrange
+    blocked = threading.Event()
+    release = threading.Event()
+
+    class BlockingPublisher(BatchEventPublisher):
+        """Blocks while buffering the second event"""
+
+        def publish(self, detail_type, detail, event_bus_name, source) -> bool:
+            if detail_type == "Type 1":
+                blocked.set()
+                release.wait(5)
+            return super().publish(detail_type, detail, event_bus_name, source)
+
+    publisher = AsyncEventPublisher(
+        spool_path=spool_path,
+        publisher_factory=lambda: BlockingPublisher(
+            client, max_age=60, retry_backoff=0
+        ),
+    )
+    # Act
+    for index in range(3):
+        publisher.submit(create_entry(index))
+    blocked.wait(5)
+    publisher.drain(timeout=0)
+    forwarded = sent_entries(client)
+    release.set()
+    publisher.drain(timeout=5)
+    # Assert
+    assert forwarded == ["Type 0", "Type 2"]
+    assert sorted(sent_entries(client)) == ["Type 0", "Type 1", "Type 2"]
+
+
+def test_events_of_a_rejected_batch_are_spooled_and_published(
+    client: MagicMock, spool_path: str
+) -> None:
+    """Test that every event of a batch PutEvents rejects is kept, not just the last"""
+    # Arrange
+    delivered = []
+
+    def put_events(Entries: list) -> dict:
+        if client.put_events.call_count == 1:
+            raise ParamValidationError(report="Invalid type for parameter")
+        delivered.extend(entry["DetailType"] for entry in Entries)
+        return {"Entries": [{"EventId": "1"} for _ in Entries]}
+
+    client.put_events.side_effect = put_events
+    publisher = create_publisher(client, spool_path)
+    # Act
+    for index in range(10):
+        publisher.submit(create_entry(index))
+    publisher.drain(timeout=5)
+    # Assert
+    assert sorted(delivered) == sorted(f"Type {index}" for index in range(10))
+
+
+def test_failed_events_are_sent_to_the_fallback_queue(
+    client: MagicMock, spool_path: str, mocker: MockerFixture
+) -> None:
+    """Test that events EventBridge rejects are spooled and sent to the fallback queue"""
+    # Arrange
+    client.put_events.side_effect = lambda Entries: {
+        "Entries": [{"ErrorCode": "InternalFailure"} for _ in Entries]
+    }
+    mock_get_client = mocker.patch(f"{FILE_PATH}.get_client")
+    mock_get_client.return_value.send_message_batch.return_value = {"Failed": []}
+    publisher = create_publisher(client, spool_path, fallback_queue_url=QUEUE_URL)
+    # Act
+    publisher.submit(create_entry(0))
+    publisher.drain(timeout=5)
+    # Assert
+    mock_get_client.return_value.send_message_batch.assert_called_once_with(
+        QueueUrl=QUEUE_URL,
+        Entries=[{"Id": "0", "MessageBody": json.dumps(create_entry(0))}],
+    )
+
+
+def test_events_the_fallback_queue_rejects_stay_spooled(
+    client: MagicMock, spool_path: str, mocker: MockerFixture
+) -> None:
+    """Test that events SQS rejects are kept in the spool for the next drain"""
+    # Arrange
+    client.put_events.side_effect = lambda Entries: {
+        "Entries": [{"ErrorCode": "InternalFailure"} for _ in Entries]
+    }
+    mock_get_client = mocker.patch(f"{FILE_PATH}.get_client")
+    mock_get_client.return_value.send_message_batch.return_value = {
+        "Failed": [{"Id": "0", "Code": "InternalError"}]
+    }
+    publisher = create_publisher(client, spool_path, fallback_queue_url=QUEUE_URL)
+    # Act
+    publisher.submit(create_entry(0))
+    publisher.drain(timeout=5)
+    # Assert
+    with open(spool_path, "r", encoding="utf-8") as file:
+        assert [json.loads(line) for line in file] == [create_entry(0)]
+
+
+def write_spool(spool_path: str, entries: list[dict]) -> None:
+    """Writes the entries to the spool file"""
+    with open(spool_path, "w", encoding="utf-8") as file:
+        for entry in entries:
+            file.write(json.dumps(entry) + "\n")
+
+
+def test_oversized_spooled_event_is_dropped(client: MagicMock, spool_path: str) -> None:
+    """Test that an event too large to publish does not stay in the spool"""
+    # Arrange
+    oversized = {**create_entry(3), "Detail": json.dumps({"data": "x" * 300 * 1024})}
+    write_spool(
+        spool_path, [create_entry(0), create_entry(1), create_entry(2), oversized]
+    )
+    publisher = create_publisher(client, spool_path)
+    # Act
+    publisher.drain()
+    # Assert
+    assert sent_entries(client) == ["Type 0", "Type 1", "Type 2"]
+    assert not os.path.exists(spool_path)
+
+
+def test_only_failed_spooled_events_are_spooled_again(
+    client: MagicMock, spool_path: str
+) -> None:
+    """Test that spooled events already sent are not spooled and sent again"""
+    # Arrange
+    client.put_events.side_effect = [
+        {"Entries": [{"EventId": str(index)} for index in range(10)]},
+        ClientError({"Error": {"Code": "InternalException"}}, "PutEvents"),
+    ]
+    write_spool(spool_path, [create_entry(index) for index in range(11)])
+    publisher = create_publisher(client, spool_path)
+    # Act
+    publisher.drain()
+    # Assert
+    with open(spool_path, "r", encoding="utf-8") as file:
+        assert [json.loads(line) for line in file] == [create_entry(10)]
+
+
+def test_drain_before_any_events_are_submitted(
+    client: MagicMock, spool_path: str
+) -> None:
+    """Test that drain returns straight away when there is nothing to publish"""
+    # Arrange
+    publisher = create_publisher(client, spool_path)
+    # Act
+    publisher.drain()
+    # Assert
+    assert not publisher.started
+    client.put_events.assert_not_called()
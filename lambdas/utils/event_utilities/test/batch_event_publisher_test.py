@@ -0,0 +1,305 @@
+"""Unit tests for the batch event publisher"""
+
+import json
+import threading
+from time import sleep
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ParamValidationError
+from pytest_mock import MockerFixture
+
+from lambdas.utils.event_utilities import batch_event_publisher
+from lambdas.utils.event_utilities.batch_event_publisher import (
+    BatchEventPublisher,
+    BatchValidationResultEventPublisher,
+    EventPublishError,
+    flush_all,
+)
+
+FILE_PATH = "lambdas.utils.event_utilities.batch_event_publisher"
+
+
+@pytest.fixture(autouse=True)
+def mock_write_log(mocker: MockerFixture) -> MagicMock:
+    """Patch the logger, which is initialised by the lambda"""
+    return mocker.patch(f"{FILE_PATH}.write_log")
+
+
+@pytest.fixture(name="client")
+def setup_client() -> MagicMock:
+    """Create an EventBridge client where every entry succeeds"""
+    client = MagicMock()
+    client.put_events.side_effect = lambda Entries: {
+        "FailedEntryCount": 0,
+        "Entries": [{"EventId": str(index)} for index, _ in enumerate(Entries)],
+    }
+    return client
+
+
+def publish(publisher: BatchEventPublisher, count: int, detail: str = "{}") -> None:
+    """Publish a number of events"""
+    for index in range(count):
+        publisher.publish(f"Type {index}", detail, "event-bus", "Source")
+
+
+def sent_batches(client: MagicMock) -> list[list[dict]]:
+    """Returns the entries of each PutEvents call"""
+    return [call.kwargs["Entries"] for call in client.put_events.call_args_list]
+
+
+def test_events_are_buffered_until_the_batch_is_full(client: MagicMock) -> None:
+    """Test that 10 events are sent in a single call"""
+    # Arrange
+    publisher = BatchEventPublisher(client, max_age=60)
+    # Act
+    publish(publisher, 9)
+    pending = publisher.pending()
+    publish(publisher, 1)
+    # Assert
+    assert pending == 9
+    assert [len(batch) for batch in sent_batches(client)] == [10]
+    assert publisher.pending() == 0
+    assert len(publisher.batch_latencies) == 1
+
+
+def test_batch_is_sent_before_it_exceeds_the_size_limit(client: MagicMock) -> None:
+    """Test that an event that would take the batch over the size limit starts a new batch"""
+    # Arrange
+    publisher = BatchEventPublisher(client, max_bytes=100, max_age=60)
+    entry_size = publisher.get_entry_size(
+        {"DetailType": "Type 0", "Detail": "x" * 30, "Source": "Source"}
+    )
+    # Act
+    publish(publisher, 3, detail="x" * 30)
+    publisher.flush()
+    # Assert
+    assert entry_size == 56
+    assert [len(batch) for batch in sent_batches(client)] == [1, 1, 1]
+
+
+def test_only_the_most_recent_latencies_are_kept(
+    client: MagicMock, mocker: MockerFixture
+) -> None:
+    """Test that a long lived publisher does not keep every latency"""
+    # Arrange
+    mocker.patch(f"{FILE_PATH}.LATENCY_SAMPLES", 3)
+    publisher = BatchEventPublisher(client, max_entries=1, max_age=60)
+    # Act
+    publish(publisher, 5)
+    # Assert
+    assert client.put_events.call_count == 5
+    assert len(publisher.batch_latencies) == 3
+
+
+def test_events_older_than_the_maximum_age_are_sent(client: MagicMock) -> None:
+    """Test that the batch is sent once the oldest event has reached the maximum age"""
+    # Arrange
+    publisher = BatchEventPublisher(client, max_age=0)
+    # Act
+    publish(publisher, 2)
+    # Assert
+    assert [len(batch) for batch in sent_batches(client)] == [1, 1]
+
+
+def test_aged_batch_is_sent_without_another_event(client: MagicMock) -> None:
+    """Test that the timer sends the batch once it reaches the maximum age"""
+    # Arrange
+    sent = threading.Event()
+    send = client.put_events.side_effect
+    client.put_events.side_effect = lambda Entries: (sent.set(), send(Entries))[1]
+    publisher = BatchEventPublisher(client, max_age=0.05)
+    # Act
+    publish(publisher, 2)
+    # Assert
+    assert sent.wait(5)
+    assert [len(batch) for batch in sent_batches(client)] == [2]
+    assert publisher.pending() == 0
+
+
+def test_entries_the_timer_fails_to_send_are_raised_by_flush(
+    client: MagicMock,
+) -> None:
+    """Test that entries failing in a batch sent by the timer are not lost"""
+    # Arrange
+    sent = threading.Event()
+
+    def put_events(Entries: list) -> dict:
+        sent.set()
+        return {"Entries": [{"ErrorCode": "InternalFailure"} for _ in Entries]}
+
+    client.put_events.side_effect = put_events
+    publisher = BatchEventPublisher(
+        client, max_age=0.05, max_retries=0, retry_backoff=0
+    )
+    publish(publisher, 1)
+    sent.wait(5)
+    # Act & Assert
+    with pytest.raises(EventPublishError, match="InternalFailure") as error:
+        for _ in range(100):
+            publisher.flush()
+            sleep(0.01)
+    assert error.value.failed_entries[0]["DetailType"] == "Type 0"
+    assert publisher.take_pending() == []
+
+
+def test_flush(client: MagicMock) -> None:
+    """Test that flush sends the buffered events, and does nothing when there are none"""
+    # Arrange
+    publisher = BatchEventPublisher(client, max_age=60)
+    publish(publisher, 3)
+    # Act
+    publisher.flush()
+    publisher.flush()
+    # Assert
+    assert sent_batches(client) == [
+        [
+            {
+                "DetailType": f"Type {index}",
+                "Detail": "{}",
+                "EventBusName": "event-bus",
+                "Source": "Source",
+            }
+            for index in range(3)
+        ]
+    ]
+
+
+def test_only_failed_entries_are_retried(client: MagicMock) -> None:
+    """Test that the entries that failed in a partially successful call are retried"""
+    # Arrange
+    client.put_events.side_effect = [
+        {
+            "FailedEntryCount": 1,
+            "Entries": [
+                {"EventId": "1"},
+                {"ErrorCode": "ThrottlingException"},
+                {"EventId": "3"},
+            ],
+        },
+        {"FailedEntryCount": 0, "Entries": [{"EventId": "2"}]},
+    ]
+    publisher = BatchEventPublisher(client, max_age=60, retry_backoff=0)
+    publish(publisher, 3)
+    # Act
+    publisher.flush()
+    # Assert
+    batches = sent_batches(client)
+    assert [entry["DetailType"] for entry in batches[1]] == ["Type 1"]
+    assert len(publisher.batch_latencies) == 2
+
+
+def test_entries_failing_every_retry_raise_an_error(client: MagicMock) -> None:
+    """Test that an error is raised with the entries that still fail after retrying"""
+    # Arrange
+    client.put_events.side_effect = lambda Entries: {
+        "FailedEntryCount": 1,
+        "Entries": [{"ErrorCode": "InternalFailure"}],
+    }
+    publisher = BatchEventPublisher(client, max_age=60, max_retries=2, retry_backoff=0)
+    publish(publisher, 1)
+    # Act & Assert
+    with pytest.raises(EventPublishError, match="InternalFailure") as error:
+        publisher.flush()
+    assert client.put_events.call_count == 3
+    assert error.value.failed_entries[0]["DetailType"] == "Type 0"
+
+
+def test_rejected_put_events_call_raises_an_error_with_the_batch(
+    client: MagicMock,
+) -> None:
+    """Test that the whole batch is handed back when PutEvents rejects the call"""
+    # Arrange
+    validation_error = ParamValidationError(report="Invalid type for parameter")
+    client.put_events.side_effect = validation_error
+    publisher = BatchEventPublisher(client, max_age=60)
+    publish(publisher, 3)
+    # Act & Assert
+    with pytest.raises(EventPublishError, match="ParamValidationError") as error:
+        publisher.flush()
+    assert [entry["DetailType"] for entry in error.value.failed_entries] == [
+        "Type 0",
+        "Type 1",
+        "Type 2",
+    ]
+    assert error.value.__cause__ is validation_error
+    assert publisher.pending() == 0
+
+
+def test_events_larger_than_the_size_limit_are_rejected(client: MagicMock) -> None:
+    """Test that an event that cannot fit in any batch raises an error"""
+    # Arrange
+    publisher = BatchEventPublisher(client, max_bytes=100)
+    # Act & Assert
+    with pytest.raises(ValueError):
+        publish(publisher, 1, detail="x" * 100)
+    client.put_events.assert_not_called()
+
+
+def test_events_with_a_field_that_is_not_a_string_are_rejected(
+    client: MagicMock,
+) -> None:
+    """Test that an event PutEvents would reject is not buffered"""
+    # Arrange
+    publisher = BatchEventPublisher(client, max_age=60)
+    # Act & Assert
+    with pytest.raises(ValueError, match="Detail must be a string"):
+        publisher.publish("Type 0", {"detail": "value"}, "event-bus", "Source")
+    assert publisher.pending() == 0
+
+
+def test_validation_result_events_are_marshalled_and_buffered(
+    client: MagicMock, mocker: MockerFixture
+) -> None:
+    """Test that the validation result publisher buffers the marshalled event"""
+    # Arrange
+    marshall = mocker.patch.object(
+        BatchValidationResultEventPublisher,
+        "_try_marshall",
+        return_value={"Detail": {"detail": "value"}},
+    )
+    validation_result = MagicMock(
+        DetailType="Validation Successful", EventBusName="bus", Source="Source"
+    )
+    publisher = BatchValidationResultEventPublisher(client, max_age=60)
+    # Act
+    publisher.publish(validation_result)
+    pending = publisher.pending()
+    publisher.flush()
+    # Assert
+    assert pending == 1
+    marshall.assert_called_once_with(validation_result)
+    assert sent_batches(client)[0][0]["Detail"] == json.dumps({"detail": "value"})
+
+
+def test_flush_all_sends_events_of_every_publisher(client: MagicMock) -> None:
+    """Test that the events buffered by every publisher are sent at exit"""
+    # Arrange
+    publishers = [BatchEventPublisher(client, max_age=60) for _ in range(2)]
+    for publisher in publishers:
+        publish(publisher, 1)
+    # Act
+    flush_all()
+    # Assert
+    assert client.put_events.call_count == 2
+    assert all(publisher.pending() == 0 for publisher in publishers)
+
+
+def test_flush_all_logs_failures(
+    client: MagicMock, mock_write_log: MagicMock, mocker: MockerFixture
+) -> None:
+    """Test that a publisher failing to send at exit does not stop the others"""
+    # Arrange
+    failing = MagicMock()
+    failing.flush.side_effect = EventPublishError([{}], {"InternalFailure"})
+    publisher = BatchEventPublisher(client, max_age=60)
+    publish(publisher, 1)
+    mocker.patch.object(batch_event_publisher, "_PUBLISHERS", [failing, publisher])
+    # Act
+    flush_all()
+    # Assert
+    assert publisher.pending() == 0
+    mock_write_log.assert_any_call(
+        "ERROR",
+        {"info": "Failed to send buffered events", "error": failing.flush.side_effect},
+    )
@@ -0,0 +1,185 @@
+"""Unit tests for the compiled marshaller, compared with the generated marshallers"""
+
+import datetime
+import json
+from pathlib import Path
+
+import pytest
+
+from lambdas.utils.code_bindings import base_event, validation_result
+from lambdas.utils.code_bindings.validation_result import (
+    Detail,
+    Detail_metadata,
+    Detail_sensitive,
+    Detail_standard,
+)
+from lambdas.utils.code_bindings.validation_result import Event as ValidationResult
+from lambdas.utils.code_bindings.validation_result import (
+    Marshaller as ValidationResultMarshaller,
+)
+from lambdas.utils.event_utilities.compiled_marshaller import CompiledMarshaller
+
+
+@pytest.fixture(name="marshaller")
+def setup_marshaller() -> CompiledMarshaller:
+    """Create a compiled marshaller for the validation result bindings"""
+    return CompiledMarshaller(validation_result, ValidationResultMarshaller)
+
+
+@pytest.fixture(name="event")
+def setup_event() -> ValidationResult:
+    """Create a validation result event"""
+    return ValidationResult(
+        Detail(
+            Detail_metadata(
+                client_key="client key",
+                correlation_id="correlation id",
+                created=datetime.datetime(2024, 1, 2, 3, 4, 5),
+                request_id="request id",
+            ),
+            Detail_sensitive(
+                patient_identifier="9435797881", proxy_identifier="9435775039"
+            ),
+            Detail_standard(
+                proxy_identifier_type="NHS Number",
+                relationship_type="MTH",
+                validation_result_info={"VALIDATED_PROXY": "Validated Proxy"},
+            ),
+        ),
+        DetailType="Validation Successful",
+        EventBusName="event-bus",
+        Source="Validation Service",
+    )
+
+
+def test_marshall_event(marshaller: CompiledMarshaller, event: ValidationResult):
+    """Test that an event is marshalled as the generated marshaller does"""
+    # Act
+    result = marshaller.marshall(event)
+    # Assert
+    assert result == ValidationResultMarshaller.marshall(event)
+    assert list(result["Detail"]["metadata"]) == [
+        "client-key",
+        "correlation-id",
+        "created",
+        "request-id",
+    ]
+    assert result["Detail"]["metadata"]["created"] == "2024-01-02T03:04:05"
+
+
+def test_marshall_omits_fields_that_are_not_set(marshaller: CompiledMarshaller):
+    """Test that fields set to None are not included"""
+    # Arrange
+    event = ValidationResult(Detail(Detail_metadata(request_id="request id")))
+    # Act
+    result = marshaller.marshall(event)
+    # Assert
+    assert result == {"Detail": {"metadata": {"request-id": "request id"}}}
+    assert result == ValidationResultMarshaller.marshall(event)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        "text",
+        1,
+        1.5,
+        True,
+        b"bytes",
+        datetime.date(2024, 1, 2),
+        [1, "two", datetime.date(2024, 1, 2), None],
+        (1, "two"),
+        {"key": [datetime.datetime(2024, 1, 2, 3, 4, 5)], "none": None},
+    ],
+)
+def test_marshall_values(marshaller: CompiledMarshaller, value):
+    """Test that field values are marshalled as the generated marshaller does"""
+    # Act & Assert
+    assert marshaller.marshall(value) == ValidationResultMarshaller.marshall(value)
+
+
+def test_marshall_plans_are_reused(marshaller: CompiledMarshaller, event):
+    """Test that the plan for a type is built once"""
+    # Act
+    marshaller.marshall(event)
+    plans = dict(marshaller._marshall_plans)  # pylint: disable=protected-access
+    marshaller.marshall(event)
+    # Assert
+    assert plans == marshaller._marshall_plans  # pylint: disable=protected-access
+    assert ValidationResult in plans
+
+
+def test_unmarshall_event(marshaller: CompiledMarshaller):
+    """Test that an event is unmarshalled as the generated marshaller does"""
+    # Arrange
+    with open(
+        Path(Path(__file__).parent, "validation-failed-event.json"), encoding="utf-8"
+    ) as file:
+        event = json.load(file)
+    data = {"Detail": event["detail"], "DetailType": event["detail-type"]}
+    # Act
+    result = marshaller.unmarshall(data, ValidationResult)
+    # Assert
+    assert result == ValidationResultMarshaller.unmarshall(data, ValidationResult)
+    assert result.Detail.metadata.correlation_id is not None
+
+
+def test_unmarshall_base_event():
+    """Test that the marshaller can be used with another binding package"""
+    # Arrange
+    marshaller = CompiledMarshaller(base_event, base_event.Marshaller)
+    data = {"Detail": {"metadata": {"request-id": "request id"}}, "Source": "Source"}
+    # Act
+    result = marshaller.unmarshall(data, "Event")
+    # Assert
+    assert result == base_event.Marshaller.unmarshall(data, "Event")
+    assert result.Detail.metadata.request_id == "request id"
+
+
+@pytest.mark.parametrize(
+    "data, type_name",
+    [
+        (["1", "2"], "list[int]"),
+        ({"a": "1.5"}, "dict(str, float)"),
+        ({"a": [1]}, "dict(str, list[str])"),
+        ("text", "str"),
+        ({"a": 1}, "object"),
+        ([1], "int"),
+        ("2024-01-02", "date"),
+        ("2024-01-02T03:04:05", "datetime"),
+    ],
+)
+def test_unmarshall_values(marshaller: CompiledMarshaller, data, type_name: str):
+    """Test that values are unmarshalled as the generated marshaller does"""
+    # Act & Assert
+    assert marshaller.unmarshall(
+        data, type_name
+    ) == ValidationResultMarshaller.unmarshall(data, type_name)
+
+
+def test_unmarshall_models_choosing_their_type_use_the_generated_marshaller(
+    marshaller: CompiledMarshaller, mocker
+):
+    """Test that models with get_real_child_model are left to the generated marshaller"""
+
+    # Arrange
+    class Polymorphic:
+        """Model that chooses its type from the data"""
+
+        _types = {"value": "str"}
+        _attribute_map = {"value": "value"}
+
+        def __init__(self, value=None):
+            self.value = value
+
+        def get_real_child_model(self, data):
+            """Returns the name of the model for the data"""
+            return None
+
+    unmarshall = mocker.patch.object(marshaller.marshaller, "unmarshall")
+    # Act
+    result = marshaller.unmarshall({"value": "1"}, Polymorphic)
+    # Assert
+    assert result == unmarshall.return_value
+    unmarshall.assert_called_once_with({"value": "1"}, Polymorphic)
@@ -0,0 +1,144 @@
+"""Unit tests for the slotted code bindings, compared with the generated bindings"""
+
+import datetime
+import json
+from pathlib import Path
+
+import pytest
+
+from lambdas.utils.code_bindings import (
+    base_event,
+    base_event_slotted,
+    validation_result,
+    validation_result_slotted,
+)
+from lambdas.utils.event_utilities import slotted_bindings
+from lambdas.utils.event_utilities.compiled_marshaller import CompiledMarshaller
+from lambdas.utils.event_utilities.event_consumer import unmarshall
+
+SAMPLE_EVENT = Path(Path(__file__).parent, "validation-failed-event.json")
+
+
+def create_event(bindings) -> object:
+    """Create a validation result event with the classes of a bindings package"""
+    return bindings.Event(
+        bindings.Detail(
+            bindings.Detail_metadata(
+                client_key="client key",
+                correlation_id="correlation id",
+                created=datetime.datetime(2024, 1, 2, 3, 4, 5),
+                request_id="request id",
+            ),
+            bindings.Detail_sensitive(
+                patient_identifier="9435797881", proxy_identifier="9435775039"
+            ),
+            bindings.Detail_standard(
+                proxy_identifier_type="NHS Number",
+                relationship_type="MTH",
+                validation_result_info={"VALIDATED_PROXY": "Validated Proxy"},
+            ),
+        ),
+        DetailType="Validation Successful",
+        EventBusName="event-bus",
+        Source="Validation Service",
+    )
+
+
+@pytest.mark.parametrize("package_name", slotted_bindings.GENERATED_PACKAGES)
+def test_slotted_bindings_are_up_to_date(package_name: str):
+    """Test that the slotted bindings match the bindings they are generated from"""
+    # Arrange
+    path = slotted_bindings.BINDINGS_PATH / f"{package_name}_slotted"
+    # Act
+    generated = slotted_bindings.generate(package_name)
+    # Assert
+    assert sorted(generated) == sorted(file.name for file in path.glob("*.py"))
+    for file_name, source in generated.items():
+        assert source == (path / file_name).read_text(encoding="utf-8"), file_name
+
+
+@pytest.mark.parametrize(
+    "bindings, slotted",
+    [(validation_result, validation_result_slotted), (base_event, base_event_slotted)],
+)
+def test_slotted_bindings_match_the_generated_bindings(bindings, slotted):
+    """Test that every class is generated with the same fields and no __dict__"""
+    # Arrange
+    models = slotted_bindings.get_models(bindings)
+    # Act
+    slotted_models = slotted_bindings.get_models(slotted)
+    # Assert
+    assert [model.__name__ for model in slotted_models] == [
+        model.__name__ for model in models
+    ]
+    for model, slotted_model in zip(models, slotted_models):
+        assert slotted_model._types == model._types
+        assert slotted_model._attribute_map == model._attribute_map
+        assert not hasattr(slotted_model(), "__dict__")
+
+
+def test_marshall_slotted_event():
+    """Test that a slotted event is marshalled as the generated event is"""
+    # Arrange
+    event = create_event(validation_result_slotted)
+    # Act
+    result = validation_result_slotted.Marshaller.marshall(event)
+    # Assert
+    assert result == validation_result.Marshaller.marshall(
+        create_event(validation_result)
+    )
+    assert result == CompiledMarshaller(
+        validation_result_slotted, validation_result_slotted.Marshaller
+    ).marshall(event)
+
+
+def test_unmarshall_slotted_event():
+    """Test that an event from the event bus is unmarshalled into slotted classes"""
+    # Arrange
+    with open(SAMPLE_EVENT, encoding="utf-8") as file:
+        event = json.load(file)
+    # Act
+    result = unmarshall(
+        event,
+        validation_result_slotted.Marshaller.unmarshall,
+        validation_result_slotted.Event,
+    )
+    # Assert
+    expected = unmarshall(
+        event, validation_result.Marshaller.unmarshall, validation_result.Event
+    )
+    assert isinstance(result.Detail.metadata, validation_result_slotted.Detail_metadata)
+    assert result.to_dict() == expected.to_dict()
+    assert result == CompiledMarshaller(
+        validation_result_slotted, validation_result_slotted.Marshaller
+    ).unmarshall(
+        {
+            "Detail": event["detail"],
+            "DetailType": event["detail-type"],
+            "Source": event["source"],
+        },
+        "Event",
+    )
+
+
+def test_slotted_event_equality_and_repr():
+    """Test that slotted events compare by value and are printed as a dictionary"""
+    # Arrange
+    event = create_event(validation_result_slotted)
+    # Act
+    other = create_event(validation_result_slotted)
+    other.Detail.standard.relationship_type = "PRN"
+    # Assert
+    assert event == create_event(validation_result_slotted)
+    assert event != other
+    assert event != create_event(validation_result)
+    assert repr(event) == repr(create_event(validation_result))
+
+
+def test_render_marshaller_requires_the_package_import(mocker):
+    """Test that a marshaller that does not import its package is rejected"""
+    # Arrange
+    mocker.patch.object(Path, "read_text", return_value="import datetime\n")
+    # Act & Assert
+    with pytest.raises(ValueError, match="does not import its package"):
+        slotted_bindings.render_marshaller("base_event")
@@ -0,0 +1,251 @@
+"""Streams the records of a Firehose data transformation.
+
+A transformation lambda receives a batch of up to 6 MB of base64 encoded records and
+returns every record with its result and transformed data. `transform_records`
+decodes, transforms and encodes one record at a time, and releases the data of each
+input record once it has been transformed, so the batch is not held in memory in
+both its input and output form. `BatchMetrics` measures the throughput of a batch,
+to be logged once per batch rather than once per record.
+
+`transform_batch` transforms a batch on every vCPU of the lambda when
+FIREHOSE_TRANSFORM_MODE is 'parallel' and the batch is large enough. The records
+are split into one contiguous partition per vCPU, each transformed in a forked
+worker process, and the partitions joined in order. Lambda has no /dev/shm, which
+multiprocessing.Pool and Queue need, so each worker returns its partition through a
+Pipe. A partition whose worker fails is transformed again in the lambda process.
+Workers are forked, so the transform does not need to be picklable, but the lambda
+should not be running other threads when a batch is transformed.
+
+JSON is parsed and serialised with orjson when it is installed, otherwise with the
+json module.
+"""
+
+import json
+import multiprocessing
+import os
+from base64 import b64decode, b64encode
+from collections import Counter
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from os import getenv
+from time import perf_counter
+from typing import Any, Callable, Iterator, Optional, Union
+
+from lambdas.utils.lazy_import import lazy_import
+
+orjson = lazy_import("orjson", optional=True)
+
+TRANSFORM_MODE = getenv("FIREHOSE_TRANSFORM_MODE", "serial")
+PARALLEL_MIN_RECORDS = int(getenv("FIREHOSE_PARALLEL_MIN_RECORDS", "200"))
+
+OK = "Ok"
+DROPPED = "Dropped"
+PROCESSING_FAILED = "ProcessingFailed"
+
+# Takes the decoded data of a record, returns the result and the transformed data
+Transform = Callable[[bytes], tuple[str, bytes]]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parses a JSON document
+
+    Args:
+        data (Union[bytes, str]): The JSON document
+
+    Returns:
+        Any: The parsed document
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialises an object to a UTF-8 encoded JSON document
+
+    Args:
+        obj (Any): The object to serialise
+
+    Returns:
+        bytes: The JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+@dataclass
+class BatchMetrics:
+    """The throughput of the transformation of a batch of records"""
+
+    records: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    results: Counter = field(default_factory=Counter)
+    started: float = field(default_factory=perf_counter)
+    duration: float = 0.0
+
+    def add(self, result: str, bytes_in: int, bytes_out: int) -> None:
+        """Adds a transformed record
+
+        Args:
+            result (str): The result of the transformation, e.g. 'Ok'
+            bytes_in (int): The size of the decoded input data
+            bytes_out (int): The size of the transformed data
+        """
+        self.records += 1
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.results[result] += 1
+        self.duration = perf_counter() - self.started
+
+    def merge(self, other: "BatchMetrics") -> None:
+        """Adds the records transformed in another part of the batch
+
+        Args:
+            other (BatchMetrics): The metrics of the other part of the batch
+        """
+        self.records += other.records
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.results.update(other.results)
+        self.duration = perf_counter() - self.started
+
+    @property
+    def records_per_second(self) -> float:
+        """The number of records transformed per second"""
+        return self.records / self.duration if self.duration else 0.0
+
+    def to_log(self) -> str:
+        """Returns a summary of the metrics to be logged"""
+        results = ", ".join(
+            f"{result}: {count}" for result, count in self.results.items()
+        )
+        return (
+            f"Processed {self.records} records ({self.bytes_in} bytes in, "
+            f"{self.bytes_out} bytes out) in {self.duration * 1000:.1f} ms, "
+            f"{self.records_per_second:.0f} records/s. Results: {results or 'none'}"
+        )
+
+
+def transform_records(
+    records: list[dict], transform: Transform, metrics: BatchMetrics
+) -> Iterator[dict]:
+    """Transforms Firehose records one at a time
+
+    The data of each input record is removed from it once it has been transformed.
+
+    Args:
+        records (list[dict]): The records of the Firehose event
+        transform (Transform): Transforms the decoded data of a record
+        metrics (BatchMetrics): Updated with each transformed record
+
+    Yields:
+        dict: The response record for each input record, in order
+    """
+    for record in records:
+        data = b64decode(record.pop("data"))
+        result, transformed = transform(data)
+        metrics.add(result, len(data), len(transformed))
+        yield {
+            "recordId": record["recordId"],
+            "result": result,
+            "data": b64encode(transformed).decode("ascii"),
+        }
+
+
+def get_worker_count() -> int:
+    """Returns the number of vCPUs available to the lambda"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def partition(records: list[dict], count: int) -> list[list[dict]]:
+    """Splits records into contiguous partitions of nearly equal size
+
+    Args:
+        records (list[dict]): The records to split
+        count (int): The number of partitions
+
+    Returns:
+        list[list[dict]]: The partitions, in record order, none of them empty
+    """
+    size, remainder = divmod(len(records), count)
+    partitions, start = [], 0
+    for index in range(count):
+        end = start + size + (1 if index < remainder else 0)
+        if end > start:
+            partitions.append(records[start:end])
+        start = end
+    return partitions
+
+
+def _transform_partition(
+    records: list[dict], transform: Transform, connection: Connection
+) -> None:
+    """Transforms a partition in a worker process and sends it to the lambda process"""
+    metrics = BatchMetrics()
+    connection.send((list(transform_records(records, transform, metrics)), metrics))
+    connection.close()
+
+
+def transform_batch(
+    records: list[dict],
+    transform: Transform,
+    metrics: BatchMetrics,
+    mode: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> list[dict]:
+    """Transforms a batch of Firehose records, in parallel when it is enabled
+
+    Batches of fewer than FIREHOSE_PARALLEL_MIN_RECORDS records, and batches on a
+    single vCPU, are transformed in the lambda process.
+
+    Args:
+        records (list[dict]): The records of the Firehose event
+        transform (Transform): Transforms the decoded data of a record
+        metrics (BatchMetrics): Updated with each transformed record
+        mode (str): 'serial' or 'parallel', defaults to FIREHOSE_TRANSFORM_MODE
+        workers (int): The number of processes, defaults to the number of vCPUs
+
+    Returns:
+        list[dict]: The response record for each input record, in order
+    """
+    workers = workers or get_worker_count()
+    if (
+        (mode or TRANSFORM_MODE) != "parallel"
+        or workers < 2
+        or len(records) < PARALLEL_MIN_RECORDS
+    ):
+        return list(transform_records(records, transform, metrics))
+
+    context = multiprocessing.get_context("fork")
+    first, *others = partition(records, workers)
+    running = []
+    for records_partition in others:
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_transform_partition,
+            args=(records_partition, transform, sender),
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+        running.append((process, receiver, records_partition))
+
+    outputs = list(transform_records(first, transform, metrics))
+    for process, receiver, records_partition in running:
+        try:
+            partition_outputs, partition_metrics = receiver.recv()
+        except EOFError:
+            # The worker failed before sending its partition
+            outputs.extend(transform_records(records_partition, transform, metrics))
+        else:
+            outputs.extend(partition_outputs)
+            metrics.merge(partition_metrics)
+        finally:
+            receiver.close()
+            process.join()
+    return outputs
@@ -0,0 +1,172 @@
+"""Unit tests for streaming Firehose records"""
+
+import os
+from base64 import b64decode, b64encode
+
+import pytest
+
+from lambdas.utils.firehose import records
+from lambdas.utils.firehose.records import (
+    OK,
+    PROCESSING_FAILED,
+    BatchMetrics,
+    dumps,
+    loads,
+    partition,
+    transform_batch,
+    transform_records,
+)
+
+
+def create_records(*data: bytes) -> list[dict]:
+    """Create Firehose records with the data"""
+    return [
+        {
+            "recordId": str(index),
+            "approximateArrivalTimestamp": 1,
+            "data": b64encode(value).decode(),
+        }
+        for index, value in enumerate(data)
+    ]
+
+
+def upper(data: bytes) -> tuple[str, bytes]:
+    """Transform that fails empty records and upper cases the others"""
+    return (OK, data.upper()) if data else (PROCESSING_FAILED, data)
+
+
+def test_transform_records():
+    """Test that each record is transformed and returned in order"""
+    # Arrange
+    batch = create_records(b"one", b"", b"three")
+    metrics = BatchMetrics()
+    # Act
+    result = list(transform_records(batch, upper, metrics))
+    # Assert
+    assert result == [
+        {"recordId": "0", "result": OK, "data": b64encode(b"ONE").decode()},
+        {"recordId": "1", "result": PROCESSING_FAILED, "data": ""},
+        {"recordId": "2", "result": OK, "data": b64encode(b"THREE").decode()},
+    ]
+    assert (metrics.records, metrics.bytes_in, metrics.bytes_out) == (3, 8, 8)
+    assert metrics.results == {OK: 2, PROCESSING_FAILED: 1}
+
+
+def test_transform_records_is_lazy():
+    """Test that records are transformed as they are read, releasing the input data"""
+    # Arrange
+    batch = create_records(b"one", b"two")
+    # Act
+    stream = transform_records(batch, upper, BatchMetrics())
+    first = next(stream)
+    # Assert
+    assert b64decode(first["data"]) == b"ONE"
+    assert "data" not in batch[0]
+    assert "data" in batch[1]
+
+
+def test_batch_metrics_to_log(mocker):
+    """Test that the metrics of a batch are summarised"""
+    # Arrange
+    mocker.patch.object(records, "perf_counter", side_effect=[10.5, 12.0])
+    metrics = BatchMetrics(started=10.0)
+    # Act
+    metrics.add(OK, 10, 5)
+    metrics.add(PROCESSING_FAILED, 20, 20)
+    # Assert
+    assert metrics.to_log() == (
+        "Processed 2 records (30 bytes in, 25 bytes out) in 2000.0 ms, 1 records/s. "
+        "Results: Ok: 1, ProcessingFailed: 1"
+    )
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+def test_json_codec(codec: str, mocker):
+    """Test that JSON is parsed and serialised with the json module or orjson"""
+    # Arrange
+    if codec == "orjson" and records.orjson is None:
+        pytest.skip("orjson is not installed")
+    if codec == "json":
+        mocker.patch.object(records, "orjson", None)
+    # Act
+    result = loads(dumps({"a": [1, "\u00e9", None]}))
+    # Assert
+    assert result == {"a": [1, "\u00e9", None]}
+
+
+@pytest.mark.parametrize(
+    "size, count, expected",
+    [(10, 3, [4, 3, 3]), (2, 4, [1, 1]), (0, 2, []), (6, 1, [6])],
+)
+def test_partition(size: int, count: int, expected: list[int]):
+    """Test that records are split into contiguous partitions of nearly equal size"""
+    # Arrange
+    batch = list(range(size))
+    # Act
+    result = partition(batch, count)
+    # Assert
+    assert [len(part) for part in result] == expected
+    assert [record for part in result for record in part] == batch
+
+
+@pytest.mark.parametrize(
+    "mode, workers, size", [("serial", 4, 10), ("parallel", 1, 10), ("parallel", 4, 3)]
+)
+def test_transform_batch_serial(mode: str, workers: int, size: int, mocker):
+    """Test that small batches, single vCPUs and serial mode do not start workers"""
+    # Arrange
+    mocker.patch.object(records, "PARALLEL_MIN_RECORDS", 5)
+    get_context = mocker.patch.object(records.multiprocessing, "get_context")
+    batch = create_records(*(b"record" for _ in range(size)))
+    # Act
+    result = transform_batch(batch, upper, BatchMetrics(), mode, workers)
+    # Assert
+    assert [record["recordId"] for record in result] == [str(i) for i in range(size)]
+    get_context.assert_not_called()
+
+
+def pid_transform(data: bytes) -> tuple[str, bytes]:
+    """Transform that returns the id of the process that transformed the record"""
+    return OK, str(os.getpid()).encode()
+
+
+def test_transform_batch_parallel(mocker):
+    """Test that partitions are transformed by workers and returned in order"""
+    # Arrange
+    mocker.patch.object(records, "PARALLEL_MIN_RECORDS", 5)
+    batch = create_records(*(b"record" for _ in range(12)))
+    metrics = BatchMetrics()
+    # Act
+    result = transform_batch(batch, pid_transform, metrics, "parallel", 3)
+    # Assert
+    assert [record["recordId"] for record in result] == [str(i) for i in range(12)]
+    pids = [b64decode(record["data"]).decode() for record in result]
+    assert pids[:4] == [str(os.getpid())] * 4
+    assert len(set(pids[4:8])) == 1 and len(set(pids[8:])) == 1
+    assert len(set(pids)) == 3
+    assert (metrics.records, metrics.results) == (12, {OK: 12})
+
+
+def test_transform_batch_worker_failure(mocker):
+    """Test that the partition of a failed worker is transformed in the lambda process"""
+    # Arrange
+    mocker.patch.object(records, "PARALLEL_MIN_RECORDS", 2)
+    parent = os.getpid()
+
+    def fail_in_worker(data: bytes) -> tuple[str, bytes]:
+        if os.getpid() != parent:
+            os._exit(1)
+        return upper(data)
+
+    batch = create_records(b"one", b"two", b"three", b"four")
+    metrics = BatchMetrics()
+    # Act
+    result = transform_batch(batch, fail_in_worker, metrics, "parallel", 2)
+    # Assert
+    assert [b64decode(record["data"]) for record in result] == [
+        b"ONE",
+        b"TWO",
+        b"THREE",
+        b"FOUR",
+    ]
+    assert metrics.records == 4
@@ -0,0 +1,46 @@
+"""Defers importing a module until one of its attributes is first used.
+
+Imports at the top of a handler module are run on every cold start, even when the
+invocation takes a path that never uses them, e.g. a request that fails validation.
+Modules that are expensive to import and only used on some paths can be imported
+with `lazy_import` instead, e.g. `jwt = lazy_import("jwt")`, and used as normal.
+
+Attributes are always read from the imported module, so patching the module in a
+test is seen through the lazy module.
+"""
+
+import importlib
+import importlib.util
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule(ModuleType):
+    """Stands in for a module, importing it when an attribute is first used"""
+
+    def __getattr__(self, attr: str):
+        # import_module is thread safe and returns the module from sys.modules
+        # once it has been imported
+        return getattr(importlib.import_module(self.__name__), attr)
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__name__))
+
+
+def lazy_import(name: str, optional: bool = False) -> Optional[ModuleType]:
+    """Returns a module that is only imported when an attribute is first used
+
+    Args:
+        name (str): The absolute name of the module, e.g. 'jwt'
+        optional (bool): Return None if the module is not installed,
+            rather than raising ModuleNotFoundError
+
+    Returns:
+        ModuleType: The lazy module, or None if it is optional and not installed
+    """
+    if importlib.util.find_spec(name) is None:
+        if optional:
+            return None
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    return LazyModule(name)
@@ -1,14 +1,23 @@
 """Logging utilities"""
 
+from contextvars import ContextVar
 from os import path
 
 LOG_BASE = path.join(path.dirname(path.realpath(__file__)), "./config/logbase.cfg")
 
 
 class Logger:
-    """Logger - Singleton - using the log object to write logs"""
+    """Logger - Singleton - using the log object to write logs
+
+    The log object is held per context, so that stages run concurrently in copies
+    of the context, as by the in-process validate relationships pipeline, each log
+    with their own. Threads started without a copy of the context use the log
+    object added most recently.
+    """
 
     _instance = None
+    _log_object = None
+    _context_log_object: ContextVar = ContextVar("log_object", default=None)
 
     @classmethod
     def instance(cls) -> "Logger":
@@ -30,12 +39,14 @@ class Logger:
             log_object: the log object from the LambdaApplication
         """
         cls._log_object = log_object
+        cls._context_log_object.set(log_object)
 
     @classmethod
     def write_log(cls, log_reference: str, log_dict: dict = None, exc_info=None):
         """Write the log"""
         log_dict = log_dict or {}
-        cls._log_object.write_log(log_reference, exc_info, log_dict)
+        log_object = cls._context_log_object.get() or cls._log_object
+        log_object.write_log(log_reference, exc_info, log_dict)
 
 
 LOGGER = Logger.instance()
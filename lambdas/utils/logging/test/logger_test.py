@@ -0,0 +1,42 @@
+""" Unit tests for the logger """
+
+import threading
+from contextvars import copy_context
+from unittest.mock import MagicMock
+
+from lambdas.utils.logging.logger import initialise_logger, write_log
+
+
+def test_log_object_is_kept_per_context() -> None:
+    """Test that a log object added in a copy of the context does not replace the
+    log object of the caller"""
+    # Arrange
+    caller_log_object = MagicMock()
+    stage_log_object = MagicMock()
+    initialise_logger(caller_log_object)
+
+    def run_stage() -> None:
+        initialise_logger(stage_log_object)
+        write_log("INFO", {"info": "stage"})
+
+    # Act
+    copy_context().run(run_stage)
+    write_log("INFO", {"info": "caller"})
+    # Assert
+    stage_log_object.write_log.assert_called_once_with("INFO", None, {"info": "stage"})
+    caller_log_object.write_log.assert_called_once_with(
+        "INFO", None, {"info": "caller"}
+    )
+
+
+def test_thread_without_context_uses_latest_log_object() -> None:
+    """Test that a thread started without a copy of the context can still log"""
+    # Arrange
+    log_object = MagicMock()
+    initialise_logger(log_object)
+    thread = threading.Thread(target=write_log, args=("INFO", {"info": "thread"}))
+    # Act
+    thread.start()
+    thread.join()
+    # Assert
+    log_object.write_log.assert_called_once_with("INFO", None, {"info": "thread"})
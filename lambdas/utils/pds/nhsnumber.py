@@ -1,9 +1,29 @@
-"""NHS Number class to extract and validate to the Module-11 requirements."""
+"""NHS Number class to extract and validate to the Module-11 requirements.
+
+`validate_many` and `extract_many` handle large arrays of identifiers at once, e.g.
+for reconciliation jobs over audit data. The checksum of the whole array is
+calculated with NumPy when it is installed, otherwise one number at a time.
+
+`parse_nhs_identifier` parses an identifier parameter once into an NHSIdentifier,
+which holds the results of every check made on it.
+"""
 
 import re
-from typing import Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional
 from urllib.parse import unquote
 
+from lambdas.utils.lazy_import import lazy_import
+
+# Optional, only imported when a batch is validated
+numpy = lazy_import("numpy", optional=True)
+
+# Weights applied to the first nine digits for the Modulus 11 checksum
+CHECK_SUM_WEIGHTS = (10, 9, 8, 7, 6, 5, 4, 3, 2)
+# Removes the separators allowed within an NHS number
+SEPARATORS = str.maketrans("", "", "- ")
+
 
 class NHSNumber:
     """NHS Number class to extract and validate to the Module-11 requirements."""
@@ -11,6 +31,9 @@ class NHSNumber:
     NHS_NUMBER_FORMAT = r"(\d{10})$"
     NHS_NUMBER_SYSTEM_BASE_URL = "https://fhir.nhs.uk/Id/nhs-number|"
 
+    NHS_NUMBER_PATTERN = re.compile(NHS_NUMBER_FORMAT)
+    SANITISE_PATTERN = re.compile(r"[- ]")
+
     def extract_nhs_number(self, nhs_number_input: Optional[str]) -> Optional[str]:
         """
         Extracts the NHS Number from a given string
@@ -26,7 +49,7 @@ class NHSNumber:
         if nhs_number_input is None:
             return nhs_number_input
 
-        match = re.search(self.NHS_NUMBER_FORMAT, nhs_number_input)
+        match = self.NHS_NUMBER_PATTERN.search(nhs_number_input)
         nhs_number_input_decode = unquote(nhs_number_input)  # URL decode
         if match:
             return self.sanitise_input(nhs_number_input_decode.rsplit("|")[-1])
@@ -38,7 +61,7 @@ class NHSNumber:
 
         # Attempt to extract NHS Number from sanitized input
         sanitised_number = self.sanitise_input(nhs_number_input)
-        if re.match(self.NHS_NUMBER_FORMAT, sanitised_number):
+        if self.NHS_NUMBER_PATTERN.match(sanitised_number):
             return sanitised_number
 
         # No valid NHS Number found, return the original input
@@ -57,7 +80,7 @@ class NHSNumber:
         sanitised_number = self.sanitise_input(nhs_number)
 
         return bool(
-            re.match(self.NHS_NUMBER_FORMAT, sanitised_number)
+            self.NHS_NUMBER_PATTERN.match(sanitised_number)
             and self.valid_check_sum(sanitised_number)
         )
 
@@ -86,7 +109,7 @@ class NHSNumber:
         Returns:
             str: The sanitised string
         """
-        sanitised = re.sub(r"[- ]", "", input_string)
+        sanitised = self.SANITISE_PATTERN.sub("", input_string)
         return sanitised
 
     def valid_check_sum(self, nhs_number: str) -> bool:
@@ -98,7 +121,7 @@ class NHSNumber:
         Returns:
             bool: True if the checksum is valid, False otherwise
         """
-        if not re.match(self.NHS_NUMBER_FORMAT, nhs_number):
+        if not self.NHS_NUMBER_PATTERN.match(nhs_number):
             return False
 
         # The first 9 digits are used to calculate the checksum
@@ -109,8 +132,9 @@ class NHSNumber:
         # https://en.wikipedia.org/wiki/NHS_number
         # https://www.activebarcode.com/codes/checkdigit/modulo11
         # Calculate modulo 11
-        parts_list = [int(digit) * (10 - index) for index, digit in enumerate(digits)]
-        list_sum = sum(parts_list)
+        list_sum = sum(
+            int(digit) * weight for digit, weight in zip(digits, CHECK_SUM_WEIGHTS)
+        )
 
         # If checksum is 11, then it is zeroed out
         # If checksum is 10, then it should error out
@@ -120,3 +144,147 @@ class NHSNumber:
             checksum = 0
 
         return checksum == check_digit
+
+    def validate_many(self, nhs_numbers: Iterable[Optional[str]]) -> list[bool]:
+        """
+        Determines whether each of the given strings is a valid NHS number,
+        with the same result as is_valid_nhs_number for each string.
+
+        Args:
+            nhs_numbers (Iterable[str]): The numbers to be checked for validity.
+
+        Returns:
+            list[bool]: True for each number that is valid, False otherwise,
+                including for None
+        """
+        results = []
+        # Sanitised numbers made up of ten ASCII digits and their index in results
+        candidates = []
+        positions = []
+
+        for nhs_number in nhs_numbers:
+            if nhs_number is None:
+                results.append(False)
+                continue
+
+            sanitised = nhs_number.translate(SEPARATORS)
+            if len(sanitised) == 10 and sanitised.isascii() and sanitised.isdigit():
+                candidates.append(sanitised)
+                positions.append(len(results))
+                results.append(False)
+            else:
+                # Other digits matched by the pattern are checked one at a time
+                results.append(self.__is_valid_other_nhs_number(sanitised))
+
+        for position, valid in zip(positions, self.__valid_check_sums(candidates)):
+            results[position] = valid
+
+        return results
+
+    def extract_many(
+        self, nhs_number_inputs: Iterable[Optional[str]]
+    ) -> list[Optional[str]]:
+        """
+        Extracts the NHS Number from each of the given strings,
+        with the same result as extract_nhs_number for each string.
+
+        Args:
+            nhs_number_inputs (Iterable[str]): Strings to extract the NHS Number from.
+
+        Returns:
+            list[str]: NHS number extracted from each input string
+        """
+        return [
+            (
+                nhs_number_input
+                if nhs_number_input is not None
+                and len(nhs_number_input) == 10
+                and nhs_number_input.isascii()
+                and nhs_number_input.isdigit()
+                else self.extract_nhs_number(nhs_number_input)
+            )
+            for nhs_number_input in nhs_number_inputs
+        ]
+
+    def __is_valid_other_nhs_number(self, sanitised_number: str) -> bool:
+        """Validates a sanitised number that is not ten ASCII digits"""
+        try:
+            return bool(
+                self.NHS_NUMBER_PATTERN.match(sanitised_number)
+                and self.valid_check_sum(sanitised_number)
+            )
+        except ValueError:
+            # A trailing new line is matched by the pattern but is not a digit
+            return False
+
+    def __valid_check_sums(self, nhs_numbers: list[str]) -> list[bool]:
+        """Validates the checksum digits of numbers made up of ten ASCII digits"""
+        if numpy is None or not nhs_numbers:
+            results = []
+            for nhs_number in nhs_numbers:
+                total = sum(
+                    map(int.__mul__, map(int, nhs_number[:9]), CHECK_SUM_WEIGHTS)
+                )
+                results.append((11 - total % 11) % 11 == int(nhs_number[9]))
+            return results
+
+        digits = numpy.frombuffer(
+            "".join(nhs_numbers).encode("ascii"), dtype=numpy.uint8
+        ).reshape(-1, 10) - ord("0")
+        totals = digits[:, :9].astype(numpy.int64) @ numpy.array(CHECK_SUM_WEIGHTS)
+
+        # A checksum of 11 is zeroed out and a checksum of 10 never matches a digit
+        checksums = 11 - totals % 11
+        checksums[checksums == 11] = 0
+
+        return (checksums == digits[:, 9]).tolist()
+
+
+@dataclass(frozen=True)
+class NHSIdentifier:
+    """An NHS number identifier parameter and the results of the checks made on it."""
+
+    # The identifier as supplied, e.g. 'https://fhir.nhs.uk/Id/nhs-number|9000000009'
+    raw: str
+    # The URL decoded identifier
+    decoded: str
+    # The identifier system, if supplied
+    system: Optional[str]
+    # The extracted NHS number, or the raw identifier if no NHS number is found
+    digits: str
+    # True if the extracted NHS number is valid
+    valid: bool
+    # True if the raw identifier, without separators, has a valid checksum
+    checksum_ok: bool
+    # True if the identifier system is correct or is not needed
+    system_ok: bool
+
+
+@lru_cache(maxsize=1024)
+def parse_nhs_identifier(raw: str) -> NHSIdentifier:
+    """
+    Parses an NHS number identifier parameter, with the same results as the
+    NHSNumber methods. The result is immutable, so it is cached for reuse by
+    each lambda the identifier is passed to.
+
+    Args:
+        raw (str): The identifier as supplied
+
+    Returns:
+        NHSIdentifier: The parsed identifier
+    """
+    nhs_number = NHSNumber()
+    decoded = unquote(raw)
+    digits = nhs_number.extract_nhs_number(raw)
+    checksum_ok = nhs_number.valid_check_sum(nhs_number.sanitise_input(raw))
+
+    return NHSIdentifier(
+        raw=raw,
+        decoded=decoded,
+        system=decoded.rsplit("|", 1)[0] if "|" in decoded else None,
+        digits=digits,
+        valid=nhs_number.is_valid_nhs_number(digits),
+        checksum_ok=checksum_ok,
+        system_ok=checksum_ok
+        or decoded.startswith(NHSNumber.NHS_NUMBER_SYSTEM_BASE_URL),
+    )
@@ -0,0 +1,197 @@
+"""Read-through cache for PDS responses.
+
+Responses are held in an in-memory LRU for the lifetime of a warm Lambda container,
+keyed on the resource type and NHS number. An optional DynamoDB table can be
+configured so that responses are shared between containers.
+
+Caching is off unless a time to live is configured for a resource type. A cached
+response can be out of date, e.g. a patient recorded as deceased or a relationship
+removed in PDS is not seen until the response expires, and these are used in
+eligibility decisions, so the time to live should be kept short.
+
+Each resource type has its own time to live, and a 'not found' response from PDS
+is cached for a shorter period so that repeated lookups of an unknown NHS number do
+not each go to PDS.
+"""
+
+import json
+import re
+from os import getenv
+from time import time
+from typing import Callable, Optional
+
+from fhirclient.server import FHIRNotFoundException
+
+from lambdas.utils.tiered_cache import CacheEntry, TieredCache
+
+RESOURCE_PATIENT = "Patient"
+RESOURCE_RELATED_PERSON = "RelatedPerson"
+
+# Seconds that each resource type is cached for, 0 disables caching of the resource
+RESOURCE_TTLS = {
+    RESOURCE_PATIENT: int(getenv("PDS_CACHE_PATIENT_TTL", "0")),
+    RESOURCE_RELATED_PERSON: int(getenv("PDS_CACHE_RELATED_PERSON_TTL", "0")),
+}
+# Seconds that a 'not found' response is cached for
+NOT_FOUND_TTL = int(getenv("PDS_CACHE_NOT_FOUND_TTL", "30"))
+# Maximum number of responses held in memory
+MAX_ENTRIES = int(getenv("PDS_CACHE_MAX_ENTRIES", "256"))
+# Optional DynamoDB table used to share responses between containers
+PDS_CACHE_TABLE_NAME = getenv("PDS_CACHE_TABLE_NAME")
+
+# Paths requested by Patient.read and Bundle.read_from
+PATIENT_PATH = re.compile(r"^Patient/(?P<nhs_number>\d{10})$")
+RELATED_PERSON_PATH = re.compile(r"^Patient/(?P<nhs_number>\d{10})/RelatedPerson$")
+
+
+class PDSCache:
+    """Caches PDS responses keyed on resource type and NHS number."""
+
+    def __init__(
+        self,
+        resource_ttls: Optional[dict[str, int]] = None,
+        not_found_ttl: int = NOT_FOUND_TTL,
+        max_entries: int = MAX_ENTRIES,
+        table_name: Optional[str] = PDS_CACHE_TABLE_NAME,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        """Initialise the cache
+
+        Args:
+            resource_ttls (dict, optional): Seconds to cache each resource type for
+            not_found_ttl (int): Seconds to cache a 'not found' response for
+            max_entries (int): Maximum number of responses held in memory
+            table_name (str, optional): DynamoDB table name for the shared tier
+            clock (Callable): Returns the current epoch time in seconds
+        """
+        self.resource_ttls = (
+            RESOURCE_TTLS.copy() if resource_ttls is None else resource_ttls
+        )
+        self.not_found_ttl = not_found_ttl
+        self._clock = clock
+        self._cache = TieredCache(
+            "PDS", max_entries=max_entries, table_name=table_name, clock=clock
+        )
+
+    @staticmethod
+    def create_key(resource_type: str, nhs_number: str) -> str:
+        """Creates the cache key for a resource type and NHS number
+
+        Args:
+            resource_type (str): The FHIR resource type, e.g. 'Patient'
+            nhs_number (str): The NHS number the resource is for
+
+        Returns:
+            str: The cache key
+        """
+        return f"{resource_type}|{nhs_number}"
+
+    @staticmethod
+    def parse_path(path: str) -> Optional[tuple[str, str]]:
+        """Returns the resource type and NHS number of a PDS request path
+
+        Args:
+            path (str): The path relative to the PDS base URL
+
+        Returns:
+            Optional[tuple[str, str]]: The resource type and NHS number,
+                or None if the path is not cacheable
+        """
+        if match := PATIENT_PATH.match(path):
+            return RESOURCE_PATIENT, match.group("nhs_number")
+        if match := RELATED_PERSON_PATH.match(path):
+            return RESOURCE_RELATED_PERSON, match.group("nhs_number")
+        return None
+
+    def request_json(self, path: str, fetch: Callable[[], dict]) -> dict:
+        """Returns the response for the path from the cache, fetching it when required.
+
+        A FHIRNotFoundException raised by the fetch is cached and raised again
+        for subsequent requests until it expires.
+
+        Args:
+            path (str): The path relative to the PDS base URL
+            fetch (Callable): Requests the decoded JSON response from PDS
+
+        Returns:
+            dict: The decoded JSON response
+        """
+        parsed = self.parse_path(path)
+        if parsed is None or not self.resource_ttls.get(parsed[0]):
+            return fetch()
+
+        resource_type, nhs_number = parsed
+        key = self.create_key(resource_type, nhs_number)
+        cached = self._cache.get(key)
+
+        if cached is None:
+            return self.__fetch_and_store(key, resource_type, fetch)
+
+        if cached.value is None:
+            raise FHIRNotFoundException(None)
+        return json.loads(cached.value)
+
+    def invalidate(self, nhs_number: str, resource_type: Optional[str] = None) -> None:
+        """Removes the cached responses for an NHS number from both tiers
+
+        Args:
+            nhs_number (str): The NHS number to remove
+            resource_type (str, optional): Only remove this resource type,
+                by default all resource types are removed
+        """
+        resource_types = [resource_type] if resource_type else self.resource_ttls
+        for cached_type in resource_types:
+            self._cache.delete(self.create_key(cached_type, nhs_number))
+
+    def clear(self) -> None:
+        """Removes every response from the in-memory tier and resets the counters"""
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """Returns the cache counters
+
+        Returns:
+            dict: hit, shared hit and miss counts and the number of responses held
+        """
+        stats = self._cache.stats()
+        return {
+            "hits": stats["hits"],
+            "shared_hits": stats["shared_hits"],
+            "misses": stats["misses"],
+            "entries": stats["entries"],
+        }
+
+    def __fetch_and_store(
+        self, key: str, resource_type: str, fetch: Callable[[], dict]
+    ) -> dict:
+        """Fetches the response and caches it, including 'not found' responses"""
+        try:
+            response = fetch()
+        except FHIRNotFoundException:
+            if self.not_found_ttl > 0:
+                self.__store(key, None, self.not_found_ttl)
+            raise
+
+        self.__store(key, json.dumps(response), self.resource_ttls[resource_type])
+        return response
+
+    def __store(self, key: str, body: Optional[str], ttl: int) -> None:
+        """Caches a response body, or None if not found, for the ttl in seconds"""
+        expires_at = self._clock() + ttl
+        self._cache.put(
+            key, CacheEntry(value=body, fresh_until=expires_at, expires_at=expires_at)
+        )
+
+
+pds_cache = PDSCache()
+
+
+def invalidate_pds_cache(nhs_number: str, resource_type: Optional[str] = None) -> None:
+    """Removes the cached PDS responses for an NHS number
+
+    Args:
+        nhs_number (str): The NHS number to remove
+        resource_type (str, optional): Only remove this resource type,
+            by default all resource types are removed
+    """
+    pds_cache.invalidate(nhs_number, resource_type)
@@ -3,25 +3,50 @@ FHIR Patient Record Utility Functions
 
 This module provides utility functions for extracting information from FHIR
 Patient records in JSON format.
+
+Each function accepts either the fhirclient model or the raw JSON dictionary of
+the resource. Reading the raw dictionary avoids building and validating the full
+model, only the properties that are read are type checked, so the model only needs
+to be created when the resource is re-emitted.
 """
 
 from datetime import date, datetime
-from typing import Optional
+from typing import Any, Optional, Union
 
 from dateutil.relativedelta import relativedelta
 from fhirclient.models.codeableconcept import CodeableConcept
+from fhirclient.models.fhirabstractbase import FHIRValidationError
 from fhirclient.models.fhirdate import FHIRDate
 from fhirclient.models.patient import Patient
-from fhirclient.models.period import Period
 from fhirclient.models.relatedperson import RelatedPerson
 
 
-def get_patient_age(patient: Patient) -> Optional[int]:
+def validate_resource_json(resource: Any) -> dict:
+    """
+    Checks that the supplied value can be read as a FHIR resource.
+
+    Args:
+        resource (Any): The raw JSON FHIR resource.
+
+    Raises:
+        FHIRValidationError: If the resource is not a dictionary.
+
+    Returns:
+        dict: The resource.
+    """
+    if not isinstance(resource, dict):
+        raise FHIRValidationError(
+            [TypeError(f"Non-dict type {type(resource)} supplied as a FHIR resource")]
+        )
+    return resource
+
+
+def get_patient_age(patient: Union[Patient, dict]) -> Optional[int]:
     """
     Determines the age of the supplied patient in whole years.
 
     Args:
-        patient (Patient): The patient for whom the age needs to be determined.
+        patient (Patient | dict): The patient for whom the age needs to be determined.
 
     Returns:
         int: Patient age in years,
@@ -57,7 +82,11 @@ def get_patient_age(patient: Patient) -> Optional[int]:
     #     YY          +-YYYY            incomplete century date
 
     age = None
-    bday = patient.birthDate
+    bday = (
+        __get_json_date(patient, "birthDate")
+        if isinstance(patient, dict)
+        else patient.birthDate
+    )
 
     if bday is not None and isinstance(bday, FHIRDate):
         today = datetime.now()
@@ -68,48 +97,99 @@ def get_patient_age(patient: Patient) -> Optional[int]:
     return age
 
 
-def get_is_person_deceased(patient: Patient) -> bool:
+def get_is_person_deceased(patient: Union[Patient, dict]) -> bool:
     """
     Determines if a person is deceased based on the presence of deceasedBoolean flag
     in the FHIR Patient record.
 
     Args:
-        pds_data (dict): The FHIR Patient record.
+        patient (Patient | dict): The FHIR Patient record.
 
     Returns:
         bool: True if the person is deceased, False otherwise.
     """
-    if patient.deceasedBoolean is not None:
+    if isinstance(patient, dict):
+        deceased = __get_json_property(patient, "deceasedBoolean", bool)
+        if deceased is not None:
+            return deceased
+        dday = __get_json_date(patient, "deceasedDateTime")
+    elif patient.deceasedBoolean is not None:
         return patient.deceasedBoolean
+    else:
+        dday = patient.deceasedDateTime
 
-    dday = patient.deceasedDateTime
     return isinstance(dday, FHIRDate) and isinstance(dday.date, date)
 
 
-def get_security_code(patient: Patient) -> Optional[str]:
+def get_security_code(patient: Union[Patient, dict]) -> Optional[str]:
     """
     Returns the security code associated with the record.
 
     Args:
-        pds_data (dict): The FHIR Patient record.
+        patient (Patient | dict): The FHIR Patient record.
 
     Returns:
         str or None: The security code if present, or None if not found.
     """
     rtn = None
 
-    if patient.meta is not None and patient.meta.security is not None:
+    if isinstance(patient, dict):
+        meta = __get_json_property(patient, "meta", dict)
+        security = __get_json_property(meta or {}, "security", list)
+        if security is not None:
+            rtn = __get_json_property(validate_resource_json(security[0]), "code", str)
+    elif patient.meta is not None and patient.meta.security is not None:
         rtn = patient.meta.security[0].code
 
     return rtn
 
 
-def get_relationship(related: RelatedPerson) -> list[str]:
+def get_identifier_value(resource: Union[Patient, dict]) -> Optional[str]:
+    """
+    Returns the value of the first identifier of the record, i.e. the NHS number.
+
+    Args:
+        resource (Patient | dict): The FHIR Patient record.
+
+    Returns:
+        str or None: The identifier value if present, or None if not found.
+    """
+    if not isinstance(resource, dict):
+        return resource.identifier[0].value
+
+    identifier = __get_json_property(resource, "identifier", list)
+    return __get_json_property(validate_resource_json(identifier[0]), "value", str)
+
+
+def get_related_nhs_number(related: Union[RelatedPerson, dict]) -> Optional[str]:
+    """
+    Returns the NHS number of the patient the related person record refers to.
+
+    Args:
+        related (RelatedPerson | dict): The FHIR related person record.
+
+    Returns:
+        str or None: The NHS number if present, or None if not found.
+    """
+    if not isinstance(related, dict):
+        if related.patient and related.patient.identifier:
+            return related.patient.identifier.value
+        return None
+
+    patient = __get_json_property(related, "patient", dict)
+    identifier = __get_json_property(patient or {}, "identifier", dict)
+    return __get_json_property(identifier or {}, "value", str)
+
+
+def get_relationship(
+    related: Union[RelatedPerson, dict], today: Optional[date] = None
+) -> list[str]:
     """
     Returns the relationship from the related person record
 
     Args:
-        related (RelatedPerson): The FHIR related person record.
+        related (RelatedPerson | dict): The FHIR related person record.
+        today (date, optional): Date the period is checked against, defaults to today
 
     Returns:
         list[str]: The relationship(s) or empty list
@@ -120,11 +200,15 @@ def get_relationship(related: RelatedPerson) -> list[str]:
     # If the supplied data is not present
     if related is None:
         return rtn
+    if isinstance(related, dict):
+        return __get_relationship_from_json(related, today)
     # If the relationship is not active
     if related.active is not None and related.active == False:
         return rtn
     # If period is not active
-    if __is_period_range_in_past(related.period):
+    if related.period is not None and __is_period_range_in_past(
+        related.period.start, related.period.end, today
+    ):
         return rtn
     # If relationship record are not present
     if related.relationship is None:
@@ -135,35 +219,107 @@ def get_relationship(related: RelatedPerson) -> list[str]:
     return rtn
 
 
-def __is_period_range_in_past(dp: Period) -> bool:
+def __get_relationship_from_json(related: dict, today: Optional[date]) -> list[str]:
+    """
+    Returns the relationship from the raw JSON related person record
+
+    Args:
+        related (dict): The FHIR related person record.
+        today (date, optional): Date the period is checked against
+
+    Returns:
+        list[str]: The relationship(s) or empty list
+    """
+    # If the relationship is not active
+    if __get_json_property(related, "active", bool) is False:
+        return []
+    # If period is not active
+    # NPA-2374 - a period that is not defined is a valid active relationship
+    period = __get_json_property(related, "period", dict)
+    if period is not None and __is_period_range_in_past(
+        __get_json_date(period, "start"), __get_json_date(period, "end"), today
+    ):
+        return []
+
+    rtn = []
+    for codeable in __get_json_property(related, "relationship", list) or []:
+        for coding in (
+            __get_json_property(validate_resource_json(codeable), "coding", list) or []
+        ):
+            code = __get_json_property(validate_resource_json(coding), "code", str)
+            if code is not None:
+                rtn.append(code)
+
+    return rtn
+
+
+def __is_period_range_in_past(
+    start: Optional[FHIRDate], end: Optional[FHIRDate], today: Optional[date] = None
+) -> bool:
     """
     Determines if the period is active and if its already passed.
-    A None value will result in true.
+    A period that is not defined must be treated as active by the caller (NPA-2374).
 
     Args:
-        date (Period): Date value to evaluate
+        start (FHIRDate): Start of the period to evaluate
+        end (FHIRDate): End of the period to evaluate
+        today (date, optional): Date to evaluate against, defaults to today
 
     Returns:
         bool: True if the period has passed or not yet started, false otherwise
     """
-    dt = date.today()
-    rtn = False
-    if dp is None:
-        # date is not defined
-        # NPA-2374
-        # Following discussion with PDS this needs to be treated
-        # as a valid active relationship
-        rtn = False
-    elif (
+    dt = today or date.today()
+    return (
         # end date has already passed
-        (dp.end is not None and dp.end.date is not None and dp.end.date < dt)
+        (end is not None and end.date is not None and end.date < dt)
         or
         # start date has not yet started
-        (dp.start is None or dp.start.date is None or dp.start.date > dt)
-    ):
-        rtn = True
+        (start is None or start.date is None or start.date > dt)
+    )
 
-    return rtn
+
+def __get_json_property(resource: dict, name: str, expected_type: type) -> Any:
+    """
+    Returns a property of a raw JSON resource, checking its type as the model would
+
+    Args:
+        resource (dict): The raw JSON FHIR resource or element
+        name (str): Name of the property
+        expected_type (type): Type the property must have if present
+
+    Raises:
+        FHIRValidationError: If the property does not have the expected type
+
+    Returns:
+        Any: The value of the property or None if not present
+    """
+    value = resource.get(name)
+    if value is not None and not isinstance(value, expected_type):
+        raise FHIRValidationError(
+            [
+                TypeError(
+                    f"Wrong type {type(value)} for property {name}, "
+                    f"expecting {expected_type}"
+                )
+            ],
+            name,
+        )
+    return value
+
+
+def __get_json_date(resource: dict, name: str) -> Optional[FHIRDate]:
+    """
+    Returns a date property of a raw JSON resource
+
+    Args:
+        resource (dict): The raw JSON FHIR resource or element
+        name (str): Name of the property
+
+    Returns:
+        FHIRDate or None: The date or None if not present
+    """
+    value = __get_json_property(resource, name, str)
+    return FHIRDate(value) if value is not None else None
 
 
 def __extract_code_from_codeable(codeables: list[CodeableConcept]):
@@ -4,12 +4,24 @@ import uuid
 
 from fhirclient.server import FHIRServer
 
+from lambdas.utils.connection_pool import get_session
+from lambdas.utils.pds.pdscache import pds_cache
+from lambdas.utils.pds.singleflight import single_flight
+
 
 class PDSFHIRClient(FHIRServer):
     """Extendeds FHIRServer client that allows headers sent via request_join to be extended."""
 
     _headers = {"Accept": "application/json", "X-Request-ID": str(uuid.uuid4())}
 
+    # Read-through cache shared by every client in the container
+    cache = pds_cache
+
+    def __init__(self, client=None, base_uri=None, state=None):
+        super().__init__(client, base_uri=base_uri, state=state)
+        # Reuse the pooled session for the host between invocations
+        self.session = get_session(self.base_uri)
+
     @property
     def headers(self) -> dict:
         """Dictionary of headers that will be included with every request"""
@@ -19,7 +31,9 @@ class PDSFHIRClient(FHIRServer):
         """Perform a request for JSON data against the server's base with the
         given relative path.
 
-        Overrides the base function to add additional headers
+        Overrides the base function to add additional headers, to read
+        Patient and RelatedPerson responses through the PDS cache and to
+        deduplicate requests made within a single flight scope
 
         :param str path: The path to append to `base_uri`
         :param bool nosign: If set to True, the request will not be signed
@@ -27,6 +41,9 @@ class PDSFHIRClient(FHIRServer):
         :returns: Decoded JSON response
         """
 
-        res = self._get(path, self.headers, nosign)
-
-        return res.json()
+        return single_flight(
+            path,
+            lambda: self.cache.request_json(
+                path, lambda: self._get(path, self.headers, nosign).json()
+            ),
+        )
@@ -0,0 +1,67 @@
+"""Index of a patient's related people for matching a proxy to a relationship.
+
+The related people are grouped by NHS number when the index is built, which only
+reads the NHS number of each record. The active relationship codes are only worked
+out for the related people with an NHS number that is looked up, so matching a proxy
+does not check the period and relationship codes of every record in the bundle.
+"""
+
+from datetime import date
+from typing import Iterable, Optional, Union
+
+from fhirclient.models.relatedperson import RelatedPerson
+
+from lambdas.utils.pds import pdsdata
+
+Related = Union[RelatedPerson, dict]
+
+
+class RelationshipIndex:
+    """Maps NHS number to active relationship code to the related person record"""
+
+    def __init__(self, related: Iterable[Related], today: Optional[date] = None):
+        """Initialise the index
+
+        Args:
+            related (Iterable[RelatedPerson | dict]): The patient's related people
+            today (date, optional): Date periods are checked against, defaults to today
+        """
+        self.today = today or date.today()
+        self._related: dict[Optional[str], list[Related]] = {}
+        self._codes: dict[Optional[str], dict[str, Related]] = {}
+
+        for record in related:
+            nhs_number = pdsdata.get_related_nhs_number(record)
+            self._related.setdefault(nhs_number, []).append(record)
+
+    def get_relationships(self, nhs_number: str) -> dict[str, Related]:
+        """Returns the active relationship codes of the related person
+
+        Args:
+            nhs_number (str): NHS number of the related person
+
+        Returns:
+            dict[str, RelatedPerson | dict]: Each active relationship code and the
+                first record in the bundle with that code
+        """
+        if nhs_number not in self._codes:
+            codes = {}
+            for record in self._related.get(nhs_number, []):
+                for code in pdsdata.get_relationship(record, self.today):
+                    codes.setdefault(code, record)
+            self._codes[nhs_number] = codes
+
+        return self._codes[nhs_number]
+
+    def find(self, nhs_number: str, code: str) -> Optional[Related]:
+        """Returns the record of an active relationship with the related person
+
+        Args:
+            nhs_number (str): NHS number of the related person
+            code (str): The relationship code, e.g. 'MTH'
+
+        Returns:
+            RelatedPerson | dict: The first matching record in the bundle,
+                or None if there is no active relationship with the code
+        """
+        return self.get_relationships(nhs_number).get(code)
@@ -0,0 +1,110 @@
+"""Deduplicates PDS lookups made within a single execution.
+
+Within a single flight scope, the first lookup of a key is made and its outcome is
+kept, so that concurrent and later lookups of the same key wait for, and share, that
+outcome instead of making another request. Outside of a scope every lookup is made.
+
+The scope is held in a context variable. Work submitted to a thread pool must be run
+in a copy of the caller's context, e.g. `executor.submit(copy_context().run, fn)`,
+for it to share the scope.
+"""
+
+import copy
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from lambdas.utils.logging.logger import write_log
+
+
+class SingleFlight:
+    """Makes each lookup at most once, sharing the outcome with every caller"""
+
+    def __init__(self) -> None:
+        self._calls: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.shared = 0
+
+    def do(self, key: str, fetch: Callable[[], dict]) -> dict:
+        """Returns the outcome of the first lookup of the key, making it if required
+
+        Args:
+            key (str): Identifies the lookup, e.g. the PDS request path
+            fetch (Callable): Makes the lookup
+
+        Returns:
+            dict: A copy of the lookup result, exceptions are raised to every caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_owner = call is None
+            if is_owner:
+                call = Future()
+                self._calls[key] = call
+                self.lookups += 1
+            else:
+                self.shared += 1
+
+        if is_owner:
+            try:
+                call.set_result(fetch())
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                call.set_exception(error)
+
+        # Callers must not be able to change the result seen by other callers
+        return copy.deepcopy(call.result())
+
+    def stats(self) -> dict:
+        """Returns the lookup counters
+
+        Returns:
+            dict: the number of lookups made and the number shared
+        """
+        return {"lookups": self.lookups, "shared": self.shared}
+
+
+_scope: ContextVar[Optional[SingleFlight]] = ContextVar(
+    "pds_single_flight", default=None
+)
+
+
+@contextmanager
+def single_flight_scope() -> Iterator[SingleFlight]:
+    """Deduplicates lookups made within the block, including nested scopes
+
+    Yields:
+        SingleFlight: The scope's single flight
+    """
+    current = _scope.get()
+    if current is not None:
+        yield current
+        return
+
+    single_flight = SingleFlight()
+    token = _scope.set(single_flight)
+    try:
+        yield single_flight
+    finally:
+        _scope.reset(token)
+        write_log(
+            "DEBUG", {"info": f"PDS single flight stats: {single_flight.stats()}"}
+        )
+
+
+def single_flight(key: str, fetch: Callable[[], dict]) -> dict:
+    """Makes the lookup through the current single flight scope, if there is one
+
+    Args:
+        key (str): Identifies the lookup, e.g. the PDS request path
+        fetch (Callable): Makes the lookup
+
+    Returns:
+        dict: The lookup result
+    """
+    current = _scope.get()
+    if current is None:
+        return fetch()
+    return current.do(key, fetch)
@@ -7,6 +7,7 @@ from fhirclient import client
 from pytest_mock import MockerFixture
 from requests import Session
 
+from lambdas.utils.pds.pdscache import pds_cache
 from lambdas.utils.pds.pdsfhirclient import PDSFHIRClient
 
 
@@ -68,3 +69,22 @@ def test_additional_headers_are_included_when_using_pdsfhirclient(
     my_args = mocked_get.call_args
     headers = my_args[1]["headers"]
     assert "someheader" in headers
+
+
+def test_patient_reads_are_served_from_the_pds_cache(
+    mocker: MockerFixture, fhirclient: PDSFHIRClient, fake_response
+):
+    """Test that repeated reads of the same patient only make one request"""
+
+    # Arrange
+    mocker.patch.dict(pds_cache.resource_ttls, {"Patient": 300})
+    fake_response.json.return_value = {"resourceType": "Patient"}
+    mocked_get = mocker.patch.object(Session, "get", return_value=fake_response)
+
+    # Act
+    first = fhirclient.request_json("Patient/9000000009")
+    second = fhirclient.request_json("Patient/9000000009")
+
+    # Assert
+    assert first == second == {"resourceType": "Patient"}
+    mocked_get.assert_called_once()
@@ -5,7 +5,7 @@ These tests cover the various input validation required.
 
 import pytest
 
-from lambdas.utils.pds.nhsnumber import NHSNumber
+from lambdas.utils.pds.nhsnumber import NHSNumber, parse_nhs_identifier
 
 
 def test_when_an_invalid_nhs_number_then_returns_false():
@@ -101,3 +101,99 @@ def test_checksum_when_invalid_characters(nhs_number, expected):
     sut = NHSNumber()
     actual = sut.valid_check_sum(nhs_number)
     assert actual == expected
+
+
+BATCH_NHS_NUMBERS = [
+    " 900 000 0009 ",
+    "900-000-0009",
+    "9000000009",
+    "9100000000",
+    "9000000050",
+    "900000009",
+    "90000000009",
+    "9000000008",
+    "900A000B0009",
+    "1234567890",
+    "",
+]
+
+
+@pytest.mark.parametrize("numpy_installed", [True, False])
+def test_validate_many_matches_is_valid_nhs_number(numpy_installed: bool, mocker):
+    """Batch validation results match validating each number"""
+    if not numpy_installed:
+        mocker.patch("lambdas.utils.pds.nhsnumber.numpy", None)
+    sut = NHSNumber()
+
+    actual = sut.validate_many(BATCH_NHS_NUMBERS)
+
+    assert actual == [sut.is_valid_nhs_number(value) for value in BATCH_NHS_NUMBERS]
+
+
+@pytest.mark.parametrize(
+    "nhs_numbers, expected",
+    [
+        pytest.param([], [], id="Empty batch"),
+        pytest.param([None, "9000000009"], [False, True], id="None is invalid"),
+        pytest.param(["9000000009\n"], [False], id="Trailing new line is invalid"),
+    ],
+)
+def test_validate_many_edge_cases(nhs_numbers, expected):
+    """Batch validation handles inputs the single validation does not"""
+    sut = NHSNumber()
+    actual = sut.validate_many(nhs_numbers)
+
+    assert actual == expected
+
+
+def test_extract_many_matches_extract_nhs_number():
+    """Batch extraction results match extracting each number"""
+    inputs = BATCH_NHS_NUMBERS + [
+        None,
+        "https://fhir.nhs.uk/Id/nhs-number|9000000009",
+        "https%3A%2F%2Ffhir.nhs.uk%2FId%2Fnhs-number%7C9000000009",
+    ]
+    sut = NHSNumber()
+
+    actual = sut.extract_many(inputs)
+
+    assert actual == [sut.extract_nhs_number(value) for value in inputs]
+
+
+@pytest.mark.parametrize(
+    "raw",
+    BATCH_NHS_NUMBERS
+    + [
+        "https://fhir.nhs.uk/Id/nhs-number|9000000009",
+        "https%3A%2F%2Ffhir.nhs.uk%2FId%2Fnhs-number%7C9000000009",
+        "https://example.org/nhs-number|9000000009",
+    ],
+)
+def test_parse_nhs_identifier_matches_nhs_number_checks(raw: str):
+    """Parsed identifier holds the results of the NHS number checks"""
+    sut = NHSNumber()
+    extracted = sut.extract_nhs_number(raw)
+
+    actual = parse_nhs_identifier(raw)
+
+    assert actual.digits == extracted
+    assert actual.valid == sut.is_valid_nhs_number(extracted)
+    assert actual.checksum_ok == sut.is_valid_nhs_number(raw)
+    assert actual.system_ok == sut.is_correct_nhs_number_system(raw)
+
+
+def test_parse_nhs_identifier_splits_system():
+    """The system and decoded value of an encoded identifier are parsed"""
+    actual = parse_nhs_identifier(
+        "https%3A%2F%2Ffhir.nhs.uk%2FId%2Fnhs-number%7C9000000009"
+    )
+
+    assert actual.decoded == "https://fhir.nhs.uk/Id/nhs-number|9000000009"
+    assert actual.system == "https://fhir.nhs.uk/Id/nhs-number"
+    assert actual.digits == "9000000009"
+    assert parse_nhs_identifier("9000000009").system is None
+
+
+def test_parse_nhs_identifier_is_reused():
+    """The same identifier is only parsed once"""
+    assert parse_nhs_identifier("9000000009") is parse_nhs_identifier("9000000009")
@@ -0,0 +1,260 @@
+""" Unit tests for the PDS response cache """
+
+from unittest.mock import MagicMock
+
+import pytest
+from fhirclient.server import FHIRNotFoundException
+from pytest_mock import MockerFixture
+
+from lambdas.conftest import FakeClock
+from lambdas.utils.pds.pdscache import PDSCache
+
+NHS_NUMBER = "9000000009"
+PATIENT_PATH = f"Patient/{NHS_NUMBER}"
+RELATED_PERSON_PATH = f"Patient/{NHS_NUMBER}/RelatedPerson"
+PATIENT = {"resourceType": "Patient", "id": NHS_NUMBER}
+
+
+@pytest.fixture(name="cache")
+def setup_cache(clock: FakeClock) -> PDSCache:
+    """Create and return a PDS cache without a shared tier"""
+    return PDSCache(
+        resource_ttls={"Patient": 300, "RelatedPerson": 60},
+        not_found_ttl=30,
+        max_entries=2,
+        table_name=None,
+        clock=clock,
+    )
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        (PATIENT_PATH, ("Patient", NHS_NUMBER)),
+        (RELATED_PERSON_PATH, ("RelatedPerson", NHS_NUMBER)),
+        ("Patient?family=Smith", None),
+        ("Patient/123", None),
+    ],
+)
+def test_parse_path(path: str, expected) -> None:
+    """Test that only Patient and RelatedPerson reads for an NHS number are cacheable"""
+    assert PDSCache.parse_path(path) == expected
+
+
+def test_response_is_cached_until_ttl(cache: PDSCache, clock: FakeClock) -> None:
+    """Test that a response is reused until its resource TTL expires"""
+    # Arrange
+    fetch = MagicMock(return_value=PATIENT)
+    # Act
+    first = cache.request_json(PATIENT_PATH, fetch)
+    clock.now += 299
+    second = cache.request_json(PATIENT_PATH, fetch)
+    clock.now += 1
+    cache.request_json(PATIENT_PATH, fetch)
+    # Assert
+    assert first == second == PATIENT
+    assert fetch.call_count == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_cached_response_is_a_copy(cache: PDSCache) -> None:
+    """Test that changes to a returned response do not change the cached response"""
+    # Arrange
+    cache.request_json(PATIENT_PATH, MagicMock(return_value=PATIENT))
+    # Act
+    cache.request_json(PATIENT_PATH, MagicMock())["id"] = "changed"
+    # Assert
+    assert cache.request_json(PATIENT_PATH, MagicMock()) == PATIENT
+
+
+def test_resource_types_have_separate_ttls(cache: PDSCache, clock: FakeClock) -> None:
+    """Test that each resource type is cached using its own TTL"""
+    # Arrange
+    patient_fetch = MagicMock(return_value=PATIENT)
+    related_fetch = MagicMock(return_value={"resourceType": "Bundle"})
+    cache.request_json(PATIENT_PATH, patient_fetch)
+    cache.request_json(RELATED_PERSON_PATH, related_fetch)
+    # Act
+    clock.now += 100
+    cache.request_json(PATIENT_PATH, patient_fetch)
+    cache.request_json(RELATED_PERSON_PATH, related_fetch)
+    # Assert
+    assert patient_fetch.call_count == 1
+    assert related_fetch.call_count == 2
+
+
+def test_not_found_is_cached_for_not_found_ttl(
+    cache: PDSCache, clock: FakeClock
+) -> None:
+    """Test that a 404 is raised from the cache until the not found TTL expires"""
+    # Arrange
+    fetch = MagicMock(side_effect=FHIRNotFoundException(None))
+    with pytest.raises(FHIRNotFoundException):
+        cache.request_json(PATIENT_PATH, fetch)
+    # Act & Assert
+    clock.now += 29
+    with pytest.raises(FHIRNotFoundException):
+        cache.request_json(PATIENT_PATH, fetch)
+    assert fetch.call_count == 1
+    clock.now += 1
+    with pytest.raises(FHIRNotFoundException):
+        cache.request_json(PATIENT_PATH, fetch)
+    assert fetch.call_count == 2
+
+
+def test_other_errors_are_not_cached(cache: PDSCache) -> None:
+    """Test that errors other than not found are not cached"""
+    # Arrange
+    fetch = MagicMock(side_effect=[Exception("unavailable"), PATIENT])
+    with pytest.raises(Exception, match="unavailable"):
+        cache.request_json(PATIENT_PATH, fetch)
+    # Act
+    result = cache.request_json(PATIENT_PATH, fetch)
+    # Assert
+    assert result == PATIENT
+
+
+def test_uncacheable_paths_are_always_fetched(cache: PDSCache) -> None:
+    """Test that requests that are not keyed on an NHS number bypass the cache"""
+    # Arrange
+    fetch = MagicMock(return_value={})
+    # Act
+    cache.request_json("Patient?family=Smith", fetch)
+    cache.request_json("Patient?family=Smith", fetch)
+    # Assert
+    assert fetch.call_count == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_zero_ttl_disables_caching_of_resource(clock: FakeClock) -> None:
+    """Test that a resource type with a TTL of 0 is not cached"""
+    # Arrange
+    cache = PDSCache(resource_ttls={"Patient": 0}, table_name=None, clock=clock)
+    fetch = MagicMock(return_value=PATIENT)
+    # Act
+    cache.request_json(PATIENT_PATH, fetch)
+    cache.request_json(PATIENT_PATH, fetch)
+    # Assert
+    assert fetch.call_count == 2
+
+
+def test_caching_is_disabled_by_default(clock: FakeClock) -> None:
+    """Test that no resource type is cached unless a TTL is configured"""
+    # Arrange
+    cache = PDSCache(table_name=None, clock=clock)
+    fetch = MagicMock(return_value=PATIENT)
+    # Act
+    cache.request_json(PATIENT_PATH, fetch)
+    cache.request_json(f"{PATIENT_PATH}/RelatedPerson", fetch)
+    cache.request_json(PATIENT_PATH, fetch)
+    cache.request_json(f"{PATIENT_PATH}/RelatedPerson", fetch)
+    # Assert
+    assert fetch.call_count == 4
+
+
+def test_least_recently_used_response_is_evicted(cache: PDSCache) -> None:
+    """Test that the least recently used response is removed when the cache is full"""
+    # Arrange
+    cache.request_json("Patient/9000000017", MagicMock(return_value={}))
+    cache.request_json("Patient/9000000025", MagicMock(return_value={}))
+    cache.request_json("Patient/9000000017", MagicMock())
+    # Act
+    cache.request_json(PATIENT_PATH, MagicMock(return_value=PATIENT))
+    # Assert
+    fetch = MagicMock(return_value={})
+    cache.request_json("Patient/9000000017", fetch)
+    fetch.assert_not_called()
+    cache.request_json("Patient/9000000025", fetch)
+    fetch.assert_called_once()
+
+
+@pytest.mark.parametrize("resource_type, fetch_count", [(None, 2), ("Patient", 1)])
+def test_invalidate_removes_responses(
+    cache: PDSCache, resource_type, fetch_count: int
+) -> None:
+    """Test that invalidated responses are fetched again"""
+    # Arrange
+    patient_fetch = MagicMock(return_value=PATIENT)
+    related_fetch = MagicMock(return_value={})
+    cache.request_json(PATIENT_PATH, patient_fetch)
+    cache.request_json(RELATED_PERSON_PATH, related_fetch)
+    # Act
+    cache.invalidate(NHS_NUMBER, resource_type)
+    cache.request_json(PATIENT_PATH, patient_fetch)
+    cache.request_json(RELATED_PERSON_PATH, related_fetch)
+    # Assert
+    assert patient_fetch.call_count == 2
+    assert patient_fetch.call_count + related_fetch.call_count == 2 + fetch_count
+
+
+def test_shared_tier_is_used_on_memory_miss(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a response stored by another container is reused"""
+    # Arrange
+    mock_client = mocker.patch("lambdas.utils.tiered_cache.get_client")
+    mock_client.return_value.get_item.return_value = {
+        "Item": {
+            "CacheKey": {"S": f"Patient|{NHS_NUMBER}"},
+            "Body": {"S": '{"resourceType": "Patient"}'},
+            "ExpiresAt": {"N": str(clock.now + 300)},
+        }
+    }
+    cache = PDSCache(
+        resource_ttls={"Patient": 300}, table_name="pds-cache", clock=clock
+    )
+    fetch = MagicMock()
+    # Act
+    result = cache.request_json(PATIENT_PATH, fetch)
+    cache.request_json(PATIENT_PATH, fetch)
+    # Assert
+    assert result == {"resourceType": "Patient"}
+    fetch.assert_not_called()
+    mock_client.return_value.get_item.assert_called_once_with(
+        TableName="pds-cache", Key={"CacheKey": {"S": f"Patient|{NHS_NUMBER}"}}
+    )
+    assert cache.stats()["shared_hits"] == 1
+
+
+def test_not_found_is_written_to_shared_tier_without_body(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a not found response is shared with the not found TTL"""
+    # Arrange
+    mock_client = mocker.patch("lambdas.utils.tiered_cache.get_client")
+    mock_client.return_value.get_item.return_value = {}
+    cache = PDSCache(
+        resource_ttls={"Patient": 300},
+        not_found_ttl=30,
+        table_name="pds-cache",
+        clock=clock,
+    )
+    # Act
+    with pytest.raises(FHIRNotFoundException):
+        cache.request_json(
+            PATIENT_PATH, MagicMock(side_effect=FHIRNotFoundException(None))
+        )
+    # Assert
+    item = mock_client.return_value.put_item.call_args.kwargs["Item"]
+    assert "Body" not in item
+    assert item["TTL"] == {"N": str(int(clock.now + 30))}
+
+
+def test_shared_tier_errors_do_not_prevent_requests(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that DynamoDB failures fall back to requesting PDS"""
+    # Arrange
+    mock_client = mocker.patch("lambdas.utils.tiered_cache.get_client")
+    mock_client.return_value.get_item.side_effect = Exception("unavailable")
+    mock_client.return_value.put_item.side_effect = Exception("unavailable")
+    mock_client.return_value.delete_item.side_effect = Exception("unavailable")
+    cache = PDSCache(
+        resource_ttls={"Patient": 300}, table_name="pds-cache", clock=clock
+    )
+    # Act
+    result = cache.request_json(PATIENT_PATH, MagicMock(return_value=PATIENT))
+    cache.invalidate(NHS_NUMBER)
+    # Assert
+    assert result == PATIENT
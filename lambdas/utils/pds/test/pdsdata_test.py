@@ -8,16 +8,20 @@ import pytest
 from dateutil.relativedelta import relativedelta
 from fhirclient.models.codeableconcept import CodeableConcept
 from fhirclient.models.coding import Coding
+from fhirclient.models.fhirabstractbase import FHIRValidationError
 from fhirclient.models.fhirdate import FHIRDate
 from fhirclient.models.patient import Patient
 from fhirclient.models.period import Period
 from fhirclient.models.relatedperson import RelatedPerson
 
 from lambdas.utils.pds.pdsdata import (
+    get_identifier_value,
     get_is_person_deceased,
     get_patient_age,
+    get_related_nhs_number,
     get_relationship,
     get_security_code,
+    validate_resource_json,
 )
 
 
@@ -426,6 +430,145 @@ def test_get_relationship_when_coding_empty_returns_empty(
     assert actual == expected
 
 
+# Tests cases for reading the raw JSON records
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        "patient_valid.json",
+        "proxy_deceased.json",
+        "proxy_restricted.json",
+        "proxy_valid.json",
+        "sample_sandpit_patient.json",
+        "sample_very_restricted.json",
+    ],
+)
+def test_patient_json_matches_patient_model(file_name: str):
+    """
+    Test Function : pdsdata patient functions
+    Scenario: When the raw JSON patient record is supplied
+    Expected Result: the same values are returned as for the Patient model
+    """
+    # Arrange
+    data = load_mock_record(os.path.join(sample_data_dir, "patient_details", file_name))
+    patient = Patient(data)
+
+    # Act & Assert
+    assert get_patient_age(data) == get_patient_age(patient)
+    assert get_is_person_deceased(data) == get_is_person_deceased(patient)
+    assert get_security_code(data) == get_security_code(patient)
+    assert get_identifier_value(data) == get_identifier_value(patient)
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        "proxy_test_mother_and_personal.json",
+        "proxy_valid_three_children.json",
+        "related_person_two_relationships.json",
+        "sample_sandpit_two_related_person.json",
+    ],
+)
+def test_related_person_json_matches_related_person_model(file_name: str):
+    """
+    Test Function : pdsdata related person functions
+    Scenario: When the raw JSON related person records are supplied
+    Expected Result: the same values are returned as for the RelatedPerson model
+    """
+    # Arrange
+    records = load_mock_record(
+        os.path.join(sample_data_dir, "related_person", file_name)
+    )
+    if isinstance(records, dict):
+        records = [records]
+
+    for data in records:
+        related = RelatedPerson(data)
+
+        # Act & Assert
+        assert get_relationship(data) == get_relationship(related)
+        assert get_related_nhs_number(data) == get_related_nhs_number(related)
+
+
+@pytest.mark.parametrize(
+    "period, is_active",
+    [
+        ({"start": "null", "end": "null"}, False),
+        ({"start": "", "end": ""}, False),
+        ({"start": "2100-01-01", "end": "2110-01-01"}, False),
+        ({"start": "2000-01-01", "end": "2020-01-01"}, False),
+        ({"end": "2110-01-01"}, False),
+        ({"start": "2000-01-01"}, True),
+        (None, True),
+    ],
+)
+def test_get_relationship_json_when_period_returns_expected(period, is_active: bool):
+    """
+    Test Function : pdsdata.get_relationship
+    Scenario: When the raw JSON 'period' property is specified value
+    Expected Result: the relationship is returned only for an active period,
+        matching the RelatedPerson model
+    """
+    # Arrange
+    data = load_mock_record(mock_related_person_file)[0]
+    data["period"] = period
+
+    # Act
+    actual = get_relationship(data)
+
+    # Assert
+    assert actual == get_relationship(RelatedPerson(data))
+    assert bool(actual) == is_active
+
+
+def test_get_relationship_json_when_inactive_returns_empty():
+    """
+    Test Function : pdsdata.get_relationship
+    Scenario: When the raw JSON 'active' property is False
+    Expected Result: returns an empty result
+    """
+    # Arrange
+    data = load_mock_record(mock_related_person_file)[0]
+    data["active"] = False
+
+    # Act
+    actual = get_relationship(data)
+
+    # Assert
+    assert actual == []
+
+
+@pytest.mark.parametrize(
+    "function, data",
+    [
+        (get_is_person_deceased, {"deceasedBoolean": "false"}),
+        (get_patient_age, {"birthDate": 2010}),
+        (get_security_code, {"meta": {"security": {"code": "U"}}}),
+        (get_relationship, {"relationship": [{"coding": "MTH"}]}),
+    ],
+)
+def test_json_when_property_has_wrong_type_then_error_raised(function, data: dict):
+    """
+    Test Function : pdsdata functions
+    Scenario: When a raw JSON property does not have the type the model expects
+    Expected Result: FHIRValidationError is raised
+    """
+    # Act & Assert
+    with pytest.raises(FHIRValidationError):
+        function(data)
+
+
+@pytest.mark.parametrize("data", ["test-invalid-fhir-patient", None, []])
+def test_validate_resource_json_when_not_dict_then_error_raised(data):
+    """
+    Test Function : pdsdata.validate_resource_json
+    Scenario: When the record is not a JSON object
+    Expected Result: FHIRValidationError is raised
+    """
+    # Act & Assert
+    with pytest.raises(FHIRValidationError):
+        validate_resource_json(data)
+
+
 def load_mock_record(file_path):
     """
     Load a mock record from a JSON file.
@@ -440,6 +583,10 @@ def load_mock_record(file_path):
         return json.load(file)
 
 
+sample_data_dir = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "../sample_data"
+)
+
 mock_proxy_file_sandpit_patient = os.path.join(
     os.path.dirname(os.path.realpath(__file__)),
     "../sample_data/patient_details/sample_sandpit_patient.json",
@@ -0,0 +1,88 @@
+""" Unit tests for the relationship index """
+
+from datetime import date
+
+import pytest
+from fhirclient.models.relatedperson import RelatedPerson
+from pytest_mock import MockerFixture
+
+from lambdas.utils.pds import pdsdata
+from lambdas.utils.pds.relationshipindex import RelationshipIndex
+
+TODAY = date(2024, 6, 1)
+
+
+def create_related(record_id: str, nhs_number: str, code: str, **kwargs) -> dict:
+    """Creates a raw JSON related person record"""
+    return {
+        "resourceType": "RelatedPerson",
+        "id": record_id,
+        "patient": {"identifier": {"value": nhs_number}},
+        "period": {"start": "2020-01-01"},
+        "relationship": [{"coding": [{"code": code}]}],
+        **kwargs,
+    }
+
+
+@pytest.fixture(name="related")
+def setup_related() -> list[dict]:
+    """Returns related people with two records for the same NHS number"""
+    return [
+        create_related("1", "9000000009", "PRN"),
+        create_related("2", "9000000017", "MTH", active=False),
+        create_related("3", "9000000017", "MTH"),
+        create_related("4", "9000000017", "MTH"),
+    ]
+
+
+def test_find_returns_first_active_record(related: list[dict]) -> None:
+    """Test that the first active record in the bundle with the code is returned"""
+    # Act
+    actual = RelationshipIndex(related, TODAY).find("9000000017", "MTH")
+    # Assert
+    assert actual is related[2]
+
+
+@pytest.mark.parametrize(
+    "nhs_number, code", [("9000000009", "MTH"), ("9000000025", "MTH")]
+)
+def test_find_when_no_relationship_returns_none(
+    related: list[dict], nhs_number: str, code: str
+) -> None:
+    """Test that None is returned when there is no relationship with the code"""
+    assert RelationshipIndex(related, TODAY).find(nhs_number, code) is None
+
+
+def test_find_when_period_not_started_returns_none() -> None:
+    """Test that the period is checked against the date of the index"""
+    # Arrange
+    related = [create_related("1", "9000000009", "MTH")]
+    # Act
+    index = RelationshipIndex(related, date(2019, 12, 31))
+    # Assert
+    assert index.find("9000000009", "MTH") is None
+
+
+def test_relationships_are_only_read_for_looked_up_nhs_numbers(
+    related: list[dict], mocker: MockerFixture
+) -> None:
+    """Test that relationship codes are worked out once, only for the NHS number"""
+    # Arrange
+    get_relationship = mocker.spy(pdsdata, "get_relationship")
+    index = RelationshipIndex(related, TODAY)
+    # Act
+    index.find("9000000017", "MTH")
+    index.find("9000000017", "PRN")
+    # Assert
+    assert get_relationship.call_count == 3
+    get_relationship.assert_called_with(related[3], TODAY)
+
+
+def test_index_accepts_related_person_models(related: list[dict]) -> None:
+    """Test that the fhirclient models can be indexed"""
+    # Arrange
+    models = [RelatedPerson(record) for record in related]
+    # Act
+    actual = RelationshipIndex(models, TODAY).get_relationships("9000000017")
+    # Assert
+    assert actual == {"MTH": models[2]}
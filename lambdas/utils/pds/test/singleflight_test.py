@@ -0,0 +1,114 @@
+""" Unit tests for the PDS single flight """
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from unittest.mock import MagicMock
+
+import pytest
+from fhirclient.server import FHIRNotFoundException
+
+from lambdas.utils.pds.singleflight import single_flight, single_flight_scope
+
+PATH = "Patient/9000000009"
+
+
+def test_lookups_outside_a_scope_are_always_made() -> None:
+    """Test that lookups are not deduplicated without a scope"""
+    # Arrange
+    fetch = MagicMock(return_value={})
+    # Act
+    single_flight(PATH, fetch)
+    single_flight(PATH, fetch)
+    # Assert
+    assert fetch.call_count == 2
+
+
+def test_repeated_lookups_in_a_scope_are_made_once() -> None:
+    """Test that a repeated lookup shares the first result"""
+    # Arrange
+    fetch = MagicMock(return_value={"id": "1"})
+    other_fetch = MagicMock(return_value={"id": "2"})
+    # Act
+    with single_flight_scope() as scope:
+        first = single_flight(PATH, fetch)
+        second = single_flight(PATH, fetch)
+        other = single_flight("Patient/9000000017", other_fetch)
+    # Assert
+    assert first == second == {"id": "1"}
+    assert other == {"id": "2"}
+    fetch.assert_called_once()
+    assert scope.stats() == {"lookups": 2, "shared": 1}
+
+
+def test_shared_results_are_copies() -> None:
+    """Test that a caller cannot change the result seen by another caller"""
+    # Act
+    with single_flight_scope():
+        single_flight(PATH, MagicMock(return_value={"id": "1"}))["id"] = "changed"
+        result = single_flight(PATH, MagicMock())
+    # Assert
+    assert result == {"id": "1"}
+
+
+def test_exceptions_are_shared() -> None:
+    """Test that a failed lookup is raised to every caller without a retry"""
+    # Arrange
+    fetch = MagicMock(side_effect=FHIRNotFoundException(None))
+    # Act & Assert
+    with single_flight_scope():
+        for _ in range(2):
+            with pytest.raises(FHIRNotFoundException):
+                single_flight(PATH, fetch)
+    fetch.assert_called_once()
+
+
+def test_scope_ends_with_the_block() -> None:
+    """Test that results are not shared between scopes"""
+    # Arrange
+    fetch = MagicMock(return_value={})
+    # Act
+    with single_flight_scope():
+        single_flight(PATH, fetch)
+    with single_flight_scope():
+        single_flight(PATH, fetch)
+    # Assert
+    assert fetch.call_count == 2
+
+
+def test_nested_scopes_share_the_outer_scope() -> None:
+    """Test that a nested scope does not start a new single flight"""
+    # Act
+    with single_flight_scope() as outer:
+        with single_flight_scope() as inner:
+            pass
+    # Assert
+    assert inner is outer
+
+
+def test_concurrent_lookups_in_copied_contexts_are_made_once() -> None:
+    """Test that threads running in a copy of the context wait for the first lookup"""
+    # Arrange
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch() -> dict:
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return {"id": "1"}
+
+    # Act
+    with single_flight_scope(), ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(copy_context().run, single_flight, PATH, fetch)
+        started.wait(1)
+        others = [
+            executor.submit(copy_context().run, single_flight, PATH, fetch)
+            for _ in range(3)
+        ]
+        release.set()
+        results = [first.result()] + [other.result() for other in others]
+    # Assert
+    assert results == [{"id": "1"}] * 4
+    assert len(calls) == 1
@@ -0,0 +1,188 @@
+"""Validates a batch of candidate relationships concurrently.
+
+The equivalent of the relationship-map state, which validates one relationship at a
+time. All of the PDS patient details and relationship lookups for the batch are made
+on a bounded worker pool, followed by the validation of each relationship.
+
+LambdaApplication instances keep the current event and response as attributes, so
+each worker thread uses its own instance of each stage.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from os import getenv
+from typing import Any, Callable, Optional
+
+from lambdas.pds_get_patient_details.main import PdsGetPatientDetails
+from lambdas.relationship_lookup.main import RelationshipLookup
+from lambdas.utils.logging.logger import LOG_BASE, write_log
+from lambdas.utils.pipeline.stage_output import select, select_result
+from lambdas.validate_relationship.main import ValidateRelationship
+
+# Maximum number of PDS requests and validations in progress at once
+MAX_CONCURRENCY = int(getenv("RELATIONSHIP_VALIDATION_MAX_CONCURRENCY", "4"))
+
+
+class RelationshipBatchValidator:
+    """Validates the relationships of a proxy using a bounded worker pool"""
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY) -> None:
+        """Initialise the validator
+
+        Args:
+            max_concurrency (int): Maximum number of concurrent PDS requests and validations
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._stages = threading.local()
+
+    def validate(
+        self,
+        relationships: list[dict],
+        access_token: str,
+        parameters: dict,
+        context: Any = None,
+    ) -> list[Optional[dict]]:
+        """Validates each relationship, preserving the order of the input
+
+        Args:
+            relationships (list[dict]): RelatedPerson resources from the eligibility output
+            access_token (str): PDS access token
+            parameters (dict): Must contain proxyNhsNumber, correlationId and requestId
+            context (Any): Current Lambda context
+
+        Returns:
+            list[Optional[dict]]: For each relationship, the 'pdsPatient' and
+                'pdsRelationship' if it is valid, otherwise None
+        """
+        if not relationships:
+            return []
+
+        write_log(
+            "DEBUG",
+            {
+                "info": f"Validating {len(relationships)} relationships with "
+                f"{self.max_concurrency} workers"
+            },
+        )
+        executor = self.__get_executor()
+
+        # Tasks run in a copy of the current context to share the single flight scope
+        lookups = []
+        for relationship in relationships:
+            payload = {
+                "authToken": access_token,
+                "nhsNumber": relationship["patient"]["identifier"]["value"],
+            }
+            lookups.append(
+                (
+                    executor.submit(
+                        copy_context().run,
+                        self.__run_stage,
+                        "pds_get_patient_details",
+                        payload,
+                        context,
+                    ),
+                    executor.submit(
+                        copy_context().run,
+                        self.__run_stage,
+                        "relationship_lookup",
+                        payload,
+                        context,
+                    ),
+                )
+            )
+
+        validations: list[Future] = []
+        for patient_details, patient_relationships in lookups:
+            validations.append(
+                executor.submit(
+                    copy_context().run,
+                    self.__validate_relationship,
+                    patient_details.result(),
+                    patient_relationships.result(),
+                    parameters,
+                    context,
+                )
+            )
+
+        return [validation.result() for validation in validations]
+
+    def __validate_relationship(
+        self,
+        patient_details: dict,
+        patient_relationships: dict,
+        parameters: dict,
+        context: Any,
+    ) -> Optional[dict]:
+        """Validates a single relationship from its PDS records
+
+        Args:
+            patient_details (dict): Output of the patient details stage
+            patient_relationships (dict): Output of the relationship lookup stage
+            parameters (dict): Must contain proxyNhsNumber, correlationId and requestId
+            context (Any): Current Lambda context
+
+        Returns:
+            Optional[dict]: The patient and relationship if valid, otherwise None
+
+        Raises:
+            PipelineError: If a stage output does not contain a required value
+        """
+        result = self.__run_stage(
+            "validate_relation",
+            {
+                "proxyNhsNumber": parameters["proxyNhsNumber"],
+                "pdsPatient": select(patient_details, "body", "pdsPatientRecord"),
+                "pdsPatientStatus": select(patient_details, "statusCode"),
+                "pdsRelationshipLookup": select(
+                    patient_relationships, "body", "pdsRelationshipRecord"
+                ),
+                "pdsRelationshipLookupStatus": select(
+                    patient_relationships, "statusCode"
+                ),
+                "correlationId": parameters["correlationId"],
+                "requestId": parameters["requestId"],
+            },
+            context,
+        )
+
+        body = select_result(result)["body"]
+        if "pdsPatient" in body and "pdsRelationshipLookup" in body:
+            return {
+                "pdsPatient": body["pdsPatient"],
+                "pdsRelationship": body["pdsRelationshipLookup"],
+            }
+        return None
+
+    def __run_stage(self, name: str, payload: dict, context: Any) -> dict:
+        """Runs a stage using the instance belonging to the current thread"""
+        return self.__get_stage(name)(payload, context)
+
+    def __get_stage(self, name: str) -> Callable[[dict, Any], dict]:
+        """Returns the main function of the current thread's instance of the stage"""
+        if not hasattr(self._stages, name):
+            stage_types = {
+                "pds_get_patient_details": PdsGetPatientDetails,
+                "relationship_lookup": RelationshipLookup,
+                "validate_relation": ValidateRelationship,
+            }
+            setattr(
+                self._stages, name, stage_types[name](additional_log_config=LOG_BASE)
+            )
+        return getattr(self._stages, name).main
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        """Returns the worker pool, which is kept for the lifetime of the container"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="relationship-validation",
+                )
+            return self._executor
+
+
+relationship_batch_validator = RelationshipBatchValidator()
@@ -0,0 +1,47 @@
+"""Selects values from the outputs of the in-process pipeline stages.
+
+A stage output that is missing a value the next stage needs is reported as a
+PipelineError, the equivalent of the state machine execution failing.
+"""
+
+from typing import Any
+
+
+class PipelineError(Exception):
+    """Raised when a stage output cannot be passed to the next stage.
+
+    This is the equivalent of the state machine execution failing.
+    """
+
+
+def select(data: Any, *path) -> Any:
+    """Returns the value at the path, raising a PipelineError if it does not exist
+
+    Args:
+        data (Any): The data to select from
+        *path: Keys and indexes to follow
+
+    Returns:
+        Any: The selected value
+    """
+    value = data
+    for key in path:
+        try:
+            value = value[key]
+        except (KeyError, IndexError, TypeError) as error:
+            raise PipelineError(
+                f"Stage output does not contain {'.'.join(map(str, path))}"
+            ) from error
+    return value
+
+
+def select_result(output: dict) -> dict:
+    """Selects the body and status code from a stage output
+
+    Args:
+        output (dict): The output of the stage
+
+    Returns:
+        dict: The body and statusCode of the output
+    """
+    return {"body": select(output, "body"), "statusCode": select(output, "statusCode")}
@@ -0,0 +1,215 @@
+"""Unit tests for the relationship batch validator."""
+
+import threading
+from http import HTTPStatus
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from lambdas.utils.pipeline.relationship_batch import RelationshipBatchValidator
+from lambdas.utils.pipeline.stage_output import PipelineError
+
+FILE_PATH = "lambdas.utils.pipeline.relationship_batch"
+
+ACCESS_TOKEN = "test-access-token"
+PARAMETERS = {
+    "proxyNhsNumber": "9730675929",
+    "correlationId": "test-correlation-id",
+    "requestId": "test-request-id",
+}
+NHS_NUMBERS = ["9730676399", "9730676402", "9730676410"]
+
+
+def relationship(nhs_number: str) -> dict:
+    """Creates a RelatedPerson resource for the patient"""
+    return {"patient": {"identifier": {"value": nhs_number}}}
+
+
+def patient_details(payload: dict, _context) -> dict:
+    """Returns patient details for the requested NHS number"""
+    return {
+        "statusCode": HTTPStatus.OK,
+        "body": {"pdsPatientRecord": {"id": payload["nhsNumber"]}},
+    }
+
+
+def relationship_lookup(payload: dict, _context) -> dict:
+    """Returns the related people for the requested NHS number"""
+    return {
+        "statusCode": HTTPStatus.OK,
+        "body": {"pdsRelationshipRecord": [{"id": payload["nhsNumber"]}]},
+    }
+
+
+def validate_relation(payload: dict, _context) -> dict:
+    """Returns a valid result, unless the patient is the last NHS number"""
+    if payload["pdsPatient"]["id"] == NHS_NUMBERS[-1]:
+        return {"statusCode": HTTPStatus.OK, "body": {"error": "INVALID"}}
+    return {
+        "statusCode": HTTPStatus.OK,
+        "body": {
+            "pdsPatient": payload["pdsPatient"],
+            "pdsRelationshipLookup": payload["pdsRelationshipLookup"],
+        },
+    }
+
+
+@pytest.fixture(name="stage_types")
+def setup_stage_types(mocker: MockerFixture) -> dict[str, MagicMock]:
+    """Patch the stage classes used by the worker threads"""
+    stage_types = {
+        "PdsGetPatientDetails": patient_details,
+        "RelationshipLookup": relationship_lookup,
+        "ValidateRelationship": validate_relation,
+    }
+    mocks = {}
+    for name, main in stage_types.items():
+        mocks[name] = mocker.patch(f"{FILE_PATH}.{name}")
+        mocks[name].return_value.main.side_effect = main
+    return mocks
+
+
+def test_validate_returns_result_for_each_relationship_in_order(
+    stage_types: dict[str, MagicMock],
+) -> None:
+    """Test that the results are in the same order as the relationships"""
+    # Arrange
+    validator = RelationshipBatchValidator(max_concurrency=2)
+    context = {"aws_request_id": "test"}
+    # Act
+    results = validator.validate(
+        [relationship(nhs_number) for nhs_number in NHS_NUMBERS],
+        ACCESS_TOKEN,
+        PARAMETERS,
+        context,
+    )
+    # Assert
+    assert results == [
+        {
+            "pdsPatient": {"id": NHS_NUMBERS[0]},
+            "pdsRelationship": [{"id": NHS_NUMBERS[0]}],
+        },
+        {
+            "pdsPatient": {"id": NHS_NUMBERS[1]},
+            "pdsRelationship": [{"id": NHS_NUMBERS[1]}],
+        },
+        None,
+    ]
+    lookup = stage_types["PdsGetPatientDetails"].return_value.main
+    assert sorted(
+        call.args[0]["nhsNumber"] for call in lookup.call_args_list
+    ) == sorted(NHS_NUMBERS)
+    assert all(
+        call.args[0]["authToken"] == ACCESS_TOKEN for call in lookup.call_args_list
+    )
+    validation = stage_types["ValidateRelationship"].return_value.main
+    assert all(
+        call.args[0]["proxyNhsNumber"] == PARAMETERS["proxyNhsNumber"]
+        and call.args[1] == context
+        for call in validation.call_args_list
+    )
+
+
+def test_validate_uses_one_stage_instance_per_worker_thread(
+    stage_types: dict[str, MagicMock],
+) -> None:
+    """Test that stage instances are not shared between worker threads"""
+    # Arrange
+    validator = RelationshipBatchValidator(max_concurrency=2)
+    threads = set()
+
+    def record_thread(payload: dict, context) -> dict:
+        threads.add(threading.get_ident())
+        return patient_details(payload, context)
+
+    stage_types["PdsGetPatientDetails"].return_value.main.side_effect = record_thread
+    # Act
+    for _ in range(3):
+        validator.validate(
+            [relationship(nhs_number) for nhs_number in NHS_NUMBERS],
+            ACCESS_TOKEN,
+            PARAMETERS,
+        )
+    # Assert
+    assert len(threads) <= 2
+    assert stage_types["PdsGetPatientDetails"].call_count == len(threads)
+
+
+def test_validate_limits_concurrency(stage_types: dict[str, MagicMock]) -> None:
+    """Test that no more than max_concurrency requests are in progress at once"""
+    # Arrange
+    validator = RelationshipBatchValidator(max_concurrency=2)
+    lock = threading.Lock()
+    in_progress = [0]
+    peak = [0]
+
+    def count_in_progress(payload: dict, context) -> dict:
+        with lock:
+            in_progress[0] += 1
+            peak[0] = max(peak[0], in_progress[0])
+        threading.Event().wait(0.01)
+        with lock:
+            in_progress[0] -= 1
+        return patient_details(payload, context)
+
+    stage_types["PdsGetPatientDetails"].return_value.main.side_effect = (
+        count_in_progress
+    )
+    # Act
+    validator.validate(
+        [relationship(nhs_number) for nhs_number in NHS_NUMBERS * 2],
+        ACCESS_TOKEN,
+        PARAMETERS,
+    )
+    # Assert
+    assert peak[0] <= 2
+
+
+def test_validate_when_no_relationships_then_returns_empty_list(
+    stage_types: dict[str, MagicMock],
+) -> None:
+    """Test that an empty batch does not start any work"""
+    # Act
+    results = RelationshipBatchValidator().validate([], ACCESS_TOKEN, PARAMETERS)
+    # Assert
+    assert results == []
+    stage_types["PdsGetPatientDetails"].assert_not_called()
+
+
+def test_validate_when_lookup_raises_then_raises(
+    stage_types: dict[str, MagicMock],
+) -> None:
+    """Test that a failed lookup fails the batch"""
+    # Arrange
+    stage_types["RelationshipLookup"].return_value.main.side_effect = Exception("test")
+    # Act & Assert
+    with pytest.raises(Exception, match="test"):
+        RelationshipBatchValidator().validate(
+            [relationship(NHS_NUMBERS[0])], ACCESS_TOKEN, PARAMETERS
+        )
+
+
+@pytest.mark.parametrize(
+    "stage, output, path",
+    [
+        (
+            "PdsGetPatientDetails",
+            {"statusCode": HTTPStatus.OK},
+            "body.pdsPatientRecord",
+        ),
+        ("RelationshipLookup", {"body": {}}, "body.pdsRelationshipRecord"),
+        ("ValidateRelationship", {"statusCode": HTTPStatus.OK}, "body"),
+    ],
+)
+def test_validate_when_stage_output_is_malformed_then_raises_pipeline_error(
+    stage: str, output: dict, path: str, stage_types: dict[str, MagicMock]
+) -> None:
+    """Test that a stage output missing a value fails like the pipeline does"""
+    # Arrange
+    stage_types[stage].return_value.main.side_effect = lambda payload, context: output
+    # Act & Assert
+    with pytest.raises(PipelineError, match=path):
+        RelationshipBatchValidator().validate(
+            [relationship(NHS_NUMBERS[0])], ACCESS_TOKEN, PARAMETERS
+        )
@@ -0,0 +1,204 @@
+"""Unit tests for the in-process validate relationships pipeline."""
+
+from http import HTTPStatus
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from lambdas.utils.pds import errors
+from lambdas.utils.pipeline.stage_output import PipelineError
+from lambdas.utils.pipeline.validate_relationships import ValidateRelationshipsPipeline
+
+FILE_PATH = "lambdas.utils.pipeline.validate_relationships"
+
+PROXY_NHS_NUMBER = "9730675929"
+PATIENT_NHS_NUMBER = "9730676399"
+ACCESS_TOKEN = "test-access-token"
+
+PARAMETERS = {
+    "proxyNhsNumber": PROXY_NHS_NUMBER,
+    "patientNhsNumber": PATIENT_NHS_NUMBER,
+    "correlationId": "test-correlation-id",
+    "originalRequestUrl": "test-url",
+    "_include": "",
+    "requestId": "test-request-id",
+}
+PROXY_IDENTIFIER = {"system": "https://fhir.nhs.uk/Id/nhs-number", "value": "1"}
+RELATIONSHIP = {"patient": {"identifier": {"value": PATIENT_NHS_NUMBER}}}
+
+
+@pytest.fixture(name="stages")
+def setup_stages(mocker: MockerFixture) -> dict[str, MagicMock]:
+    """Patch every stage with a successful, eligible response"""
+    stages = {
+        name: mocker.patch(f"{FILE_PATH}.{name}")
+        for name in [
+            "verify_parameters",
+            "pds_access_token",
+            "pds_get_patient_details",
+            "relationship_lookup",
+            "validate_eligibility",
+            "relationship_batch_validator",
+            "process_result",
+        ]
+    }
+    stages["verify_parameters"].main.return_value = PARAMETERS
+    stages["pds_access_token"].main.return_value = {
+        "statusCode": HTTPStatus.OK,
+        "body": {"token": {"access_token": ACCESS_TOKEN}},
+    }
+    stages["pds_get_patient_details"].main.return_value = {
+        "statusCode": HTTPStatus.OK,
+        "body": {"pdsPatientRecord": {"identifier": [PROXY_IDENTIFIER]}},
+    }
+    stages["relationship_lookup"].main.return_value = {
+        "statusCode": HTTPStatus.OK,
+        "body": {"pdsRelationshipRecord": [RELATIONSHIP]},
+    }
+    stages["validate_eligibility"].main.return_value = {
+        "statusCode": HTTPStatus.OK,
+        "body": {"eligibility": True, "relationshipArr": [RELATIONSHIP]},
+    }
+    stages["relationship_batch_validator"].validate.return_value = [
+        {"pdsPatient": "patient", "pdsRelationship": "relationship"}
+    ]
+    return stages
+
+
+def test_run_when_eligible_then_validates_each_relationship(
+    stages: dict[str, MagicMock],
+) -> None:
+    """Test that each stage is called with the same inputs as the state machine"""
+    # Arrange
+    event = {"proxyNhsNumber": PROXY_NHS_NUMBER}
+    context = {"aws_request_id": "test"}
+    # Act
+    result = ValidateRelationshipsPipeline().run(event, context)
+    # Assert
+    assert result == stages["process_result"].main.return_value
+    stages["verify_parameters"].main.assert_called_once_with(event, context)
+    pds_payload = {"authToken": ACCESS_TOKEN, "nhsNumber": PROXY_NHS_NUMBER}
+    assert stages["pds_get_patient_details"].main.call_args_list[0].args == (
+        pds_payload,
+        context,
+    )
+    assert stages["relationship_lookup"].main.call_args_list[0].args == (
+        pds_payload,
+        context,
+    )
+    eligibility_event = stages["validate_eligibility"].main.call_args.args[0]
+    assert eligibility_event["pdsProxyStatusCode"] == HTTPStatus.OK
+    assert eligibility_event["pdsRelationshipLookup"] == [RELATIONSHIP]
+    stages["relationship_batch_validator"].validate.assert_called_once_with(
+        [RELATIONSHIP], ACCESS_TOKEN, PARAMETERS, context
+    )
+    stages["process_result"].main.assert_called_once_with(
+        {
+            "pdsPatientRelationship": [
+                {"pdsPatient": "patient", "pdsRelationship": "relationship"}
+            ],
+            "originalRequestUrl": "test-url",
+            "_include": "",
+            "proxyIdentifier": PROXY_IDENTIFIER,
+            "requestId": "test-request-id",
+        },
+        context,
+    )
+
+
+@pytest.mark.parametrize(
+    "eligibility_body",
+    [
+        {"eligibility": False, "relationshipArr": None},
+        {"eligibility": True, "relationshipArr": None},
+    ],
+)
+def test_run_when_not_eligible_then_skips_relationship_validation(
+    stages: dict[str, MagicMock], eligibility_body: dict
+) -> None:
+    """Test that relationships are not validated for an ineligible proxy"""
+    # Arrange
+    stages["validate_eligibility"].main.return_value = {
+        "statusCode": HTTPStatus.OK,
+        "body": eligibility_body,
+    }
+    # Act
+    ValidateRelationshipsPipeline().run({})
+    # Assert
+    stages["relationship_batch_validator"].validate.assert_not_called()
+    event = stages["process_result"].main.call_args.args[0]
+    assert event["pdsPatientRelationship"] == []
+
+
+def test_run_when_parameters_invalid_then_processes_error(
+    stages: dict[str, MagicMock],
+) -> None:
+    """Test that a verify parameters error is returned as an operation outcome"""
+    # Arrange
+    stages["verify_parameters"].main.return_value = {"error": errors.NOT_SUPPORTED}
+    # Act
+    ValidateRelationshipsPipeline().run({})
+    # Assert
+    stages["pds_access_token"].main.assert_not_called()
+    stages["process_result"].main.assert_called_once_with(
+        {"error": errors.NOT_SUPPORTED}, None
+    )
+
+
+@pytest.mark.parametrize("token", [None, {}])
+def test_run_when_access_token_missing_then_processes_error(
+    stages: dict[str, MagicMock], token
+) -> None:
+    """Test that a missing access token stops the pipeline with a server error"""
+    # Arrange
+    stages["pds_access_token"].main.return_value = {
+        "statusCode": HTTPStatus.INTERNAL_SERVER_ERROR,
+        "body": {"token": token},
+    }
+    # Act
+    ValidateRelationshipsPipeline().run({})
+    # Assert
+    stages["pds_get_patient_details"].main.assert_not_called()
+    stages["process_result"].main.assert_called_once_with(
+        {"error": errors.INTERNAL_SERVER_ERROR}, None
+    )
+
+
+def test_run_when_eligibility_errors_then_raises_pipeline_error(
+    stages: dict[str, MagicMock],
+) -> None:
+    """Test that an output missing a required value fails the pipeline"""
+    # Arrange
+    stages["validate_eligibility"].main.return_value = {
+        "statusCode": HTTPStatus.BAD_REQUEST,
+        "body": {"error": "PDS Status Code is invalid"},
+    }
+    # Act & Assert
+    with pytest.raises(PipelineError, match="body.eligibility"):
+        ValidateRelationshipsPipeline().run({})
+    stages["process_result"].main.assert_not_called()
+
+
+def test_run_when_stage_raises_then_raises(stages: dict[str, MagicMock]) -> None:
+    """Test that an unhandled stage exception is not swallowed"""
+    # Arrange
+    stages["relationship_lookup"].main.side_effect = Exception("test")
+    # Act & Assert
+    with pytest.raises(Exception, match="test"):
+        ValidateRelationshipsPipeline().run({})
+
+
+def test_run_deduplicates_pds_lookups_within_the_run(
+    stages: dict[str, MagicMock], mocker: MockerFixture
+) -> None:
+    """Test that the stages run within a single flight scope"""
+    # Arrange
+    mock_scope = mocker.patch(f"{FILE_PATH}.single_flight_scope")
+    stages["verify_parameters"].main.side_effect = lambda *_: (
+        mock_scope.return_value.__enter__.assert_called_once() or PARAMETERS
+    )
+    # Act
+    ValidateRelationshipsPipeline().run({})
+    # Assert
+    mock_scope.return_value.__exit__.assert_called_once()
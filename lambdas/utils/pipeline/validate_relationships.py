@@ -0,0 +1,160 @@
+"""In-process engine for the validate relationships workflow.
+
+Runs the same stages as the validate-relationships state machine within a single
+invocation, calling each stage's LambdaApplication directly instead of invoking it
+through Step Functions. The PDS record and related people lookups for the proxy are
+made concurrently, and the candidate relationships are validated as a batch.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Callable
+
+from lambdas.pds_access_token.main import pds_access_token
+from lambdas.pds_get_patient_details.main import pds_get_patient_details
+from lambdas.process_validation_result.main import process_result
+from lambdas.relationship_lookup.main import relationship_lookup
+from lambdas.utils.logging.logger import write_log
+from lambdas.utils.pds import errors
+from lambdas.utils.pds.singleflight import single_flight_scope
+from lambdas.utils.pipeline.relationship_batch import relationship_batch_validator
+from lambdas.utils.pipeline.stage_output import select, select_result
+from lambdas.utils.validation.publish_validation_audit_event import (
+    validation_result_event_batch,
+)
+from lambdas.validate_eligibility.main import validate_eligibility
+from lambdas.verify_parameters.main import verify_parameters
+
+
+class ValidateRelationshipsPipeline:
+    """Runs the validate relationships stages in the current process"""
+
+    def run(self, event: dict, context: Any = None) -> dict:
+        """Validates the relationships of the proxy in the event
+
+        PDS lookups of the same resource and NHS number are only made once per run,
+        and the validation result events are sent in batches.
+
+        Args:
+            event (dict): The state machine input, as created by get_candidate_relationships
+            context (Any): Current Lambda context, passed to each stage
+
+        Returns:
+            dict: The process validation result output containing 'statusCode' and 'body'
+        """
+        with single_flight_scope(), validation_result_event_batch():
+            return self.__run(event, context)
+
+    def __run(self, event: dict, context: Any) -> dict:
+        """Runs each of the stages in the order of the state machine"""
+        parameters = verify_parameters.main(event, context)
+        if "error" in parameters:
+            return self.__process_error(parameters["error"], context)
+
+        auth = select_result(pds_access_token.main(parameters, context))
+        access_token = (auth["body"].get("token") or {}).get("access_token")
+        if access_token is None:
+            write_log(
+                "ERROR",
+                {
+                    "info": "PDS access token is not present in the response",
+                    "error": "",
+                },
+            )
+            return self.__process_error(errors.INTERNAL_SERVER_ERROR, context)
+
+        proxy_details, proxy_relationships = self.__get_pds_records(
+            access_token, parameters["proxyNhsNumber"], context
+        )
+
+        eligibility = select_result(
+            validate_eligibility.main(
+                {
+                    "patientNhsNumber": parameters["patientNhsNumber"],
+                    "pdsProxyDetails": select(
+                        proxy_details, "body", "pdsPatientRecord"
+                    ),
+                    "pdsProxyStatusCode": proxy_details["statusCode"],
+                    "pdsRelationshipLookup": select(
+                        proxy_relationships, "body", "pdsRelationshipRecord"
+                    ),
+                    "pdsRelationshipLookupStatusCode": proxy_relationships[
+                        "statusCode"
+                    ],
+                    "correlationId": parameters["correlationId"],
+                    "requestId": parameters["requestId"],
+                },
+                context,
+            )
+        )
+
+        relationships = []
+        if (
+            select(eligibility, "body", "eligibility") is True
+            and select(eligibility, "body", "relationshipArr") is not None
+        ):
+            relationships = relationship_batch_validator.validate(
+                eligibility["body"]["relationshipArr"],
+                access_token,
+                parameters,
+                context,
+            )
+
+        return process_result.main(
+            {
+                "pdsPatientRelationship": relationships,
+                "originalRequestUrl": parameters["originalRequestUrl"],
+                "_include": parameters["_include"],
+                "proxyIdentifier": select(
+                    proxy_details, "body", "pdsPatientRecord", "identifier", 0
+                ),
+                "requestId": parameters["requestId"],
+            },
+            context,
+        )
+
+    def __get_pds_records(
+        self, access_token: str, nhs_number: str, context: Any
+    ) -> tuple[dict, dict]:
+        """Fetches the PDS patient details and related people concurrently
+
+        Args:
+            access_token (str): PDS access token
+            nhs_number (str): NHS number to look up
+            context (Any): Current Lambda context
+
+        Returns:
+            tuple[dict, dict]: The patient details and relationship lookup outputs
+        """
+        payload = {"authToken": access_token, "nhsNumber": nhs_number}
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Run in a copy of the current context to share the single flight scope,
+            # and so that each stage's log object does not replace the caller's
+            patient_details = executor.submit(
+                copy_context().run,
+                self.__run_stage,
+                pds_get_patient_details.main,
+                payload,
+                context,
+            )
+            related_people = executor.submit(
+                copy_context().run,
+                self.__run_stage,
+                relationship_lookup.main,
+                payload,
+                context,
+            )
+            return patient_details.result(), related_people.result()
+
+    def __run_stage(
+        self, stage: Callable[[dict, Any], dict], payload: dict, context: Any
+    ) -> dict:
+        """Runs a stage and selects the body and status code from its output"""
+        return select_result(stage(payload, context))
+
+    def __process_error(self, error: dict, context: Any) -> dict:
+        """Generates the operation outcome for an error"""
+        return process_result.main({"error": error}, context)
+
+
+validate_relationships_pipeline = ValidateRelationshipsPipeline()
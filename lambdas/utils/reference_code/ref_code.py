@@ -5,7 +5,7 @@ import secrets
 import string
 from os import getenv
 
-from boto3 import resource
+from lambdas.utils.aws.clients import get_resource
 
 
 class ReferenceCode:
@@ -69,7 +69,7 @@ class ReferenceCode:
         table_name = self.TABLE_NAME
 
         # Initialize DynamoDB resource
-        dynamodb = resource("dynamodb")
+        dynamodb = get_resource("dynamodb")
 
         # Specify the table
         table = dynamodb.Table(table_name)
@@ -57,10 +57,10 @@ class RefCodeTests(unittest.TestCase):
         return_value=TABLE_NAME,
     )
     @mock.patch(
-        "lambdas.utils.reference_code.ref_code.resource.Table.get_item",
+        "lambdas.utils.reference_code.ref_code.get_resource.Table.get_item",
         return_value={},
     )
-    @mock.patch("lambdas.utils.reference_code.ref_code.resource")
+    @mock.patch("lambdas.utils.reference_code.ref_code.get_resource")
     def test_check_dynamodb_for_duplicates(
         self, resource_mock, get_item_mock, table_name_mock
     ):
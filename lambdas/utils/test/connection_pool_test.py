@@ -0,0 +1,104 @@
+"""Unit tests for the connection_pool module."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests import PreparedRequest
+from requests.adapters import HTTPAdapter
+
+from ..connection_pool import ConnectionPoolManager, TimeoutHTTPAdapter
+
+
+@pytest.fixture(name="manager")
+def setup_manager() -> ConnectionPoolManager:
+    """Create and return a connection pool manager"""
+    return ConnectionPoolManager(pool_maxsize=4, max_retries=1, timeout=(1, 2))
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://example.com/path?query=1", "https://example.com"),
+        ("http://example.com:8080/path", "http://example.com:8080"),
+        (None, "://"),
+    ],
+)
+def test_get_host(url: str, expected: str) -> None:
+    """Test that the pool key is the scheme and host of the URL"""
+    assert ConnectionPoolManager.get_host(url) == expected
+
+
+def test_get_session_reuses_session_for_same_host(
+    manager: ConnectionPoolManager,
+) -> None:
+    """Test that one session is shared per host"""
+    # Act
+    first = manager.get_session("https://example.com/one")
+    second = manager.get_session("https://example.com/two")
+    other = manager.get_session("https://another.example.com/one")
+    # Assert
+    assert first is second
+    assert first is not other
+
+
+def test_create_session_mounts_pooled_adapter(manager: ConnectionPoolManager) -> None:
+    """Test that the session uses a pooled, retrying adapter with a default timeout"""
+    # Act
+    session = manager.create_session()
+    # Assert
+    adapter = session.get_adapter("https://example.com")
+    assert isinstance(adapter, TimeoutHTTPAdapter)
+    assert adapter is session.get_adapter("http://example.com")
+    assert adapter.timeout == (1, 2)
+    assert adapter.max_retries.total == 1
+    assert adapter._pool_maxsize == 4  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize("timeout, expected", [(None, (1, 2)), (10, 10)])
+@patch.object(HTTPAdapter, "send")
+def test_timeout_adapter_applies_default_timeout(
+    mock_send: MagicMock, timeout, expected
+) -> None:
+    """Test that the default timeout is only used when none is supplied"""
+    # Arrange
+    adapter = TimeoutHTTPAdapter(timeout=(1, 2))
+    request = PreparedRequest()
+    # Act
+    adapter.send(request, timeout=timeout)
+    # Assert
+    assert mock_send.call_args.kwargs["timeout"] == expected
+
+
+def test_metrics_reports_reuse_rate(manager: ConnectionPoolManager) -> None:
+    """Test that the metrics are calculated from the underlying connection pools"""
+    # Arrange
+    session = manager.get_session("https://example.com")
+    pool = MagicMock(num_requests=4, num_connections=1)
+    session.get_adapter("https://example.com").poolmanager.pools = {"key": pool}
+    manager.get_session("https://unused.example.com")
+    # Act
+    metrics = manager.metrics()
+    # Assert
+    assert metrics["https://example.com"] == {
+        "requests": 4,
+        "connections": 1,
+        "reuse_rate": 0.75,
+    }
+    assert metrics["https://unused.example.com"] == {
+        "requests": 0,
+        "connections": 0,
+        "reuse_rate": 0.0,
+    }
+
+
+def test_close_discards_sessions(manager: ConnectionPoolManager) -> None:
+    """Test that closing the manager closes and removes every session"""
+    # Arrange
+    session = manager.get_session("https://example.com")
+    # Act
+    with patch.object(session, "close") as mock_close:
+        manager.close()
+    # Assert
+    mock_close.assert_called_once()
+    assert manager.metrics() == {}
+    assert manager.get_session("https://example.com") is not session
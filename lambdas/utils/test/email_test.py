@@ -1,16 +1,26 @@
 """Unit tests for the email module."""
 
+import threading
 from json import dumps
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 from requests import Response
+from requests.exceptions import ConnectionError as RequestsConnectionError
 
-from ..email import send_email
+from ..email import (
+    BulkEmailClient,
+    EmailNotSentError,
+    EmailResult,
+    RateLimiter,
+    send_email,
+)
 
+EMAIL = ("test@example.com", "Test email", "This is a test email")
 
-@patch("lambdas.utils.email.post")
-def test_send_email(mock_post: MagicMock) -> None:
+
+@patch("lambdas.utils.email.get_session")
+def test_send_email(mock_get_session: MagicMock) -> None:
     """Test the send_email function."""
     # Arrange
     email = "test@example.com"
@@ -18,6 +28,7 @@ def test_send_email(mock_post: MagicMock) -> None:
     body = "This is a test email"
     api_url = "https://example.com"
     subscription_key = "1234567890"
+    mock_post = mock_get_session.return_value.post
     mock_post.return_value = MagicMock(return_value=Response())
     mock_post.return_value.status_code = status_code = 200
     # Act
@@ -39,8 +50,8 @@ def test_send_email(mock_post: MagicMock) -> None:
 
 
 @pytest.mark.parametrize("status_code", [400, 500])
-@patch("lambdas.utils.email.post")
-def test_send_email_failure(mock_post: MagicMock, status_code: int) -> None:
+@patch("lambdas.utils.email.get_session")
+def test_send_email_failure(mock_get_session: MagicMock, status_code: int) -> None:
     """Test the send_email function."""
     # Arrange
     email = "test@example.com"
@@ -48,13 +59,15 @@ def test_send_email_failure(mock_post: MagicMock, status_code: int) -> None:
     body = "This is a test email"
     api_url = "https://example.com"
     subscription_key = "1234567890"
+    mock_post = mock_get_session.return_value.post
     mock_post.return_value = MagicMock(return_value=Response())
     mock_post.return_value.status_code = status_code
     # Act & Assert
     with pytest.raises(
         ValueError, match="Email failed to be added to NHS Send Mail queue."
-    ):
+    ) as error:
         send_email(email, subject, body, api_url, subscription_key)
+    assert error.value.status_code == status_code
     mock_post.assert_called_once_with(
         url=api_url,
         headers={"Subscription-Key": subscription_key},
@@ -67,3 +80,133 @@ def test_send_email_failure(mock_post: MagicMock, status_code: int) -> None:
         ),
         timeout=10,
     )
+
+
+@pytest.fixture(name="mock_sleep")
+def setup_sleep() -> MagicMock:
+    """Patch the backoff between retries and the rate limit"""
+    with patch("lambdas.utils.email.sleep") as mock_sleep:
+        yield mock_sleep
+
+
+@patch("lambdas.utils.email.write_log")
+def test_send_many_sends_concurrently(mock_write_log: MagicMock) -> None:
+    """Test that a batch of emails is sent at the same time, up to the limit"""
+    # Arrange
+    barrier = threading.Barrier(3, timeout=5)
+
+    def send_email_together(*args, **kwargs) -> MagicMock:
+        barrier.wait()
+        return MagicMock(status_code=202)
+
+    on_sent = MagicMock()
+    client = BulkEmailClient(max_concurrency=3, rate_limit=0, timeout=2)
+    messages = [(f"{name}@nhs.net", "Subject", "Body") for name in "abc"]
+    # Act
+    with patch(
+        "lambdas.utils.email.send_email", side_effect=send_email_together
+    ) as mock_send_email:
+        results = client.send_many(messages, "https://example.com", "key", on_sent)
+    # Assert
+    assert [(result.to_email_address, result.sent) for result in results] == [
+        ("a@nhs.net", True),
+        ("b@nhs.net", True),
+        ("c@nhs.net", True),
+    ]
+    assert on_sent.call_count == 3
+    mock_send_email.assert_any_call(
+        "b@nhs.net", "Subject", "Body", "https://example.com", "key", timeout=2
+    )
+    mock_write_log.assert_called_with("INFO", {"info": "Sent 3 of 3 emails"})
+
+
+@pytest.mark.parametrize(
+    "error",
+    [EmailNotSentError("Busy", 503), RequestsConnectionError("Connection reset")],
+)
+def test_send_many_retries_transient_failures(
+    error: Exception, mock_sleep: MagicMock
+) -> None:
+    """Test that transient failures are retried with a jittered backoff"""
+    # Arrange
+    client = BulkEmailClient(rate_limit=0, max_attempts=3, retry_backoff=0.5)
+    # Act
+    with patch(
+        "lambdas.utils.email.send_email",
+        side_effect=[error, error, MagicMock(status_code=200)],
+    ), patch("lambdas.utils.email.random.uniform", side_effect=lambda low, high: high):
+        [result] = client.send_many([EMAIL], "https://example.com", "key")
+    # Assert
+    assert result == EmailResult(EMAIL[0], sent=True, status_code=200, attempts=3)
+    assert mock_sleep.call_args_list == [call(0.5), call(1.0)]
+
+
+@patch("lambdas.utils.email.write_log")
+def test_send_many_limits_retries(
+    mock_write_log: MagicMock, mock_sleep: MagicMock
+) -> None:
+    """Test that an email failing every attempt is reported as not sent"""
+    # Arrange
+    on_sent = MagicMock()
+    client = BulkEmailClient(rate_limit=0, max_attempts=2)
+    # Act
+    with patch(
+        "lambdas.utils.email.send_email", side_effect=EmailNotSentError("Busy", 429)
+    ):
+        [result] = client.send_many([EMAIL], "https://example.com", "key", on_sent)
+    # Assert
+    assert result == EmailResult(
+        EMAIL[0], sent=False, status_code=429, attempts=2, error="Busy"
+    )
+    on_sent.assert_not_called()
+    assert mock_write_log.call_args.args[0] == "WARNING"
+
+
+@patch("lambdas.utils.email.write_log")
+def test_send_many_does_not_retry_rejected_emails(
+    mock_write_log: MagicMock, mock_sleep: MagicMock
+) -> None:
+    """Test that an email rejected by SendNHSMail is not sent again"""
+    # Arrange
+    client = BulkEmailClient(max_concurrency=1, rate_limit=0)
+    messages = [("a@nhs.net", "Subject", "Body"), ("b@nhs.net", "Subject", "Body")]
+    # Act
+    with patch(
+        "lambdas.utils.email.send_email",
+        side_effect=[EmailNotSentError("Bad request", 400), MagicMock(status_code=200)],
+    ) as mock_send_email:
+        results = client.send_many(messages, "https://example.com", "key")
+    # Assert
+    assert [(result.sent, result.attempts) for result in results] == [
+        (False, 1),
+        (True, 1),
+    ]
+    assert mock_send_email.call_count == 2
+    mock_sleep.assert_not_called()
+
+
+@patch("lambdas.utils.email.write_log")
+def test_send_many_logs_on_sent_errors(mock_write_log: MagicMock) -> None:
+    """Test that an email is still reported as sent if handling it fails"""
+    # Arrange
+    on_sent = MagicMock(side_effect=Exception("Throttled"))
+    # Act
+    with patch("lambdas.utils.email.send_email"):
+        [result] = BulkEmailClient(rate_limit=0).send_many(
+            [EMAIL], "https://example.com", "key", on_sent
+        )
+    # Assert
+    assert result.sent
+    assert mock_write_log.call_args.args[0] == "WARNING"
+
+
+def test_rate_limiter_spaces_out_calls(mock_sleep: MagicMock) -> None:
+    """Test that calls beyond the rate wait for their turn"""
+    # Arrange
+    limiter = RateLimiter(rate=4)
+    # Act
+    with patch("lambdas.utils.email.monotonic", return_value=100.0):
+        for _ in range(3):
+            limiter.acquire()
+    # Assert
+    assert mock_sleep.call_args_list == [call(0.25), call(0.5)]
@@ -0,0 +1,52 @@
+""" Unit tests for lazy imports """
+
+import sys
+
+import pytest
+from pytest_mock import MockerFixture
+
+from lambdas.utils.lazy_import import lazy_import
+
+MODULE = "colorsys"
+
+
+@pytest.fixture(name="unimported")
+def remove_module():
+    """Removes the test module from the imported modules"""
+    original = sys.modules.pop(MODULE, None)
+    yield
+    if original is not None:
+        sys.modules[MODULE] = original
+
+
+@pytest.mark.usefixtures("unimported")
+def test_module_is_imported_when_attribute_first_used() -> None:
+    """Test that the module is only imported when it is used"""
+    # Act
+    module = lazy_import(MODULE)
+    # Assert
+    assert MODULE not in sys.modules
+    assert module.rgb_to_hsv(0, 0, 0) == (0, 0, 0)
+    assert MODULE in sys.modules
+
+
+def test_patches_of_the_module_are_used(mocker: MockerFixture) -> None:
+    """Test that attributes are read from the imported module"""
+    # Arrange
+    module = lazy_import(MODULE)
+    imported = __import__(MODULE)
+    # Act
+    mocker.patch.object(imported, "rgb_to_hsv", return_value="patched")
+    # Assert
+    assert module.rgb_to_hsv(0, 0, 0) == "patched"
+
+
+def test_missing_optional_module_returns_none() -> None:
+    """Test that an optional module that is not installed is None"""
+    assert lazy_import("not_an_installed_module", optional=True) is None
+
+
+def test_missing_module_raises_error() -> None:
+    """Test that a required module that is not installed raises an error"""
+    with pytest.raises(ModuleNotFoundError):
+        lazy_import("not_an_installed_module")
@@ -0,0 +1,163 @@
+""" Unit tests for the two-tier cache """
+
+from unittest.mock import MagicMock
+
+from pytest_mock import MockerFixture
+
+from lambdas.conftest import FakeClock
+from lambdas.utils.tiered_cache import CacheEntry, TieredCache
+
+FILE_PATH = "lambdas.utils.tiered_cache"
+
+
+def entry(clock: FakeClock, value: str = "value", ttl: int = 100) -> CacheEntry:
+    """Creates an entry that is fresh until it expires"""
+    return CacheEntry(
+        value=value, fresh_until=clock.now + ttl, expires_at=clock.now + ttl
+    )
+
+
+def test_entry_is_returned_until_margin_before_expiry(clock: FakeClock) -> None:
+    """Test that an entry stops being used the margin before it expires"""
+    # Arrange
+    cache = TieredCache("test", clock=clock)
+    cache.put("key", entry(clock))
+    # Act
+    clock.now += 89
+    usable = cache.get("key", margin=10)
+    clock.now += 1
+    expired = cache.get("key", margin=10)
+    # Assert
+    assert usable.value == "value"
+    assert expired is None
+    assert cache.stats() == {
+        "hits": 1,
+        "shared_hits": 0,
+        "misses": 1,
+        "refreshes": 0,
+        "entries": 0,
+    }
+
+
+def test_least_recently_used_entry_is_evicted(clock: FakeClock) -> None:
+    """Test that the in-memory tier is limited to max_entries"""
+    # Arrange
+    cache = TieredCache("test", max_entries=2, clock=clock)
+    cache.put("one", entry(clock))
+    cache.put("two", entry(clock))
+    cache.get("one")
+    # Act
+    cache.put("three", entry(clock))
+    # Assert
+    assert cache.get("two") is None
+    assert cache.get("one") is not None
+    assert cache.stats()["entries"] == 2
+
+
+def test_dynamodb_client_uses_configured_region(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that the shared tier table can be in any region"""
+    # Arrange
+    mock_client = mocker.patch(f"{FILE_PATH}.get_client")
+    mock_client.return_value.get_item.return_value = {}
+    cache = TieredCache(
+        "test", table_name="cache", region_name="eu-west-1", clock=clock
+    )
+    # Act
+    cache.get("key")
+    # Assert
+    mock_client.assert_called_once_with("dynamodb", region_name="eu-west-1")
+
+
+def test_entry_is_shared_between_caches(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that an entry written by one cache is read by another"""
+    # Arrange
+    mock_client = mocker.patch(f"{FILE_PATH}.get_client")
+    writer = TieredCache("test", table_name="cache", clock=clock)
+    reader = TieredCache("test", table_name="cache", clock=clock)
+    writer.put("key", entry(clock), {"Extra": {"N": "1"}})
+    item = mock_client.return_value.put_item.call_args.kwargs["Item"]
+    mock_client.return_value.get_item.return_value = {"Item": item}
+    # Act
+    result = reader.get("key")
+    # Assert
+    assert item["Extra"] == {"N": "1"}
+    assert item["TTL"] == {"N": str(int(clock.now + 100))}
+    assert result == entry(clock)
+    assert reader.stats()["shared_hits"] == 1
+
+
+def test_none_value_is_stored_without_value_attribute(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a None value is written and read back as a missing attribute"""
+    # Arrange
+    mock_client = mocker.patch(f"{FILE_PATH}.get_client")
+    cache = TieredCache("test", table_name="cache", clock=clock)
+    # Act
+    cache.put("key", entry(clock, value=None))
+    # Assert
+    item = mock_client.return_value.put_item.call_args.kwargs["Item"]
+    assert "Body" not in item
+    mock_client.return_value.get_item.return_value = {"Item": item}
+    cache.clear()
+    assert cache.get("key").value is None
+
+
+def test_delete_removes_entry_from_both_tiers(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a deleted entry is removed from the shared tier unless told not to"""
+    # Arrange
+    mock_client = mocker.patch(f"{FILE_PATH}.get_client")
+    cache = TieredCache("test", table_name="cache", clock=clock)
+    cache.put("key", entry(clock))
+    # Act
+    cache.delete("key", shared=False)
+    cache.delete("key")
+    # Assert
+    mock_client.return_value.delete_item.assert_called_once_with(
+        TableName="cache", Key={"CacheKey": {"S": "key"}}
+    )
+    assert cache.stats()["entries"] == 0
+
+
+def test_only_one_background_refresh_runs_per_key(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a refresh is not started while one is running for the key"""
+    # Arrange
+    mock_thread = mocker.patch(f"{FILE_PATH}.threading.Thread")
+    cache = TieredCache("test", clock=clock)
+    # Act
+    cache.refresh_in_background("key", MagicMock(), "test entry")
+    cache.refresh_in_background("key", MagicMock(), "test entry")
+    # Assert
+    mock_thread.assert_called_once()
+    mock_thread.return_value.start.assert_called_once()
+
+
+def test_failed_background_refresh_is_logged(
+    clock: FakeClock, mocker: MockerFixture
+) -> None:
+    """Test that a failed refresh is logged and a later refresh can run"""
+    # Arrange
+    mock_thread = mocker.patch(f"{FILE_PATH}.threading.Thread")
+    mock_write_log = mocker.patch(f"{FILE_PATH}.write_log")
+    cache = TieredCache("test", clock=clock)
+    cache.refresh_in_background(
+        "key", MagicMock(side_effect=Exception("error")), "test entry"
+    )
+    target = mock_thread.call_args.kwargs["target"]
+    # Act
+    target(*mock_thread.call_args.kwargs["args"])
+    # Assert
+    mock_write_log.assert_called_once_with(
+        "WARNING", {"info": "Background refresh of test entry failed - error"}
+    )
+    assert cache.stats()["refreshes"] == 0
+    cache.refresh_in_background("key", MagicMock(), "test entry")
+    assert mock_thread.call_count == 2
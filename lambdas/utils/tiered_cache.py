@@ -0,0 +1,271 @@
+"""Two-tier cache used by the PDS response, PDS access token and ODS caches.
+
+Entries are held in an in-memory LRU for the lifetime of a warm Lambda container. An
+optional DynamoDB table (partition key `CacheKey`, TTL attribute `TTL`) can be
+configured so that entries are shared between containers and outlive them. Failures
+of the DynamoDB tier are logged and treated as a miss, so they never fail a lookup.
+
+An entry is fresh until `fresh_until` and is usable until `expires_at`. An entry that
+is no longer fresh can be refreshed in a background thread, with at most one refresh
+running for each key.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from os import getenv
+from time import time
+from typing import Callable, Optional
+
+from lambdas.utils.aws.clients import get_client
+from lambdas.utils.logging.logger import write_log
+
+# AWS region of the DynamoDB tables used for the shared tier
+CACHE_TABLE_REGION = getenv("CACHE_TABLE_REGION", getenv("AWS_REGION", "eu-west-2"))
+
+
+@dataclass
+class CacheEntry:
+    """A cached value, or None, and the epoch times it goes stale and expires."""
+
+    value: Optional[str]
+    fresh_until: float
+    expires_at: float
+
+
+class TieredCache:
+    """An in-memory LRU backed by an optional DynamoDB table."""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: Optional[int] = None,
+        table_name: Optional[str] = None,
+        value_attribute: str = "Body",
+        region_name: str = CACHE_TABLE_REGION,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        """Initialise the cache
+
+        Args:
+            name (str): Name of the cache used in log messages, e.g. 'PDS'
+            max_entries (int, optional): Maximum number of entries held in memory,
+                unbounded if None
+            table_name (str, optional): DynamoDB table name for the shared tier
+            value_attribute (str): DynamoDB attribute the value is stored in
+            region_name (str): AWS region of the DynamoDB table
+            clock (Callable): Returns the current epoch time in seconds
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.table_name = table_name
+        self.value_attribute = value_attribute
+        self.region_name = region_name
+        self._clock = clock
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._dynamodb = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def get(self, key: str, margin: float = 0) -> Optional[CacheEntry]:
+        """Looks up an unexpired entry in memory, then in the shared tier
+
+        Args:
+            key (str): The cache key
+            margin (float): Seconds before expiry that an entry stops being used
+
+        Returns:
+            Optional[CacheEntry]: The entry, or None if there is no usable entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if self.__is_usable(entry, margin):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self._entries.pop(key, None)
+
+        entry = self.__get_shared_entry(key)
+        if self.__is_usable(entry, margin):
+            self.hits += 1
+            self.shared_hits += 1
+            self.__store(key, entry)
+            return entry
+
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        key: str,
+        entry: CacheEntry,
+        attributes: Optional[dict[str, dict]] = None,
+    ) -> None:
+        """Stores an entry in both tiers
+
+        Args:
+            key (str): The cache key
+            entry (CacheEntry): The entry to store
+            attributes (dict, optional): Other DynamoDB attributes of the shared item
+        """
+        self.__store(key, entry)
+        self.__put_shared_entry(key, entry, attributes or {})
+
+    def delete(self, key: str, shared: bool = True) -> None:
+        """Removes an entry from the in-memory tier and optionally the shared tier
+
+        Args:
+            key (str): The cache key
+            shared (bool): Whether to remove the entry from the shared tier too
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+        if shared:
+            self.__delete_shared_entry(key)
+
+    def refresh_in_background(
+        self, key: str, refresh: Callable[[], None], description: str
+    ) -> None:
+        """Runs the refresh in a background thread unless one is running for the key
+
+        Args:
+            key (str): The cache key
+            refresh (Callable): Fetches and stores a replacement entry
+            description (str): What is refreshed, used in log messages
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        thread = threading.Thread(
+            target=self.__refresh, args=(key, refresh, description), daemon=True
+        )
+        thread.start()
+
+    def get_dynamodb_client(self):
+        """Returns the DynamoDB client used for the shared tier"""
+        if self._dynamodb is None:
+            self._dynamodb = get_client("dynamodb", region_name=self.region_name)
+        return self._dynamodb
+
+    def clear(self) -> None:
+        """Removes every entry from the in-memory tier and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def stats(self) -> dict:
+        """Returns the cache counters
+
+        Returns:
+            dict: hit, shared hit, miss and refresh counts and the number of entries
+        """
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "entries": len(self._entries),
+        }
+
+    def __is_usable(self, entry: Optional[CacheEntry], margin: float) -> bool:
+        return entry is not None and entry.expires_at - margin > self._clock()
+
+    def __store(self, key: str, entry: CacheEntry) -> None:
+        """Adds the entry to the in-memory tier, evicting the least recently used"""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while (
+                self.max_entries is not None and len(self._entries) > self.max_entries
+            ):
+                self._entries.popitem(last=False)
+
+    def __refresh(
+        self, key: str, refresh: Callable[[], None], description: str
+    ) -> None:
+        try:
+            refresh()
+            self.refreshes += 1
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # The current entry is served until it expires
+            write_log(
+                "WARNING",
+                {"info": f"Background refresh of {description} failed - {error}"},
+            )
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def __get_shared_entry(self, key: str) -> Optional[CacheEntry]:
+        """Reads an entry from the DynamoDB tier if it is configured"""
+        if not self.table_name:
+            return None
+
+        try:
+            response = self.get_dynamodb_client().get_item(
+                TableName=self.table_name, Key={"CacheKey": {"S": key}}
+            )
+            item = response.get("Item")
+            if item is None:
+                return None
+            expires_at = float(item["ExpiresAt"]["N"])
+            return CacheEntry(
+                value=item.get(self.value_attribute, {}).get("S"),
+                fresh_until=float(item.get("FreshUntil", {}).get("N", expires_at)),
+                expires_at=expires_at,
+            )
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            write_log(
+                "WARNING",
+                {"info": f"Unable to read shared {self.name} cache - {error}"},
+            )
+            return None
+
+    def __put_shared_entry(
+        self, key: str, entry: CacheEntry, attributes: dict[str, dict]
+    ) -> None:
+        """Writes an entry to the DynamoDB tier if it is configured"""
+        if not self.table_name:
+            return
+
+        item = {
+            **attributes,
+            "CacheKey": {"S": key},
+            "FreshUntil": {"N": str(entry.fresh_until)},
+            "ExpiresAt": {"N": str(entry.expires_at)},
+            "TTL": {"N": str(int(entry.expires_at))},
+        }
+        if entry.value is not None:
+            item[self.value_attribute] = {"S": entry.value}
+
+        try:
+            self.get_dynamodb_client().put_item(TableName=self.table_name, Item=item)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            write_log(
+                "WARNING",
+                {"info": f"Unable to write shared {self.name} cache - {error}"},
+            )
+
+    def __delete_shared_entry(self, key: str) -> None:
+        """Removes an entry from the DynamoDB tier if it is configured"""
+        if not self.table_name:
+            return
+
+        try:
+            self.get_dynamodb_client().delete_item(
+                TableName=self.table_name, Key={"CacheKey": {"S": key}}
+            )
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            write_log(
+                "WARNING",
+                {"info": f"Unable to delete from shared {self.name} cache - {error}"},
+            )
@@ -2,8 +2,10 @@
 
 import os
 import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, Optional
 
 import lambdas.utils.validation.codes as code
 from lambdas.utils.code_bindings.validation_result import (
@@ -13,7 +15,60 @@ from lambdas.utils.code_bindings.validation_result import (
     Detail_standard,
 )
 from lambdas.utils.code_bindings.validation_result import Event as ValidationResultClass
+from lambdas.utils.event_utilities.async_event_publisher import AUDIT_EVENT_PUBLISHER
+from lambdas.utils.event_utilities.batch_event_publisher import (
+    BatchValidationResultEventPublisher,
+)
 from lambdas.utils.event_utilities.event_publisher import ValidationResultEventPublisher
+from lambdas.utils.logging.logger import write_log
+
+# 'sync' publishes each event before returning, 'async' queues it for a background
+# worker, which is drained by drain_validation_result_events
+AUDIT_EVENT_MODE = os.getenv("AUDIT_EVENT_MODE", "sync").lower()
+
+_batch: ContextVar[Optional[BatchValidationResultEventPublisher]] = ContextVar(
+    "validation_result_event_batch", default=None
+)
+
+
+@contextmanager
+def validation_result_event_batch() -> Iterator[BatchValidationResultEventPublisher]:
+    """Sends the validation result events published within the block in batches
+
+    The buffered events are sent when the block ends, including when it raises. A
+    failure to send them is raised when the block succeeds, and is logged when it
+    raises so that the error of the block is not replaced.
+    Nested blocks share the outer batch. Work submitted to a thread pool must be run
+    in a copy of the caller's context to publish to the batch.
+
+    Yields:
+        BatchValidationResultEventPublisher: The publisher events are buffered in
+    """
+    current = _batch.get()
+    if current is not None:
+        yield current
+        return
+
+    publisher = BatchValidationResultEventPublisher()
+    token = _batch.set(publisher)
+    try:
+        yield publisher
+    except BaseException:
+        _batch.reset(token)
+        # Keep the error raised by the block rather than one from sending the events
+        try:
+            publisher.flush()
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            write_log(
+                "ERROR",
+                {
+                    "info": "Unable to send the validation result events",
+                    "error": str(error),
+                },
+            )
+        raise
+    _batch.reset(token)
+    publisher.flush()
 
 
 def validation_result_event(
@@ -27,7 +82,10 @@ def validation_result_event(
     Publishes a validation result event to the ValidationResultEventPublisher.
 
     This function creates a validation result event using the provided parameters
-    and publishes it using the ValidationResultEventPublisher.
+    and publishes it using the ValidationResultEventPublisher. Within a
+    validation_result_event_batch block the event is buffered and sent in a batch.
+    When AUDIT_EVENT_MODE is 'async' the event is queued and published in the
+    background.
 
     Args:
         proxy_id (str): The NHS Number for the proxy associated with the validation.
@@ -64,5 +122,20 @@ def validation_result_event(
         Source="Validation Service",
     )
 
-    publisher = ValidationResultEventPublisher()
-    publisher.publish(event)
+    batch = _batch.get()
+    if batch is not None:
+        batch.publish(event)
+    elif AUDIT_EVENT_MODE == "async":
+        AUDIT_EVENT_PUBLISHER.submit(ValidationResultEventPublisher.create_entry(event))
+    else:
+        ValidationResultEventPublisher().publish(event)
+
+
+def drain_validation_result_events() -> None:
+    """Waits for the validation result events queued in async mode to be published
+
+    Called before a lambda returns, so that no events are left queued in a frozen
+    container. Events not published within the drain timeout are spooled.
+    """
+    if AUDIT_EVENT_PUBLISHER.started:
+        AUDIT_EVENT_PUBLISHER.drain()
@@ -1,14 +1,25 @@
 """Unit tests for the Validation Event Publish Function """
 
+import json
+
+import pytest
 from pytest_mock import MockerFixture
 
 import lambdas.utils.validation.codes as code
 from lambdas.utils.code_bindings.validation_result import Event as ValidationResultClass
+from lambdas.utils.event_utilities.batch_event_publisher import (
+    BatchValidationResultEventPublisher,
+    EventPublishError,
+)
 from lambdas.utils.event_utilities.event_publisher import ValidationResultEventPublisher
 from lambdas.utils.validation.publish_validation_audit_event import (
+    drain_validation_result_events,
     validation_result_event,
+    validation_result_event_batch,
 )
 
+FILE_PATH = "lambdas.utils.validation.publish_validation_audit_event"
+
 
 def test_validation_result_event_publish_called(mocker: MockerFixture) -> None:
     """Test that the 'publish' method of ValidationResultEventPublisher is called"""
@@ -57,3 +68,110 @@ def test_validation_result_event_correct_event_structure(mocker: MockerFixture):
     # Assert - correct event argument structure was passed
     published_event = mock_publish_method.call_args[0][0]
     assert isinstance(published_event, ValidationResultClass)
+
+
+def test_validation_result_events_in_a_batch_are_sent_at_the_end(
+    mocker: MockerFixture,
+) -> None:
+    """Test that events published within a batch block are sent when it ends"""
+
+    # Arrange
+    mocker.patch.object(
+        BatchValidationResultEventPublisher, "_create_eventbridge_client"
+    )
+    mock_publish_method = mocker.patch.object(
+        BatchValidationResultEventPublisher, "publish", return_value=True
+    )
+    mock_flush_method = mocker.patch.object(
+        BatchValidationResultEventPublisher, "flush", return_value=None
+    )
+
+    # Act
+    with validation_result_event_batch() as batch:
+        with validation_result_event_batch() as nested_batch:
+            for _ in range(2):
+                validation_result_event(
+                    "proxy_id", "patient_id", code.VALIDATED_PROXY, "request_id"
+                )
+        flushed_in_block = mock_flush_method.called
+
+    # Assert
+    assert nested_batch is batch
+    assert mock_publish_method.call_count == 2
+    assert not flushed_in_block
+    mock_flush_method.assert_called_once()
+
+
+def test_validation_result_event_batch_raises_send_failure_after_block(
+    mocker: MockerFixture,
+) -> None:
+    """Test that a failure to send the events is raised when the block succeeds"""
+
+    # Arrange
+    mocker.patch.object(
+        BatchValidationResultEventPublisher,
+        "flush",
+        side_effect=EventPublishError([{}], {"ThrottlingException"}),
+    )
+
+    # Act & Assert
+    with pytest.raises(EventPublishError):
+        with validation_result_event_batch():
+            pass
+
+
+def test_validation_result_event_batch_keeps_error_raised_in_block(
+    mocker: MockerFixture,
+) -> None:
+    """Test that a failure to send the events does not replace the block's error"""
+
+    # Arrange
+    mock_flush_method = mocker.patch.object(
+        BatchValidationResultEventPublisher,
+        "flush",
+        side_effect=EventPublishError([{}], {"ThrottlingException"}),
+    )
+    mock_write_log = mocker.patch(f"{FILE_PATH}.write_log")
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="pipeline failed"):
+        with validation_result_event_batch():
+            raise ValueError("pipeline failed")
+    mock_flush_method.assert_called_once()
+    assert mock_write_log.call_args.args[0] == "ERROR"
+
+
+def test_validation_result_event_in_async_mode_is_queued(mocker: MockerFixture) -> None:
+    """Test that in async mode the event is queued rather than published"""
+
+    # Arrange
+    mocker.patch(f"{FILE_PATH}.AUDIT_EVENT_MODE", "async")
+    mock_publisher = mocker.patch(f"{FILE_PATH}.AUDIT_EVENT_PUBLISHER")
+    mock_publish_method = mocker.patch.object(ValidationResultEventPublisher, "publish")
+
+    # Act
+    validation_result_event(
+        "proxy_id", "patient_id", code.VALIDATED_PROXY, "request_id", "correlation_id"
+    )
+    drain_validation_result_events()
+
+    # Assert
+    mock_publish_method.assert_not_called()
+    entry = mock_publisher.submit.call_args.args[0]
+    assert entry["DetailType"] == code.VALIDATED_PROXY["audit_details_type"]
+    assert json.loads(entry["Detail"])["metadata"]["correlation-id"] == "correlation_id"
+    mock_publisher.drain.assert_called_once()
+
+
+def test_drain_when_no_events_were_queued(mocker: MockerFixture) -> None:
+    """Test that drain does nothing when no events were queued"""
+
+    # Arrange
+    mock_publisher = mocker.patch(f"{FILE_PATH}.AUDIT_EVENT_PUBLISHER")
+    mock_publisher.started = False
+
+    # Act
+    drain_validation_result_events()
+
+    # Assert
+    mock_publisher.drain.assert_not_called()
@@ -3,17 +3,23 @@
 
 import os
 from http import HTTPStatus
-from typing import Optional
+from typing import Optional, Union
 
 from fhirclient.models.fhirabstractbase import FHIRValidationError
-from fhirclient.models.patient import Patient
 from fhirclient.models.relatedperson import RelatedPerson
 from spine_aws_common import LambdaApplication
 
 import lambdas.utils.validation.codes as code
 from lambdas.utils.logging.logger import LOG_BASE, initialise_logger, write_log
-from lambdas.utils.pds.pdsdata import get_is_person_deceased, get_security_code
+from lambdas.utils.pds.pdsdata import (
+    get_identifier_value,
+    get_is_person_deceased,
+    get_related_nhs_number,
+    get_security_code,
+    validate_resource_json,
+)
 from lambdas.utils.validation.publish_validation_audit_event import (
+    drain_validation_result_events,
     validation_result_event,
 )
 
@@ -115,26 +121,24 @@ class ValidateEligibility(LambdaApplication):
         }
 
     def filter_related_person_array(
-        self, related_people: list[RelatedPerson], nhs_number: str
-    ) -> list[RelatedPerson]:
+        self, related_people: list[Union[RelatedPerson, dict]], nhs_number: str
+    ) -> list[Union[RelatedPerson, dict]]:
         """
         Filters a list of RelatedPerson objects based on the NHS number.
 
         Args:
-            related_people (list[RelatedPerson]): A list of RelatedPerson objects
-                    to be filtered.
+            related_people (list[RelatedPerson | dict]): A list of RelatedPerson
+                    objects or raw JSON records to be filtered.
             nhs_number (str): The NHS number used as the filter criteria.
 
         Returns:
-            list[RelatedPerson]: A filtered list of RelatedPerson objects that
+            list[RelatedPerson | dict]: A filtered list of the records that
                     match the provided NHS number.
         """
         return [
             item
             for item in related_people
-            if item.patient
-            and item.patient.identifier
-            and item.patient.identifier.value == nhs_number
+            if get_related_nhs_number(item) == nhs_number
         ]
 
     def start(self) -> None:
@@ -198,19 +202,20 @@ class ValidateEligibility(LambdaApplication):
 
             pds_proxy_details = self.event.get(self.PARAMETER_PDS_PROXY_DETAILS, 0)
 
-            # Check PDS valid FHIR format
-            fhir_patient = Patient(pds_proxy_details)
-            proxy_nhs_number = fhir_patient.identifier[0].value
+            # Check PDS valid FHIR format, the record is read without building
+            # the Patient model as it is not re-emitted
+            validate_resource_json(pds_proxy_details)
+            proxy_nhs_number = get_identifier_value(pds_proxy_details)
 
             # Proxy eligibility checks
-            if get_is_person_deceased(fhir_patient):
+            if get_is_person_deceased(pds_proxy_details):
                 write_log("DEBUG", {"info": code.PROXY_DECEASED["validation_code"]})
                 self.handle_success(
                     proxy_nhs_number, code.PROXY_DECEASED, request_id, correlation_id
                 )
                 return
 
-            proxy_flag = get_security_code(fhir_patient)
+            proxy_flag = get_security_code(pds_proxy_details)
             if proxy_flag != "U":
                 write_log("DEBUG", {"info": code.NO_PROXY_CONSENT["validation_code"]})
                 self.handle_success(
@@ -243,16 +248,20 @@ class ValidateEligibility(LambdaApplication):
             )
 
             # Check Relationships valid FHIR format
-            fhir_relationships = []
             for relationship in pds_relationships:
-                fhir_relationships.append(RelatedPerson(relationship))
+                validate_resource_json(relationship)
 
-            new_relationship_arr = (
-                self.filter_related_person_array(fhir_relationships, patient_nhs_number)
+            filtered_relationships = (
+                self.filter_related_person_array(pds_relationships, patient_nhs_number)
                 if patient_nhs_number
-                else fhir_relationships
+                else pds_relationships
             )
 
+            # Only the relationships that are returned are parsed into the model
+            new_relationship_arr = [
+                RelatedPerson(relationship) for relationship in filtered_relationships
+            ]
+
             write_log("DEBUG", {"info": "Lambda completed"})
 
             self.handle_success(
@@ -310,4 +319,7 @@ def lambda_handler(event: dict, context: dict) -> dict:
                 5XX - Any other errors
     """
 
-    return validate_eligibility.main(event, context)
+    try:
+        return validate_eligibility.main(event, context)
+    finally:
+        drain_validation_result_events()
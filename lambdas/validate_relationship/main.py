@@ -3,7 +3,7 @@
 
 import os
 from http import HTTPStatus
-from typing import List
+from typing import List, Union
 
 from fhirclient.models.fhirabstractbase import FHIRValidationError
 from fhirclient.models.patient import Patient
@@ -12,8 +12,10 @@ from spine_aws_common import LambdaApplication
 
 from lambdas.utils.logging.logger import LOG_BASE, initialise_logger, write_log
 from lambdas.utils.pds import errors, pdsdata
+from lambdas.utils.pds.relationshipindex import RelationshipIndex
 from lambdas.utils.validation import codes
 from lambdas.utils.validation.publish_validation_audit_event import (
+    drain_validation_result_events,
     validation_result_event,
 )
 
@@ -38,7 +40,10 @@ class ValidateRelationship(LambdaApplication):
         initialise_logger(self.log_object)
 
     def is_eligible(
-        self, proxy_nhs_num: str, patient: Patient, related: List[RelatedPerson]
+        self,
+        proxy_nhs_num: str,
+        patient: Union[Patient, dict],
+        related: List[Union[RelatedPerson, dict]],
     ) -> tuple:
         """
         Determines if the given patient is eligibile based on the patient
@@ -46,12 +51,13 @@ class ValidateRelationship(LambdaApplication):
 
         Args:
             proxy_nhs_num (str): The nhs number of the proxy
-            patient (Patient): The patient record for whom to the check eligibility
-            related ([RelatedPerson]): List of all relationships for the patient
+            patient (Patient | dict): The patient record for whom to the check
+                eligibility
+            related ([RelatedPerson | dict]): List of all relationships for the patient
 
         Returns:
             tuple: (ErrorProxyValidation, json) Validation result
-            and the related person json record
+            and the related person record
         """
         # Default to not related result
         result = codes.PATIENT_NOT_RELATED
@@ -67,18 +73,13 @@ class ValidateRelationship(LambdaApplication):
             # Patient did not meet the minimum age requirements
             result = codes.PATIENT_NOT_ELIGIBLE_OVER_13
         else:
-            for rel in related:
-                related_num = rel.patient.identifier.value
-                relationship_type = pdsdata.get_relationship(rel)
-
-                # Check if related person is mother
-                if (
-                    self.MOTHER_RELATION_CODE in relationship_type
-                    and proxy_nhs_num == related_num
-                ):
-                    result = codes.VALIDATED_RELATIONSHIP
-                    related_person = rel
-                    break
+            # Check if the proxy is the mother of the patient
+            mother = RelationshipIndex(related).find(
+                proxy_nhs_num, self.MOTHER_RELATION_CODE
+            )
+            if mother is not None:
+                result = codes.VALIDATED_RELATIONSHIP
+                related_person = mother
 
         return (result, related_person)
 
@@ -97,26 +98,20 @@ class ValidateRelationship(LambdaApplication):
                 if self.__are_statuses_okay(
                     mother_num, input_patient, input_related, correlation_id, request_id
                 ):
-                    related = []
+                    # The records are read without building the FHIR models
+                    # as the input records are re-emitted unchanged
+                    pdsdata.validate_resource_json(input_patient)
                     for rel in input_related:
-                        related.append(RelatedPerson(rel))
-                    patient = Patient(input_patient)
-                    result = self.is_eligible(mother_num, patient, related)
-                    output_related = ""
-
-                    if result[1] != "":
-                        for relate in input_related:
-                            if result[1].id == relate["id"]:
-                                output_related = relate
-                                break
+                        pdsdata.validate_resource_json(rel)
+                    result = self.is_eligible(mother_num, input_patient, input_related)
 
                     write_log("DEBUG", {"info": "Generating validation result"})
                     self.__handle_validation_result(
-                        patient.identifier[0].value,
+                        pdsdata.get_identifier_value(input_patient),
                         mother_num,
                         result[0],
                         input_patient,
-                        output_related,
+                        result[1],
                         correlation_id,
                         request_id,
                     )
@@ -318,4 +313,7 @@ def lambda_handler(event: dict, context: dict) -> dict:
         dict: Generated response or error.
     """
 
-    return validate_relation.main(event, context)
+    try:
+        return validate_relation.main(event, context)
+    finally:
+        drain_validation_result_events()
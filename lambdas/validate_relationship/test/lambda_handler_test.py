@@ -638,7 +638,7 @@ def test_start_when_valid_then_return_true(mocker: MockerFixture):
     mocker.patch.object(
         ValidateRelationship,
         "is_eligible",
-        return_value=(eligbility_result, RelatedPerson(expected_relation)),
+        return_value=(eligbility_result, expected_relation),
     )
 
     publish = mocker.patch.object(
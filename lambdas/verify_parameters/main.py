@@ -2,13 +2,14 @@
 
 import traceback
 import uuid
+from typing import Optional
 
 from spine_aws_common import LambdaApplication
 
 from lambdas.utils.logging.logger import LOG_BASE, initialise_logger, write_log
 from lambdas.utils.pds import errors
 from lambdas.utils.pds.errors import OperationalOutcomeResult
-from lambdas.utils.pds.nhsnumber import NHSNumber
+from lambdas.utils.pds.nhsnumber import NHSIdentifier, parse_nhs_identifier
 
 
 class VerifyParameters(LambdaApplication):
@@ -25,6 +26,8 @@ class VerifyParameters(LambdaApplication):
     RELATED_PERSON_RESOURCE_INCLUDE = "RelatedPerson:patient"
 
     correlation_id = ""
+    proxy_identifier: Optional[NHSIdentifier] = None
+    patient_identifier: Optional[NHSIdentifier] = None
 
     def initialise(self) -> None:
         """Initialise with log object"""
@@ -92,53 +95,38 @@ class VerifyParameters(LambdaApplication):
         """
         result = False
 
-        if self.event.get(self.PARAM_PROXY_NHS_NO) and self.event.get(
+        # Each identifier is parsed once and reused by the checks and the output
+        proxy = self.proxy_identifier = self.__parse_identifier(self.PARAM_PROXY_NHS_NO)
+        patient = self.patient_identifier = self.__parse_identifier(
             self.PARAM_PATIENT_NHS_NO
-        ):
+        )
+
+        if proxy and patient:
             # Both parameters are present
             write_log("DEBUG", {"info": "Both Proxy and Patient NHS Number supplied"})
             result = True
 
-        if self.event.get(self.PARAM_PROXY_NHS_NO) and not self.event.get(
-            self.PARAM_PATIENT_NHS_NO
-        ):
+        if proxy and not patient:
             # Only proxy number - list relations
             write_log("DEBUG", {"info": "Only Proxy NHS Number supplied"})
             result = True
 
-        if not self.event.get(self.PARAM_PROXY_NHS_NO):
+        if not proxy:
             write_log("ERROR", {"info": "Proxy NHS Number not supplied", "error": ""})
             self.__output_error(errors.MISSING_IDENTIFIER_VALUE)
             return False
 
-        if self.event.get(
-            self.PARAM_PROXY_NHS_NO
-        ) and not self.__check_nhs_number_is_valid(
-            self.event.get(self.PARAM_PROXY_NHS_NO)
-        ):
+        if not proxy.valid:
             write_log("ERROR", {"info": "Proxy Identifier not valid", "error": ""})
             self.__output_error(errors.INVALID_IDENTIFIER_VALUE)
             return False
 
-        if self.event.get(
-            self.PARAM_PATIENT_NHS_NO
-        ) and not self.__check_nhs_number_is_valid(
-            self.event.get(self.PARAM_PATIENT_NHS_NO)
-        ):
+        if patient and not patient.valid:
             write_log("ERROR", {"info": "Patient Identifier not valid", "error": ""})
             self.__output_error(errors.INVALID_PATIENT_IDENTIFIER_VALUE)
             return False
 
-        if (
-            self.event.get(self.PARAM_PROXY_NHS_NO)
-            and not self.__check_nhs_number_system(
-                self.event.get(self.PARAM_PROXY_NHS_NO)
-            )
-            and self.event.get(self.PARAM_PATIENT_NHS_NO)
-            and not self.__check_nhs_number_system(
-                self.event.get(self.PARAM_PATIENT_NHS_NO)
-            )
-        ):
+        if not proxy.system_ok and patient and not patient.system_ok:
             write_log(
                 "ERROR",
                 {"info": "Proxy and Patient Identifier Systems not valid", "error": ""},
@@ -146,22 +134,14 @@ class VerifyParameters(LambdaApplication):
             self.__output_error(errors.INVALID_IDENTIFIER_SYSTEM)
             return False
 
-        if self.event.get(
-            self.PARAM_PROXY_NHS_NO
-        ) and not self.__check_nhs_number_system(
-            self.event.get(self.PARAM_PROXY_NHS_NO)
-        ):
+        if not proxy.system_ok:
             write_log(
                 "ERROR", {"info": "Proxy Identifier System not valid", "error": ""}
             )
             self.__output_error(errors.INVALID_IDENTIFIER_SYSTEM)
             return False
 
-        if self.event.get(
-            self.PARAM_PATIENT_NHS_NO
-        ) and not self.__check_nhs_number_system(
-            self.event.get(self.PARAM_PATIENT_NHS_NO)
-        ):
+        if patient and not patient.system_ok:
             write_log(
                 "ERROR", {"info": "Patient Identifier System not valid", "error": ""}
             )
@@ -178,42 +158,24 @@ class VerifyParameters(LambdaApplication):
             self.__output_error(errors.INTERNAL_SERVER_ERROR)
             result = False
 
-        if (
-            not self.event.get(self.PARAM_PROXY_NHS_NO)
-            and not self.event.get(self.PARAM_PATIENT_NHS_NO)
-            or not self.event.get(self.PARAM_PROXY_NHS_NO)
-            and self.event.get(self.PARAM_PATIENT_NHS_NO)
-        ):
+        if not proxy and not patient or not proxy and patient:
             # Last check - if no parameters are present, return an error (should never happen)
             write_log("ERROR", {"info": "No correct parameters supplied", "error": ""})
             self.__output_error(errors.NOT_SUPPORTED)
 
         return result
 
-    def __check_nhs_number_system(self, nhs_number: str) -> bool:
-        """Determines if the NHS Number System is correct (if set)
+    def __parse_identifier(self, parameter: str) -> Optional[NHSIdentifier]:
+        """Parses an NHS Number parameter
 
         Args:
-            nhs_number (str): The NHS Number to check
+            parameter (str): Name of the parameter
 
         Returns:
-            bool: Returns True if the NHS Number System is correct, False otherwise
+            NHSIdentifier: The parsed identifier, or None if it is not supplied
         """
-        nhs_number_class = NHSNumber()
-        return nhs_number_class.is_correct_nhs_number_system(nhs_number)
-
-    def __check_nhs_number_is_valid(self, nhs_number: str) -> bool:
-        """Determines if the NHS Number Type is valid
-
-        Args:
-            nhs_number (str): The NHS Number to check
-
-        Returns:
-            bool: Returns True if the NHS Number is valid, False otherwise
-        """
-        nhs_number_class = NHSNumber()
-        nhs_number = nhs_number_class.extract_nhs_number(nhs_number)
-        return nhs_number_class.is_valid_nhs_number(nhs_number)
+        value = self.event.get(parameter)
+        return parse_nhs_identifier(value) if value else None
 
     def __verify_is_guid(self, parameter_header: str) -> bool:
         """Determines if the parameter is a valid UUID
@@ -242,14 +204,13 @@ class VerifyParameters(LambdaApplication):
 
     def __output_success(self):
         """Outputs the required parameters"""
-        patient_nhs_number = self.event.get(self.PARAM_PATIENT_NHS_NO)
-        proxy_nhs_number = self.event.get(self.PARAM_PROXY_NHS_NO)
-
-        nhs_number = NHSNumber()
-
         resp = {
-            "patientNhsNumber": nhs_number.extract_nhs_number(patient_nhs_number),
-            "proxyNhsNumber": nhs_number.extract_nhs_number(proxy_nhs_number),
+            "patientNhsNumber": (
+                self.patient_identifier.digits
+                if self.patient_identifier
+                else self.event.get(self.PARAM_PATIENT_NHS_NO)
+            ),
+            "proxyNhsNumber": self.proxy_identifier.digits,
             "correlationId": self.correlation_id,
             "originalRequestUrl": self.event.get(self.PARAM_HEADER_ORIGINAL_URL),
             self.PARAM_INCLUDE: "",
@@ -11,6 +11,8 @@ module "pds_get_patient_details" {
   subnet_ids         = data.aws_subnets.lambda_subnets.ids
 
   environment_variables = {
-    PDS_BASE_URL = var.pds_base_url
+    PDS_BASE_URL                 = var.pds_base_url
+    PDS_CACHE_PATIENT_TTL        = var.pds_cache_patient_ttl
+    PDS_CACHE_RELATED_PERSON_TTL = var.pds_cache_related_person_ttl
   }
 }
@@ -118,3 +118,21 @@ variable "dynamodb_ttl" {
   type        = number
   description = "Dynamo DB record Time To Live in seconds"
 }
+
+variable "validate_relationships_in_process" {
+  type        = string
+  default     = "false"
+  description = "Set to 'true' for get_candidate_relationships to run the validate relationships stages in process instead of starting the step function"
+}
+
+variable "pds_cache_patient_ttl" {
+  type        = number
+  default     = 0
+  description = "Seconds that PDS Patient responses are cached for, 0 disables caching. Cached responses can hide a change of deceased status"
+}
+
+variable "pds_cache_related_person_ttl" {
+  type        = number
+  default     = 0
+  description = "Seconds that PDS RelatedPerson responses are cached for, 0 disables caching. Cached responses can hide a removed relationship"
+}
@@ -13,6 +13,15 @@ module "get_candidate_relationships" {
 
   environment_variables = {
     "VALIDATE_RELATIONSHIPS_STATE_MACHINE_ARN" = module.validate_relationships_step_functions.step_function_arn
+    "VALIDATE_RELATIONSHIPS_IN_PROCESS"        = var.validate_relationships_in_process
+    # Required by the validate relationships stages when run in process
+    "REGION"                       = local.aws_region
+    "PDS_CREDENTIALS"              = aws_secretsmanager_secret.pds_credentials.name
+    "PDS_AUTH_URL"                 = var.pds_auth_url
+    "PDS_BASE_URL"                 = var.pds_base_url
+    "PDS_CACHE_PATIENT_TTL"        = var.pds_cache_patient_ttl
+    "PDS_CACHE_RELATED_PERSON_TTL" = var.pds_cache_related_person_ttl
+    "EVENT_BUS_NAME"               = data.aws_cloudwatch_event_bus.event_bus.name
   }
 }
 
@@ -36,3 +45,48 @@ resource "aws_iam_role_policy_attachment" "get_candidate_relationships_step_func
   policy_arn = aws_iam_policy.get_candidate_relationships_step_functions_policy.arn
   role       = module.get_candidate_relationships.iam_role_name
 }
+
+data "aws_iam_policy_document" "get_candidate_relationships_in_process_validation_policy_document" {
+  statement {
+    sid     = "AllowSecretsAccess"
+    effect  = "Allow"
+    actions = ["secretsmanager:GetSecretValue"]
+    resources = [
+      aws_secretsmanager_secret.pds_credentials.arn
+    ]
+  }
+
+  statement {
+    sid    = "AllowKMSAccess" # KMS access for decrypting secrets
+    effect = "Allow"
+    actions = [
+      "kms:Decrypt*",
+      "kms:Describe*"
+    ]
+    resources = [aws_kms_key.pds_credentials_secrets_manager_key.arn]
+  }
+
+  statement {
+    sid    = "AllowPutEvents"
+    effect = "Allow"
+    actions = [
+      "events:PutEvents"
+    ]
+    resources = [
+      data.aws_cloudwatch_event_bus.event_bus.arn
+    ]
+  }
+}
+
+resource "aws_iam_policy" "get_candidate_relationships_in_process_validation_policy" {
+  name        = "${local.workspace}-get-candidate-relationships-in-process-validation-policy"
+  path        = "/"
+  description = "IAM policy for get_candidate_relationships to validate relationships in process"
+
+  policy = data.aws_iam_policy_document.get_candidate_relationships_in_process_validation_policy_document.json
+}
+
+resource "aws_iam_role_policy_attachment" "get_candidate_relationships_in_process_validation_policy_attachment" {
+  policy_arn = aws_iam_policy.get_candidate_relationships_in_process_validation_policy.arn
+  role       = module.get_candidate_relationships.iam_role_name
+}